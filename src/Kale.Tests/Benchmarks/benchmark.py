@@ -0,0 +1,123 @@
+"""
+Throughput and scaling benchmarks for the Lexer, Parser and Emitter.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/benchmark.py [statements]
+
+test_scaling.py only checks the time growth with KALE_BENCHMARKS=1 set,
+the memory growth always.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Emitting.emitter import Emitter
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def measure(function, repeat=3, memory=False):
+    """
+    Returns the best wall time of `repeat` runs of function, and its peak
+    traced memory if memory=True (measured on a separate run).
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return best, peak
+
+
+def lex(source):
+    return Lexer(source).token_stream()
+
+
+def parse(source):
+    lexer = Lexer(source)
+    return Parser(lexer.token_stream(), names=lexer.names).program()
+
+
+def emit(lines):
+    with tempfile.TemporaryDirectory() as directory:
+        emitter = Emitter(os.path.join(directory, "bench"))
+        for i in range(lines):
+            emitter.emit_line(f"    v{i} = v{i} + {i};")
+        emitter.output()
+
+
+def stages(statements, seed=0):
+    """
+    Returns (name, units, function) for every benchmarked stage at the
+    given program size.
+    """
+
+    source = ProgramGenerator(seed).generate(statements)
+    tokens = len(lex(source))
+    lines = source.count("\n")
+    return [
+        ("lexer", tokens, lambda: lex(source)),
+        ("parser", lines, lambda: parse(source)),
+        ("emitter", lines, lambda: emit(lines)),
+    ]
+
+
+def scaling(sizes, repeat=3, memory=False, seed=0):
+    """
+    Runs every stage at each program size.
+
+    Returns {stage: [(units, seconds, peak_bytes), ...]}.
+    """
+
+    results = {}
+    for size in sizes:
+        for name, units, function in stages(size, seed):
+            seconds, peak = measure(function, repeat, memory)
+            results.setdefault(name, []).append((units, seconds, peak))
+    return results
+
+
+def growth(samples, column=1):
+    """
+    Returns how much the per-unit cost grows from the smallest to the
+    largest sample. 1.0 is perfectly linear, a quadratic stage doubles it
+    with every doubling of the input.
+    """
+
+    first, last = samples[0], samples[-1]
+    return (last[column] / last[0]) / (first[column] / first[0])
+
+
+def report(results):
+    lines = []
+    for name, samples in results.items():
+        for units, seconds, peak in samples:
+            line = f"{name:<8}{units:>10} units{seconds * 1000:>10.1f} ms{units / seconds:>14,.0f} units/s"
+            if peak is not None:
+                line += f"{peak / units:>10.1f} B/unit"
+            lines.append(line)
+        lines.append(f"{name:<8}time growth x{growth(samples):.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    base = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(report(scaling([base, base * 2, base * 4], memory=True)))
@@ -0,0 +1,98 @@
+"""
+What `kale run` costs against the gcc path: startup, from source to the
+end of a short program, and throughput on the loop heavy program of
+the loop optimization benchmark.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/bytecodevm.py [iterations]
+"""
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Running.runner import load_program
+from CodeAnalysis.Running.virtualmachine import VirtualMachine
+from Benchmarks import loopoptimization
+
+
+SHORT = """int total = 0
+for (int i = 0; i < 100; i++) {
+    total = total + i * i
+}
+print(total)
+"""
+
+
+def run_vm(path):
+    """
+    Returns (compile seconds, run seconds, output) of path on the VM.
+    """
+
+    start = time.perf_counter()
+    program, diagnostics = load_program(path)
+    assert not diagnostics, diagnostics
+    compiled = time.perf_counter()
+    output = io.StringIO()
+    VirtualMachine(program, stdout=output).run()
+    return compiled - start, time.perf_counter() - compiled, output.getvalue()
+
+
+def run_native(path):
+    """
+    Returns (compile seconds, run seconds, output) of path compiled to C
+    at level 3 and built by the NativeBuilder at -O0.
+    """
+
+    start = time.perf_counter()
+    result = compile_file(path, CompilationOptions(trace=False, emit=True, optimization=3))
+    build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+    assert not build.failed, build.error
+    compiled = time.perf_counter()
+    output = subprocess.run([build.executable], capture_output=True, text=True, check=True).stdout
+    return compiled - start, time.perf_counter() - compiled, output
+
+
+def measure(iterations=200):
+    """
+    Returns {backend: {'startup': (compile, run, output), 'loops': ...}},
+    without the native backend when there is no gcc.
+    """
+
+    backends = {'vm': run_vm}
+    if shutil.which("gcc"):
+        backends['gcc'] = run_native
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, source in (('startup', SHORT), ('loops', loopoptimization.program(iterations))):
+            path = os.path.join(directory, f"{name}.kl")
+            with open(path, 'w') as file:
+                file.write(source)
+            for backend, run in backends.items():
+                results.setdefault(backend, {})[name] = run(path)
+    return results
+
+
+def report(results):
+    lines = []
+    for backend, programs in results.items():
+        for name, (compiled, ran, _) in programs.items():
+            lines.append(f"{backend:<7}{name:<8}compile{compiled * 1000:>9.1f} ms  run{ran * 1000:>9.1f} ms"
+                         f"  total{(compiled + ran) * 1000:>9.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(report(measure(iterations)))
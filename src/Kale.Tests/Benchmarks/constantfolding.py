@@ -0,0 +1,123 @@
+"""
+What constant folding saves: operations left in the program, bytes of C
+and, with gcc at -O0 so it doesn't fold for us, run time.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/constantfolding.py [iterations]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Emitting.codegenerator import CodeGenerator
+from CodeAnalysis.Emitting.emitter import Emitter
+from CodeAnalysis.Optimizing.optimizer import Optimizer
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Syntax.syntaxtree import BinaryExpression, SyntaxNode, UnaryExpression
+
+
+def program(iterations):
+    """
+    A loop over arithmetic on literals and never reassigned declarations.
+    """
+
+    return f"""int width = 640
+int height = 480
+double scale = 1.5
+let offset = 12 * 4 - 6
+int total = 0
+double area = 0.0
+for (int i = 0; i < {iterations}; i++) {{
+    total = total + (width * height / 1024 - offset * 2) / (height / 60) - (width / 8 + height / 6 - 140)
+    area = area + scale * scale * 2.0 - (3 + 4) * 0.5 + width / 64 - 10
+    if (total > 100000 * 10) {{
+        total = total - (8 / 8) - 1000000 + 1
+    }}
+}}
+print(total)
+print(area)
+"""
+
+
+def operations(node):
+    """
+    Number of operators in an expression tree or statement list.
+    """
+
+    if isinstance(node, list):
+        return sum(operations(child) for child in node)
+    count = 1 if isinstance(node, (BinaryExpression, UnaryExpression)) else 0
+    for name in getattr(node, '__slots__', ()):
+        child = getattr(node, name)
+        if isinstance(child, (list, SyntaxNode)):
+            count += operations(child)
+    return count
+
+
+def compile_program(source, level, directory, stats=None):
+    """
+    Emits source optimized at level, returns (unit, C path).
+    """
+
+    unit = Optimizer(level, stats).run(Parser(Lexer(source).tokens()).program())
+    emitter = Emitter(os.path.join(directory, f"program{level}"))
+    generator = CodeGenerator(emitter)
+    for statement in unit.statements:
+        generator.statement(statement)
+    generator.end()
+    emitter.output()
+    return unit, emitter.path
+
+
+def run_time(c_path, repeat=3):
+    build = NativeBuilder(BuildOptions(optimization=0)).build(c_path)
+    assert not build.failed, build.error
+    executable = build.executable
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([executable], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(iterations=5_000_000, levels=(0, 1)):
+    """
+    Returns {level: (operations, c_bytes, seconds)}, seconds is None
+    without gcc.
+    """
+
+    results = {}
+    source = program(iterations)
+    with tempfile.TemporaryDirectory() as directory:
+        for level in levels:
+            unit, c_path = compile_program(source, level, directory)
+            count = operations(unit.statements)
+            seconds = run_time(c_path) if shutil.which("gcc") else None
+            results[level] = (count, os.path.getsize(c_path), seconds)
+    return results
+
+
+def report(results):
+    lines = []
+    for level, (count, c_bytes, seconds) in results.items():
+        line = f"-O{level}{count:>6} operations{c_bytes:>8} C bytes"
+        if seconds is not None:
+            line += f"{seconds * 1000:>10.1f} ms"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    print(report(measure(iterations)))
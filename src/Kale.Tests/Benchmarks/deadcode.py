@@ -0,0 +1,88 @@
+"""
+What the control flow passes save on generated, goto heavy programs:
+statements left, bytes of C, gcc's compile time and the program's run
+time, at each optimization level.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/deadcode.py [statements] [loop count]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Statistics.compilationstats import CompilationStats
+from CodeAnalysis.Syntax.syntaxtree import ForStatement, IfStatement, SyntaxNode, WhileStatement
+from Benchmarks.constantfolding import compile_program, run_time
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def statements(nodes):
+    """
+    Number of statements in a statement list, nested ones included.
+    """
+
+    count = 0
+    for node in nodes:
+        count += 1
+        if isinstance(node, (IfStatement, WhileStatement, ForStatement)):
+            count += statements(node.body)
+        if isinstance(node, IfStatement) and node.else_body is not None:
+            count += statements(node.else_body)
+    return count
+
+
+def compile_time(c_path, flags=("-O0",), repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(["gcc", *flags, "-w", "-c", "-o", os.devnull, c_path], check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(count=2000, loop_count=40, levels=(0, 1, 2), seed=0):
+    """
+    Returns {level: (statements, c_bytes, compile_seconds, run_seconds)}
+    and the per pass counts of the highest level. Times are None without
+    gcc.
+    """
+
+    source = ProgramGenerator(seed, depth=3, loop_count=loop_count).generate(count)
+    results = {}
+    stats = None
+    with tempfile.TemporaryDirectory() as directory:
+        for level in levels:
+            stats = CompilationStats()
+            unit, c_path = compile_program(source, level, directory, stats=stats)
+            compile_seconds = run_seconds = None
+            if shutil.which("gcc"):
+                compile_seconds = compile_time(c_path)
+                run_seconds = run_time(c_path)
+            results[level] = (statements(unit.statements), os.path.getsize(c_path), compile_seconds, run_seconds)
+    return results, stats.passes
+
+
+def report(results, passes):
+    lines = []
+    for level, (count, c_bytes, compile_seconds, run_seconds) in results.items():
+        line = f"-O{level}{count:>7} statements{c_bytes:>9} C bytes"
+        if compile_seconds is not None:
+            line += f"{compile_seconds * 1000:>9.1f} ms gcc{run_seconds * 1000:>9.1f} ms run"
+        lines.append(line)
+    for name, counts in passes.items():
+        lines.append(f"{name:<12}" + ", ".join(f"{count} {key}" for key, count in counts.items()))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    loop_count = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    print(report(*measure(count, loop_count)))
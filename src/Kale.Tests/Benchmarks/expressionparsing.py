@@ -0,0 +1,77 @@
+"""
+Parse time of expression heavy programs, and the deepest nesting of
+parentheses the Parser takes.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/expressionparsing.py [statements]
+"""
+import os
+import sys
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from Benchmarks.programgenerator import ProgramGenerator
+
+operators = ("+", "-", "*", "/", "%", "**", "&", "|", "^", "<<", ">>", "<", "==")
+
+
+def program(statements, expression_length=12):
+    """
+    Flat statements of long expressions over every binary operator.
+    """
+
+    return ProgramGenerator(0, depth=1, expression_length=expression_length, identifier_ratio=0.6,
+                            operators=operators).generate(statements)
+
+
+def nested(depth):
+    return "print(" + "(" * depth + "1" + ")" * depth + ")\n"
+
+
+def parse_time(source, repeat=3):
+    """
+    Returns (tokens, best seconds) of parsing source, lexed beforehand.
+    """
+
+    lexer = Lexer(source)
+    tokens = lexer.token_stream()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Parser(tokens, names=lexer.names).program()
+        best = min(best, time.perf_counter() - start)
+    return len(tokens), best
+
+
+def deepest(limit=1_000_000):
+    """
+    The deepest nesting up to limit, doubling from 100, that parses
+    without a RecursionError.
+    """
+
+    depth = 100
+    while depth <= limit:
+        try:
+            parse_time(nested(depth), repeat=1)
+        except RecursionError:
+            return depth // 2
+        depth *= 2
+    return depth // 2
+
+
+def report(statements):
+    tokens, seconds = parse_time(program(statements))
+    return "\n".join([
+        f"expressions  {tokens:>9} tokens {seconds * 1000:>9.1f} ms {tokens / seconds:>12,.0f} tokens/s",
+        f"nesting      parses {deepest():,} levels of parentheses",
+    ])
+
+
+if __name__ == '__main__':
+    print(report(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
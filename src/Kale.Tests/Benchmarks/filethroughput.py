@@ -0,0 +1,68 @@
+"""
+End-to-end throughput of compiling many files, at several worker counts.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/filethroughput.py [files] [statements]
+"""
+import os
+import sys
+import tempfile
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Compilation.compilation import CompilationOptions, available_cores, compile_files
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def write_programs(directory, files, statements, seed=0):
+    """
+    Writes `files` generated programs to directory, returns their paths.
+    """
+
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"program{i:05}.kl")
+        with open(path, "w") as source_file:
+            source_file.write(ProgramGenerator(seed + i).generate(statements))
+        paths.append(path)
+    return paths
+
+
+def throughput(paths, jobs):
+    """
+    Returns files per second compiling paths on `jobs` workers, pool
+    startup included as a build would pay it.
+    """
+
+    start = time.perf_counter()
+    for _ in compile_files(paths, CompilationOptions(trace=False), jobs):
+        pass
+    return len(paths) / (time.perf_counter() - start)
+
+
+def scaling(files=200, statements=100, workers=(1, 2, 4, 8)):
+    """
+    Returns [(jobs, files_per_second), ...].
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_programs(directory, files, statements)
+        return [(jobs, throughput(paths, jobs)) for jobs in workers]
+
+
+def report(results):
+    base = results[0][1]
+    lines = [f"{available_cores()} cores available"]
+    for jobs, files_per_second in results:
+        lines.append(f"{jobs:>3} workers{files_per_second:>12,.1f} files/s  x{files_per_second / base:.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    print(report(scaling(files, statements)))
@@ -0,0 +1,168 @@
+import random
+
+
+class ProgramGenerator:
+    """
+    Seeded generator of valid Kale programs.
+
+    Programs only use constructs Parser.statement accepts, every name is
+    declared before use and every loop and goto terminates, so generated
+    programs can also be run by the backends.
+
+    depth               maximum nesting of if/while/for bodies
+    expression_length   number of operands in generated expressions
+    identifier_ratio    chance that an operand is a variable, not a literal
+    operators           binary operators expressions are made of
+    """
+
+    def __init__(self, seed=0, depth=2, expression_length=4, identifier_ratio=0.5, loop_count=3,
+                 operators=("+", "-", "*", "/")):
+        self.random = random.Random(seed)
+        self.operators = operators
+        self.depth = depth
+        self.expression_length = expression_length
+        self.identifier_ratio = identifier_ratio
+        self.loop_count = loop_count
+
+        self.counter = 0
+        self.numbers = []
+        self.lines = []
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def generate(self, statements):
+        """
+        Returns the source of a program with `statements` top level
+        statements, plus the labels and skipped statements of its gotos.
+        """
+
+        self.counter = 0
+        self.numbers = []
+        self.lines = []
+
+        # Seed variables so expressions always have something to refer to
+        self.declaration(0, "int")
+        for _ in range(statements - 1):
+            self.statement(0)
+
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, level, line):
+        self.lines.append("    " * level + line)
+
+    def literal(self):
+        if self.random.random() < 0.25:
+            return f"{self.random.randint(1, 99)}.{self.random.randint(0, 9)}"
+        return str(self.random.randint(1, 999))
+
+    def operand(self):
+        if self.numbers and self.random.random() < self.identifier_ratio:
+            return self.random.choice(self.numbers)
+        return self.literal()
+
+    def expression(self):
+        parts = [self.operand()]
+        for _ in range(self.random.randint(0, self.expression_length - 1)):
+            operator = self.random.choice(self.operators)
+            # Only literal divisors, so programs never divide by zero
+            if operator == "/" or operator == "%":
+                right = str(self.random.randint(1, 9))
+            elif operator == "<<" or operator == ">>":
+                right = str(self.random.randint(0, 31))
+            # Small exponents, so powers don't all overflow
+            elif operator == "**":
+                right = str(self.random.randint(0, 4))
+            else:
+                right = self.operand()
+            # A negative exponent can make a divisor 0
+            if self.random.random() < 0.15 and operator != "**":
+                right = f"-{right}"
+            parts.append(operator)
+            parts.append(right)
+
+        if len(parts) > 3 and self.random.random() < 0.3:
+            parts[0] = "(" + parts[0]
+            parts[2] = parts[2] + ")"
+        return " ".join(parts)
+
+    def comparison(self):
+        operator = self.random.choice(["<", "<=", ">", ">=", "==", "!="])
+        return f"{self.expression()} {operator} {self.expression()}"
+
+    def declaration(self, level, keyword=None):
+        keyword = keyword or self.random.choice(["int", "int", "float", "double", "char", "bool", "string", "let", "var"])
+        name = self.fresh("v")
+
+        if keyword == "string":
+            self.emit(level, f'string {name} = "s{self.counter}"')
+            return
+        if keyword == "bool":
+            self.emit(level, f"bool {name} = {self.random.choice(['true', 'false'])}")
+            return
+        if keyword == "char":
+            self.emit(level, f"char {name} = {self.random.randint(65, 90)}")
+            return
+
+        self.emit(level, f"{keyword} {name} = {self.expression()}")
+        # Block scoped names must not leak into later statements
+        if level == 0:
+            self.numbers.append(name)
+
+    def statement(self, level):
+        nested = level < self.depth
+        choice = self.random.random()
+
+        if choice < 0.30:
+            self.declaration(level)
+        elif choice < 0.50 and self.numbers:
+            self.emit(level, f"{self.random.choice(self.numbers)} = {self.expression()}")
+        elif choice < 0.60:
+            if self.random.random() < 0.5:
+                self.emit(level, f'print("p{self.counter}")')
+            else:
+                self.emit(level, f"print({self.expression()})")
+        elif choice < 0.70 and nested:
+            self.if_statement(level)
+        elif choice < 0.78 and nested:
+            self.while_statement(level)
+        elif choice < 0.86 and nested:
+            self.for_statement(level)
+        elif choice < 0.92:
+            # Forward goto over one statement
+            label = self.fresh("l")
+            self.emit(level, f"goto {label}")
+            self.statement(level)
+            self.emit(level, f"label {label}:")
+        else:
+            self.emit(level, f"print({self.expression()})")
+
+    def block(self, level):
+        for _ in range(self.random.randint(1, 3)):
+            self.statement(level + 1)
+
+    def if_statement(self, level):
+        self.emit(level, f"if ({self.comparison()}) {{")
+        self.block(level)
+        for _ in range(self.random.randint(0, 2)):
+            self.emit(level, f"}} else if ({self.comparison()}) {{")
+            self.block(level)
+        if self.random.random() < 0.5:
+            self.emit(level, "} else {")
+            self.block(level)
+        self.emit(level, "}")
+
+    def while_statement(self, level):
+        counter = self.fresh("w")
+        self.emit(level, f"int {counter} = 0")
+        self.emit(level, f"while ({counter} < {self.loop_count}) {{")
+        self.block(level)
+        self.emit(level + 1, f"{counter} = {counter} + 1")
+        self.emit(level, "}")
+
+    def for_statement(self, level):
+        counter = self.fresh("i")
+        self.emit(level, f"for (int {counter} = 0; {counter} < {self.loop_count}; {counter}++) {{")
+        self.block(level)
+        self.emit(level, "}")
@@ -0,0 +1,170 @@
+"""
+What the Python backend costs against the other ways of running a
+program: the gcc path, the bytecode VM and a naive tree walking
+interpreter, on a short program and on the loop heavy program of the
+loop optimization benchmark.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/pythonexecution.py [iterations]
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.Emitting.codegenerator import comparison_kinds, print_formats, expression_type, variable_type
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Running.pythonbackend import execute, load_code
+from CodeAnalysis.Running.virtualmachine import single, to_int, wrap
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, IfStatement, LiteralExpression,
+    NameExpression, PrintStatement, UnaryExpression, WhileStatement,
+)
+from Benchmarks import bytecodevm, loopoptimization
+
+
+class TreeWalker:
+    """
+    The baseline: evaluates the syntax tree node by node, variables in a
+    dict. Only covers what the benchmark programs use, no gotos or input.
+    """
+
+    operations = {
+        SyntaxKind.PlusToken: lambda left, right: left + right,
+        SyntaxKind.MinusToken: lambda left, right: left - right,
+        SyntaxKind.StartToken: lambda left, right: left * right,
+        SyntaxKind.LessToken: lambda left, right: left < right,
+        SyntaxKind.LessOrEqualsToken: lambda left, right: left <= right,
+        SyntaxKind.GreaterToken: lambda left, right: left > right,
+        SyntaxKind.GreaterOrEqualsToken: lambda left, right: left >= right,
+        SyntaxKind.EqualsEqualsToken: lambda left, right: left == right,
+        SyntaxKind.BangEqualsToken: lambda left, right: left != right,
+    }
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.types = {}
+        self.variables = {}
+
+    def run(self, unit):
+        for statement in unit.statements:
+            self.execute(statement)
+
+    def execute(self, node):
+        if isinstance(node, PrintStatement):
+            text_format = print_formats[expression_type(node.expression, self.types)]
+            self.stdout.write(text_format % self.evaluate(node.expression) + "\n")
+        elif isinstance(node, DeclarationStatement):
+            self.types.setdefault(node.name_id, variable_type(node, self.types))
+            if node.initializer is not None:
+                self.store(node.name_id, self.evaluate(node.initializer))
+        elif isinstance(node, AssignmentStatement):
+            self.store(node.name_id, self.evaluate(node.expression))
+        elif isinstance(node, IfStatement):
+            for statement in node.body if self.evaluate(node.condition) else node.else_body or []:
+                self.execute(statement)
+        elif isinstance(node, WhileStatement):
+            while self.evaluate(node.condition):
+                for statement in node.body:
+                    self.execute(statement)
+        elif isinstance(node, ForStatement):
+            self.execute(node.initializer)
+            while self.evaluate(node.condition):
+                for statement in node.body:
+                    self.execute(statement)
+                self.evaluate(node.increment)
+
+    def store(self, name_id, value):
+        kind = self.types[name_id]
+        if kind == 'int':
+            value = wrap(to_int(value))
+        elif kind == 'float':
+            value = single(value)
+        elif kind == 'double':
+            value = float(value)
+        self.variables[name_id] = value
+        return value
+
+    def evaluate(self, node):
+        if isinstance(node, LiteralExpression):
+            return (float(node.value) if '.' in node.value else int(node.value)) \
+                if node.kind is SyntaxKind.NumberToken else node.value
+        if isinstance(node, NameExpression):
+            return self.variables.get(node.name_id, 0)
+        if isinstance(node, BinaryExpression):
+            left, right = self.evaluate(node.left), self.evaluate(node.right)
+            integers = isinstance(left, int) and isinstance(right, int)
+            if node.operator is SyntaxKind.SlashToken:
+                return int(left / right) if integers else left / right
+            value = self.operations[node.operator](left, right)
+            return wrap(value) if integers and node.operator not in comparison_kinds else value
+        if isinstance(node, UnaryExpression):
+            value = self.evaluate(node.operand)
+            if node.operator is SyntaxKind.PlusPlusToken:
+                self.store(node.operand.name_id, value + 1)
+                return value
+            return -value if node.operator is SyntaxKind.MinusToken else value
+        raise TypeError(f"The tree walker doesn't run {type(node).__name__}")
+
+
+def run_python(path):
+    """
+    Returns (compile seconds, run seconds, output) of path as Python.
+    """
+
+    start = time.perf_counter()
+    code, diagnostics = load_code(path)
+    assert not diagnostics, diagnostics
+    compiled = time.perf_counter()
+    output = io.StringIO()
+    execute(code, stdout=output)
+    return compiled - start, time.perf_counter() - compiled, output.getvalue()
+
+
+def run_walker(path):
+    """
+    Returns (parse seconds, run seconds, output) of path on the tree walker.
+    """
+
+    start = time.perf_counter()
+    with open(path) as file:
+        unit = Parser(Lexer(file.read()).tokens()).program()
+    parsed = time.perf_counter()
+    output = io.StringIO()
+    TreeWalker(output).run(unit)
+    return parsed - start, time.perf_counter() - parsed, output.getvalue()
+
+
+def measure(iterations=200):
+    """
+    Returns {backend: {'startup': (compile, run, output), 'loops': ...}},
+    without the gcc path when there is no gcc.
+    """
+
+    backends = {'python': run_python, 'vm': bytecodevm.run_vm, 'walker': run_walker}
+    if shutil.which("gcc"):
+        backends['gcc'] = bytecodevm.run_native
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, source in (('startup', bytecodevm.SHORT), ('loops', loopoptimization.program(iterations))):
+            path = os.path.join(directory, f"{name}.kl")
+            with open(path, 'w') as file:
+                file.write(source)
+            for backend, run in backends.items():
+                results.setdefault(backend, {})[name] = run(path)
+    return results
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(bytecodevm.report(measure(iterations)))
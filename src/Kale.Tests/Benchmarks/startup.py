@@ -0,0 +1,116 @@
+"""
+Cold start of the kale command on a trivial file: the modules it imports,
+their import time and the wall time of the whole run.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+kale_root = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'Kale')
+
+trivial = "int x = 1\nprint(x)\n"
+
+# Modules a clean --check --no-cache compile must not load, each only
+# matters to errors, builds, several files, the cache, emitting C or
+# optimizing it
+forbidden = ('loguru', 'colorama', 'termcolor', 'concurrent.futures', 'multiprocessing', 'dataclasses',
+             'tempfile', 'CodeAnalysis.Caching.compilationcache', 'CodeAnalysis.Statistics.compilationstats',
+             'CodeAnalysis.Emitting.codegenerator', 'CodeAnalysis.Emitting.ircodegenerator',
+             'CodeAnalysis.Optimizing.optimizer')
+
+# Budgets of a clean compile, in seconds. The imports include the
+# interpreter's own and -X importtime's overhead, the wall time is over a
+# bare interpreter. Both leave room for a slow machine, eagerly importing
+# the modules above again doesn't fit. A loaded machine alone can exceed
+# them, so the test only checks them when benchmarks are asked for.
+import_budget = 0.100
+wall_budget = 0.100
+
+
+def command(path, *flags):
+    return [sys.executable, *flags, kale_root, '-q', '--check', '--no-cache', path]
+
+
+def import_times(path):
+    """
+    Runs kale on path under -X importtime. Returns ({module: seconds}, total)
+    with the cumulative import time of every module it loaded, and the sum
+    over the top level ones, the modules kale asked for itself.
+    """
+
+    process = subprocess.run(command(path, '-X', 'importtime'), capture_output=True, text=True, check=True)
+    times, total = {}, 0
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or line.endswith('| package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # The column headings
+        if not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = int(cumulative) / 1e6
+        # Nested imports are indented
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return times, total / 1e6
+
+
+def best_wall(arguments, runs):
+    """
+    The best wall time of `runs` runs of arguments, in seconds.
+    """
+
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(arguments, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(runs=10):
+    """
+    Returns the startup figures of kale on a trivial file: the modules it
+    loaded with their import times, the total import time of the modules
+    it asked for, and the best wall times of kale and of the bare
+    interpreter.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trivial.kl')
+        with open(path, 'w') as file:
+            file.write(trivial)
+        times, imports = import_times(path)
+        kale = best_wall(command(path), runs)
+    bare = best_wall([sys.executable, '-c', 'pass'], runs)
+    return {'modules': times, 'imports': imports, 'kale': kale, 'bare': bare}
+
+
+def budget(seconds, limit):
+    return f"(budget {limit * 1000:.0f} ms{', OVER' if seconds >= limit else ''})"
+
+
+def report(runs):
+    results = measure(runs)
+    slowest = sorted(results['modules'].items(), key=lambda item: -item[1])[:10]
+    over = results['kale'] - results['bare']
+    lines = [
+        f"imports          {results['imports'] * 1000:>8.1f} ms {budget(results['imports'], import_budget)}",
+        f"kale wall time   {results['kale'] * 1000:>8.1f} ms",
+        f"bare python      {results['bare'] * 1000:>8.1f} ms",
+        f"over bare        {over * 1000:>8.1f} ms {budget(over, wall_budget)}",
+        "slowest modules (cumulative)",
+    ]
+    lines += [f"  {name:<45}{seconds * 1000:>8.1f} ms" for name, seconds in slowest]
+    loaded = [name for name in forbidden if name in results['modules']]
+    lines.append(f"forbidden modules loaded: {', '.join(loaded) or 'none'}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    print(report(int(sys.argv[1]) if len(sys.argv) > 1 else 10))
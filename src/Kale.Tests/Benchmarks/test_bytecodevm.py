@@ -0,0 +1,13 @@
+import shutil
+
+from Benchmarks.bytecodevm import measure
+
+
+def test_vm_starts_faster_than_gcc():
+    results = measure(2)
+    vm = results['vm']
+    assert vm['startup'][2] == "328350\n"
+    if shutil.which("gcc"):
+        gcc = results['gcc']
+        assert vm['loops'][2] == gcc['loops'][2]
+        assert sum(vm['startup'][:2]) < sum(gcc['startup'][:2])
@@ -0,0 +1,13 @@
+import tempfile
+
+from Benchmarks.constantfolding import compile_program, operations, program
+
+
+def test_folding_removes_operations_and_c():
+    source = program(10)
+    with tempfile.TemporaryDirectory() as directory:
+        unfolded, unfolded_path = compile_program(source, 0, directory)
+        folded, folded_path = compile_program(source, 1, directory)
+        with open(unfolded_path) as unfolded_file, open(folded_path) as folded_file:
+            assert len(folded_file.read()) < len(unfolded_file.read())
+    assert operations(folded.statements) < operations(unfolded.statements) / 2
@@ -0,0 +1,9 @@
+from Benchmarks.deadcode import measure
+
+
+def test_control_flow_passes_shrink_generated_programs():
+    results, passes = measure(200, loop_count=2, levels=(1, 2))
+    (folded_statements, folded_bytes, _, _), (optimized_statements, optimized_bytes, _, _) = results.values()
+    assert optimized_statements < folded_statements * 0.8
+    assert optimized_bytes < folded_bytes
+    assert set(passes) == {'fold', 'thread', 'stores', 'unreachable', 'labels'}
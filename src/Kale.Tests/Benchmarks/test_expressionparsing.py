@@ -0,0 +1,10 @@
+from Benchmarks.expressionparsing import nested, parse_time, program
+
+
+def test_long_expressions_parse():
+    tokens, seconds = parse_time(program(200), repeat=1)
+    assert tokens > 200 * 12
+
+
+def test_nesting_is_not_bounded_by_the_recursion_limit():
+    parse_time(nested(50000), repeat=1)
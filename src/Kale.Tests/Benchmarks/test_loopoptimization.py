@@ -0,0 +1,10 @@
+from Benchmarks.loopoptimization import measure
+
+
+def test_loop_passes_transform_the_program():
+    results, passes = measure(20)
+    (_, _, unoptimized_output), (_, _, optimized_output) = results.values()
+    assert optimized_output == unoptimized_output
+    assert passes['licm']['hoisted'] > 0
+    assert passes['strength']['reduced'] > 0
+    assert passes['cse']['removed'] > 0
@@ -0,0 +1,8 @@
+from Benchmarks.pythonexecution import measure
+
+
+def test_python_backend_beats_the_tree_walker():
+    results = measure(5)
+    outputs = {backend: programs['loops'][2] for backend, programs in results.items()}
+    assert len(set(outputs.values())) == 1
+    assert results['python']['loops'][1] < results['walker']['loops'][1]
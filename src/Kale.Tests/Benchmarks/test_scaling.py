@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from Benchmarks.benchmark import growth, scaling
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_programs_parse(seed):
+    source = ProgramGenerator(seed, depth=3, expression_length=6).generate(200)
+    lexer = Lexer(source)
+    unit = Parser(lexer.tokens(), names=lexer.names).program()
+    assert len(unit.statements) >= 200
+
+
+def test_generator_is_deterministic():
+    assert ProgramGenerator(7).generate(50) == ProgramGenerator(7).generate(50)
+
+
+@pytest.fixture(scope="module")
+def results():
+    return scaling([1000, 4000], repeat=3, memory=True)
+
+
+# Quadrupling the input may cost noise, not another factor of four. Wall
+# time depends on the load of the machine, so it is only checked when
+# benchmarks are asked for, the memory column always is.
+@pytest.mark.skipif(not os.environ.get("KALE_BENCHMARKS"), reason="timing benchmark, set KALE_BENCHMARKS=1")
+@pytest.mark.parametrize("stage", ["lexer", "parser", "emitter"])
+def test_time_grows_linearly(results, stage):
+    assert growth(results[stage]) < 2.0
+
+
+@pytest.mark.parametrize("stage", ["lexer", "parser", "emitter"])
+def test_memory_grows_linearly(results, stage):
+    assert growth(results[stage], column=2) < 2.0
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from Benchmarks.startup import forbidden, import_budget, measure, wall_budget
+
+
+@pytest.fixture(scope="module")
+def results():
+    return measure(5)
+
+
+def test_clean_compile_loads_no_forbidden_modules(results):
+    assert [name for name in forbidden if name in results['modules']] == []
+
+
+@pytest.mark.skipif(not os.environ.get("KALE_BENCHMARKS"), reason="timing benchmark, set KALE_BENCHMARKS=1")
+def test_clean_compile_starts_within_budget(results):
+    assert results['imports'] < import_budget
+    assert results['kale'] - results['bare'] < wall_budget
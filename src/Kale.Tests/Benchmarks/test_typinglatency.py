@@ -0,0 +1,10 @@
+from Benchmarks.typinglatency import typing_latency
+
+
+def test_keystrokes_reparse_a_bounded_number_of_statements():
+    open_seconds, latencies, reparsed, diagnosed = typing_latency(5000)
+    assert diagnosed > 0
+    # Error recovery also reparses the statements a half typed one swallows
+    assert max(reparsed) <= 8
+    # A keystroke is a small fraction of the full analysis
+    assert sorted(latencies)[len(latencies) // 2] < open_seconds / 10
@@ -0,0 +1,171 @@
+"""
+Latency of the language server while typing into a large file.
+
+Run directly for a report:
+
+    python src/Kale.Tests/Benchmarks/typinglatency.py [lines]
+"""
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+if __name__ == '__main__':
+    tests_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path[:0] = [os.path.join(os.path.dirname(tests_root), 'Kale'), tests_root]
+
+from CodeAnalysis.LanguageServer.document import Document
+from CodeAnalysis.LanguageServer.languageserver import LanguageServer
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+typed = "int typed = 12 * 3\nprint(typed)\n"
+
+
+def program(lines, seed=0):
+    """
+    Returns a generated program of about `lines` lines.
+    """
+
+    generator = ProgramGenerator(seed)
+    source = generator.generate(lines)
+    # Nested blocks make a statement several lines, scale to the target
+    ratio = source.count("\n") / lines
+    return ProgramGenerator(seed).generate(max(1, int(lines / ratio)))
+
+
+def middle(source):
+    """
+    Returns the offset of a top level line start near the middle of source.
+    """
+
+    offset = source.index("\n", len(source) // 2) + 1
+    while source.startswith((" ", "}"), offset):
+        offset = source.index("\n", offset) + 1
+    return offset
+
+
+def typing_latency(lines=50000, text=typed, seed=0):
+    """
+    Types `text` one character at a time into the middle of a generated
+    program, analyzing the document after every keystroke.
+
+    Returns (open_seconds, keystroke_seconds, reparsed, diagnosed): the
+    initial full analysis, the change plus analysis time of each
+    keystroke, the statements reparsed for each and how many keystrokes
+    left the text with an error.
+    """
+
+    source = program(lines, seed)
+    document = Document("file:///bench.kl", source)
+    start = time.perf_counter()
+    document.analyze()
+    open_seconds = time.perf_counter() - start
+
+    offset = middle(source)
+    latencies, reparsed, diagnosed = [], [], 0
+    for character in text:
+        position = document.position(offset)
+        before = document.parser.reparsed
+        start = time.perf_counter()
+        document.change([{"range": {"start": position, "end": position}, "text": character}])
+        diagnosed += bool(document.analyze())
+        latencies.append(time.perf_counter() - start)
+        reparsed.append(document.parser.reparsed - before)
+        offset += 1
+
+    return open_seconds, latencies, reparsed, diagnosed
+
+
+def message(method, params, id=None):
+    content = {"jsonrpc": "2.0", "method": method, "params": params}
+    if id is not None:
+        content["id"] = id
+    body = json.dumps(content).encode("utf-8")
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+
+def published(output):
+    """
+    Returns the publishDiagnostics params written to output.
+    """
+
+    data, results = output.getvalue(), []
+    while data:
+        header, _, data = data.partition(b"\r\n\r\n")
+        length = int(header.split(b":")[1])
+        content = json.loads(data[:length])
+        data = data[length:]
+        if content.get("method") == "textDocument/publishDiagnostics":
+            results.append(content["params"])
+    return results
+
+
+async def burst_latency(lines=50000, text=typed, seed=0, interval=0.01, debounce=0.05):
+    """
+    Sends `text` to a LanguageServer as one didChange per character,
+    `interval` seconds apart, and measures from the last keystroke to its
+    diagnostics.
+
+    Returns (seconds, publishes) where publishes counts the diagnostics
+    sent for the burst, debouncing should make it 1.
+    """
+
+    source = program(lines, seed)
+    reader = asyncio.StreamReader()
+    output = io.BytesIO()
+    server = LanguageServer(reader, output, debounce)
+    serving = asyncio.ensure_future(server.serve())
+
+    uri = "file:///bench.kl"
+    reader.feed_data(message("textDocument/didOpen",
+                             {"textDocument": {"uri": uri, "version": 0, "text": source}}))
+    while not published(output):
+        await asyncio.sleep(debounce)
+    opened = len(published(output))
+
+    document = server.documents[uri]
+    offset = middle(source)
+    for version, character in enumerate(text, 1):
+        position = document.position(offset)
+        reader.feed_data(message("textDocument/didChange", {
+            "textDocument": {"uri": uri, "version": version},
+            "contentChanges": [{"range": {"start": position, "end": position}, "text": character}],
+        }))
+        offset += 1
+        await asyncio.sleep(interval)
+
+    start = time.perf_counter()
+    while published(output)[-1].get("version") != len(text):
+        await asyncio.sleep(0.001)
+    seconds = time.perf_counter() - start
+
+    reader.feed_data(message("exit", None))
+    await serving
+    return seconds, len(published(output)) - opened
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(lines):
+    open_seconds, latencies, reparsed, diagnosed = typing_latency(lines)
+    seconds, publishes = asyncio.run(burst_latency(lines))
+    return "\n".join([
+        f"{lines} lines, {len(latencies)} keystrokes ({diagnosed} with an error)",
+        f"open (full analysis)   {open_seconds * 1000:>10.1f} ms",
+        f"keystroke median       {statistics.median(latencies) * 1000:>10.1f} ms",
+        f"keystroke p95          {percentile(latencies, 0.95) * 1000:>10.1f} ms",
+        f"keystroke max          {max(latencies) * 1000:>10.1f} ms",
+        f"statements reparsed    {max(reparsed):>10} max per keystroke",
+        f"burst to diagnostics   {seconds * 1000:>10.1f} ms after the last keystroke ({publishes} publish)",
+    ])
+
+
+if __name__ == '__main__':
+    print(report(int(sys.argv[1]) if len(sys.argv) > 1 else 50000))
@@ -0,0 +1,146 @@
+import io
+import os
+import shutil
+import subprocess
+import tracemalloc
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Emitting.codegenerator import CodeGenerator
+from CodeAnalysis.Emitting.emitter import Emitter
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Running.runner import load_program
+from CodeAnalysis.Running.virtualmachine import VirtualMachine
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+program = """
+int total = 0
+for (int i = 0; i < 5; i++) {
+    if (i == 3) {
+        goto skip
+    }
+    total = total + i
+    label skip:
+}
+char c = "k"
+string s = "all done"
+print(total)
+print(c)
+print(s)
+while (total > 0) {
+    total = total - 4
+}
+print(total)
+"""
+
+
+def generate(source, path):
+    emitter = Emitter(path)
+    Parser(Lexer(source).tokens(), names=None, generator=CodeGenerator(emitter)).program()
+    emitter.output()
+    return emitter.path
+
+
+def run_c(path):
+    build = NativeBuilder(BuildOptions(optimization=0)).build(path)
+    assert not build.failed, build.error
+    return subprocess.run([build.executable], capture_output=True, text=True, check=True).stdout
+
+
+needs_gcc = pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+
+
+@needs_gcc
+def test_generated_c_runs(tmp_path):
+    path = generate(program, str(tmp_path / "program"))
+    assert not os.path.exists(path + ".body")
+    assert run_c(path) == "7\nk\nall done\n-1\n"
+
+
+@needs_gcc
+def test_operators_run(tmp_path):
+    source = ("int a = -7\nint b = 3\ndouble x = -7.5\nprint(a % b)\nprint(x % 2)\nprint(b ** 20)\n"
+              "print(2 ** 3 ** 2)\nprint(x ** 2)\nprint(a & 12 | 1)\nprint(1 << b + 30)\nprint(a >> 1)\n"
+              "print(1 + 2 < 4 == 1)\nb <<= 2\nprint(b)\n")
+    path = generate(source, str(tmp_path / "operators"))
+    assert run_c(path) == "-1\n-1.5\n-808182895\n512\n56.25\n9\n2\n-4\n1\n12\n"
+
+
+@needs_gcc
+def test_string_comparisons_print_what_the_vm_prints(tmp_path):
+    # Declared in the reverse of their order, so comparing the pointers
+    # would give the opposite answers
+    source = ('string s = "zz"\nstring t = "ab"\nprint(s < t)\nprint(t < s)\nprint(s == "zz")\n'
+              'print(s != t)\nprint(t >= "ab")\nlet u = t\nwhile (u <= "ab") {\n    u = "b"\n}\nprint(u > t)\n')
+    path = tmp_path / "strings.kl"
+    path.write_text(source)
+    program, _ = load_program(str(path))
+    output = io.StringIO()
+    VirtualMachine(program, stdout=output).run()
+    assert output.getvalue() == "0\n1\n1\n1\n1\n1\n"
+    for level in (0, 3):
+        result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=level))
+        assert run_c(result.c_path) == output.getvalue()
+
+
+def test_string_arithmetic_is_reported(tmp_path):
+    path = tmp_path / "strings.kl"
+    path.write_text('string s = "ab"\nprint(s + "cd")\n')
+    result = compile_file(str(path), CompilationOptions(trace=False, emit=True))
+    assert result.diagnostics == [(2, 9, "Operator '+' can't be applied to a string")]
+    assert result.c_path is None
+
+
+@needs_gcc
+def test_generated_programs_compile(tmp_path):
+    for seed in range(5):
+        source = ProgramGenerator(seed).generate(30)
+        path = generate(source, str(tmp_path / f"program{seed}"))
+        run_c(path)
+
+
+def test_c_is_written_while_parsing(tmp_path):
+    source = ProgramGenerator(1).generate(2000)
+    emitter = Emitter(str(tmp_path / "program"), buffer_size=4096)
+    sizes = []
+
+    def tokens():
+        for count, token in enumerate(Lexer(source).tokens()):
+            if count == 20000:
+                emitter.body.flush()
+                sizes.append(os.path.getsize(emitter.body_path))
+            yield token
+
+    Parser(tokens(), generator=CodeGenerator(emitter)).program()
+    emitter.output()
+    assert 0 < sizes[0] < os.path.getsize(emitter.path) / 2
+
+
+def test_memory_stays_flat(tmp_path):
+    # The symbol tables grow with the names declared, so the program
+    # repeats statements over the same few variables
+    def peak(statements):
+        source = "int a = 0\nint b = 1\n" + "if (a < b) {\n    a = a + b * 2\n    print(a)\n}\n" * statements
+        tokens = list(Lexer(source).tokens())
+        emitter = Emitter(str(tmp_path / f"program{statements}"))
+        tracemalloc.start()
+        Parser(iter(tokens), generator=CodeGenerator(emitter)).program()
+        emitter.output()
+        result = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result
+
+    # Ten times the statements, not ten times the memory
+    assert peak(4000) < peak(400) * 3
+
+
+def test_no_c_for_a_file_with_errors(tmp_path):
+    bad = tmp_path / "bad.kl"
+    bad.write_text("int a = 1\nprint(b)\n")
+    result = compile_file(str(bad), CompilationOptions(trace=False, emit=True))
+    assert result.failed
+    assert os.listdir(tmp_path) == ["bad.kl"]
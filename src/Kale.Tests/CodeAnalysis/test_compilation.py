@@ -0,0 +1,84 @@
+import os
+import runpy
+import subprocess
+import sys
+
+import pytest
+
+from CodeAnalysis.Compilation import compilation
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_files, expand
+from Benchmarks.filethroughput import write_programs
+
+
+kale = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Kale")
+
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = write_programs(str(tmp_path), 6, 20)
+    bad = tmp_path / "bad.kl"
+    bad.write_text("int a = 1\nprint(b)\nint a = 2\n")
+    return paths, str(bad)
+
+
+def test_expand_keeps_argument_order(sources, tmp_path):
+    paths, bad = sources
+    pattern = str(tmp_path / "program*.kl")
+    assert expand([bad, pattern, paths[0], "missing.kl"]) == [bad] + sorted(paths) + ["missing.kl"]
+
+
+def test_parallel_results_match_serial(sources):
+    paths, bad = sources
+    paths = paths[::-1] + [bad]
+    options = CompilationOptions(stats=True)
+    serial = list(compile_files(paths, options, jobs=1))
+    parallel = list(compile_files(paths, options, jobs=3))
+    assert [result.path for result in parallel] == paths
+    assert [result.output for result in parallel] == [result.output for result in serial]
+    assert [result.diagnostics for result in parallel] == [result.diagnostics for result in serial]
+    assert all(result.stats.statements for result in parallel)
+
+
+def test_diagnostics_are_reported_per_file(sources):
+    paths, bad = sources
+    results = list(compile_files([bad, "missing.kl"], CompilationOptions(trace=False), jobs=2))
+    assert results[0].diagnostics == [
+        (2, 7, "Referencing variable before assignment: b"),
+        (3, 5, "A local variable named 'a' is already defined in this scope"),
+    ]
+    assert results[1].failed
+
+
+def test_cli_fails_if_any_file_fails(sources, tmp_path):
+    paths, bad = sources
+    cache = ["--cache-dir", str(tmp_path / "cache")]
+    run = subprocess.run([sys.executable, kale, "-q", "-j", "2", paths[0], bad, paths[1]] + cache,
+                         capture_output=True, text=True)
+    assert run.returncode == 1
+    assert f"{bad}:2:7: Error" in run.stdout
+    assert "Compiled 2 of 3 files" in run.stdout
+
+    run = subprocess.run([sys.executable, kale, "-q", paths[0]] + cache, capture_output=True, text=True)
+    assert run.returncode == 0
+    assert "hits, 0 misses" in run.stdout
+
+
+def test_cli_fails_without_input_files(monkeypatch, capsys):
+    monkeypatch.setattr(compilation, "expand", lambda patterns: [])
+    monkeypatch.setattr(sys, "argv", ["kale", "-q", "--no-cache", "missing/*.kl"])
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_path(kale, run_name="__main__")
+    assert exit_info.value.code != 0
+    assert "no input files" in capsys.readouterr().err
+
+
+def test_cli_streams_unoptimized_c_by_default(tmp_path):
+    path = tmp_path / "program.kl"
+    path.write_text("int x = 4\nprint(x * 3 - 2)\n")
+    c_texts = []
+    for flags in ([], ["-O", "0"], ["-O", "1"]):
+        subprocess.run([sys.executable, kale, "-q", "--no-cache", *flags, str(path)], check=True,
+                       capture_output=True)
+        c_texts.append((tmp_path / "program.c").read_text())
+    assert c_texts[0] == c_texts[1]
+    assert "((k_x * 3) - 2)" in c_texts[0] and "10" in c_texts[2]
@@ -0,0 +1,93 @@
+import os
+
+from CodeAnalysis.Caching.compilationcache import CompilationCache, temporary_file
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Parsing.lexer import Lexer
+
+
+source = "int a = 1\nprint(a)\nlabel top:\nint b = a + 2\n"
+
+
+def test_key_depends_on_source_and_options(tmp_path):
+    cache = CompilationCache(str(tmp_path))
+    assert cache.key(source) == cache.key(source.encode())
+    assert cache.key(source) != cache.key(source + " ")
+    assert cache.key(source, (True,)) != cache.key(source, (False,))
+
+
+def test_entries_round_trip_and_count(tmp_path):
+    cache = CompilationCache(str(tmp_path))
+    key = cache.key(source)
+    assert cache.load(key, 'c') is None
+    cache.store(key, 'c', b"int main() {}")
+    assert cache.load(key, 'c') == b"int main() {}"
+    assert (cache.hits['c'], cache.misses['c']) == (1, 1)
+    # Written through a temporary file renamed into place
+    assert os.listdir(os.path.dirname(cache.path(key, 'c'))) == [os.path.basename(cache.path(key, 'c'))]
+
+
+def test_unwritable_file_targets_are_misses(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    key = cache.key(source)
+    cache.store(key, 'object', b"\x7fELF")
+    assert not cache.load_file(key, 'object', str(tmp_path / "missing" / "program.o"))
+    assert cache.load_file(key, 'object', str(tmp_path / "program.o"))
+    assert (tmp_path / "program.o").read_bytes() == b"\x7fELF"
+    assert (cache.hits['object'], cache.misses['object']) == (1, 1)
+    assert sorted(os.listdir(tmp_path)) == ["cache", "program.o"]
+
+
+def test_tokens_round_trip(tmp_path):
+    cache = CompilationCache(str(tmp_path))
+    key = cache.key(source)
+    cache.store_tokens(key, Lexer(source).token_stream())
+    assert list(cache.load_tokens(key, source)) == list(Lexer(source).token_stream())
+
+
+def test_trim_evicts_least_recently_used(tmp_path):
+    cache = CompilationCache(str(tmp_path), max_bytes=250)
+    keys = [cache.key(str(i)) for i in range(4)]
+    for age, key in enumerate(keys):
+        cache.store(key, 'c', b"x" * 100)
+        os.utime(cache.path(key, 'c'), (1000 + age, 1000 + age))
+    # Reading makes the oldest entry the most recent
+    cache.load(keys[0], 'c')
+
+    assert cache.trim() == 200
+    assert [cache.load(key, 'c') is not None for key in keys] == [True, False, False, True]
+
+
+def test_trim_leaves_writes_in_progress(tmp_path):
+    cache = CompilationCache(str(tmp_path), max_bytes=150)
+    keys = [cache.key(str(i)) for i in range(2)]
+    for key in keys:
+        cache.store(key, 'c', b"x" * 100)
+    directory = os.path.dirname(cache.path(keys[0], 'c'))
+    handle, writing = temporary_file(directory)
+    os.write(handle, b"x" * 500)
+    os.close(handle)
+    handle, stale = temporary_file(directory)
+    os.close(handle)
+    os.utime(stale, (1000, 1000))
+
+    assert all(not path.startswith(os.path.join(directory, '.tmp-')) for _, _, path in cache.entries())
+    assert cache.trim() == 100
+    assert os.path.exists(writing)
+    assert not os.path.exists(stale)
+    assert sum(cache.load(key, 'c') is not None for key in keys) == 1
+
+
+def test_warm_compile_is_a_lookup(tmp_path):
+    path = tmp_path / "program.kl"
+    path.write_text(source + "print(zz)\n")
+    options = CompilationOptions(cache_dir=str(tmp_path / "cache"))
+
+    cold = compile_file(str(path), options)
+    warm = compile_file(str(path), options)
+    assert (cold.hits['ast'], cold.misses['ast']) == (0, 1)
+    assert (warm.hits['ast'], warm.misses['ast']) == (1, 0)
+    assert warm.output == cold.output
+    assert warm.diagnostics == cold.diagnostics == [(5, 7, "Referencing variable before assignment: zz")]
+
+    path.write_text(source)
+    assert compile_file(str(path), options).misses['ast'] == 1
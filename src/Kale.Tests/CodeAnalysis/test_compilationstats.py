@@ -0,0 +1,58 @@
+import json
+
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Statistics.compilationstats import CompilationStats
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def compiled(tmp_path, **options):
+    path = tmp_path / "program.kl"
+    path.write_text(ProgramGenerator(0).generate(40))
+    return compile_file(str(path), CompilationOptions(trace=False, stats=True, **options)).stats
+
+
+def test_phases_and_counts(tmp_path):
+    stats = compiled(tmp_path, emit=True, optimization=2)
+    assert {'lex', 'parse'} <= set(stats.phases)
+    assert all(phase.wall >= 0 and phase.cpu >= 0 for phase in stats.phases.values())
+    assert all(phase.peak_memory is None for phase in stats.phases.values())
+    assert stats.tokens > stats.statements > 0
+    assert stats.c_bytes > 0
+    assert stats.tokens_per_second is None or stats.tokens_per_second > 0
+    assert stats.passes
+
+
+def test_memory_is_traced_on_request(tmp_path):
+    stats = compiled(tmp_path, memory=True)
+    assert stats.phases['parse'].peak_memory > 0
+    assert "KiB peak" in stats.report(memory=True)
+
+
+def test_phase_accumulates():
+    stats = CompilationStats()
+    for _ in range(2):
+        with stats.phase('lex'):
+            sum(range(10000))
+    assert list(stats.phases) == ['lex']
+    stats.tokens = 100
+    assert stats.tokens_per_second == 100 / stats.phases['lex'].wall
+
+
+def test_add_and_json():
+    first, second = CompilationStats(), CompilationStats()
+    with first.phase('parse') as phase:
+        phase.peak_memory = 10
+    with second.phase('parse') as phase:
+        phase.peak_memory = 30
+    first.tokens, second.tokens = 1, 2
+    first.add_pass('fold', {'folded': 2})
+    second.add_pass('fold', {'folded': 3, 'removed': 1})
+
+    first.add(second)
+    assert first.tokens == 3
+    assert first.phases['parse'].peak_memory == 30
+    assert first.passes == {'fold': {'folded': 5, 'removed': 1}}
+
+    data = json.loads(first.to_json())
+    assert data['tokens'] == 3 and data['phases'][0]['name'] == 'parse'
+    assert "5 folded, 1 removed" in first.report()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Optimizing.constantfolder import ConstantFolder
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Syntax.syntaxtree import LiteralExpression
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def fold(source):
+    unit = Parser(Lexer(source).tokens()).program()
+    folder = ConstantFolder()
+    folder.run(unit)
+    return unit.statements, folder
+
+
+def printed(source):
+    """
+    Values of the print statements that folded to a literal, else None.
+    """
+
+    statements, _ = fold(source)
+    return [statement.expression.value if isinstance(statement.expression, LiteralExpression) else None
+            for statement in statements if type(statement).__name__ == 'PrintStatement']
+
+
+@pytest.mark.parametrize("expression, value", [
+    ("1 + 2 * 3", "7"),
+    ("-7 / 2", "-3"),
+    ("7 / -2", "-3"),
+    ("7 / 2.0", "3.5"),
+    ("1.5 * 2", "3.0"),
+    ("~5", "-6"),
+    ("~2.7", "-3"),
+    ("7 / 0", None),
+    ("2147483647 + 1", None),
+    ("0 - 2147483647 - 1", None),
+    ("-(0 - 2147483647 - 1)", None),
+    ("-7 % 3", "-1"),
+    ("7.5 % 2", "1.5"),
+    ("7 % 0", None),
+    ("2 ** 3 ** 2", "512"),
+    ("2 ** -1", "0"),
+    ("-1 ** -3", "-1"),
+    ("2 ** 31", None),
+    ("2.0 ** 0.5", "1.4142135623730951"),
+    ("6 & 3 | 8", "10"),
+    ("1 << 33", "2"),
+    ("-8 >> 1", "-4"),
+    ("2.5 & 3", None),
+])
+def test_literals_fold_like_c(expression, value):
+    assert printed(f"print({expression})") == [value]
+
+
+def test_constants_propagate():
+    source = "int x = 4\nlet s = \"ab\"\nprint(x * 3 - 2)\nprint(s)\nprint(s + \"cd\")\nprint(s == \"ab\")\n"
+    statements, folder = fold(source)
+    # Strings are propagated, but not folded
+    assert printed(source) == ["10", "ab", None, None]
+    assert folder.counts() == {'folded': 2, 'propagated': 4}
+
+
+@pytest.mark.parametrize("source", [
+    # Reassigned or incremented
+    "int x = 4\nx = 5\nprint(x + 1)\n",
+    "int x = 4\nint y = x++\nprint(x + 1)\n",
+    # Converted by C
+    "char c = \"k\"\nprint(c + 1)\n",
+    "int x = 2.5\nprint(x + 1)\n",
+    # Declared in a block that may not run
+    "if (input() > 0) {\n    int x = 4\n}\nprint(x + 1)\n",
+    # Reachable past the declaration by a goto
+    "goto skip\nint x = 4\nlabel skip:\nprint(x + 1)\n",
+])
+def test_unsafe_constants_dont_propagate(source):
+    assert printed(source)[-1] is None
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_int_minimum_stays_an_expression(tmp_path):
+    path = tmp_path / "program.kl"
+    path.write_text("int a = -(0 - 2147483647 - 1)\nprint(a)\nprint(-(0 - 2147483647 - 1) + 1)\n")
+    result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=1))
+    build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+    assert not build.failed, build.error
+    run = subprocess.run([build.executable], capture_output=True, text=True, timeout=10)
+    assert run.stdout == "-2147483648\n-2147483647\n"
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_folded_programs_print_the_same(tmp_path):
+    for seed in range(8):
+        outputs = []
+        for level in (0, 1):
+            path = tmp_path / f"program{seed}_{level}.kl"
+            path.write_text(ProgramGenerator(seed, depth=3, identifier_ratio=0.3).generate(40))
+            result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=level))
+            build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+            assert not build.failed, build.error
+            outputs.append(subprocess.run([build.executable], capture_output=True, text=True, timeout=10).stdout)
+        assert outputs[0] == outputs[1]
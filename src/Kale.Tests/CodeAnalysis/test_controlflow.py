@@ -0,0 +1,99 @@
+import shutil
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Optimizing.controlflow import ControlFlowGraph
+from CodeAnalysis.Optimizing.optimizer import Optimizer
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Statistics.compilationstats import CompilationStats
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def parse(source):
+    return Parser(Lexer(source).tokens()).program()
+
+
+def optimize(source):
+    stats = CompilationStats()
+    unit = Optimizer(2, stats).run(parse(source))
+    return [type(node).__name__ + (f" {node.name}" if hasattr(node, 'name') else "")
+            for node in unit.statements], stats.passes
+
+
+def test_gotos_resolve_to_label_blocks():
+    graph = ControlFlowGraph(parse("int x = input()\ngoto end\nprint(x)\nlabel end:\nprint(1)\n"))
+    goto_block, goto = graph.gotos[0]
+    assert goto_block.successors == [graph.labels[goto.name_id]]
+    reachable = graph.reachable()
+    assert graph.owners[id(graph.labels[goto.name_id].items[0])].index in reachable
+    unreachable = [block for block in graph.blocks if block.index not in reachable]
+    assert any(node.__class__.__name__ == 'PrintStatement' for block in unreachable for node in block.items)
+
+
+def test_goto_chains_are_threaded():
+    statements, passes = optimize(
+        "int x = input()\n"
+        "if (x > 1) {\n    goto first\n}\n"
+        "print(1)\n"
+        "label first:\n"
+        "goto second\n"
+        "print(2)\n"
+        "label second:\n"
+        "print(3)\n"
+    )
+    assert statements == ["DeclarationStatement x", "IfStatement", "PrintStatement",
+                          "LabelStatement second", "PrintStatement"]
+    assert passes['thread']['threaded'] == 1
+    assert passes['labels']['removed'] == 1
+
+
+def test_literal_conditions_drop_branches():
+    statements, _ = optimize("int debug = 0\nif (debug) {\n    print(1)\n} else {\n    print(2)\n}\n"
+                             "while (debug > 0) {\n    print(3)\n}\n")
+    assert statements == ["PrintStatement"]
+
+
+def test_dead_stores_are_dropped():
+    statements, passes = optimize(
+        "int x = input()\n"
+        "int y = 1\n"
+        "y = x * 2\n"
+        "y = x + 1\n"
+        "int unused = x\n"
+        "x = x\n"
+        "print(y)\n"
+    )
+    assert statements == ["DeclarationStatement x", "DeclarationStatement y", "AssignmentStatement y",
+                          "PrintStatement"]
+    assert passes['stores']['removed'] == 4
+
+
+def test_stores_read_around_a_goto_loop_are_kept():
+    statements, _ = optimize(
+        "int n = input()\n"
+        "label top:\n"
+        "print(n)\n"
+        "n = n - 1\n"
+        "if (n > 0) {\n    goto top\n}\n"
+        "n = input()\n"
+    )
+    assert statements == ["DeclarationStatement n", "LabelStatement top", "PrintStatement",
+                          "AssignmentStatement n", "IfStatement", "AssignmentStatement n"]
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_optimized_programs_print_the_same(tmp_path):
+    for seed in range(8):
+        outputs = []
+        for level in (0, 2):
+            path = tmp_path / f"program{seed}_{level}.kl"
+            path.write_text(ProgramGenerator(seed, depth=3).generate(40))
+            result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=level))
+            build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+            assert not build.failed, build.error
+            outputs.append(subprocess.run([build.executable], capture_output=True, text=True, timeout=10).stdout)
+        assert outputs[0] == outputs[1]
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Diagnostics.diagnosticrenderer import report_errors
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from CodeAnalysis.Parsing.parser import Parser
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+source = """int a = 1
+print(a $ )
+int b = (a +
+if (a > 1) {
+  print(zz)
+  c = 3
+  int a = 2
+}
+goto nowhere
+}
+float f = 1.
+print(b)
+"""
+
+expected = [
+    (2, 9, "Invalid token '$'"),
+    (4, 1, "Unexpected token IfKeyword"),
+    (5, 9, "Referencing variable before assignment: zz"),
+    (6, 3, "The name 'c' does not exist in the current convalue"),
+    (7, 7, "A local variable named 'a' is already defined in this scope"),
+    (9, 6, "Attempting to goto to undeclared label: nowhere"),
+    (10, 1, "Invalid statement at CloseBraceToken"),
+    (11, 12, "Illegal character at ."),
+]
+
+
+def diagnose(lexer_type, text, limit=100):
+    diagnostics = DiagnosticBag(limit)
+    lexer = lexer_type(text, diagnostics=diagnostics)
+    unit = Parser(lexer.tokens(), names=lexer.names, diagnostics=diagnostics).program()
+    return unit, diagnostics
+
+
+@pytest.mark.parametrize("lexer_type, text", [(Lexer, source), (MappedLexer, source.encode())])
+def test_one_run_reports_every_error(lexer_type, text):
+    unit, diagnostics = diagnose(lexer_type, text)
+    assert diagnostics.located(text) == expected
+    # The statements around the errors are still parsed
+    assert len(unit.statements) == 6
+
+
+def test_columns_count_characters():
+    text = 'string s = "größe" $\nprint(ü + "日本")\n'
+    expected = diagnose(Lexer, text)[1].located(text)
+    assert expected[:2] == [(1, 20, "Invalid token '$'"), (2, 7, "Referencing variable before assignment: ü")]
+    assert diagnose(MappedLexer, text.encode())[1].located(text.encode()) == expected
+
+
+def test_valid_programs_have_no_diagnostics():
+    assert len(diagnose(Lexer, ProgramGenerator(3).generate(200))[1]) == 0
+
+
+def test_diagnostics_are_capped():
+    unit, diagnostics = diagnose(Lexer, "print(\n" * 1000, limit=10)
+    assert len(diagnostics) == 10
+    assert diagnostics.full
+
+
+def test_errors_are_rendered_with_their_location(capsys):
+    report_errors("bad.kl", expected[:2], dropped=3)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert "bad.kl:2:9: Error: Invalid token '$'" in lines[0]
+    assert "3 more errors not shown" in lines[2]
+
+
+alphabet = ["int", "x", "=", "1", "(", ")", "{", "}", "if", "else", "while", "for", ";", "+", "print",
+            "label", "goto", ":", "$", "\"s", "1.", "\n", "let", "y", "<", "input"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_recovery_always_makes_progress(seed):
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(alphabet) for _ in range(300))
+    diagnostics = DiagnosticBag(limit=10 ** 6)
+    lexer = Lexer(text, diagnostics=diagnostics)
+    tokens = lexer.token_stream()
+    parser = Parser(tokens, names=lexer.names, diagnostics=diagnostics)
+    parser.program()
+    # Every diagnostic but the goto checks was made at a new token
+    assert parser.position == len(tokens) - 1
+    assert len(diagnostics) <= len(tokens) + len(parser.labels_gotoed)
@@ -0,0 +1,121 @@
+import os
+import re
+import time
+
+import pytest
+
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Parsing.incrementalparser import IncrementalParser
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+
+
+source = "int a = 1\nprint(a)\nlabel top:\nint b = a + 2\ngoto top\nb = b * 3\n"
+
+
+def incremental(text):
+    lexer = Lexer(text)
+    parser = IncrementalParser(lexer.token_stream(), lexer.names)
+    parser.parse()
+    return parser
+
+
+def tree(unit):
+    return re.sub(r"name_id=\d+", "", repr(unit.statements))
+
+
+def full_parse(text):
+    lexer = Lexer(text)
+    return tree(Parser(lexer.token_stream(), names=lexer.names).program())
+
+
+def full_diagnostics(text):
+    lexer = Lexer(text)
+    diagnostics = DiagnosticBag()
+    Parser(lexer.token_stream(), names=lexer.names, diagnostics=diagnostics).program()
+    return sorted((diagnostic.position, diagnostic.message) for diagnostic in diagnostics)
+
+
+def edit_diagnostics(parser, text, offset, deleted, inserted):
+    edited = text[:offset] + inserted + text[offset + deleted:]
+    diagnostics = [(diagnostic.position, diagnostic.message)
+                   for diagnostic in parser.edit(offset, deleted, inserted)]
+    assert diagnostics == full_diagnostics(edited)
+    return diagnostics
+
+
+@pytest.mark.parametrize("offset, deleted, inserted", [
+    (source.index("print"), 0, "int c = 5\n"),
+    (source.index("2"), 1, "a * 4"),
+    (source.index("b = b"), 0, "print(b)\n"),
+    (len(source), 0, "int d = b\n"),
+])
+def test_edit_matches_full_parse(offset, deleted, inserted):
+    parser = incremental(source)
+    edited = source[:offset] + inserted + source[offset + deleted:]
+    assert parser.edit(offset, deleted, inserted) == []
+    assert tree(parser.unit()) == full_parse(edited)
+
+
+def test_edit_reparses_only_the_touched_statement():
+    parser = incremental(source)
+    parser.reparsed = 0
+    parser.edit(source.index("2"), 1, "7")
+    assert parser.reparsed == 1
+
+
+def test_redeclaration_is_still_reported():
+    parser = incremental(source)
+    assert edit_diagnostics(parser, source, 0, 0, "int b = 0\n")
+
+
+def test_string_operands_are_rechecked():
+    text = "int s = 1\nprint(s + 1)\n"
+    parser = incremental(text)
+    assert edit_diagnostics(parser, text, 0, len("int s = 1"), 'string s = "a"')
+
+
+def test_removing_a_goto_target_is_still_reported():
+    parser = incremental(source)
+    start = source.index("label")
+    assert edit_diagnostics(parser, source, start, len("label top:\n"), "")
+    edited = source[:start] + source[start + len("label top:\n"):]
+    assert edit_diagnostics(parser, edited, len(edited), 0, "label top:\n") == []
+
+
+def test_every_error_is_reported():
+    parser = incremental(source)
+    inserted = "print(q)\nint = 2\nint a = 0\n"
+    assert len(edit_diagnostics(parser, source, 0, 0, inserted)) == 3
+    assert tree(parser.unit()) == full_parse(inserted + source)
+
+
+def test_declaring_a_name_rechecks_only_its_uses():
+    parser = incremental(source + "print(c)\nint e = 1\nprint(c + 1)\n")
+    parser.reparsed = 0
+    edit_diagnostics(parser, parser.stream.source, 0, 0, "int c = 0\n")
+    # The new statement and the two statements referencing c
+    assert parser.reparsed == 3
+
+
+def edit_cost(statements):
+    text = "".join(f"int v{i} = {i}\nprint(v{i} + 1)\n" for i in range(statements))
+    parser = incremental(text)
+    offset = text.index(f"int v{statements // 2} ")
+    parser.reparsed = 0
+    start = time.perf_counter()
+    for _ in range(50):
+        parser.edit(offset, 0, "int w = 1\n")
+        parser.edit(offset, len("int w = 1\n"), "")
+    return parser.reparsed, time.perf_counter() - start
+
+
+def test_edit_work_doesnt_grow_with_the_file():
+    assert edit_cost(100)[0] == edit_cost(2000)[0]
+
+
+@pytest.mark.skipif(not os.environ.get("KALE_BENCHMARKS"), reason="timing benchmark, set KALE_BENCHMARKS=1")
+def test_edit_time_doesnt_grow_with_the_file():
+    small = min(edit_cost(1000)[1] for _ in range(3))
+    large = min(edit_cost(16000)[1] for _ in range(3))
+    assert large < small * 3
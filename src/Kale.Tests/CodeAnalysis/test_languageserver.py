@@ -0,0 +1,136 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from CodeAnalysis.LanguageServer.document import Document, LineStarts
+from CodeAnalysis.LanguageServer.languageserver import LanguageServer
+from Benchmarks.typinglatency import message, published
+
+
+source = "int a = 1\nprint(a)\nlabel top:\nint b = a + 2\ngoto top\n"
+
+
+def at(line, character):
+    return {"line": line, "character": character}
+
+
+def test_positions_round_trip():
+    document = Document("file:///a.kl", source)
+    for offset in range(len(source) + 1):
+        assert document.offset(document.position(offset)) == offset
+
+
+@pytest.mark.parametrize("encoding, character", [("utf-16", 12), ("utf-32", 11)])
+def test_positions_use_the_encoding(encoding, character):
+    text = 'int a = 1\nprint("\U0001f600é" == q)\n'
+    document = Document("file:///a.kl", text, encoding=encoding)
+    for offset in range(len(text) + 1):
+        assert document.offset(document.position(offset)) == offset
+    diagnostics = document.analyze()
+    assert diagnostics[0]["range"]["start"] == at(1, character)
+
+
+def test_changes_keep_line_starts():
+    document = Document("file:///a.kl", source)
+    document.change([
+        {"range": {"start": at(1, 6), "end": at(2, 0)}, "text": "b)\nint c = 2\n"},
+        {"range": {"start": at(0, 0), "end": at(0, 0)}, "text": "\n\n"},
+    ])
+    assert list(LineStarts(document)) == list(Document("file:///a.kl", document.text).lines)
+
+
+@pytest.mark.parametrize("start, end, text, message, expected", [
+    (at(1, 6), at(1, 7), "c", "Referencing variable before assignment: c", (at(1, 6), at(1, 7))),
+    (at(1, 7), at(1, 7), " $", "Invalid token '$'", (at(1, 8), at(1, 9))),
+    (at(4, 5), at(4, 8), "end", "Attempting to goto to undeclared label: end", (at(4, 5), at(4, 8))),
+])
+def test_diagnostics_point_at_the_error(start, end, text, message, expected):
+    document = Document("file:///a.kl", source)
+    assert document.analyze() == []
+    document.change([{"range": {"start": start, "end": end}, "text": text}])
+    diagnostics = document.analyze()
+    assert [d["message"] for d in diagnostics] == [message]
+    assert (diagnostics[0]["range"]["start"], diagnostics[0]["range"]["end"]) == expected
+
+
+def test_fixing_an_error_clears_the_diagnostics():
+    document = Document("file:///a.kl", source)
+    document.analyze()
+    document.change([{"range": {"start": at(1, 6), "end": at(1, 7)}, "text": "zz"}])
+    assert document.analyze()
+    document.change([{"range": {"start": at(1, 6), "end": at(1, 8)}, "text": "b"}])
+    assert document.analyze()
+    document.change([{"range": {"start": at(1, 6), "end": at(1, 7)}, "text": "a"}])
+    assert document.analyze() == []
+    assert document.parser.stream.source == document.text
+
+
+def test_server_debounces_a_burst_of_changes():
+    async def session():
+        reader, output = asyncio.StreamReader(), io.BytesIO()
+        serving = asyncio.ensure_future(LanguageServer(reader, output, debounce=0.05).serve())
+        uri = "file:///a.kl"
+        reader.feed_data(message("initialize", {}, id=1))
+        reader.feed_data(message("textDocument/didOpen",
+                                 {"textDocument": {"uri": uri, "version": 0, "text": source}}))
+        for version, character in enumerate("xyz", 1):
+            reader.feed_data(message("textDocument/didChange", {
+                "textDocument": {"uri": uri, "version": version},
+                "contentChanges": [{"range": {"start": at(1, 6), "end": at(1, 6)}, "text": character}],
+            }))
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        reader.feed_data(message("textDocument/didClose", {"textDocument": {"uri": uri}}))
+        reader.feed_data(message("exit", None))
+        await serving
+        return published(output)
+
+    first, last = asyncio.run(session())
+    assert first["version"] == 3
+    assert first["diagnostics"][0]["message"] == "Referencing variable before assignment: zyxa"
+    assert last == {"uri": "file:///a.kl", "diagnostics": []}
+
+
+def serve(*messages, handlers=None):
+    async def session():
+        reader, output = asyncio.StreamReader(), io.BytesIO()
+        server = LanguageServer(reader, output, debounce=0)
+        server.handlers.update(handlers or {})
+        for content in messages:
+            reader.feed_data(content)
+        reader.feed_data(message("exit", None))
+        await server.serve()
+        return output
+
+    output, responses = asyncio.run(session()).getvalue(), []
+    while output:
+        header, _, output = output.partition(b"\r\n\r\n")
+        length = int(header.split(b":")[1])
+        responses.append(json.loads(output[:length]))
+        output = output[length:]
+    return responses
+
+
+@pytest.mark.parametrize("offered, encoding", [
+    (["utf-32", "utf-16"], "utf-32"),
+    (["utf-8"], "utf-16"),
+    (None, "utf-16"),
+])
+def test_initialize_negotiates_the_position_encoding(offered, encoding):
+    capabilities = {"general": {"positionEncodings": offered}} if offered else {}
+    response, = serve(message("initialize", {"capabilities": capabilities}, id=1))
+    assert response["result"]["capabilities"]["positionEncoding"] == encoding
+
+
+def test_handler_errors_dont_stop_the_server():
+    responses = serve(
+        message("textDocument/didOpen", {"textDocument": {"uri": "file:///a.kl"}}),
+        message("kale/fail", {}, id=1),
+        message("shutdown", None, id=2),
+        handlers={"kale/fail": lambda params: params["missing"]},
+    )
+    assert responses[0]["method"] == "window/logMessage"
+    assert responses[1]["id"] == 1 and responses[1]["error"]["code"] == -32603
+    assert responses[2] == {"jsonrpc": "2.0", "id": 2, "result": None}
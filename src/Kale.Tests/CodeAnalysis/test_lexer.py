@@ -0,0 +1,74 @@
+import pytest
+
+from CodeAnalysis.Exceptions.illegalcharacter import IllegalCharacterException
+from CodeAnalysis.Exceptions.invalidtoken import InvalidTokenException
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import keyword_map, operator_map, punctuator_map
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def kinds(source):
+    return [(token.kind, token.value) for token in Lexer(source).tokens()]
+
+
+def test_every_keyword_operator_and_punctuator():
+    spellings = list(keyword_map) + list(operator_map) + list(punctuator_map)
+    expected = [(kind, None) for kind in keyword_map.values()]
+    expected += [(kind, text) for text, kind in operator_map.items()]
+    expected += [(kind, None) for kind in punctuator_map.values()]
+    assert kinds(" ".join(spellings)) == expected + [(SyntaxKind.EndOfFileToken, None)]
+
+
+def test_longest_operator_wins():
+    assert [kind for kind, _ in kinds("a<<=b**c--")] == [
+        SyntaxKind.IdentifierToken, SyntaxKind.LeftShiftEqualsToken, SyntaxKind.IdentifierToken,
+        SyntaxKind.DoubleStarToken, SyntaxKind.IdentifierToken, SyntaxKind.MinusMinusToken,
+        SyntaxKind.EndOfFileToken,
+    ]
+
+
+def test_literals_names_and_trivia():
+    source = "int x1 = 12.5 // the rest\nprint('single') print(\"dé\")\n\tname2\r\n"
+    assert kinds(source) == [
+        (SyntaxKind.IntKeyword, None), (SyntaxKind.IdentifierToken, "x1"), (SyntaxKind.EqualsToken, "="),
+        (SyntaxKind.NumberToken, "12.5"),
+        (SyntaxKind.PrintKeyword, None), (SyntaxKind.OpenParenthesisToken, None),
+        (SyntaxKind.StringToken, "single"), (SyntaxKind.CloseParenthesisToken, None),
+        (SyntaxKind.PrintKeyword, None), (SyntaxKind.OpenParenthesisToken, None),
+        (SyntaxKind.StringToken, "dé"), (SyntaxKind.CloseParenthesisToken, None),
+        (SyntaxKind.IdentifierToken, "name2"), (SyntaxKind.EndOfFileToken, None),
+    ]
+
+
+def test_positions_are_where_tokens_start():
+    source = 'int x = 1\nprint("hé")\n'
+    tokens = list(Lexer(source).tokens())
+    assert [token.position for token in tokens] == [0, 4, 6, 8, 10, 15, 16, 20, 22]
+    assert source[tokens[6].position] == '"'
+
+    stream = Lexer(source).token_stream()
+    assert [token.position for token in stream] == [token.position for token in tokens]
+    # The stream's own offsets are those of the values
+    assert stream.raw(6) == "hé"
+
+
+@pytest.mark.parametrize("source, error", [
+    ("int x = 1.\n", IllegalCharacterException),
+    ('print("tab\there")\n', IllegalCharacterException),
+    ("int x = 1 $ 2\n", InvalidTokenException),
+])
+def test_errors_raise_without_a_diagnostics_bag(source, error):
+    with pytest.raises(error):
+        list(Lexer(source).tokens())
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_tokens_and_spans_agree(seed):
+    source = ProgramGenerator(seed, depth=3).generate(100)
+    tokens = list(Lexer(source).tokens())
+    spans = list(Lexer(source).spans())
+    assert [token.kind for token in tokens] == [kind for kind, _, _ in spans]
+    for token, (kind, start, end) in zip(tokens, spans):
+        if token.value is not None:
+            assert source[start:end] == token.value
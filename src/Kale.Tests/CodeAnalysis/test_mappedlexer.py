@@ -0,0 +1,75 @@
+import pytest
+
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from Benchmarks.programgenerator import ProgramGenerator
+
+# Non-ASCII names and strings, which take the MappedLexer's slow path
+unicode_lines = [
+    'int größe = 1',
+    'print("naïve café")',
+    "print('日本語' + \"ü\")",
+    'int x2é = größe * 2 // ünïcode comment',
+    'print(x2é)',
+]
+
+
+def program(seed):
+    lines = ProgramGenerator(seed, depth=3).generate(80).splitlines()
+    # Declarations first, so the generated statements can't shadow them
+    return "\n".join(unicode_lines + lines) + "\n"
+
+
+def pairs(tokens):
+    return [(token.kind, token.value) for token in tokens]
+
+
+def character_positions(source, tokens):
+    encoded = source.encode('utf-8')
+    return [len(encoded[:token.position].decode('utf-8')) for token in tokens]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_every_producer_gives_the_same_tokens(seed):
+    source = program(seed)
+    encoded = source.encode('utf-8')
+    expected = list(Lexer(source).tokens())
+
+    assert pairs(MappedLexer(encoded).tokens()) == pairs(expected)
+    assert pairs(Lexer(source).token_stream()) == pairs(expected)
+    assert pairs(MappedLexer(encoded).token_stream()) == pairs(expected)
+    assert pairs(MappedLexer(encoded).lex()) == pairs(Lexer(source).lex())
+
+    # Positions are byte offsets in the MappedLexer
+    positions = [token.position for token in expected]
+    assert character_positions(source, MappedLexer(encoded).tokens()) == positions
+    assert [token.position for token in Lexer(source).token_stream()] == positions
+    assert character_positions(source, MappedLexer(encoded).token_stream()) == positions
+
+
+def test_from_file(tmp_path):
+    source = program(0)
+    path = tmp_path / "program.kl"
+    path.write_bytes(source.encode('utf-8'))
+
+    lexer = MappedLexer.from_file(str(path))
+    try:
+        assert pairs(lexer.tokens()) == pairs(Lexer(source).tokens())
+    finally:
+        lexer.close()
+
+    empty = tmp_path / "empty.kl"
+    empty.write_bytes(b"")
+    assert len(list(MappedLexer.from_file(str(empty)).tokens())) == 1
+
+
+def test_errors_match():
+    source = 'int é = 1.\nprint("a\tb")\nint x = 1 $ 2\n'
+    expected, mapped = DiagnosticBag(), DiagnosticBag()
+    list(Lexer(source, diagnostics=expected).tokens())
+    list(MappedLexer(source.encode('utf-8'), diagnostics=mapped).tokens())
+
+    assert len(expected) == 4
+    # Columns count characters for both
+    assert mapped.located(source.encode('utf-8')) == expected.located(source)
@@ -0,0 +1,39 @@
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Syntax.nametable import NameTable
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import keyword_map
+
+
+def test_interning():
+    names = NameTable()
+    keywords = len(names)
+    assert keywords == len(keyword_map)
+
+    first = names.intern("count")
+    assert names.intern("count") == first
+    assert names.intern("other") == first + 1
+    assert names.name(first) == "count"
+    assert len(names) == keywords + 2
+
+
+def test_keywords_share_the_table():
+    names = NameTable()
+    assert names.keyword("while") is SyntaxKind.WhileKeyword
+    assert names.keyword("count") is None
+    assert names.intern("print") < len(keyword_map)
+    # Looking a keyword up doesn't intern anything
+    assert len(names) == len(keyword_map)
+
+
+def test_lexer_and_parser_share_names():
+    names = NameTable()
+    source = "int total = 1\ntotal = total + 1\nprint(total)\n"
+    tokens = [token for token in Lexer(source, names=names).tokens() if token.kind is SyntaxKind.IdentifierToken]
+    # Every occurrence is the one interned string
+    assert all(token.value is tokens[0].value for token in tokens)
+
+    parser = Parser(Lexer(source, names=names).tokens(), names=names)
+    parser.program()
+    assert parser.symbols == {names.intern("total")}
+    assert len(names) == len(keyword_map) + 1
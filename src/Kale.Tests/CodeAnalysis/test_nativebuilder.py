@@ -0,0 +1,122 @@
+import io
+import os
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder, find_compiler, report
+from CodeAnalysis.Caching.compilationcache import CompilationCache
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Emitting.emitter import Emitter
+from CodeAnalysis.Running.runner import load_program
+from CodeAnalysis.Running.virtualmachine import VirtualMachine
+
+
+pytestmark = pytest.mark.skipif(find_compiler() is None, reason="no C compiler")
+
+
+def write_c(directory, count):
+    paths = []
+    for number in range(count):
+        path = os.path.join(directory, f"program{number}.c")
+        with open(path, 'w') as c_file:
+            c_file.write(f'#include <stdio.h>\nint main(void)\n{{\n    printf("%d\\n", {number});\n    return 0;\n}}\n')
+        paths.append(path)
+    return paths
+
+
+def test_options_flags():
+    assert BuildOptions().flags() == ['-O2', '-fwrapv']
+    assert BuildOptions(optimization=0, native=True).flags() == ['-O0', '-fwrapv', '-march=native']
+    with pytest.raises(ValueError):
+        BuildOptions(optimization=4)
+
+
+def test_parallel_build_runs_in_order(tmp_path):
+    paths = write_c(str(tmp_path), 5)
+    results = list(NativeBuilder(jobs=3).build_all(paths))
+    assert [result.path for result in results] == paths
+    for number, result in enumerate(results):
+        assert not result.failed
+        assert result.compile_time > 0 and result.link_time > 0
+        assert subprocess.run([result.executable], capture_output=True, text=True).stdout == f"{number}\n"
+    assert report(results, 1.0).startswith("Built 5 of 5 executables in 1.00 s")
+
+
+def test_identical_c_reuses_the_object(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    path, = write_c(str(tmp_path), 1)
+    builder = NativeBuilder(BuildOptions(optimization=3), cache)
+
+    assert not builder.build(path).cached
+    os.unlink(path[:-2] + ".o")
+    result = builder.build(path)
+    assert result.cached and not result.failed
+    assert cache.hits['object'] == 1
+
+    # Other flags, other object
+    assert not NativeBuilder(BuildOptions(optimization=0), cache).build(path).cached
+
+
+def test_compiler_errors_are_reported(tmp_path):
+    path = tmp_path / "bad.c"
+    path.write_text("int main(void) { return }\n")
+    result = NativeBuilder().build(str(path))
+    assert result.failed and "error" in result.error
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_missing_compiler_is_reported(tmp_path, monkeypatch, cached):
+    monkeypatch.setenv("CC", str(tmp_path / "no-such-cc"))
+    path, = write_c(str(tmp_path), 1)
+    cache = CompilationCache(str(tmp_path / "cache")) if cached else None
+    result = NativeBuilder(cache=cache).build(path)
+    assert result.failed and result.error.startswith("Couldn't run the C compiler")
+
+
+def test_emitter_build_and_clean(tmp_path):
+    base = str(tmp_path / "program0")
+    write_c(str(tmp_path), 1)
+    assert not Emitter.build(base).failed
+    assert os.path.exists(base + ".o")
+    Emitter.clean(base)
+    assert os.listdir(tmp_path) == ["program0.c"]
+
+
+# Out of range doubles converted to int, and int overflow
+conversions = """int a = input()
+double d = input() * 4
+int b = d
+char c = d
+print(a)
+print(b)
+print(c)
+print(d & 7)
+print(~d)
+int big = 2147483647
+int n = input()
+print(big + n)
+print(big * (n + 2))
+double e = 10000000000.0
+int f = e
+print(f)
+print(e | 1)
+"""
+
+
+@pytest.mark.parametrize("level", [0, 3])
+def test_native_builds_convert_like_the_vm(tmp_path, level):
+    path = tmp_path / "program.kl"
+    path.write_text(conversions)
+    stdin = "3e10\n-1e12\n1\n"
+
+    program, _ = load_program(str(path), level)
+    output = io.StringIO()
+    VirtualMachine(program, stdin=io.StringIO(stdin), stdout=output).run()
+    assert output.getvalue().splitlines()[:2] == ["-2147483648", "-2147483648"]
+
+    result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=level))
+    build = NativeBuilder(BuildOptions(optimization=2)).build(result.c_path)
+    assert not build.failed
+    run = subprocess.run([build.executable], input=stdin, capture_output=True, text=True, timeout=10)
+    assert run.stdout == output.getvalue()
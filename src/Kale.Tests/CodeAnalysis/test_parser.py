@@ -0,0 +1,113 @@
+import pytest
+
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Emitting.codegenerator import operator_text
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, InputExpression, LiteralExpression, NameExpression, UnaryExpression,
+)
+
+
+def parse(source):
+    return Parser(Lexer(source).tokens()).program().statements
+
+
+def shape(node):
+    """
+    The tree of an expression fully parenthesized.
+    """
+
+    if isinstance(node, BinaryExpression):
+        return f"({shape(node.left)} {operator_text[node.operator]} {shape(node.right)})"
+    if isinstance(node, UnaryExpression):
+        operator = operator_text[node.operator]
+        return f"({shape(node.operand)}{operator})" if node.postfix else f"({operator}{shape(node.operand)})"
+    if isinstance(node, NameExpression):
+        return node.name
+    if isinstance(node, LiteralExpression):
+        return node.value
+    if isinstance(node, InputExpression):
+        return f"input({shape(node.prompt) if node.prompt is not None else ''})"
+    raise TypeError(node)
+
+
+def printed(expression):
+    return shape(parse(f"int a = 1\nint b = 2\nint c = 3\nprint({expression})\n")[-1].expression)
+
+
+@pytest.mark.parametrize("expression, tree", [
+    ("a + b * c", "(a + (b * c))"),
+    ("a - b - c", "((a - b) - c)"),
+    ("a * b % c / 2", "(((a * b) % c) / 2)"),
+    ("a ** b ** c", "(a ** (b ** c))"),
+    ("-a ** 2", "(-(a ** 2))"),
+    ("a ** -b", "(a ** (-b))"),
+    ("a << b + c", "(a << (b + c))"),
+    ("a < b == b > c", "((a < b) == (b > c))"),
+    ("a | b ^ c & 1", "(a | (b ^ (c & 1)))"),
+    ("a & b == c", "(a & (b == c))"),
+    ("!a < b", "((!a) < b)"),
+    ("-a++ * b", "((-(a++)) * b)"),
+    ("((a + b)) * c", "((a + b) * c)"),
+    ("input() + input(\"n\")", "(input() + input(n))"),
+])
+def test_precedence_and_associativity(expression, tree):
+    assert printed(expression) == tree
+
+
+def test_compound_assignments_expand():
+    statements = parse("int a = 1\na += 2\na **= 3\na <<= a - 1\n")
+    assert all(isinstance(statement, AssignmentStatement) for statement in statements[1:])
+    assert [shape(statement.expression) for statement in statements[1:]] == [
+        "(a + 2)", "(a ** 3)", "(a << (a - 1))",
+    ]
+
+
+def test_deep_nesting_doesnt_recurse():
+    depth = 100000
+    statements = parse("print(" + "(" * depth + "1" + ")" * depth + ")\n")
+    assert isinstance(statements[0].expression, LiteralExpression)
+
+    chain = " + ".join(["1"] * depth)
+    node = parse(f"print({chain})\n")[0].expression
+    assert isinstance(node, BinaryExpression) and node.right.value == "1"
+
+
+@pytest.mark.parametrize("source, message", [
+    ("print(1 +)\n", "Unexpected token CloseParenthesisToken"),
+    ("print(1 + =)\n", "Unexpected token EqualsToken at ="),
+    ("print((1 + 2)\n", "Expected CloseParenthesisToken, got EndOfFileToken"),
+    ("print(x)\n", "Referencing variable before assignment: x"),
+    ('string s = "ab"\nprint(-s)\n', "Operator '-' can't be applied to a string"),
+    ('let s = "ab"\ns *= 2\n', "Operator '*' can't be applied to a string"),
+    ('string s = "ab"\nprint(s < 1)\n', "A string can only be compared with another string"),
+])
+def test_errors(source, message):
+    diagnostics = DiagnosticBag()
+    Parser(Lexer(source).tokens(), diagnostics=diagnostics).program()
+    messages = [text for _, _, text in diagnostics.located(source)]
+    assert messages and messages[0] == message
+
+
+def test_declarations():
+    statements = parse("int a\nbool b = true\nbool c = a < 1\nlet d = 2\nvar e = d\nvar e = 3\nstring s = \"x\" + \"y\"\n")
+    assert [statement.name for statement in statements] == ["a", "b", "c", "d", "e", "e", "s"]
+    assert statements[0].initializer is None
+    assert statements[1].initializer.value is True
+    assert shape(statements[2].initializer) == "(a < 1)"
+    assert shape(statements[6].initializer) == "(x + y)"
+
+
+@pytest.mark.parametrize("source, message", [
+    ("let a\n", "Expected EqualsToken"),
+    ("int a = 1\nint a = 2\n", "A local variable named 'a' is already defined in this scope"),
+    ("goto\n", "Expected IdentifierToken"),
+    ("if (1) {\n} else print(1)\n", "Expected OpenBraceToken"),
+    ("else\n", "Invalid statement at ElseKeyword"),
+])
+def test_statement_errors(source, message):
+    diagnostics = DiagnosticBag()
+    Parser(Lexer(source).tokens(), diagnostics=diagnostics).program()
+    messages = [text for _, _, text in diagnostics.located(source)]
+    assert messages and messages[0].startswith(message)
@@ -0,0 +1,115 @@
+import io
+import shutil
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Caching.compilationcache import CompilationCache
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Exceptions.runtimeerror import RuntimeException
+from CodeAnalysis.Exceptions.unsupported import UnsupportedException
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Running.pythonbackend import execute, load_code, translate
+from CodeAnalysis.Running.runner import main
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import BinaryExpression, CompilationUnit, LiteralExpression, PrintStatement
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def source(text):
+    return translate(Parser(Lexer(text).tokens()).program(), "program.kl").source()
+
+
+def execute_source(tmp_path, text, stdin="", cache=None):
+    path = tmp_path / "program.kl"
+    path.write_text(text)
+    code, diagnostics = load_code(str(path), cache=cache)
+    assert not diagnostics
+    output = io.StringIO()
+    execute(code, stdin=io.StringIO(stdin), stdout=output)
+    return output.getvalue()
+
+
+def test_loops_become_python_loops():
+    python = source("int total = 0\nfor (int i = 0; i < 10; i++) {\n    total = total + i\n}\n"
+                    "while (total > 3) {\n    total = total / 2\n}\nprint(total)\n")
+    assert "for k_i in range(k_i, 10):" in python
+    assert "while (k_total > 3):" in python
+    assert "state" not in python
+
+
+def test_counters_changed_in_the_body_keep_a_while():
+    python = source("for (int i = 0; i < 10; i++) {\n    i = i + 2\n    print(i)\n}\n")
+    assert "range" not in python
+
+
+def test_only_gotos_need_the_state_machine(tmp_path):
+    text = ("int n = 0\ngoto inside\nwhile (n < 3) {\n    label inside:\n    n = n + 1\n    print(n)\n}\n"
+            "label again:\nn = n + 1\nif (n < 6) {\n    goto again\n}\nprint(n)\n")
+    assert "while True:" in source(text)
+    assert execute_source(tmp_path, text) == "1\n2\n3\n6\n"
+
+
+def test_c_semantics(tmp_path):
+    text = ("int big = 2147483647\nbig = big + 1\nprint(big)\nint n = -7\nprint(n / 2)\n"
+            "for (int i = 0; i < 3; i++) {\n}\nprint(i)\nchar c = \"k\"\nint before = c++\nprint(c)\n"
+            "float g = 16777217\nprint(g)\ndouble d = input()\nprint(d / 0)\n")
+    assert execute_source(tmp_path, text, "-1") == "-2147483648\n-3\n3\nl\n1.67772e+07\n-inf\n"
+
+
+def test_operators_follow_c(tmp_path):
+    text = ("int a = input()\nint b = 3\ndouble x = input()\nfloat f = 2.5\nprint(a % b)\nprint(x % 2)\n"
+            "print(b ** 20)\nprint(a ** -1)\nprint(f ** 2)\nprint(x ** 0.5)\nprint(a & 12 | 1)\n"
+            "print(1 << b + 30)\nprint(a >> 1)\nprint(f & b)\na **= 2\nprint(a)\n")
+    expected = "-1\n-1.5\n-808182895\n0\n6.25\n-nan\n9\n2\n-4\n2\n49\n"
+    assert execute_source(tmp_path, text, "-7 -7.5") == expected
+
+
+def test_int_minimum_divided_by_minus_one_wraps(tmp_path):
+    text = "int a = input()\nint b = a - 1\nprint(b / -1)\n"
+    assert execute_source(tmp_path, text, "-2147483647") == "-2147483648\n"
+
+
+def test_division_by_zero_is_a_runtime_error(tmp_path):
+    with pytest.raises(RuntimeException):
+        execute_source(tmp_path, "int d = input()\nprint(1 / d)\n", "0")
+
+
+def test_unsupported_constructs_are_reported(tmp_path, capsys):
+    path = tmp_path / "convert.kl"
+    path.write_text('string s = "ab"\nint x = s\nprint(x)\n')
+    assert main([str(path), "--no-cache", "--backend", "python"]) == 1
+    assert capsys.readouterr().err.strip() == f"{path}:1:1: Error: Converting const char * to int can't run in Python"
+
+    # The parser reports string arithmetic before it gets here
+    path.write_text('string s = "ab"\nprint(s + "cd")\n')
+    assert main([str(path), "--no-cache", "--backend", "python"]) == 1
+    assert "2:9: Error: Operator '+' can't be applied to a string" in capsys.readouterr().err
+    string = LiteralExpression(SyntaxKind.StringToken, "ab")
+    with pytest.raises(UnsupportedException):
+        translate(CompilationUnit([PrintStatement(BinaryExpression(string, SyntaxKind.PlusToken, string))]), "x.kl")
+
+
+def test_code_objects_are_cached(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    text = "int total = 0\nwhile (total < 50) {\n    total = total + 7\n}\nprint(total)\n"
+    assert execute_source(tmp_path, text, cache=cache) == "56\n"
+    assert execute_source(tmp_path, text, cache=cache) == "56\n"
+    assert cache.hits['python'] == 1
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_programs_print_what_gcc_prints(tmp_path):
+    for seed in range(6):
+        path = tmp_path / f"program{seed}.kl"
+        path.write_text(ProgramGenerator(seed, depth=3, identifier_ratio=0.6).generate(40))
+        result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=0))
+        build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+        assert not build.failed, build.error
+        expected = subprocess.run([build.executable], capture_output=True, text=True, timeout=10).stdout
+        code, _ = load_code(str(path))
+        output = io.StringIO()
+        execute(code, stdout=output)
+        assert output.getvalue() == expected
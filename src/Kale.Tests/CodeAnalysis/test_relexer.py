@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.relexer import relex, relex_range
+
+
+fragments = list("ab x09 \t\n\"'(){};.:+-*/<>=!") + ["//", "1.", "1.2", "int", "while"]
+
+
+def columns(stream):
+    return [(stream.kinds[i], stream.start(i), stream.end(i)) for i in range(len(stream))]
+
+
+def full_lex(source):
+    try:
+        return columns(Lexer(source).token_stream())
+    except Exception as exception:
+        return type(exception)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_relex_matches_full_lex(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        source = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 40)))
+        try:
+            stream = Lexer(source).token_stream()
+        except Exception:
+            continue
+
+        # A few edits in a row, each on the previous result
+        for _ in range(5):
+            offset = rng.randint(0, len(source))
+            deleted = rng.randint(0, min(4, len(source) - offset))
+            inserted = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 3)))
+            edited = source[:offset] + inserted + source[offset + deleted:]
+
+            expected = full_lex(edited)
+            if not isinstance(expected, list):
+                with pytest.raises(expected):
+                    relex(stream, offset, deleted, inserted)
+                break
+
+            stream = relex(stream, offset, deleted, inserted)
+            assert columns(stream) == expected
+            source = edited
+
+
+def test_relex_only_rescans_near_the_edit():
+    source = "int a = 1\n" * 1000
+    stream = Lexer(source).token_stream()
+    offset = source.index("a", len(source) // 2)
+    edited, first, old_stop, new_stop = relex_range(stream, offset, 1, "bb")
+    assert old_stop - first <= 3
+    assert new_stop - first <= 3
+    assert edited[first + 1].value == "bb"
@@ -0,0 +1,132 @@
+import shutil
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Intermediate.dominance import DominatorTree
+from CodeAnalysis.Intermediate.lowering import Lowering
+from CodeAnalysis.Optimizing.optimizer import Optimizer
+from CodeAnalysis.Optimizing.ssapasses import (
+    CommonSubexpressionEliminator, LoopInvariantCodeMover, StrengthReducer,
+)
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Statistics.compilationstats import CompilationStats
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def lower(source):
+    return Lowering().run(Parser(Lexer(source).tokens()).program())
+
+
+def opcodes(function, opcode, attribute=None):
+    return [value for value in function.values()
+            if value.opcode == opcode and (attribute is None or value.attribute is attribute)]
+
+
+LOOP = (
+    "int width = input()\n"
+    "int total = 0\n"
+    "for (int i = 0; i < 10; i++) {\n"
+    "    total = total + i * 4 + width * width\n"
+    "}\n"
+    "print(total)\n"
+)
+
+
+def test_loop_carried_variables_get_header_phis():
+    function = lower(LOOP)
+    loop = DominatorTree(function).loops()[0]
+    assert len(loop.header.phis) == 2
+    assert {phi.type for phi in loop.header.phis} == {'int'}
+    # width is never assigned in the loop, it needs no phi
+    assert len(opcodes(function, 'phi')) == 2
+
+
+def test_gotos_and_ifs_merge_values():
+    function = lower("int x = input()\nif (x > 1) {\n    x = 2\n}\nprint(x)\n"
+                     "label top:\nx = x - 1\nif (x > 0) {\n    goto top\n}\n")
+    phis = opcodes(function, 'phi')
+    assert len(phis) == 2
+    assert all(len(phi.operands) == len(phi.block.predecessors) == 2 for phi in phis)
+
+
+def test_repeated_expressions_are_computed_once():
+    function = lower("int a = input()\nint b = input()\nprint(a * b + 1)\nprint(b * a + 2)\n")
+    CommonSubexpressionEliminator().run(function)
+    assert len(opcodes(function, 'binary', SyntaxKind.StartToken)) == 1
+
+
+def test_loop_invariants_move_to_the_preheader():
+    function = lower(LOOP)
+    mover = LoopInvariantCodeMover()
+    mover.run(function)
+    loop = DominatorTree(function).loops()[0]
+    square, = [value for value in opcodes(function, 'binary', SyntaxKind.StartToken)
+               if value.operands[0] is value.operands[1]]
+    assert square.block not in loop
+    assert mover.hoisted >= 1
+
+
+def test_trapping_division_stays_in_the_loop():
+    function = lower("int d = input()\nint n = 0\nwhile (n < 3) {\n    if (d > 0) {\n        print(10 / d)\n"
+                     "    }\n    n = n + 1\n}\n")
+    LoopInvariantCodeMover().run(function)
+    loop = DominatorTree(function).loops()[0]
+    division, = opcodes(function, 'binary', SyntaxKind.SlashToken)
+    assert division.block in loop
+
+
+def test_induction_variable_products_become_additions():
+    function = lower(LOOP)
+    LoopInvariantCodeMover().run(function)
+    reducer = StrengthReducer()
+    reducer.run(function)
+    assert reducer.reduced == 1
+    loop = DominatorTree(function).loops()[0]
+    assert not [value for value in opcodes(function, 'binary', SyntaxKind.StartToken)
+                if value.block in loop and value.operands[0].opcode == 'phi']
+
+
+def test_level_three_records_the_ssa_passes():
+    stats = CompilationStats()
+    Optimizer(3, stats).lower(Parser(Lexer(LOOP).tokens()).program())
+    assert {'cse', 'licm', 'strength', 'values'} <= set(stats.passes)
+    assert stats.passes['strength']['reduced'] == 1
+
+
+def run(tmp_path, name, source, level, stdin=""):
+    path = tmp_path / f"{name}_{level}.kl"
+    path.write_text(source)
+    result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=level))
+    build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+    assert not build.failed, build.error
+    return subprocess.run([build.executable], input=stdin, capture_output=True, text=True, timeout=10).stdout
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_swaps_and_conversions_print_the_same(tmp_path):
+    source = (
+        "int a = 1\nint b = 2\nint n = 0\n"
+        "while (n < 5) {\n    int t = a\n    a = b\n    b = t\n    n = n + 1\n    print(a * 10 + b)\n}\n"
+        "char c = \"k\"\nint before = c++\nprint(before)\nprint(c)\n"
+        "double d = input(\"value\")\nint i = d\nprint(i)\nprint(~d)\n"
+        "float g = 1.5\ng = g * 3\nprint(g / 2)\n"
+    )
+    assert run(tmp_path, "swap", source, 3, "7.5") == run(tmp_path, "swap", source, 0, "7.5")
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_bool_conversions_build(tmp_path):
+    # The constant is converted by a cast, there is no bool local
+    assert run(tmp_path, "bool", "bool t = 3 > 2\nprint(t)\n", 3) == "1\n"
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_ssa_programs_print_the_same(tmp_path):
+    for seed in range(8):
+        source = ProgramGenerator(seed, depth=3, identifier_ratio=0.6).generate(40)
+        assert run(tmp_path, f"program{seed}", source, 3) == run(tmp_path, f"program{seed}", source, 0)
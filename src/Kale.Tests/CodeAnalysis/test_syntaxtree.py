@@ -0,0 +1,36 @@
+import pickle
+
+import pytest
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Syntax import syntaxtree
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import SyntaxNode
+from Benchmarks.programgenerator import ProgramGenerator
+
+node_types = [value for value in vars(syntaxtree).values()
+              if isinstance(value, type) and issubclass(value, SyntaxNode) and value is not SyntaxNode]
+
+
+def parse(source):
+    return Parser(Lexer(source).tokens()).program()
+
+
+@pytest.mark.parametrize("node_type", node_types, ids=lambda node_type: node_type.__name__)
+def test_nodes_have_no_dict(node_type):
+    assert '__dict__' not in dir(node_type)
+    assert all('__dict__' not in vars(base) for base in node_type.__mro__[:-1])
+
+
+def test_pickle_round_trip():
+    unit = parse(ProgramGenerator(1, depth=3).generate(50))
+    copy = pickle.loads(pickle.dumps(unit))
+    assert type(copy) is type(unit)
+    assert repr(copy) == repr(unit)
+
+
+def test_slash_isnt_an_alias_of_star():
+    assert SyntaxKind.SlashToken is not SyntaxKind.StartToken
+    operators = [statement.expression.operator for statement in parse("print(4 / 2)\nprint(4 * 2)\n").statements]
+    assert operators == [SyntaxKind.SlashToken, SyntaxKind.StartToken]
@@ -0,0 +1,71 @@
+import pytest
+
+from CodeAnalysis.Exceptions.grammarerror import GrammarException
+from CodeAnalysis.Parsing.parser import sync_kinds
+from CodeAnalysis.Parsing.parsetable import statement_rules
+from CodeAnalysis.Parsing.tablegenerator import Grammar, main
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+
+arithmetic = """
+expression  : term terms
+terms       : '+' term terms
+            | EMPTY
+term        : factor factors
+factors     : '*' factor factors
+            | EMPTY
+factor      : '(' expression ')' | NUMBER
+"""
+
+
+def test_first_and_follow_sets():
+    grammar = Grammar.parse(arithmetic)
+    plus, star, number = SyntaxKind.PlusToken, SyntaxKind.StartToken, SyntaxKind.NumberToken
+    open_parenthesis, close_parenthesis = SyntaxKind.OpenParenthesisToken, SyntaxKind.CloseParenthesisToken
+    end = SyntaxKind.EndOfFileToken
+
+    assert grammar.first['expression'] == {open_parenthesis, number}
+    assert grammar.first['terms'] == {plus, None}
+    assert grammar.first['factors'] == {star, None}
+    assert grammar.follow['expression'] == {close_parenthesis, end}
+    assert grammar.follow['term'] == {plus, close_parenthesis, end}
+    assert grammar.follow['factor'] == {star, plus, close_parenthesis, end}
+
+    table, conflicts = grammar.table()
+    assert not conflicts
+    assert table['terms'] == {plus: 0, close_parenthesis: 1, end: 1}
+
+
+def test_conflicts_are_reported():
+    grammar = Grammar.parse("statement : 'int' IDENTIFIER | 'int' NUMBER | IDENTIFIER\n")
+    table, conflicts = grammar.table()
+    assert conflicts == [('statement', SyntaxKind.IntKeyword, (0, 1))]
+    assert grammar.conflict_messages(conflicts) == [
+        "statement: IntKeyword starts both `IntKeyword IdentifierToken` and `IntKeyword NumberToken`",
+    ]
+    with pytest.raises(GrammarException):
+        grammar.dispatch('statement')
+
+
+@pytest.mark.parametrize("text", [
+    "statement : 'nope'\n",
+    "statement : missing\n",
+    "statement : NAME\n",
+    "| 'int'\n",
+    "statement : 'int' |\n",
+])
+def test_bad_grammars(text):
+    with pytest.raises(GrammarException):
+        Grammar.parse(text)
+
+
+def test_grammar_is_ll1_and_the_table_up_to_date():
+    assert main(['--check']) == 0
+
+
+def test_statements_dispatch_on_their_first_token():
+    assert statement_rules[SyntaxKind.PrintKeyword] == 'print_statement'
+    assert statement_rules[SyntaxKind.IdentifierToken] == 'assignment'
+    for keyword in (SyntaxKind.IntKeyword, SyntaxKind.BoolKeyword, SyntaxKind.LetKeyword, SyntaxKind.VarKeyword):
+        assert statement_rules[keyword] == 'declaration'
+    assert SyntaxKind.IdentifierToken not in sync_kinds
+    assert SyntaxKind.WhileKeyword in sync_kinds
@@ -0,0 +1,56 @@
+import pytest
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Parsing.tokenbuffer import TokenBuffer
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+
+
+def counted(tokens, pulled):
+    for token in tokens:
+        pulled.append(token)
+        yield token
+
+
+def test_peek_doesnt_consume_and_pulls_lazily():
+    pulled = []
+    tokens = list(Lexer("int a = 1 + 2\n").tokens())
+    buffer = TokenBuffer(counted(tokens, pulled), size=3)
+
+    assert buffer.peek(2) is tokens[2]
+    assert len(pulled) == 3
+    assert buffer.peek() is tokens[0]
+    assert [buffer.advance() for _ in range(2)] == tokens[:2]
+    assert len(pulled) == 3
+
+    # Peeking past the ring's end wraps around it
+    assert buffer.peek(2) is tokens[4]
+    assert [buffer.advance() for _ in range(len(tokens) - 2)] == tokens[2:]
+
+
+def test_end_of_file_repeats():
+    buffer = TokenBuffer(Lexer("print(1)\n").tokens())
+    for _ in range(4):
+        buffer.advance()
+    end = buffer.advance()
+    assert end.kind is SyntaxKind.EndOfFileToken
+    assert buffer.peek(3) is end and buffer.advance() is end
+
+
+def test_lookahead_is_bounded():
+    buffer = TokenBuffer(Lexer("print(1)\n").tokens(), size=2)
+    buffer.peek(1)
+    with pytest.raises(IndexError):
+        buffer.peek(2)
+    with pytest.raises(IndexError):
+        buffer.peek(-1)
+
+
+def test_parser_peek_checks_the_kind():
+    parser = Parser(Lexer("int a = 1\n").tokens())
+    assert parser.cur_token.kind is SyntaxKind.IntKeyword
+    assert parser.peek(SyntaxKind.IdentifierToken)
+    assert not parser.peek(SyntaxKind.EqualsToken)
+    assert parser.peek(SyntaxKind.EqualsToken, 2)
+    assert parser.peek(SyntaxKind.NumberToken, 3)
+    assert parser.cur_token.kind is SyntaxKind.IntKeyword
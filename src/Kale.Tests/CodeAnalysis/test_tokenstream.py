@@ -0,0 +1,53 @@
+import pytest
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_round_trip(seed):
+    source = ProgramGenerator(seed).generate(60) + 'print("text")\n'
+    stream = Lexer(source).token_stream()
+    tokens = list(Lexer(source).tokens())
+
+    assert len(stream) == len(tokens)
+    assert list(stream) == tokens
+    assert tokens == list(stream)
+    assert stream[-1].kind is SyntaxKind.EndOfFileToken
+    assert [stream.kind(index) for index in range(len(stream))] == [token.kind for token in tokens]
+
+
+def test_twelve_bytes_per_token():
+    source = ProgramGenerator(0).generate(200)
+    stream = Lexer(source).token_stream()
+    assert stream.nbytes() == 12 * len(stream)
+
+
+def test_values_are_sliced_on_demand():
+    source = b'string s = "abc"\n'
+    stream = MappedLexer(source).token_stream()
+    raw = stream.raw(3)
+    assert isinstance(raw, memoryview) and bytes(raw) == b"abc"
+    assert stream[3].value == "abc" and stream[3].position == 11
+    assert stream[0].value is None and stream[2].value == "="
+
+
+def test_shifted_offsets():
+    stream = Lexer("int a = 1\nint b = 2\n").token_stream()
+    stream.shift_from, stream.shift = 4, 3
+    assert stream.start(4) == 13 and stream.start(3) == 8
+    stream.normalize()
+    assert (stream.shift_from, stream.shift) == (0, 0)
+    assert stream.starts[4] == 13
+
+
+def test_comparison_with_other_types():
+    token = Lexer("print(1)\n").token_stream()[0]
+    assert token != "print" and token != None  # noqa: E711
+    assert (token == 1) is False
+    with pytest.raises(TypeError):
+        hash(token)
+    with pytest.raises(IndexError):
+        Lexer("").token_stream()[1]
@@ -0,0 +1,107 @@
+import io
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Tracing.tracesink import CountingSink, TextSink
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+
+source = """int a = 1
+print(a + 2 * (a - -3))
+if (a < 2) {
+print("x")
+} else if (a == 1) {
+a = a++
+} else {
+print(input())
+}
+while (a < 3) {
+a = a + 1
+}
+"""
+
+# What Parser(debug=True) printed for source before the trace sinks
+classic_output = """Program
+Int-Declaration
+Expression
+Term
+Primary (1)
+Print-Statement
+Expression
+Term
+Primary (a)
+Term
+Primary (2)
+Primary (
+Expression
+Term
+Primary (a)
+Term
+Unary (-)
+Primary (3)
+)
+If-Statement
+Comparison
+Expression
+Term
+Primary (a)
+Expression
+Term
+Primary (2)
+Print-Statement
+Else-If-Statement
+Comparison
+Expression
+Term
+Primary (a)
+Expression
+Term
+Primary (1)
+Assignment-Statement
+Expression
+Term
+Primary (a)
+Unary (++)
+Else-Statement
+Print-Statement
+Expression
+Term
+Input
+While-Statement
+Comparison
+Expression
+Term
+Primary (a)
+Expression
+Term
+Primary (3)
+Assignment-Statement
+Expression
+Term
+Primary (a)
+Term
+Primary (1)
+"""
+
+
+def test_text_sink_reproduces_the_classic_output():
+    output = io.StringIO()
+    sink = TextSink(output)
+    tokens = Lexer(source, trace=sink).lex()
+    Parser(tokens, trace=sink).program()
+
+    lines = output.getvalue().splitlines(keepends=True)
+    assert "".join(lines[:len(tokens)]) == "".join(f"{token!r}\n" for token in tokens)
+    assert "".join(lines[len(tokens):]) == classic_output
+
+
+def test_counting_sink():
+    sink = CountingSink()
+    Parser(Lexer(source).tokens(), trace=sink).program()
+    assert sink.rules['statement'] == 8
+    assert sink.tokens[SyntaxKind.IfKeyword] == 2
+    assert sink.report().startswith("Rules:")
+
+
+def test_no_sink_prints_nothing(capsys):
+    Parser(Lexer(source).lex()).program()
+    assert capsys.readouterr().out == ""
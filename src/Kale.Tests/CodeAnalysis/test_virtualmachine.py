@@ -0,0 +1,119 @@
+import io
+import shutil
+import subprocess
+
+import pytest
+
+from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder
+from CodeAnalysis.Caching.compilationcache import CompilationCache
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_file
+from CodeAnalysis.Exceptions.runtimeerror import RuntimeException
+from CodeAnalysis.Running.runner import load_program, main
+from CodeAnalysis.Running.virtualmachine import VirtualMachine
+from Benchmarks.programgenerator import ProgramGenerator
+
+
+def execute(tmp_path, source, stdin="", optimization=3, cache=None):
+    path = tmp_path / "program.kl"
+    path.write_text(source)
+    program, diagnostics = load_program(str(path), optimization, cache)
+    assert not diagnostics
+    output = io.StringIO()
+    VirtualMachine(program, stdin=io.StringIO(stdin), stdout=output).run()
+    return output.getvalue()
+
+
+def test_int_arithmetic_wraps_and_truncates(tmp_path):
+    source = "int big = 2147483647\nbig = big + 1\nprint(big)\nint n = -7\nprint(n / 2)\n"
+    assert execute(tmp_path, source) == "-2147483648\n-3\n"
+
+
+def test_operators_follow_c(tmp_path):
+    source = ("int a = input()\nint b = 3\ndouble x = input()\nprint(a % b)\nprint(x % 2)\nprint(b ** 20)\n"
+              "print(b ** -1)\nprint(2 ** 3 ** 2)\nprint(x ** 2)\nprint(a & 12 | 1)\nprint(a ^ b)\n"
+              "print(1 << b + 30)\nprint(a >> 1)\nb <<= 2\nx %= 4\nprint(b)\nprint(x)\n")
+    expected = "-1\n-1.5\n-808182895\n0\n512\n56.25\n9\n-6\n2\n-4\n12\n-3.5\n"
+    for level in (0, 3):
+        assert execute(tmp_path, source, "-7 -7.5", optimization=level) == expected
+
+
+def test_remainder_by_zero_is_a_runtime_error(tmp_path):
+    with pytest.raises(RuntimeException):
+        execute(tmp_path, "int d = input()\nprint(1 % d)\n", "0")
+
+
+def test_gotos_and_input(tmp_path):
+    source = ("double limit = input(\"limit\")\nint n = 0\nlabel top:\nn = n + 1\n"
+              "if (n < limit) {\n    goto top\n}\nprint(n)\n")
+    assert execute(tmp_path, source, "4.5\n").endswith("5\n")
+
+
+def test_loops_use_superinstructions(tmp_path):
+    path = tmp_path / "loop.kl"
+    path.write_text("int total = 0\nfor (int i = 0; i < 10; i++) {\n    total = total + i\n}\nprint(total)\n")
+    program, _ = load_program(str(path))
+    listing = program.disassemble()
+    assert "BRANCH_LESS" in listing
+    assert "ADD_I_JUMP" in listing
+
+
+def test_division_by_zero_is_a_runtime_error(tmp_path):
+    with pytest.raises(RuntimeException):
+        execute(tmp_path, "int d = input()\nprint(1 / d)\n", "0")
+
+
+def test_run_reports_runtime_errors(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "zero.kl"
+    path.write_text("int d = 0\nint n = input()\nprint(n / d)\n")
+    monkeypatch.setattr("sys.stdin", io.StringIO("3"))
+    assert main([str(path), "--no-cache"]) == 1
+    assert "Runtime error: Division by zero" in capsys.readouterr().err
+
+
+def test_run_reports_what_the_vm_cant_run(tmp_path, capsys):
+    path = tmp_path / "convert.kl"
+    path.write_text('string s = "ab"\nint x = s\nprint(x)\n')
+    assert main([str(path), "--no-cache"]) == 1
+    assert capsys.readouterr().err.strip() == f"{path}:1:1: Error: Converting const char * to int can't run on the VM"
+
+
+def test_cached_bytecode_runs_the_same(tmp_path):
+    cache = CompilationCache(str(tmp_path / "cache"))
+    source = "int total = 0\nwhile (total < 50) {\n    total = total + 7\n}\nprint(total)\n"
+    assert execute(tmp_path, source, cache=cache) == "56\n"
+    assert cache.misses['bytecode'] == 1
+    assert execute(tmp_path, source, cache=cache) == "56\n"
+    assert cache.hits['bytecode'] == 1
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_programs_print_what_gcc_prints(tmp_path):
+    for seed in range(6):
+        path = tmp_path / f"program{seed}.kl"
+        path.write_text(ProgramGenerator(seed, depth=3, identifier_ratio=0.6).generate(40))
+        result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=0))
+        build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+        assert not build.failed, build.error
+        expected = subprocess.run([build.executable], capture_output=True, text=True, timeout=10).stdout
+        for level in (0, 3):
+            program, _ = load_program(str(path), level)
+            output = io.StringIO()
+            VirtualMachine(program, stdout=output).run()
+            assert output.getvalue() == expected
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc not installed")
+def test_programs_with_every_operator_print_what_gcc_prints(tmp_path):
+    operators = ("+", "-", "*", "/", "%", "**", "&", "|", "^", "<<", ">>", "<", "==")
+    for seed in range(6):
+        path = tmp_path / f"program{seed}.kl"
+        path.write_text(ProgramGenerator(seed, depth=3, identifier_ratio=0.6, operators=operators).generate(40))
+        result = compile_file(str(path), CompilationOptions(trace=False, emit=True, optimization=0))
+        build = NativeBuilder(BuildOptions(optimization=0)).build(result.c_path)
+        assert not build.failed, build.error
+        expected = subprocess.run([build.executable], capture_output=True, text=True, timeout=10).stdout
+        for level in (0, 3):
+            program, _ = load_program(str(path), level)
+            output = io.StringIO()
+            VirtualMachine(program, stdout=output).run()
+            assert output.getvalue() == expected
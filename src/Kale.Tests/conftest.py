@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The compiler imports its modules as top level `CodeAnalysis...`
+tests_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(tests_root), 'Kale'))
+sys.path.insert(0, tests_root)
@@ -0,0 +1,194 @@
+import os
+import platform
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+executable_suffix = '.exe' if platform.system() == 'Windows' else ''
+
+compiler_identities = {}
+
+
+def find_compiler():
+    """
+    Returns the C compiler to build with: $CC, else gcc or cc from the PATH,
+    else None. Only compilers taking gcc's flags are supported.
+    """
+
+    compiler = os.environ.get('CC')
+    if compiler:
+        return compiler
+    for name in ('gcc', 'cc'):
+        if shutil.which(name):
+            return name
+    return None
+
+
+def compiler_identity(compiler, native=False):
+    """
+    Returns the compiler's version line, and with native the CPU that
+    -march=native resolves to, so cached objects are never shared across
+    compiler versions or, for native builds, across hosts.
+
+    Returns None if the compiler can't be run, the build then reports it.
+    """
+
+    key = (compiler, native)
+    if key not in compiler_identities:
+        try:
+            run = subprocess.run([compiler, '--version'], capture_output=True, text=True)
+        except OSError:
+            return None
+        identity = run.stdout.partition('\n')[0]
+        if native:
+            run = subprocess.run([compiler, '-march=native', '-Q', '--help=target'], capture_output=True, text=True)
+            for line in run.stdout.splitlines():
+                option = line.split()
+                if option and option[0] == '-march=':
+                    identity += ' ' + ' '.join(option[1:])
+                    break
+            else:
+                identity += ' ' + platform.node()
+        compiler_identities[key] = identity
+    return compiler_identities[key]
+
+
+class BuildOptions:
+    """
+    How C files are built: `optimization` is the -O level, 0 to 3, and
+    native adds -march=native.
+
+    Signed overflow always wraps (-fwrapv), as Kale ints do in the VM and
+    the Python backend; without it gcc may assume it never happens.
+    """
+
+    __slots__ = ('compiler', 'optimization', 'native')
+
+    def __init__(self, compiler=None, optimization=2, native=False):
+        if optimization not in (0, 1, 2, 3):
+            raise ValueError(f"Optimization level must be 0 to 3, not {optimization}")
+        self.compiler = compiler
+        self.optimization = optimization
+        self.native = native
+
+    def flags(self):
+        flags = [f'-O{self.optimization}', '-fwrapv']
+        if self.native:
+            flags.append('-march=native')
+        return flags
+
+
+class BuildResult:
+    """
+    Outcome of building one C file: the executable's path, whether the
+    object came from the cache, the compile and link wall times and the
+    compiler's error output if either step failed.
+    """
+
+    __slots__ = ('path', 'executable', 'cached', 'compile_time', 'link_time', 'error')
+
+    def __init__(self, path, executable, cached=False, compile_time=0.0, link_time=0.0, error=None):
+        self.path = path
+        self.executable = executable
+        self.cached = cached
+        self.compile_time = compile_time
+        self.link_time = link_time
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+class NativeBuilder:
+    """
+    Compiles C files to objects and links each into an executable next to
+    it, running up to `jobs` compiler processes at a time.
+
+    Objects are cached under the 'object' stage of the CompilationCache
+    when one is given, keyed by the C text, the flags and the compiler's
+    identity. A file whose C is byte-identical to an earlier build is
+    only linked.
+    """
+
+    def __init__(self, options=None, cache=None, jobs=None):
+        self.options = options if options is not None else BuildOptions()
+        self.compiler = self.options.compiler or find_compiler()
+        self.cache = cache
+        self.jobs = jobs or os.cpu_count() or 1
+
+    def key(self, path):
+        with open(path, 'rb') as c_file:
+            source = c_file.read()
+        options = tuple(self.options.flags()) + (compiler_identity(self.compiler, self.options.native),)
+        return self.cache.key(source, options)
+
+    def build(self, path):
+        """
+        Builds the C file at path into an executable, returns a BuildResult.
+        """
+
+        base = path[:-2] if path.endswith('.c') else path
+        object_path = f"{base}.o"
+        result = BuildResult(path, base + executable_suffix)
+        if self.compiler is None:
+            result.error = "Couldn't find a C compiler, GCC should be installed, or use `kale run`"
+            return result
+
+        start = time.perf_counter()
+        key = self.key(path) if self.cache is not None else None
+        result.cached = key is not None and self.cache.load_file(key, 'object', object_path)
+        if not result.cached:
+            result.error = self.run(*self.options.flags(), '-c', '-o', object_path, path)
+            if result.failed:
+                return result
+            if key is not None:
+                self.cache.store_file(key, 'object', object_path)
+        result.compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        # libm for the pow() and fmod() of `**` and `%` on doubles
+        result.error = self.run('-o', result.executable, object_path, '-lm')
+        result.link_time = time.perf_counter() - start
+        return result
+
+    def run(self, *arguments):
+        """
+        Runs the compiler, returns its error output if it failed, else None.
+        """
+
+        try:
+            run = subprocess.run([self.compiler, *arguments], capture_output=True, text=True)
+        except OSError as error:
+            return f"Couldn't run the C compiler {self.compiler}: {error.strerror or error}"
+        return run.stderr if run.returncode else None
+
+    def build_all(self, paths):
+        """
+        Builds paths in parallel, yields their BuildResults in order.
+        """
+
+        if self.jobs == 1 or len(paths) <= 1:
+            for path in paths:
+                yield self.build(path)
+            return
+
+        # The work happens in the compiler processes, threads only wait
+        with ThreadPoolExecutor(min(self.jobs, len(paths))) as executor:
+            yield from executor.map(self.build, paths)
+
+
+def report(results, elapsed):
+    """
+    Summary line of a build: executables built, cached objects and the
+    compile and link times summed over files.
+    """
+
+    built = sum(not result.failed for result in results)
+    cached = sum(result.cached for result in results)
+    compile_time = sum(result.compile_time for result in results)
+    link_time = sum(result.link_time for result in results)
+    return (f"Built {built} of {len(results)} executables in {elapsed:.2f} s "
+            f"(compile {compile_time:.2f} s, link {link_time:.2f} s, {cached} objects cached)")
@@ -0,0 +1,289 @@
+import hashlib
+import os
+import pickle
+import time
+from collections import Counter
+
+from CodeAnalysis.Syntax.tokenstream import TokenStream
+
+
+# Outputs stored per source, in pipeline order
+stages = ('tokens', 'ast', 'c', 'object', 'bytecode', 'python')
+
+# Prefix of the files entries are written to before they are renamed into
+# place, and the age at which one is taken to be left by a crashed writer
+temporary_prefix = '.tmp-'
+stale_temporary_age = 3600
+
+compiler_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+compiler_hash = None
+
+
+def compiler_fingerprint():
+    """
+    Returns a hash of the compiler's own sources, so entries made by any
+    other version of the compiler never match.
+    """
+
+    global compiler_hash
+    if compiler_hash is None:
+        digest = hashlib.sha256()
+        for directory, subdirectories, files in sorted(os.walk(compiler_root)):
+            subdirectories.sort()
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    path = os.path.join(directory, name)
+                    digest.update(os.path.relpath(path, compiler_root).encode())
+                    with open(path, 'rb') as source_file:
+                        digest.update(source_file.read())
+        compiler_hash = digest.hexdigest()
+    return compiler_hash
+
+
+def temporary_file(directory):
+    """
+    Opens a new temporary file in directory, returns its handle and path.
+    tempfile is only imported by runs that write to the cache.
+    """
+
+    import tempfile
+    return tempfile.mkstemp(dir=directory, prefix=temporary_prefix)
+
+
+def copy(source, target, size=1 << 16):
+    """
+    Copies an open file to another, as shutil.copyfileobj does without
+    importing shutil.
+    """
+
+    while chunk := source.read(size):
+        target.write(chunk)
+
+
+def default_directory():
+    """
+    $KALE_CACHE_DIR, or kale/ under the user's cache directory.
+    """
+
+    directory = os.environ.get('KALE_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'kale')
+
+
+class CompilationCache:
+    """
+    Content addressed on-disk store of compilation outputs.
+
+    Entries are keyed by a hash of the source bytes, the compiler and the
+    options that change the outputs, plus the stage name. Files are
+    written to a temporary name and renamed into place, so concurrent
+    builds sharing the directory only ever see complete entries; a reader
+    losing a race with eviction just misses.
+
+    Reads refresh an entry's mtime, trim() evicts the least recently used
+    entries once the directory is over `max_bytes`.
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 1024 * 1024):
+        self.directory = directory if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def key(self, source, options=()):
+        """
+        Returns the key of a source (str or bytes-like) compiled with options.
+        """
+
+        digest = hashlib.sha256()
+        digest.update(compiler_fingerprint().encode())
+        digest.update(repr(tuple(options)).encode())
+        digest.update(source.encode('utf-8') if isinstance(source, str) else source)
+        return digest.hexdigest()
+
+    def path(self, key, stage):
+        return os.path.join(self.directory, key[:2], f"{key}.{stage}")
+
+    # Entries
+    # ----------------------------------------------------------------
+
+    def load(self, key, stage):
+        """
+        Returns the bytes stored for key and stage, or None.
+        """
+
+        path = self.path(key, stage)
+        try:
+            with open(path, 'rb') as entry:
+                data = entry.read()
+            os.utime(path)
+        except OSError:
+            self.misses[stage] += 1
+            return None
+
+        self.hits[stage] += 1
+        return data
+
+    def store(self, key, stage, data):
+        """
+        Atomically writes data as the entry for key and stage.
+        """
+
+        self.write(key, stage, lambda entry: entry.write(data))
+
+    def write(self, key, stage, write):
+        """
+        Calls write with a binary file to fill, which becomes the entry for
+        key and stage once complete.
+        """
+
+        path = self.path(key, stage)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        handle, temporary = temporary_file(directory)
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                write(entry)
+            os.replace(temporary, path)
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            raise
+
+    def load_file(self, key, stage, path):
+        """
+        Atomically copies the entry for key and stage to path, returns
+        whether there was one.
+        """
+
+        entry_path = self.path(key, stage)
+        directory = os.path.dirname(os.path.abspath(path))
+        temporary = None
+        try:
+            # A missing entry is found before a temporary file is made
+            with open(entry_path, 'rb') as entry:
+                handle, temporary = temporary_file(directory)
+                with os.fdopen(handle, 'wb') as target:
+                    copy(entry, target)
+            os.utime(entry_path)
+            os.replace(temporary, path)
+        except OSError:
+            if temporary is not None:
+                try:
+                    os.unlink(temporary)
+                except OSError:
+                    pass
+            self.misses[stage] += 1
+            return False
+
+        self.hits[stage] += 1
+        return True
+
+    def store_file(self, key, stage, path):
+        """
+        Atomically copies the file at path in as the entry for key and stage.
+        """
+
+        with open(path, 'rb') as source_file:
+            self.write(key, stage, lambda entry: copy(source_file, entry))
+
+    def load_object(self, key, stage):
+        data = self.load(key, stage)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception:
+            # Writes are atomic, only a foreign or damaged file gets here
+            self.hits[stage] -= 1
+            self.misses[stage] += 1
+            return None
+
+    def store_object(self, key, stage, value):
+        self.store(key, stage, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def load_tokens(self, key, source):
+        """
+        Returns the TokenStream stored for key, over source, or None.
+        """
+
+        columns = self.load_object(key, 'tokens')
+        if columns is None:
+            return None
+        stream = TokenStream(source)
+        for name, data in zip(('kinds', 'starts', 'ends'), columns):
+            column = getattr(stream, name)
+            column.frombytes(data)
+        return stream
+
+    def store_tokens(self, key, stream):
+        stream.normalize()
+        self.store_object(key, 'tokens', tuple(column.tobytes() for column in (stream.kinds, stream.starts, stream.ends)))
+
+    # Eviction
+    # ----------------------------------------------------------------
+
+    def entries(self, temporary=False):
+        """
+        Returns (mtime, size, path) of every entry, or with temporary=True
+        of every file still being written.
+        """
+
+        entries = []
+        try:
+            shards = os.scandir(self.directory)
+        except OSError:
+            return entries
+        with shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.name.startswith(temporary_prefix) != temporary:
+                        continue
+                    try:
+                        info = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, entry.path))
+        return entries
+
+    def trim(self):
+        """
+        Evicts least recently used entries until the cache fits max_bytes.
+        Returns the number of bytes freed.
+
+        Temporary files may belong to a write in progress, they are only
+        removed once older than stale_temporary_age.
+        """
+
+        freed = 0
+        stale = time.time() - stale_temporary_age
+        for mtime, size, path in self.entries(temporary=True):
+            if mtime < stale:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                freed += size
+
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            freed += size
+        return freed
+
+    def report(self):
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return f"cache: {hits} hits, {misses} misses"
@@ -0,0 +1,204 @@
+import glob
+import io
+import os
+
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Tracing.tracesink import TextSink
+
+
+class CompilationOptions:
+    """
+    What to do for every file of a run, sent as is to the workers.
+    Outputs are cached in `cache_dir` unless it is None. Emitted C is
+    optimized by the Optimizer passes of level `optimization`, from the
+    SSA form at level 3.
+    """
+
+    __slots__ = ('trace', 'stats', 'memory', 'cache_dir', 'emit', 'optimization')
+
+    def __init__(self, trace=True, stats=False, memory=False, cache_dir=None, emit=False, optimization=0):
+        self.trace = trace
+        self.stats = stats
+        self.memory = memory
+        self.cache_dir = cache_dir
+        self.emit = emit
+        self.optimization = optimization
+
+    def key(self):
+        """
+        The options that change a file's outputs, part of its cache key.
+        """
+        return (self.trace, self.emit, self.optimization if self.emit else 0)
+
+
+class CompilationResult:
+    """
+    Outcome of compiling one file: its captured trace output, its located
+    diagnostics as (line, column, message), its statistics, the cache hit
+    and miss Counters of its stages and the path of its C if written.
+    """
+
+    __slots__ = ('path', 'output', 'diagnostics', 'dropped', 'stats', 'hits', 'misses', 'c_path')
+
+    def __init__(self, path, output="", diagnostics=(), dropped=0, stats=None, hits=None, misses=None,
+                 c_path=None):
+        self.path = path
+        self.output = output
+        self.diagnostics = list(diagnostics)
+        self.dropped = dropped
+        self.stats = stats
+        self.hits = hits
+        self.misses = misses
+        self.c_path = c_path
+
+    @property
+    def failed(self):
+        return bool(self.diagnostics)
+
+
+def expand(patterns):
+    """
+    Returns the files named by paths and glob patterns, in argument order
+    and each glob's matches sorted, without duplicates. A pattern matching
+    nothing is kept so it gets reported as missing.
+    """
+
+    paths = {}
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        else:
+            matches = [pattern]
+        for path in matches:
+            paths.setdefault(os.path.normpath(path), None)
+    return list(paths)
+
+
+def available_cores():
+    """
+    Returns the number of cores this process may run on.
+    """
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def compile_file(path, options):
+    """
+    Lexes and parses one file, capturing everything it would print, and
+    writes its C next to it if options.emit is set and it has no errors.
+
+    With a cache, a source compiled before with the same options is only
+    hashed: its trace output, diagnostics and C are loaded as they are.
+
+    The statistics, cache, C generation and optimizer modules are imported
+    by the options that use them, a clean check of a small file costs less
+    than importing them all.
+    """
+
+    output = io.StringIO()
+    stats = None
+    if options.stats:
+        from CodeAnalysis.Statistics.compilationstats import CompilationStats
+        stats = CompilationStats(memory=options.memory)
+    diagnostics = DiagnosticBag()
+    cache = None
+    if options.cache_dir is not None:
+        from CodeAnalysis.Caching.compilationcache import CompilationCache
+        cache = CompilationCache(options.cache_dir)
+
+    try:
+        lexer = MappedLexer.from_file(path, stats=stats, diagnostics=diagnostics)
+    except OSError as error:
+        return CompilationResult(path, diagnostics=[(1, 1, error.strerror or str(error))])
+
+    emitter = generator = None
+    if options.emit:
+        from CodeAnalysis.Emitting.codegenerator import CodeGenerator
+        from CodeAnalysis.Emitting.emitter import Emitter
+        emitter = Emitter(os.path.splitext(path)[0], stats=stats)
+        generator = CodeGenerator(emitter)
+    try:
+        if cache is not None:
+            key = cache.key(lexer.source, options.key())
+            cached = cache.load_object(key, 'ast')
+            if cached is not None:
+                unit, text, located, dropped = cached
+                if emitter is None or located or cache.load_file(key, 'c', emitter.path):
+                    return CompilationResult(path, text, located, dropped, stats, cache.hits, cache.misses,
+                                             emitter.path if emitter is not None and not located else None)
+
+            tokens = cache.load_tokens(key, lexer.source)
+            if tokens is None:
+                tokens = lexer.token_stream()
+                # A stream the lexer had to skip characters of would lose
+                # their diagnostics when reused
+                if not len(diagnostics):
+                    cache.store_tokens(key, tokens)
+        else:
+            # Measuring lexes up front so the phases can be told apart
+            tokens = lexer.token_stream() if stats is not None else lexer.tokens()
+
+        trace = TextSink(output) if options.trace else None
+        # Optimizing needs the whole program, only unoptimized C streams
+        streaming = generator if not options.optimization else None
+        unit = Parser(tokens, names=lexer.names, trace=trace, stats=stats, diagnostics=diagnostics,
+                      generator=streaming).program()
+        located = diagnostics.located(lexer.source)
+
+        # Nothing is emitted for a file with errors
+        if emitter is not None and not located:
+            if options.optimization:
+                from CodeAnalysis.Optimizing.optimizer import Optimizer
+            if options.optimization >= 3:
+                from CodeAnalysis.Emitting.ircodegenerator import IRCodeGenerator
+                function = Optimizer(options.optimization, stats).lower(unit)
+                IRCodeGenerator(emitter).generate(function)
+            elif streaming is None:
+                unit = Optimizer(options.optimization, stats).run(unit)
+                for statement in unit.statements:
+                    generator.statement(statement)
+                generator.end()
+            emitter.output()
+    finally:
+        lexer.close()
+        if emitter is not None:
+            emitter.discard()
+
+    c_path = emitter.path if emitter is not None and not located else None
+    if cache is not None:
+        # Only the AST of a file that isn't emitted is kept, the generator
+        # consumes the statements otherwise
+        cache.store_object(key, 'ast', (unit if emitter is None else None, output.getvalue(), located,
+                                        diagnostics.dropped))
+        if c_path is not None:
+            cache.store_file(key, 'c', c_path)
+        return CompilationResult(path, output.getvalue(), located, diagnostics.dropped, stats,
+                                 cache.hits, cache.misses, c_path)
+    return CompilationResult(path, output.getvalue(), located, diagnostics.dropped, stats, c_path=c_path)
+
+
+def compile_files(paths, options, jobs=None):
+    """
+    Compiles paths on a pool of `jobs` processes, one per core by default,
+    and yields their CompilationResults in the order of paths.
+    """
+
+    jobs = jobs or available_cores()
+    if jobs == 1 or len(paths) <= 1:
+        for path in paths:
+            yield compile_file(path, options)
+        return
+
+    jobs = min(jobs, len(paths))
+    # Batches amortize the round trips on many small files, while still
+    # leaving a few per worker to balance uneven sizes
+    chunksize = max(1, len(paths) // (jobs * 4))
+    # Imported here, the process pool machinery costs more to import than
+    # a small file costs to compile
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(compile_file, paths, [options] * len(paths), chunksize=chunksize)
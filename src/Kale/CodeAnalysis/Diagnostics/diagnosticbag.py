@@ -0,0 +1,68 @@
+class Diagnostic:
+    """
+    An error message and the source offset it was found at.
+    """
+
+    __slots__ = ('message', 'position')
+
+    def __init__(self, message, position):
+        self.message = message
+        self.position = position
+
+    def __repr__(self):
+        return f"Diagnostic({self.message!r}, {self.position})"
+
+
+class DiagnosticBag:
+    """
+    Errors collected over a compilation, so a single run reports them all.
+
+    Only the first `limit` diagnostics are kept, the ones past it are just
+    counted in `dropped`. Producers stop once the bag is `full`.
+    """
+
+    def __init__(self, limit=100):
+        self.limit = limit
+        self.diagnostics = []
+        self.dropped = 0
+
+    def report(self, message, position):
+        if len(self.diagnostics) < self.limit:
+            self.diagnostics.append(Diagnostic(message, position))
+        else:
+            self.dropped += 1
+
+    @property
+    def full(self):
+        return len(self.diagnostics) >= self.limit
+
+    def __len__(self):
+        return len(self.diagnostics)
+
+    def __iter__(self):
+        return iter(self.diagnostics)
+
+    def located(self, source):
+        """
+        Returns (line, column, message) for every diagnostic, sorted by
+        position, both 1-based. `source` is the str or bytes-like source
+        the positions index. Columns count characters either way, the text
+        of a bytes source is decoded as UTF-8 up to the position.
+        """
+
+        text = isinstance(source, str)
+        newline = '\n' if text else b'\n'
+        line, line_start = 1, 0
+        located = []
+        for diagnostic in sorted(self.diagnostics, key=lambda diagnostic: diagnostic.position):
+            position = diagnostic.position
+            found = source.find(newline, line_start, position)
+            while found != -1:
+                line, line_start = line + 1, found + 1
+                found = source.find(newline, line_start, position)
+            if text:
+                column = position - line_start + 1
+            else:
+                column = len(source[line_start:position].decode('utf-8', 'replace')) + 1
+            located.append((line, column, diagnostic.message))
+        return located
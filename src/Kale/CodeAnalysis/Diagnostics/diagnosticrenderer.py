@@ -0,0 +1,46 @@
+import sys
+
+
+colored = None
+
+
+def color(text, color_name):
+    """
+    Text colored for the terminal.
+
+    colorama and termcolor are only imported the first time something is
+    colored, a clean compile never loads them. Without them text is left
+    plain.
+    """
+
+    global colored
+    if colored is None:
+        try:
+            import colorama
+            import termcolor
+        except ImportError:
+            colored = lambda text, color_name: text
+        else:
+            colorama.init()
+            colored = termcolor.colored
+    return colored(text, color_name)
+
+
+def error(text, file=None):
+    """
+    Prints an error line in red, to stdout unless file is given.
+    """
+
+    print(color(text, "red"), file=file if file is not None else sys.stdout)
+
+
+def report_errors(path, diagnostics, dropped=0, file=None):
+    """
+    Prints the located diagnostics of the file at path, and how many more
+    were dropped.
+    """
+
+    for line, column, message in diagnostics:
+        error(f"{path}:{line}:{column}: Error: {message}", file)
+    if dropped:
+        error(f"... {dropped} more errors not shown", file)
@@ -0,0 +1,357 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import operator_map
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, GotoStatement, IfStatement,
+    InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement, UnaryExpression,
+    WhileStatement,
+)
+
+
+operator_text = {kind: text for text, kind in operator_map.items()}
+
+# C type of each declaring keyword, let and var take their initializer's
+declared_types = {
+    SyntaxKind.IntKeyword: 'int',
+    SyntaxKind.CharKeyword: 'char',
+    SyntaxKind.FloatKeyword: 'float',
+    SyntaxKind.DoubleKeyword: 'double',
+    SyntaxKind.BoolKeyword: 'bool',
+    SyntaxKind.StringKeyword: 'const char *',
+}
+
+print_formats = {
+    'int': '%d',
+    'char': '%c',
+    'float': '%g',
+    'double': '%g',
+    'bool': '%d',
+    'const char *': '%s',
+}
+
+comparison_kinds = frozenset([
+    SyntaxKind.GreaterToken, SyntaxKind.GreaterOrEqualsToken, SyntaxKind.LessToken,
+    SyntaxKind.LessOrEqualsToken, SyntaxKind.EqualsEqualsToken, SyntaxKind.BangEqualsToken,
+])
+
+# Operators C only has for ints, float operands are truncated to int
+integer_operators = frozenset([
+    SyntaxKind.AmpersandToken, SyntaxKind.PipeToken, SyntaxKind.HatToken, SyntaxKind.LeftShiftToken,
+    SyntaxKind.RightShiftToken,
+])
+
+# Operators computed by a call on floating point operands, in double
+double_operators = frozenset([SyntaxKind.PercentToken, SyntaxKind.DoubleStarToken])
+
+input_function = """
+static double kale_input(const char *prompt)
+{
+    double value = 0;
+    if (prompt != NULL)
+        fputs(prompt, stdout);
+    if (scanf("%lf", &value) != 1)
+        value = 0;
+    return value;
+}"""
+
+
+# Doubles convert to int as x86 truncates them: NaN and out of range values
+# give INT_MIN. A plain C cast of those is undefined and gcc folds constant
+# ones differently from what the CPU does.
+int_function = """
+static int kale_int(double value)
+{
+    return value > -2147483649.0 && value < 2147483648.0 ? (int)value : INT_MIN;
+}"""
+
+
+# Exponents below 0 truncate 1 / base ** -exponent as int division would,
+# the multiplications are done unsigned so they wrap without -fwrapv
+power_function = """
+static int kale_power(int base, int exponent)
+{
+    unsigned result = 1, factor = base;
+    if (exponent < 0)
+        return base == 1 ? 1 : base == -1 ? (exponent & 1 ? -1 : 1) : 0;
+    while (exponent)
+    {
+        if (exponent & 1)
+            result *= factor;
+        factor *= factor;
+        exponent >>= 1;
+    }
+    return (int)result;
+}"""
+
+
+def binary_code(operator, kind, left, right, strings=False):
+    """
+    C of a binary operation of C type kind on the C expressions left and
+    right. `**` and the `%` of doubles are calls, shift counts are masked
+    to 0-31 as x86 masks them. Comparisons of strings compare their text.
+    """
+
+    if strings:
+        return f"strcmp({left}, {right}) {operator_text[operator]} 0"
+    if operator is SyntaxKind.DoubleStarToken:
+        return f"kale_power({left}, {right})" if kind == 'int' else f"pow({left}, {right})"
+    if operator is SyntaxKind.PercentToken and kind != 'int':
+        return f"fmod({left}, {right})"
+    if operator is SyntaxKind.LeftShiftToken or operator is SyntaxKind.RightShiftToken:
+        return f"{left} {operator_text[operator]} ({right} & 31)"
+    return f"{left} {operator_text[operator]} {right}"
+
+
+def expression_type(node, types):
+    """
+    C type an expression is printed as, given the C types of the variables
+    by name id: the widest of its operands, int for comparisons and
+    negations.
+    """
+
+    if isinstance(node, LiteralExpression):
+        if node.kind is SyntaxKind.StringToken:
+            return 'const char *'
+        if node.kind is SyntaxKind.NumberToken:
+            return 'double' if '.' in node.value else 'int'
+        return 'bool'
+
+    if isinstance(node, NameExpression):
+        return types.get(node.name_id, 'double')
+
+    if isinstance(node, BinaryExpression):
+        if node.operator in comparison_kinds or node.operator in integer_operators:
+            return 'int'
+        left, right = expression_type(node.left, types), expression_type(node.right, types)
+        if 'double' in (left, right) or 'float' in (left, right):
+            return 'double'
+        return 'int'
+
+    if isinstance(node, UnaryExpression):
+        if node.operator is SyntaxKind.BangToken or node.operator is SyntaxKind.TildeToken:
+            return 'int'
+        operand = expression_type(node.operand, types)
+        return operand if operand in ('double', 'float', 'char') else 'int'
+
+    if isinstance(node, InputExpression):
+        return 'double'
+
+    return 'int'
+
+
+def variable_type(node, types):
+    """
+    C type of the variable a declaration declares, let and var take their
+    initializer's.
+    """
+
+    kind = declared_types.get(node.keyword)
+    if kind is None:
+        kind = expression_type(node.initializer, types) if node.initializer is not None else 'double'
+    return kind
+
+
+def c_string(text):
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"').replace('?', '\\?') + '"'
+
+
+class CodeGenerator:
+    """
+    Translates top level statements to C as the Parser finishes them.
+
+    The program becomes the body of main(). Variables are hoisted to file
+    scope declarations in the Emitter's headers, since Kale names stay
+    visible after the block that declared them and gotos may jump over
+    declarations. C names get a `k_` prefix so they can't clash with C
+    keywords or the runtime.
+    """
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.types = {}
+        self.started = False
+        self.input_defined = False
+        self.power_defined = False
+        self.int_defined = False
+
+    def begin(self):
+        self.emitter.include('stdio.h')
+        self.emitter.emit_line("int main(void)")
+        self.emitter.emit_line("{")
+        self.started = True
+
+    def end(self):
+        if not self.started:
+            self.begin()
+        self.emitter.emit_line("    return 0;")
+        self.emitter.emit_line("}")
+
+    # Statements
+    # ----------------------------------------------------------------
+
+    def statement(self, node, depth=1):
+        """
+        Emits a statement and everything nested in it.
+        """
+
+        if not self.started:
+            self.begin()
+
+        emit_line = self.emitter.emit_line
+        indent = '    ' * depth
+
+        if isinstance(node, PrintStatement):
+            expression = node.expression
+            emit_line(f'{indent}printf("{print_formats[self.type(expression)]}\\n", {self.expression(expression)});')
+
+        elif isinstance(node, DeclarationStatement):
+            self.declare(node)
+            if node.initializer is not None:
+                emit_line(f"{indent}{self.simple(node)};")
+
+        elif isinstance(node, AssignmentStatement):
+            emit_line(f"{indent}{self.simple(node)};")
+
+        elif isinstance(node, IfStatement):
+            emit_line(f"{indent}if ({self.expression(node.condition)})")
+            self.block(node.body, depth)
+            while node.else_body is not None:
+                else_body = node.else_body
+                if len(else_body) == 1 and isinstance(else_body[0], IfStatement):
+                    node = else_body[0]
+                    emit_line(f"{indent}else if ({self.expression(node.condition)})")
+                    self.block(node.body, depth)
+                else:
+                    emit_line(f"{indent}else")
+                    self.block(else_body, depth)
+                    break
+
+        elif isinstance(node, WhileStatement):
+            emit_line(f"{indent}while ({self.expression(node.condition)})")
+            self.block(node.body, depth)
+
+        elif isinstance(node, ForStatement):
+            self.declare(node.initializer)
+            emit_line(f"{indent}for ({self.simple(node.initializer)}; {self.expression(node.condition)}; "
+                      f"{self.expression(node.increment)})")
+            self.block(node.body, depth)
+
+        elif isinstance(node, LabelStatement):
+            # A label must label a statement, the empty one will do
+            emit_line(f"{'    ' * (depth - 1)}k_{node.name}:;")
+
+        elif isinstance(node, GotoStatement):
+            emit_line(f"{indent}goto k_{node.name};")
+
+    def block(self, statements, depth):
+        indent = '    ' * depth
+        self.emitter.emit_line(f"{indent}{{")
+        for statement in statements:
+            self.statement(statement, depth + 1)
+        self.emitter.emit_line(f"{indent}}}")
+
+    def declare(self, node):
+        """
+        Hoists the variable of a declaration the first time it is seen.
+        """
+
+        if not isinstance(node, DeclarationStatement) or node.name_id in self.types:
+            return
+        kind = variable_type(node, self.types)
+        if kind == 'bool':
+            self.emitter.include('stdbool.h')
+        self.types[node.name_id] = kind
+        self.emitter.add_header(f"static {kind} k_{node.name};")
+
+    def simple(self, node):
+        """
+        Declaration or assignment as a C expression, without the `;`.
+        """
+
+        if isinstance(node, DeclarationStatement):
+            if node.initializer is None:
+                return f"k_{node.name} = k_{node.name}"
+            return f"k_{node.name} = {self.value(node.initializer, self.types[node.name_id])}"
+        return f"k_{node.name} = {self.value(node.expression, self.types.get(node.name_id))}"
+
+    # Expressions
+    # ----------------------------------------------------------------
+
+    def value(self, node, kind):
+        """
+        Expression converted for a variable of C type kind.
+        """
+
+        if kind == 'char' and isinstance(node, LiteralExpression) and node.kind is SyntaxKind.StringToken \
+                and len(node.value) == 1:
+            return "'\\''" if node.value == "'" else f"'{node.value}'"
+        if kind in ('int', 'char') and self.type(node) in ('double', 'float'):
+            return self.to_int(self.expression(node))
+        return self.expression(node)
+
+    def expression(self, node):
+        if isinstance(node, LiteralExpression):
+            if node.kind is SyntaxKind.StringToken:
+                return c_string(node.value)
+            if node.kind is SyntaxKind.NumberToken:
+                return node.value
+            return '1' if node.value else '0'
+
+        if isinstance(node, NameExpression):
+            return f"k_{node.name}"
+
+        if isinstance(node, BinaryExpression):
+            left, right = self.expression(node.left), self.expression(node.right)
+            if node.operator in integer_operators:
+                left, right = (self.to_int(text) if self.type(operand) in ('double', 'float') else text
+                               for text, operand in ((left, node.left), (right, node.right)))
+            kind = self.type(node)
+            strings = self.type(node.left) == 'const char *'
+            if strings:
+                self.emitter.include('string.h')
+            self.require_operator(node.operator, kind)
+            return f"({binary_code(node.operator, kind, left, right, strings)})"
+
+        if isinstance(node, UnaryExpression):
+            if node.operator is SyntaxKind.TildeToken and self.type(node.operand) in ('double', 'float'):
+                return f"(~{self.to_int(self.expression(node.operand))})"
+            if node.postfix:
+                return f"({self.expression(node.operand)}{operator_text[node.operator]})"
+            return f"({operator_text[node.operator]}{self.expression(node.operand)})"
+
+        if isinstance(node, InputExpression):
+            self.require_input()
+            if node.prompt is None:
+                return "kale_input(NULL)"
+            if self.type(node.prompt) == 'const char *':
+                return f"kale_input({self.expression(node.prompt)})"
+            prompt_format = print_formats[self.type(node.prompt)]
+            return f'(printf("{prompt_format}", {self.expression(node.prompt)}), kale_input(NULL))'
+
+        raise TypeError(f"No C translation for {type(node).__name__}")
+
+    def to_int(self, text):
+        """
+        C converting the double expression text to int.
+        """
+
+        if not self.int_defined:
+            self.int_defined = True
+            self.emitter.include('limits.h')
+            self.emitter.add_header(int_function)
+        return f"kale_int({text})"
+
+    def require_input(self):
+        if not self.input_defined:
+            self.input_defined = True
+            self.emitter.add_header(input_function)
+
+    def require_operator(self, operator, kind):
+        if operator in double_operators:
+            if kind != 'int':
+                self.emitter.include('math.h')
+            elif operator is SyntaxKind.DoubleStarToken and not self.power_defined:
+                self.power_defined = True
+                self.emitter.add_header(power_function)
+
+    def type(self, node):
+        return expression_type(node, self.types)
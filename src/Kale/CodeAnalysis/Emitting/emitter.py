@@ -1,52 +1,113 @@
 import os
-import subprocess
-import platform
 
 
 class Emitter:
-    def __init__(self, path):
+    """
+    Writes a C file as it is generated.
+
+    Code goes straight to a buffered writer on a body file next to the
+    output, so the C text is never held in memory. Includes and other
+    headers are collected apart and prepended by output(), which writes
+    them followed by a copy of the body to the .c file.
+    """
+
+    def __init__(self, path, stats=None, buffer_size=1 << 16):
         self.path = f"{path}.c"
-        self.header = ""
-        self.code = ""
+        self.body_path = f"{path}.c.body"
+        self.stats = stats
+        self.buffer_size = buffer_size
+        self.includes = []
+        self.header = []
+        self.body = None
+        self.written = 0
 
-    def __int__(self):
-        self.code = ""
+    def writer(self):
+        if self.body is None:
+            self.body = open(self.body_path, 'w', buffering=self.buffer_size)
+        return self.body
 
     def emit(self, code):
-        self.code += code
+        self.written += self.writer().write(code)
 
     def emit_line(self, code):
-        self.code += code + '\n'
+        self.written += self.writer().write(code + '\n')
 
     def add_header(self, code):
-        self.header += code + '\n'
+        self.header.append(code)
+        self.header.append('\n')
+
+    def include(self, name):
+        """
+        Adds `#include <name>` to the headers, once.
+        """
+
+        line = f"#include <{name}>\n"
+        if line not in self.includes:
+            self.includes.append(line)
 
     def output(self):
-        with open(self.path, 'w') as output_file:
-            output_file.write(self.header + self.code)
+        if self.stats is not None:
+            with self.stats.phase('emit'):
+                size = self.write_output()
+            self.stats.c_bytes += size
+        else:
+            self.write_output()
+
+    def write_output(self):
+        """
+        Writes the headers and the body to the .c file, returns its size.
+        """
+
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+
+        with open(self.path, 'w', buffering=self.buffer_size) as output_file:
+            output_file.write(''.join(self.includes))
+            output_file.write(''.join(self.header))
+            if os.path.exists(self.body_path):
+                # Copied by hand, shutil imports compression modules
+                # that cost more than the copy of a small file
+                with open(self.body_path) as body_file:
+                    while chunk := body_file.read(self.buffer_size):
+                        output_file.write(chunk)
+        self.discard()
+        return os.path.getsize(self.path)
+
+    def discard(self):
+        """
+        Drops the body written so far.
+        """
+
+        if self.body is not None:
+            self.body.close()
+            self.body = None
+        try:
+            os.unlink(self.body_path)
+        except FileNotFoundError:
+            pass
+
+    # Building is imported on use, emitting C doesn't need a C compiler
 
     @staticmethod
-    def build(file="out"):
-        # while True:
-        #     if os.path.isfile(f"{file}.c"):
-        if platform.system() == 'Windows':
-            try:
-                subprocess.call(["gcc", f"-o{file}.exe", f"{file}.c"])
-            except:
-                subprocess.call(["cl", f"-o{file}.exe", f"{file}.c"])
-        else:
-            subprocess.call(["gcc", f"{file}.c -o {file}.o"])
+    def build(file="out", options=None, cache=None):
+        """
+        Builds file.c into an executable, returns its BuildResult.
+        """
+        from CodeAnalysis.Building.nativebuilder import NativeBuilder
+        return NativeBuilder(options, cache, jobs=1).build(f"{file}.c")
 
     @staticmethod
     def run(file="out"):
-        if platform.system() == 'Windows':
-            subprocess.call([f"{file}.exe"])
-        else:
-            subprocess.call([f"{file}.o"])
-    
+        import subprocess
+        from CodeAnalysis.Building.nativebuilder import executable_suffix
+        subprocess.call([os.path.abspath(file + executable_suffix)])
+
     @staticmethod
     def clean(file="out"):
-        if platform.system() == 'Windows':
-            subprocess.call(["del", f"{file}.exe"])
-        else:
-            subprocess.call(["rm", f"{file}.o"])
+        from CodeAnalysis.Building.nativebuilder import executable_suffix
+        for path in (file + executable_suffix, f"{file}.o"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,244 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Emitting.codegenerator import (
+    binary_code, double_operators, input_function, int_function, power_function,
+)
+from CodeAnalysis.Intermediate.coalescing import coalesce
+from CodeAnalysis.Intermediate.ir import Branch, Jump, operator_text
+
+
+class IRCodeGenerator:
+    """
+    Translates an optimized Function to C.
+
+    Every value becomes a local of main() named after its number, blocks
+    become labels in reverse postorder and phis become copies on the edges
+    into their block. Constants are written where they are used, and so
+    are the pure values used once later in their own block, which gives
+    C expressions as large as the source's instead of a store per value.
+    A phi shares its local with the operands it can be coalesced with,
+    their copies go away.
+    """
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.temporaries = 0
+        self.input_defined = False
+        self.power_defined = False
+        self.int_defined = False
+        self.inlined = set()
+        self.owners = {}
+
+    def generate(self, function):
+        emit_line = self.emitter.emit_line
+        self.emitter.include('stdio.h')
+        order = function.reverse_postorder()
+        self.inlined = self.single_uses(order)
+        self.owners = coalesce(order, self.locals)
+
+        targets = set()
+        for index, block in enumerate(order):
+            following = order[index + 1] if index + 1 < len(order) else None
+            for target in block.successors:
+                if target is not following or isinstance(block.terminator, Branch):
+                    targets.add(id(target))
+
+        emit_line("int main(void)")
+        emit_line("{")
+        for block in order:
+            for value in block.phis + block.instructions:
+                if value.opcode == 'input':
+                    self.require_input()
+                elif value.opcode == 'binary':
+                    if value.operands[0].type == 'const char *':
+                        self.emitter.include('string.h')
+                    self.require_operator(value.attribute, value.type)
+                elif value.opcode == 'convert' and self.truncates(value):
+                    self.require_int()
+                # Locals and casts both name the type
+                if value.type == 'bool':
+                    self.emitter.include('stdbool.h')
+                if value.type is not None and self.locals(value) == (value,) \
+                        and self.owner(value) is value:
+                    emit_line(f"    {value.type} {self.name(value)};")
+
+        for index, block in enumerate(order):
+            following = order[index + 1] if index + 1 < len(order) else None
+            if id(block) in targets:
+                emit_line(f"b{block.number}:;")
+            for instruction in block.instructions:
+                if id(instruction) not in self.inlined and instruction.opcode != 'const':
+                    self.instruction(instruction)
+            self.terminator(block, following)
+        emit_line("}")
+
+    @staticmethod
+    def single_uses(order):
+        """
+        Returns the ids of the pure values used once, by an instruction or
+        the branch of the block defining them or by a phi on an edge
+        leaving it.
+        """
+
+        uses, users = {}, {}
+        for block in order:
+            for phi in block.phis:
+                for operand, predecessor in zip(phi.operands, block.predecessors):
+                    uses[id(operand)] = uses.get(id(operand), 0) + 1
+                    users[id(operand)] = predecessor
+            operands = [operand for instruction in block.instructions for operand in instruction.operands]
+            if isinstance(block.terminator, Branch):
+                operands.append(block.terminator.condition)
+            for operand in operands:
+                uses[id(operand)] = uses.get(id(operand), 0) + 1
+                users[id(operand)] = block
+
+        return {id(value) for block in order for value in block.instructions
+                if value.pure and value.opcode != 'const' and not value.traps()
+                and uses.get(id(value)) == 1 and users[id(value)] is block}
+
+    # Instructions
+    # ----------------------------------------------------------------
+
+    def operand(self, value):
+        if value.opcode == 'const':
+            return value.attribute
+        if id(value) in self.inlined:
+            return f"({self.value(value)})"
+        return self.name(value)
+
+    def owner(self, value):
+        return self.owners.get(id(value), value)
+
+    def name(self, value):
+        return f"v{self.owner(value).number}"
+
+    def locals(self, value):
+        """
+        The values the C of a use of value reads from locals.
+        """
+
+        if value.opcode == 'const':
+            return ()
+        if id(value) in self.inlined:
+            return tuple(read for operand in value.operands for read in self.locals(operand))
+        return (value,)
+
+    def value(self, instruction):
+        """
+        The C expression computing a pure instruction.
+        """
+
+        operands = [self.operand(operand) for operand in instruction.operands]
+        if instruction.opcode == 'binary':
+            return binary_code(instruction.attribute, instruction.type, *operands,
+                               instruction.operands[0].type == 'const char *')
+        if instruction.opcode == 'unary':
+            return f"{operator_text[instruction.attribute]}{operands[0]}" if operands[0].startswith('(') \
+                else f"{operator_text[instruction.attribute]}({operands[0]})"
+        if self.truncates(instruction):
+            return f"kale_int({operands[0]})" if instruction.type == 'int' else f"(char)kale_int({operands[0]})"
+        return f"({instruction.type}){operands[0]}"
+
+    @staticmethod
+    def truncates(instruction):
+        """
+        Whether a convert takes a double or float to an int or char.
+        """
+
+        return instruction.type in ('int', 'char') and instruction.operands[0].type in ('double', 'float')
+
+    def instruction(self, instruction):
+        emit_line = self.emitter.emit_line
+        opcode = instruction.opcode
+        operands = [self.operand(operand) for operand in instruction.operands]
+        target = self.name(instruction)
+
+        if instruction.pure:
+            emit_line(f"    {target} = {self.value(instruction)};")
+        elif opcode == 'input':
+            if not operands:
+                emit_line(f"    {target} = kale_input(NULL);")
+            elif instruction.attribute is None:
+                emit_line(f"    {target} = kale_input({operands[0]});")
+            else:
+                emit_line(f'    printf("{instruction.attribute}", {operands[0]});')
+                emit_line(f"    {target} = kale_input(NULL);")
+        elif opcode == 'print':
+            emit_line(f'    printf("{instruction.attribute}\\n", {operands[0]});')
+
+    def terminator(self, block, following):
+        emit_line = self.emitter.emit_line
+        terminator = block.terminator
+
+        if isinstance(terminator, Jump):
+            self.copies(block, terminator.target, '    ')
+            if terminator.target is not following:
+                emit_line(f"    goto b{terminator.target.number};")
+
+        elif isinstance(terminator, Branch):
+            emit_line(f"    if ({self.operand(terminator.condition)})")
+            emit_line("    {")
+            self.copies(block, terminator.true_target, '        ')
+            emit_line(f"        goto b{terminator.true_target.number};")
+            emit_line("    }")
+            self.copies(block, terminator.false_target, '    ')
+            emit_line(f"    goto b{terminator.false_target.number};")
+
+        else:
+            emit_line("    return 0;")
+
+    def copies(self, source, target, indent):
+        """
+        Emits the phi copies of the edge from source to target, each one
+        before the copies still reading the phi it assigns. Copies left
+        reading each other go through temporaries.
+        """
+
+        if not target.phis:
+            return
+        emit_line = self.emitter.emit_line
+        index = target.predecessors.index(source)
+        pending = [(phi, phi.operands[index]) for phi in target.phis
+                   if self.owner(phi.operands[index]) is not self.owner(phi)]
+        reads = {id(phi): {self.name(value) for value in self.locals(value)} for phi, value in pending}
+
+        while pending:
+            for pair in pending:
+                phi = pair[0]
+                if not any(self.name(phi) in reads[id(other)] for other, _ in pending if other is not phi):
+                    emit_line(f"{indent}{self.name(phi)} = {self.operand(pair[1])};")
+                    pending.remove(pair)
+                    break
+            else:
+                break
+        if not pending:
+            return
+
+        emit_line(f"{indent}{{")
+        names = []
+        for phi, value in pending:
+            self.temporaries += 1
+            names.append(f"t{self.temporaries}")
+            emit_line(f"{indent}    {phi.type} {names[-1]} = {self.operand(value)};")
+        for (phi, _), name in zip(pending, names):
+            emit_line(f"{indent}    {self.name(phi)} = {name};")
+        emit_line(f"{indent}}}")
+
+    def require_input(self):
+        if not self.input_defined:
+            self.input_defined = True
+            self.emitter.add_header(input_function)
+
+    def require_int(self):
+        if not self.int_defined:
+            self.int_defined = True
+            self.emitter.include('limits.h')
+            self.emitter.add_header(int_function)
+
+    def require_operator(self, operator, kind):
+        if operator in double_operators:
+            if kind != 'int':
+                self.emitter.include('math.h')
+            elif operator is SyntaxKind.DoubleStarToken and not self.power_defined:
+                self.power_defined = True
+                self.emitter.add_header(power_function)
@@ -0,0 +1,35 @@
+class PythonEmitter:
+    """
+    Collects Python source as it is generated, the counterpart of the
+    Emitter for the Python backend.
+
+    The source is compiled in process rather than written out, so it is
+    kept in memory. Headers are prepended to the body like the Emitter's,
+    the PythonGenerator puts the function's local variables there.
+    """
+
+    def __init__(self, path, stats=None):
+        self.path = path
+        self.stats = stats
+        self.header = []
+        self.body = []
+
+    def emit_line(self, code):
+        self.body.append(code)
+
+    def add_header(self, code):
+        self.header.append(code)
+
+    def source(self):
+        return '\n'.join(self.header + self.body) + '\n'
+
+    def compile(self):
+        """
+        The source as a code object, named <path> since its line numbers
+        are the generated source's rather than the Kale file's.
+        """
+
+        if self.stats is not None:
+            with self.stats.phase('emit'):
+                return compile(self.source(), f"<{self.path}>", 'exec')
+        return compile(self.source(), f"<{self.path}>", 'exec')
@@ -0,0 +1,534 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, GotoStatement, IfStatement,
+    InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement, SyntaxNode,
+    UnaryExpression, WhileStatement,
+)
+from CodeAnalysis.Emitting.codegenerator import (
+    comparison_kinds, double_operators, expression_type, integer_operators, operator_text, print_formats,
+    variable_type,
+)
+from CodeAnalysis.Exceptions.unsupported import UnsupportedException
+from CodeAnalysis.Intermediate.lowering import arithmetic_type, modifying_operators
+from CodeAnalysis.Running.virtualmachine import single
+
+
+# What a variable holds before any store, as a Python literal
+zero_values = {
+    'int': '0',
+    'char': '0',
+    'float': '0.0',
+    'double': '0.0',
+    'bool': '0',
+    'const char *': 'None',
+}
+
+integer_types = frozenset(['int', 'char', 'bool'])
+
+
+def wrapped(text):
+    """
+    An int expression reduced to 32 bit two's complement.
+    """
+
+    return f"((({text}) + 2147483648 & 4294967295) - 2147483648)"
+
+
+def uses_goto(node):
+    """
+    Whether a statement or statement list has a label or goto in it.
+    """
+
+    if isinstance(node, list):
+        return any(uses_goto(statement) for statement in node)
+    if isinstance(node, (LabelStatement, GotoStatement)):
+        return True
+    if isinstance(node, (IfStatement, WhileStatement, ForStatement)):
+        return uses_goto(node.body) or (isinstance(node, IfStatement) and uses_goto(node.else_body or []))
+    return False
+
+
+def assigned_names(node, names=None):
+    """
+    The name ids of the variables statements or an expression store to.
+    """
+
+    names = set() if names is None else names
+    if isinstance(node, list):
+        for child in node:
+            assigned_names(child, names)
+        return names
+    if isinstance(node, (DeclarationStatement, AssignmentStatement)):
+        names.add(node.name_id)
+    elif isinstance(node, UnaryExpression) and node.operator in modifying_operators \
+            and isinstance(node.operand, NameExpression):
+        names.add(node.operand.name_id)
+    for name in node.__slots__:
+        child = getattr(node, name)
+        if isinstance(child, (list, SyntaxNode)):
+            assigned_names(child, names)
+    return names
+
+
+class PythonGenerator:
+    """
+    Translates a CompilationUnit to the Python source of a main() function
+    with the semantics of the C the CodeGenerator emits: ints wrap at 32
+    bits, int division truncates, floats round to single precision and
+    stores convert to the variable's type.
+
+    Variables are locals of main(), so reading one is a fast local load.
+    An int expression is only wrapped where its value is observed, at a
+    store, a comparison, a division or a print, since wrapping the
+    operands of +, - and * doesn't change the wrapped result.
+
+    Kale's if, while and for become Python's. Statements with a goto or a
+    label in them can't, those are split into blocks run by a state
+    machine loop: each block is an `if state == n:` and falls through to
+    the next by setting state, a jump back also restarts the loop. The
+    statements without gotos inside a block are still translated as is.
+    """
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.types = {}
+        self.names = {}
+        self.labels = {}
+        self.placed = set()
+        self.blocks = 0
+
+    def generate(self, unit):
+        emit_line = self.emitter.emit_line
+        emit_line("    write = kale_write")
+        if uses_goto(unit.statements):
+            emit_line("    state = 0")
+            emit_line("    while True:")
+            self.start_block(self.new_block())
+            self.flattened(unit.statements)
+            emit_line(f"{'    ' * 3}return")
+        else:
+            self.statements(unit.statements, 1)
+
+        self.emitter.add_header("def main():")
+        for name_id, name in self.names.items():
+            self.emitter.add_header(f"    k_{name} = {zero_values[self.types.get(name_id, 'double')]}")
+        self.emitter.emit_line("main()")
+
+    # Statements
+    # ----------------------------------------------------------------
+
+    def statements(self, statements, depth):
+        """
+        Emits a block's statements, or `pass` when none emit anything.
+        """
+
+        emitted = len(self.emitter.body)
+        for statement in statements:
+            self.statement(statement, depth)
+        if len(self.emitter.body) == emitted:
+            self.emitter.emit_line(f"{'    ' * depth}pass")
+
+    def statement(self, node, depth):
+        emit_line = self.emitter.emit_line
+        indent = '    ' * depth
+
+        if isinstance(node, PrintStatement):
+            emit_line(f"{indent}write({self.formatted(node.expression, True)})")
+
+        elif isinstance(node, DeclarationStatement):
+            self.declare(node)
+            if node.initializer is not None:
+                emit_line(f"{indent}{self.store(node.name, node.name_id, node.initializer)}")
+
+        elif isinstance(node, AssignmentStatement):
+            self.names.setdefault(node.name_id, node.name)
+            emit_line(f"{indent}{self.store(node.name, node.name_id, node.expression)}")
+
+        elif isinstance(node, IfStatement):
+            emit_line(f"{indent}if {self.condition(node.condition)}:")
+            self.statements(node.body, depth + 1)
+            while node.else_body is not None:
+                else_body = node.else_body
+                if len(else_body) == 1 and isinstance(else_body[0], IfStatement):
+                    node = else_body[0]
+                    emit_line(f"{indent}elif {self.condition(node.condition)}:")
+                    self.statements(node.body, depth + 1)
+                else:
+                    emit_line(f"{indent}else:")
+                    self.statements(else_body, depth + 1)
+                    break
+
+        elif isinstance(node, WhileStatement):
+            emit_line(f"{indent}while {self.condition(node.condition)}:")
+            self.statements(node.body, depth + 1)
+
+        elif isinstance(node, ForStatement):
+            self.statement(node.initializer, depth)
+            bound = self.range_bound(node)
+            if bound is not None:
+                # The counter ends at the bound, or where it started if
+                # that is past it
+                counter = f"k_{node.condition.left.name}"
+                emit_line(f"{indent}for {counter} in range({counter}, {bound}):")
+                self.statements(node.body, depth + 1)
+                emit_line(f"{indent}{counter} = max({counter}, {bound})")
+            else:
+                # Kale has no continue, the increment can simply end the body
+                emit_line(f"{indent}while {self.condition(node.condition)}:")
+                self.statements(node.body + [node.increment], depth + 1)
+
+        elif isinstance(node, SyntaxNode) and not isinstance(node, (LabelStatement, GotoStatement)):
+            # The increment of a for
+            emit_line(f"{indent}{self.effect(node)}")
+
+    def range_bound(self, node):
+        """
+        The exclusive end of a for counting an int up by one to a bound the
+        body doesn't change, for Python's range(), or None.
+        """
+
+        condition, increment = node.condition, node.increment
+        if not (isinstance(condition, BinaryExpression) and isinstance(condition.left, NameExpression)
+                and condition.operator in (SyntaxKind.LessToken, SyntaxKind.LessOrEqualsToken)
+                and isinstance(increment, UnaryExpression) and increment.operator is SyntaxKind.PlusPlusToken
+                and isinstance(increment.operand, NameExpression)
+                and increment.operand.name_id == condition.left.name_id
+                and self.types.get(condition.left.name_id) == 'int'):
+            return None
+
+        bound = condition.right
+        assigned = assigned_names(node.body)
+        if condition.left.name_id in assigned or uses_goto(node.body):
+            return None
+        if isinstance(bound, LiteralExpression) and bound.kind is SyntaxKind.NumberToken and '.' not in bound.value:
+            text, _, exact = self.expression(bound)
+            if not exact or int(text) >= 2 ** 31 - 1:
+                return None
+            return str(int(text) + 1) if condition.operator is SyntaxKind.LessOrEqualsToken else text
+        if isinstance(bound, NameExpression) and bound.name_id not in assigned \
+                and self.types.get(bound.name_id) in integer_types:
+            # Counting to INT_MAX would never end in C
+            if condition.operator is SyntaxKind.LessOrEqualsToken:
+                return None
+            return self.expression(bound)[0]
+        return None
+
+    def declare(self, node):
+        self.names.setdefault(node.name_id, node.name)
+        if node.name_id not in self.types:
+            self.types[node.name_id] = variable_type(node, self.types)
+
+    def store(self, name, name_id, node):
+        """
+        Assignment of an expression to a variable, as a Python statement.
+        """
+
+        kind = self.types.get(name_id, 'double')
+        return f"k_{name} = {self.convert(*self.value(node, kind), kind)}"
+
+    def effect(self, node):
+        """
+        An expression evaluated for its side effects, as a statement.
+        """
+
+        if isinstance(node, UnaryExpression) and node.operator in modifying_operators \
+                and isinstance(node.operand, NameExpression):
+            name = node.operand.name
+            return f"k_{name} = {self.modified(node)}"
+        return self.expression(node)[0]
+
+    # Gotos
+    # ----------------------------------------------------------------
+
+    def new_block(self):
+        self.blocks += 1
+        return self.blocks - 1
+
+    def label(self, name_id):
+        state = self.labels.get(name_id)
+        if state is None:
+            state = self.labels[name_id] = self.new_block()
+        return state
+
+    def start_block(self, state):
+        self.placed.add(state)
+        self.emitter.emit_line(f"        if state == {state}:")
+
+    def goto(self, state, depth):
+        """
+        Continues at block state: blocks after this one are reached by
+        falling through their tests, earlier ones by restarting the loop.
+        """
+
+        indent = '    ' * depth
+        self.emitter.emit_line(f"{indent}state = {state}")
+        if state in self.placed:
+            self.emitter.emit_line(f"{indent}continue")
+
+    def flattened(self, statements):
+        """
+        Emits statements in blocks of the state machine, from within the
+        current one.
+        """
+
+        for node in statements:
+            if not uses_goto(node):
+                self.statement(node, 3)
+
+            elif isinstance(node, LabelStatement):
+                state = self.label(node.name_id)
+                self.goto(state, 3)
+                self.start_block(state)
+
+            elif isinstance(node, GotoStatement):
+                self.goto(self.label(node.name_id), 3)
+                # Whatever follows is only reachable through a label
+                self.start_block(self.new_block())
+
+            elif isinstance(node, IfStatement):
+                body = node.body
+                if len(body) == 1 and isinstance(body[0], GotoStatement) and node.else_body is None:
+                    state = self.label(body[0].name_id)
+                    self.emitter.emit_line(f"            if {self.condition(node.condition)}:")
+                    self.goto(state, 4)
+                    if state not in self.placed:
+                        # The rest of the block is skipped by moving it
+                        # to a block of its own
+                        following = self.new_block()
+                        self.emitter.emit_line("            else:")
+                        self.goto(following, 4)
+                        self.start_block(following)
+                    continue
+                self.branch(node.condition, body, node.else_body or [], None)
+
+            else:
+                if isinstance(node, ForStatement):
+                    self.statement(node.initializer, 3)
+                body = node.body if isinstance(node, WhileStatement) else node.body + [node.increment]
+                header = self.new_block()
+                self.goto(header, 3)
+                self.start_block(header)
+                self.branch(node.condition, body, [], header)
+
+    def branch(self, condition, body, else_body, loop):
+        """
+        Emits `if condition: body else: else_body` as blocks, body jumping
+        back to the block loop after it if there is one.
+        """
+
+        emit_line = self.emitter.emit_line
+        body_state, else_state = self.new_block(), self.new_block()
+        emit_line(f"            if {self.condition(condition)}:")
+        self.goto(body_state, 4)
+        emit_line("            else:")
+        self.goto(else_state, 4)
+
+        join = else_state if loop is not None else self.new_block()
+        self.start_block(body_state)
+        self.flattened(body)
+        self.goto(loop if loop is not None else join, 3)
+        self.start_block(else_state)
+        if loop is None:
+            self.flattened(else_body)
+            self.goto(join, 3)
+            self.start_block(join)
+
+    # Expressions
+    # ----------------------------------------------------------------
+
+    def value(self, node, kind):
+        """
+        (text, type, exact) of an expression stored to a variable of C
+        type kind.
+        """
+
+        if kind == 'char' and isinstance(node, LiteralExpression) and node.kind is SyntaxKind.StringToken \
+                and len(node.value) == 1:
+            return str(ord(node.value)), 'char', True
+        return self.expression(node)
+
+    def exact(self, text, kind, exact):
+        """
+        Text of an expression whose int value must be in range.
+        """
+
+        return text if exact or kind not in integer_types else wrapped(text)
+
+    def condition(self, node):
+        text, kind, exact = self.expression(node)
+        if kind == 'const char *':
+            return f"{text} is not None"
+        return self.exact(text, kind, exact)
+
+    def convert(self, text, source, exact, target):
+        """
+        Text of an expression converted from C type source to C type target
+        as a C store converts it.
+        """
+
+        if (source == 'const char *') != (target == 'const char *'):
+            raise UnsupportedException(f"Converting {source} to {target} can't run in Python")
+        if target == 'const char *' or source == target and target != 'int':
+            return text
+
+        if source in ('float', 'double') and target in integer_types:
+            text, exact = f"to_int({text})", True
+        if target == 'int':
+            return self.exact(text, source, exact)
+        if target == 'char':
+            return f"((({text}) + 128 & 255) - 128)"
+        if target == 'bool':
+            return f"bool({self.exact(text, source, exact)})"
+        if target == 'float':
+            return f"single({self.exact(text, source, exact)})"
+        return text if source == 'float' else f"float({self.exact(text, source, exact)})"
+
+    def formatted(self, node, line):
+        """
+        Text of the value of an expression formatted as printf would.
+        """
+
+        text, kind, exact = self.expression(node)
+        text_format = print_formats[expression_type(node, self.types)] + ('\n' if line else '')
+        if text_format.startswith('%c'):
+            return f"{text_format!r} % ({text} & 255)"
+        if text_format.startswith('%d'):
+            return f"{text_format!r} % ({self.exact(text, kind, exact)})"
+        # NaNs and null strings
+        return f"kale_format({text_format!r}, {text})"
+
+    def expression(self, node):
+        """
+        (text, C type, exact) of an expression, exact being False for ints
+        that may be out of range.
+        """
+
+        if isinstance(node, LiteralExpression):
+            if node.kind is SyntaxKind.StringToken:
+                return repr(node.value), 'const char *', True
+            if node.kind is SyntaxKind.NumberToken:
+                if '.' in node.value:
+                    return repr(float(node.value)), 'double', True
+                value = int(node.value, 8) if len(node.value) > 1 and node.value.startswith('0') else int(node.value)
+                return str(value), 'int', value < 2 ** 31
+            return ('1' if node.value else '0'), 'bool', True
+
+        if isinstance(node, NameExpression):
+            self.names.setdefault(node.name_id, node.name)
+            return f"k_{node.name}", self.types.get(node.name_id, 'double'), True
+
+        if isinstance(node, BinaryExpression):
+            return self.binary(node.operator, self.expression(node.left), self.expression(node.right))
+
+        if isinstance(node, UnaryExpression):
+            return self.unary(node)
+
+        if isinstance(node, InputExpression):
+            if node.prompt is None:
+                return "kale_input(None)", 'double', True
+            if expression_type(node.prompt, self.types) == 'const char *':
+                return f"kale_input({self.expression(node.prompt)[0]})", 'double', True
+            return f"kale_input({self.formatted(node.prompt, False)})", 'double', True
+
+        raise TypeError(f"No Python translation for {type(node).__name__}")
+
+    def binary(self, operator, left, right):
+        (left, left_type, left_exact), (right, right_type, right_exact) = left, right
+        operator_code = operator_text[operator]
+        if operator in integer_operators:
+            left = self.convert(left, left_type, left_exact, 'int')
+            right = self.convert(right, right_type, right_exact, 'int')
+            if operator is SyntaxKind.LeftShiftToken:
+                return f"({left} << ({right} & 31))", 'int', False
+            if operator is SyntaxKind.RightShiftToken:
+                return f"({left} >> ({right} & 31))", 'int', True
+            return f"({left} {operator_code} {right})", 'int', True
+
+        kind = arithmetic_type(left_type, right_type)
+        if kind == 'float' and operator in double_operators:
+            # pow() and fmod() take doubles
+            kind = 'double'
+        if kind == 'float':
+            # C rounds an int operand to float first
+            if left_type != 'float':
+                left, left_type = self.single(left, left_type, left_exact), 'float'
+            if right_type != 'float':
+                right, right_type = self.single(right, right_type, right_exact), 'float'
+
+        if operator in comparison_kinds:
+            left, right = self.exact(left, left_type, left_exact), self.exact(right, right_type, right_exact)
+            return f"({left} {operator_code} {right})", 'int', True
+
+        if kind == 'const char *':
+            raise UnsupportedException("Arithmetic on strings can't run in Python")
+
+        if operator is SyntaxKind.SlashToken:
+            left, right = self.exact(left, left_type, left_exact), self.exact(right, right_type, right_exact)
+            if kind == 'int':
+                # ZeroDivisionError is the runtime's division by zero, INT_MIN / -1 is 2 ** 31
+                return f"int({left} / {right})", 'int', False
+            try:
+                # Only a nonzero literal can't divide by zero
+                literal = float(right) != 0
+            except ValueError:
+                literal = False
+            text = f"({left} / {right})" if literal else f"divide({left}, {right})"
+        elif operator in double_operators:
+            left, right = self.exact(left, left_type, left_exact), self.exact(right, right_type, right_exact)
+            if operator is SyntaxKind.PercentToken:
+                return (f"remainder({left}, {right})", 'int', True) if kind == 'int' \
+                    else (f"fmod({left}, {right})", kind, True)
+            return (f"int_power({left}, {right})", 'int', True) if kind == 'int' \
+                else (f"power({left}, {right})", kind, True)
+        else:
+            if kind != 'int':
+                left, right = self.exact(left, left_type, left_exact), self.exact(right, right_type, right_exact)
+            text = f"({left} {operator_code} {right})"
+
+        if kind == 'float':
+            return f"single{text}" if text.startswith('(') else f"single({text})", 'float', True
+        return text, kind, kind != 'int'
+
+    def single(self, text, kind, exact):
+        """
+        Text of an int expression rounded to float, a literal rounded now.
+        """
+
+        if text.lstrip('-').isdigit():
+            return repr(single(int(text)))
+        return f"single({self.exact(text, kind, exact)})"
+
+    def unary(self, node):
+        operator = node.operator
+        if operator in modifying_operators and isinstance(node.operand, NameExpression):
+            name = f"k_{node.operand.name}"
+            self.names.setdefault(node.operand.name_id, node.operand.name)
+            if node.postfix:
+                return f"({name}, {name} := {self.modified(node)})[0]", self.types.get(node.operand.name_id,
+                                                                                     'double'), True
+            return f"({name} := {self.modified(node)})", self.types.get(node.operand.name_id, 'double'), True
+
+        text, kind, exact = self.expression(node.operand)
+        if operator is SyntaxKind.BangToken:
+            if kind == 'const char *':
+                return f"({text} is None)", 'int', True
+            return f"(not {self.exact(text, kind, exact)})", 'int', True
+        if kind == 'const char *':
+            raise UnsupportedException("Arithmetic on strings can't run in Python")
+        if operator is SyntaxKind.TildeToken:
+            return f"(~{self.convert(text, kind, exact, 'int')})", 'int', True
+        result_type = kind if kind in ('double', 'float') else 'int'
+        if operator is SyntaxKind.MinusToken:
+            return f"(-{text})", result_type, result_type != 'int'
+        return text, result_type, exact
+
+    def modified(self, node):
+        """
+        Text of the new value of the variable ++ or -- modifies.
+        """
+
+        name_id = node.operand.name_id
+        kind = self.types.get(name_id, 'double')
+        text, result_type, exact = self.binary(modifying_operators[node.operator],
+                                               (f"k_{node.operand.name}", kind, True), ('1', 'int', True))
+        return self.convert(text, result_type, exact, kind)
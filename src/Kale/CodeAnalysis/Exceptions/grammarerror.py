@@ -0,0 +1,8 @@
+from CodeAnalysis.Exceptions.error import Error
+
+
+class GrammarException(Error):
+    def __init__(self, message, line=None):
+        self.message = message
+        self.line = line
+        super().__init__(self.message if line is None else f"line {line}: {self.message}")
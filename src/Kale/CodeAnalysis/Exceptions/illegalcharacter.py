@@ -1,6 +1,7 @@
 from CodeAnalysis.Exceptions.error import Error
 
 class IllegalCharacterException(Error):
-    def __init__(self, char):
+    def __init__(self, char, position=None):
         self.char = char
+        self.position = position
         super().__init__(self.char)
@@ -2,6 +2,7 @@ from CodeAnalysis.Exceptions.error import Error
 
 
 class InvalidTokenException(Error):
-    def __init__(self, token):
+    def __init__(self, token, position=None):
         self.token = token
+        self.position = position
         super().__init__(self.token)
\ No newline at end of file
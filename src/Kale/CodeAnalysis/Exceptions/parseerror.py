@@ -0,0 +1,8 @@
+from CodeAnalysis.Exceptions.error import Error
+
+
+class ParseException(Error):
+    def __init__(self, message, token=None):
+        self.message = message
+        self.token = token
+        super().__init__(self.message)
@@ -0,0 +1,7 @@
+from CodeAnalysis.Exceptions.error import Error
+
+
+class RuntimeException(Error):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
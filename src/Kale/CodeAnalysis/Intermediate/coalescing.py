@@ -0,0 +1,115 @@
+from CodeAnalysis.Intermediate.ir import Branch
+
+
+def locals_read(value):
+    """
+    The values a use of value reads from locals: itself, unless it is a
+    constant, which has none.
+    """
+
+    return () if value.opcode == 'const' else (value,)
+
+
+def interference(order, expand=locals_read):
+    """
+    Returns, by id, the ids of the values whose live ranges overlap each
+    value's, over the blocks of order.
+
+    `expand(value)` gives the values a use of value actually reads, so a
+    backend computing some values where they are used can extend the live
+    ranges of their operands to there. Phi operands are read at the end of
+    the edge's predecessor and phis are all defined at the start of their
+    block.
+    """
+
+    def reads(values):
+        names = set()
+        for value in values:
+            names.update(id(read) for read in expand(value))
+        return names
+
+    uses, definitions, edge_reads = {}, {}, {}
+    for block in order:
+        used, defined = set(), {id(phi) for phi in block.phis}
+        for instruction in block.instructions:
+            used |= reads(instruction.operands) - defined
+            defined.add(id(instruction))
+        if isinstance(block.terminator, Branch):
+            used |= reads([block.terminator.condition]) - defined
+        uses[id(block)] = used
+        definitions[id(block)] = defined
+        for successor in block.successors:
+            index = successor.predecessors.index(block)
+            edge_reads.setdefault(id(block), set()).update(reads(phi.operands[index] for phi in successor.phis))
+
+    live_in = {id(block): set() for block in order}
+    live_out = {id(block): set() for block in order}
+    changed = True
+    while changed:
+        changed = False
+        for block in reversed(order):
+            out = set(edge_reads.get(id(block), ()))
+            for successor in block.successors:
+                out |= live_in.get(id(successor), set())
+            live = uses[id(block)] | (out - definitions[id(block)])
+            if out != live_out[id(block)] or live != live_in[id(block)]:
+                live_out[id(block)] = out
+                live_in[id(block)] = live
+                changed = True
+
+    graph = {}
+
+    def interfere(value, live):
+        graph.setdefault(value, set()).update(live)
+        for other in live:
+            graph.setdefault(other, set()).add(value)
+
+    for block in order:
+        live = set(live_out[id(block)])
+        if isinstance(block.terminator, Branch):
+            live |= reads([block.terminator.condition])
+        for instruction in reversed(block.instructions):
+            if instruction.type is not None and expand(instruction) == (instruction,):
+                live.discard(id(instruction))
+                interfere(id(instruction), live)
+            if expand(instruction) == (instruction,):
+                live |= reads(instruction.operands)
+        phis = {id(phi) for phi in block.phis}
+        for phi in block.phis:
+            interfere(id(phi), (live | phis) - {id(phi)})
+    return graph
+
+
+def coalesce(order, expand=locals_read):
+    """
+    Returns, by id, the value whose local each phi and phi operand is kept
+    in: a phi shares the local of an operand of its type when no value of
+    either group is live while one of the other is, which makes their copy
+    disappear. Values missing from the result keep their own local.
+    """
+
+    graph = interference(order, expand)
+    owners = {}
+    members = {}
+
+    def find(value):
+        return owners.get(id(value), value)
+
+    for block in order:
+        for phi in block.phis:
+            for operand in phi.operands:
+                if expand(operand) != (operand,) or operand.type != phi.type:
+                    continue
+                first, second = find(phi), find(operand)
+                if first is second:
+                    continue
+                group = members.get(id(first), [first])
+                other = members.get(id(second), [second])
+                if any(id(value) in graph.get(id(member), ()) for member in group for value in other):
+                    continue
+                for value in other:
+                    owners[id(value)] = first
+                members[id(first)] = group + other
+                members.pop(id(second), None)
+                owners[id(first)] = first
+    return owners
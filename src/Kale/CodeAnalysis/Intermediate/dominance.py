@@ -0,0 +1,105 @@
+class Loop:
+    """
+    Natural loop: `header` and the ids of the blocks that reach one of
+    its `latches` without going through the header.
+    """
+
+    __slots__ = ('header', 'latches', 'blocks')
+
+    def __init__(self, header, latches, blocks):
+        self.header = header
+        self.latches = latches
+        self.blocks = blocks
+
+    def __contains__(self, block):
+        return id(block) in self.blocks
+
+    def __repr__(self):
+        return f"Loop(b{self.header.number}, {len(self.blocks)} blocks)"
+
+
+class DominatorTree:
+    """
+    Immediate dominators of the reachable blocks of a Function, computed
+    as in "A Simple, Fast Dominance Algorithm" (Cooper, Harvey, Kennedy).
+    """
+
+    def __init__(self, function):
+        self.order = function.reverse_postorder()
+        self.index = {id(block): index for index, block in enumerate(self.order)}
+        self.idom = {}
+        self.children = {id(block): [] for block in self.order}
+
+        entry = self.order[0]
+        idom = {id(entry): entry}
+        changed = True
+        while changed:
+            changed = False
+            for block in self.order[1:]:
+                new = None
+                for predecessor in block.predecessors:
+                    if id(predecessor) not in idom:
+                        continue
+                    new = predecessor if new is None else self.intersect(predecessor, new, idom)
+                if idom.get(id(block)) is not new:
+                    idom[id(block)] = new
+                    changed = True
+
+        for block in self.order[1:]:
+            self.idom[id(block)] = idom[id(block)]
+            self.children[id(idom[id(block)])].append(block)
+
+    def intersect(self, first, second, idom):
+        index = self.index
+        while first is not second:
+            while index[id(first)] > index[id(second)]:
+                first = idom[id(first)]
+            while index[id(second)] > index[id(first)]:
+                second = idom[id(second)]
+        return first
+
+    def dominates(self, dominator, block):
+        while True:
+            if block is dominator:
+                return True
+            block = self.idom.get(id(block))
+            if block is None:
+                return False
+
+    def preorder(self):
+        """
+        Yields the blocks, each before the blocks it dominates.
+        """
+
+        stack = [self.order[0]]
+        while stack:
+            block = stack.pop()
+            yield block
+            stack.extend(reversed(self.children[id(block)]))
+
+    def loops(self):
+        """
+        Returns the natural loops, inner ones first. Loops sharing a
+        header are one loop, a cycle entered other than through a block
+        dominating it isn't a loop.
+        """
+
+        latches = {}
+        for block in self.order:
+            for successor in block.successors:
+                if self.dominates(successor, block):
+                    latches.setdefault(id(successor), (successor, []))[1].append(block)
+
+        loops = []
+        for header, ends in latches.values():
+            blocks = {id(header)}
+            stack = [end for end in ends if id(end) not in blocks]
+            blocks.update(id(end) for end in ends)
+            while stack:
+                for predecessor in stack.pop().predecessors:
+                    if id(predecessor) not in blocks and id(predecessor) in self.index:
+                        blocks.add(id(predecessor))
+                        stack.append(predecessor)
+            loops.append(Loop(header, ends, blocks))
+        loops.sort(key=lambda loop: len(loop.blocks))
+        return loops
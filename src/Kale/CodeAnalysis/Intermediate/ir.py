@@ -0,0 +1,236 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import operator_map
+
+
+operator_text = {kind: text for text, kind in operator_map.items()}
+
+# Instructions computing a value from their operands only, which may be
+# merged, moved or dropped
+pure_opcodes = frozenset(['const', 'binary', 'unary', 'convert'])
+
+commutative_operators = frozenset([
+    SyntaxKind.PlusToken, SyntaxKind.StartToken, SyntaxKind.EqualsEqualsToken, SyntaxKind.BangEqualsToken,
+    SyntaxKind.AmpersandToken, SyntaxKind.PipeToken, SyntaxKind.HatToken,
+])
+
+dividing_operators = frozenset([SyntaxKind.SlashToken, SyntaxKind.PercentToken])
+
+
+class Instruction:
+    """
+    SSA value, or an effect for print.
+
+    opcode      operands            attribute
+    const       -                   C literal text
+    binary      left, right         operator SyntaxKind
+    unary       operand             operator SyntaxKind
+    convert     value               -
+    input       [prompt]            printf format of a non string prompt
+    print       value               printf format
+    phi         one per predecessor -
+
+    `type` is the C type of the value. Operands of a phi line up with its
+    block's predecessors.
+    """
+
+    __slots__ = ('number', 'opcode', 'type', 'operands', 'attribute', 'block')
+
+    def __init__(self, number, opcode, type, operands=(), attribute=None, block=None):
+        self.number = number
+        self.opcode = opcode
+        self.type = type
+        self.operands = list(operands)
+        self.attribute = attribute
+        self.block = block
+
+    @property
+    def pure(self):
+        return self.opcode in pure_opcodes
+
+    def traps(self):
+        """
+        Whether evaluating it could stop the program: int division or
+        remainder by anything but a nonzero constant.
+        """
+
+        if self.opcode != 'binary' or self.attribute not in dividing_operators or self.type != 'int':
+            return False
+        divisor = self.operands[1]
+        if divisor.opcode != 'const':
+            return True
+        try:
+            return int(divisor.attribute) == 0
+        except ValueError:
+            return True
+
+    def __repr__(self):
+        if self.opcode == 'const':
+            return f"v{self.number} = {self.attribute}"
+        operands = ", ".join(f"v{operand.number}" for operand in self.operands)
+        attribute = operator_text.get(self.attribute, self.attribute) if self.attribute is not None else ""
+        return f"v{self.number} = {self.opcode} {attribute} {operands}".replace("  ", " ")
+
+
+class Jump:
+    __slots__ = ('target',)
+
+    def __init__(self, target):
+        self.target = target
+
+    @property
+    def targets(self):
+        return (self.target,)
+
+    def __repr__(self):
+        return f"jump b{self.target.number}"
+
+
+class Branch:
+    __slots__ = ('condition', 'true_target', 'false_target')
+
+    def __init__(self, condition, true_target, false_target):
+        self.condition = condition
+        self.true_target = true_target
+        self.false_target = false_target
+
+    @property
+    def targets(self):
+        return (self.true_target, self.false_target)
+
+    def __repr__(self):
+        return f"branch v{self.condition.number} b{self.true_target.number} b{self.false_target.number}"
+
+
+class Return:
+    __slots__ = ()
+
+    targets = ()
+
+    def __repr__(self):
+        return "return"
+
+
+class Block:
+    __slots__ = ('number', 'phis', 'instructions', 'terminator', 'predecessors')
+
+    def __init__(self, number):
+        self.number = number
+        self.phis = []
+        self.instructions = []
+        self.terminator = None
+        self.predecessors = []
+
+    @property
+    def successors(self):
+        return self.terminator.targets if self.terminator is not None else ()
+
+    def retarget(self, old, new):
+        """
+        Points the terminator's edges to old at new instead.
+        """
+
+        terminator = self.terminator
+        if isinstance(terminator, Jump):
+            if terminator.target is old:
+                terminator.target = new
+        elif isinstance(terminator, Branch):
+            if terminator.true_target is old:
+                terminator.true_target = new
+            if terminator.false_target is old:
+                terminator.false_target = new
+
+    def __repr__(self):
+        return f"Block(b{self.number})"
+
+
+class Function:
+    """
+    A program in SSA form: blocks[0] is the entry, every instruction has
+    a number unique in the function.
+    """
+
+    def __init__(self):
+        self.blocks = []
+        self.count = 0
+        self.block_count = 0
+
+    def block(self):
+        block = Block(self.block_count)
+        self.block_count += 1
+        self.blocks.append(block)
+        return block
+
+    def instruction(self, opcode, type, operands=(), attribute=None, block=None):
+        self.count += 1
+        return Instruction(self.count, opcode, type, operands, attribute, block)
+
+    def values(self):
+        """
+        Yields every phi and instruction of the function.
+        """
+
+        for block in self.blocks:
+            yield from block.phis
+            yield from block.instructions
+
+    def reverse_postorder(self):
+        """
+        Returns the blocks reachable from the entry, each before its
+        successors except along back edges.
+        """
+
+        order, seen = [], {id(self.blocks[0])}
+        stack = [(self.blocks[0], iter(self.blocks[0].successors))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if id(successor) not in seen:
+                    seen.add(id(successor))
+                    stack.append((successor, iter(successor.successors)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def replace(self, replacements):
+        """
+        Rewrites every use of the instructions keyed by id in replacements
+        to their replacement, following chains.
+        """
+
+        def resolve(value):
+            while id(value) in replacements:
+                value = replacements[id(value)]
+            return value
+
+        for block in self.blocks:
+            for value in block.phis + block.instructions:
+                value.operands = [resolve(operand) for operand in value.operands]
+            if isinstance(block.terminator, Branch):
+                block.terminator.condition = resolve(block.terminator.condition)
+
+    def uses(self):
+        """
+        Returns the number of uses of every value, by id.
+        """
+
+        counts = {}
+        for block in self.blocks:
+            for value in block.phis + block.instructions:
+                for operand in value.operands:
+                    counts[id(operand)] = counts.get(id(operand), 0) + 1
+            if isinstance(block.terminator, Branch):
+                condition = block.terminator.condition
+                counts[id(condition)] = counts.get(id(condition), 0) + 1
+        return counts
+
+    def dump(self):
+        lines = []
+        for block in self.blocks:
+            predecessors = " ".join(f"b{predecessor.number}" for predecessor in block.predecessors)
+            lines.append(f"b{block.number}: <- {predecessors}")
+            lines.extend(f"    {value!r}" for value in block.phis + block.instructions)
+            lines.append(f"    {block.terminator!r}")
+        return "\n".join(lines)
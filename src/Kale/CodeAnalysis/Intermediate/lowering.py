@@ -0,0 +1,360 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, GotoStatement, IfStatement,
+    InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement, UnaryExpression,
+    WhileStatement,
+)
+from CodeAnalysis.Emitting.codegenerator import (
+    c_string, comparison_kinds, double_operators, expression_type, integer_operators, print_formats, variable_type,
+)
+from CodeAnalysis.Intermediate.ir import Branch, Function, Jump, Return
+
+
+modifying_operators = {
+    SyntaxKind.PlusPlusToken: SyntaxKind.PlusToken,
+    SyntaxKind.MinusMinusToken: SyntaxKind.MinusToken,
+}
+
+# What a variable holds before any store, as a C literal of its type
+zero_constants = {
+    'int': '0',
+    'char': "'\\0'",
+    'float': '0.0f',
+    'double': '0.0',
+    'bool': '0',
+    'const char *': '((const char *)0)',
+}
+
+
+def arithmetic_type(left, right):
+    """
+    C type of arithmetic on operands of C types left and right.
+    """
+
+    if 'const char *' in (left, right):
+        return 'const char *'
+    if 'double' in (left, right):
+        return 'double'
+    if 'float' in (left, right):
+        return 'float'
+    return 'int'
+
+
+class Lowering:
+    """
+    Lowers a CompilationUnit to a Function in SSA form.
+
+    Values are built as in "Simple and Efficient Construction of Static
+    Single Assignment Form" (Braun et al.): a variable read looks for its
+    definition up the predecessors, placing phis at joins. Loop headers
+    are sealed once their back edge is added and label blocks at the end,
+    when every goto is known.
+
+    Variables keep the C semantics of the CodeGenerator's file scope
+    statics: every store converts to the variable's type and a variable
+    read before any store is 0.
+    """
+
+    def __init__(self):
+        self.function = Function()
+        self.types = {}
+        self.definitions = {}
+        self.incomplete = {}
+        self.sealed = set()
+        self.labels = {}
+        self.current = None
+
+    def run(self, unit):
+        entry = self.block()
+        self.seal(entry)
+        self.current = entry
+        self.statements(unit.statements)
+        self.terminate(Return())
+
+        for block in list(self.function.blocks):
+            if id(block) not in self.sealed:
+                self.seal(block)
+
+        self.prune()
+        self.remove_trivial_phis()
+        return self.function
+
+    # Blocks
+    # ----------------------------------------------------------------
+
+    def block(self):
+        block = self.function.block()
+        self.definitions[id(block)] = {}
+        return block
+
+    def terminate(self, terminator):
+        block = self.current
+        block.terminator = terminator
+        for target in terminator.targets:
+            target.predecessors.append(block)
+
+    def jump(self, target):
+        self.terminate(Jump(target))
+
+    def branch(self, condition, true_target, false_target):
+        self.terminate(Branch(condition, true_target, false_target))
+
+    def label(self, name_id):
+        block = self.labels.get(name_id)
+        if block is None:
+            block = self.labels[name_id] = self.block()
+        return block
+
+    def seal(self, block):
+        for name_id, phi in self.incomplete.pop(id(block), {}).items():
+            self.add_phi_operands(name_id, phi)
+        self.sealed.add(id(block))
+
+    # Variables
+    # ----------------------------------------------------------------
+
+    def write(self, name_id, block, value):
+        self.definitions[id(block)][name_id] = value
+
+    def read(self, name_id, block):
+        value = self.definitions[id(block)].get(name_id)
+        if value is not None:
+            return value
+
+        if id(block) not in self.sealed:
+            value = self.phi(name_id, block)
+            self.incomplete.setdefault(id(block), {})[name_id] = value
+        elif len(block.predecessors) == 1:
+            value = self.read(name_id, block.predecessors[0])
+        elif not block.predecessors:
+            value = self.zero(self.types.get(name_id, 'double'), block)
+        else:
+            value = self.phi(name_id, block)
+            self.write(name_id, block, value)
+            self.add_phi_operands(name_id, value)
+        self.write(name_id, block, value)
+        return value
+
+    def phi(self, name_id, block):
+        phi = self.function.instruction('phi', self.types.get(name_id, 'double'), block=block)
+        block.phis.append(phi)
+        return phi
+
+    def add_phi_operands(self, name_id, phi):
+        for predecessor in phi.block.predecessors:
+            phi.operands.append(self.read(name_id, predecessor))
+
+    def store(self, name_id, value):
+        kind = self.types[name_id]
+        if value.type != kind:
+            value = self.emit('convert', kind, [value])
+        self.write(name_id, self.current, value)
+        return value
+
+    # Statements
+    # ----------------------------------------------------------------
+
+    def statements(self, statements):
+        for statement in statements:
+            self.statement(statement)
+
+    def statement(self, node):
+        if isinstance(node, PrintStatement):
+            value = self.expression(node.expression)
+            self.emit('print', None, [value], print_formats[expression_type(node.expression, self.types)])
+
+        elif isinstance(node, DeclarationStatement):
+            if node.name_id not in self.types:
+                self.types[node.name_id] = variable_type(node, self.types)
+            if node.initializer is not None:
+                self.store(node.name_id, self.value(node.initializer, self.types[node.name_id]))
+
+        elif isinstance(node, AssignmentStatement):
+            self.store(node.name_id, self.value(node.expression, self.types.get(node.name_id)))
+
+        elif isinstance(node, IfStatement):
+            condition = self.expression(node.condition)
+            body, other, join = self.block(), self.block(), self.block()
+            self.branch(condition, body, other)
+            for block, statements in ((body, node.body), (other, node.else_body or [])):
+                self.seal(block)
+                self.current = block
+                self.statements(statements)
+                self.jump(join)
+            self.seal(join)
+            self.current = join
+
+        elif isinstance(node, WhileStatement):
+            self.loop(node.condition, node.body, None)
+
+        elif isinstance(node, ForStatement):
+            self.statement(node.initializer)
+            self.loop(node.condition, node.body, node.increment)
+
+        elif isinstance(node, LabelStatement):
+            block = self.label(node.name_id)
+            self.jump(block)
+            self.current = block
+
+        elif isinstance(node, GotoStatement):
+            self.jump(self.label(node.name_id))
+            # Whatever follows is only reachable through a label
+            self.current = self.block()
+            self.seal(self.current)
+
+    def loop(self, condition, body, increment):
+        header, entry, exit = self.block(), self.block(), self.block()
+        self.jump(header)
+        self.current = header
+        self.branch(self.expression(condition), entry, exit)
+        self.seal(entry)
+        self.seal(exit)
+
+        self.current = entry
+        self.statements(body)
+        if increment is not None:
+            latch = self.block()
+            self.jump(latch)
+            self.seal(latch)
+            self.current = latch
+            self.expression(increment)
+        self.jump(header)
+        self.seal(header)
+        self.current = exit
+
+    # Expressions
+    # ----------------------------------------------------------------
+
+    def emit(self, opcode, type, operands=(), attribute=None):
+        instruction = self.function.instruction(opcode, type, operands, attribute, self.current)
+        self.current.instructions.append(instruction)
+        return instruction
+
+    def constant(self, type, text, block=None):
+        block = block if block is not None else self.current
+        instruction = self.function.instruction('const', type, (), text, block)
+        block.instructions.append(instruction)
+        return instruction
+
+    def zero(self, type, block):
+        return self.constant(type, zero_constants[type], block)
+
+    def value(self, node, kind):
+        """
+        Value of an expression stored to a variable of C type kind.
+        """
+
+        if kind == 'char' and isinstance(node, LiteralExpression) and node.kind is SyntaxKind.StringToken \
+                and len(node.value) == 1:
+            return self.constant('char', "'\\''" if node.value == "'" else f"'{node.value}'")
+        return self.expression(node)
+
+    def expression(self, node):
+        if isinstance(node, LiteralExpression):
+            if node.kind is SyntaxKind.StringToken:
+                return self.constant('const char *', c_string(node.value))
+            if node.kind is SyntaxKind.NumberToken:
+                return self.constant('double' if '.' in node.value else 'int', node.value)
+            return self.constant('bool', '1' if node.value else '0')
+
+        if isinstance(node, NameExpression):
+            return self.read(node.name_id, self.current)
+
+        if isinstance(node, BinaryExpression):
+            left, right = self.expression(node.left), self.expression(node.right)
+            if node.operator in integer_operators:
+                left, right = (self.emit('convert', 'int', [operand]) if operand.type != 'int' else operand
+                               for operand in (left, right))
+                return self.emit('binary', 'int', [left, right], node.operator)
+            kind = arithmetic_type(left.type, right.type)
+            if kind == 'float' and node.operator in double_operators:
+                # pow() and fmod() take doubles
+                kind = 'double'
+            if kind == 'float':
+                # C rounds an int operand to float first, which the
+                # backends computing in double have to do explicitly
+                left, right = (self.emit('convert', 'float', [operand]) if operand.type != 'float' else operand
+                               for operand in (left, right))
+            if node.operator in comparison_kinds:
+                kind = 'int'
+            return self.emit('binary', kind, [left, right], node.operator)
+
+        if isinstance(node, UnaryExpression):
+            if node.operator in modifying_operators and isinstance(node.operand, NameExpression):
+                name_id = node.operand.name_id
+                old = self.read(name_id, self.current)
+                one = self.constant('int', '1')
+                new = self.store(name_id, self.emit('binary', arithmetic_type(old.type, 'int'), [old, one],
+                                                    modifying_operators[node.operator]))
+                return old if node.postfix else new
+
+            operand = self.expression(node.operand)
+            if node.operator is SyntaxKind.BangToken:
+                return self.emit('unary', 'int', [operand], node.operator)
+            if node.operator is SyntaxKind.TildeToken:
+                if operand.type != 'int':
+                    operand = self.emit('convert', 'int', [operand])
+                return self.emit('unary', 'int', [operand], node.operator)
+            kind = operand.type if operand.type in ('double', 'float') else 'int'
+            return self.emit('unary', kind, [operand], node.operator)
+
+        if isinstance(node, InputExpression):
+            if node.prompt is None:
+                return self.emit('input', 'double')
+            prompt = self.expression(node.prompt)
+            prompt_type = expression_type(node.prompt, self.types)
+            prompt_format = None if prompt_type == 'const char *' else print_formats[prompt_type]
+            return self.emit('input', 'double', [prompt], prompt_format)
+
+        raise TypeError(f"No lowering for {type(node).__name__}")
+
+    # Cleanup
+    # ----------------------------------------------------------------
+
+    def prune(self):
+        """
+        Drops the blocks no path from the entry reaches, and the phi
+        operands coming from them.
+        """
+
+        reachable = self.function.reverse_postorder()
+        alive = {id(block) for block in reachable}
+        for block in reachable:
+            kept = [index for index, predecessor in enumerate(block.predecessors) if id(predecessor) in alive]
+            if len(kept) != len(block.predecessors):
+                block.predecessors = [block.predecessors[index] for index in kept]
+                for phi in block.phis:
+                    phi.operands = [phi.operands[index] for index in kept]
+        self.function.blocks = [block for block in self.function.blocks if id(block) in alive]
+
+    def remove_trivial_phis(self):
+        """
+        Replaces phis merging a single value, besides themselves, by it.
+        """
+
+        replacements = {}
+
+        def resolve(value):
+            while id(value) in replacements:
+                value = replacements[id(value)]
+            return value
+
+        changed = True
+        while changed:
+            changed = False
+            for block in self.function.blocks:
+                for phi in block.phis:
+                    if id(phi) in replacements:
+                        continue
+                    operands = {id(resolve(operand)): resolve(operand) for operand in phi.operands}
+                    operands.pop(id(phi), None)
+                    if len(operands) == 1:
+                        replacements[id(phi)] = next(iter(operands.values()))
+                        changed = True
+                    elif not operands:
+                        replacements[id(phi)] = self.zero(phi.type, self.function.blocks[0])
+                        changed = True
+
+        for block in self.function.blocks:
+            block.phis = [phi for phi in block.phis if id(phi) not in replacements]
+        self.function.replace(replacements)
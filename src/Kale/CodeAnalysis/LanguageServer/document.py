@@ -0,0 +1,220 @@
+from array import array
+from bisect import bisect_right
+
+from CodeAnalysis.Parsing.incrementalparser import IncrementalParser
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Parsing.relexer import TokenEnds, shifted
+
+from CodeAnalysis.Exceptions.illegalcharacter import IllegalCharacterException
+from CodeAnalysis.Exceptions.invalidtoken import InvalidTokenException
+
+
+# LSP DiagnosticSeverity
+error_severity = 1
+
+
+def line_starts(text, offset=0):
+    """
+    Returns the offsets just after each newline of text, moved by offset.
+    """
+
+    starts = []
+    position = text.find('\n')
+    while position != -1:
+        starts.append(offset + position + 1)
+        position = text.find('\n', position + 1)
+    return starts
+
+
+class LineStarts:
+    """
+    Sequence view of a Document's true line start offsets, for bisect.
+    """
+
+    def __init__(self, document):
+        self.document = document
+
+    def __len__(self):
+        return len(self.document.lines)
+
+    def __getitem__(self, index):
+        return self.document.line_start(index)
+
+
+class Document:
+    """
+    An open text document and its incremental analysis.
+
+    Changes are applied to the text right away but only parsed on
+    analyze(). All the changes since the last parse are merged into a
+    single edit of the parsed text, so the IncrementalParser keeps working
+    from its last state while the text has a character it can't lex.
+
+    Positions are LSP (line, character) pairs, characters count UTF-16
+    code units of the line, the LSP default, or code points with the
+    'utf-32' `encoding`. Line starts are shifted lazily as the TokenStream
+    offsets are: the ones from `shift_from` on are stored `shift` too low.
+    """
+
+    def __init__(self, uri, text, version=None, encoding='utf-16'):
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.encoding = encoding
+        self.lines = array('i', [0] + line_starts(text))
+        self.shift_from = 0
+        self.shift = 0
+        self.parser = None
+        # (start, old_end, new_end): self.text[start:new_end] replaced
+        # the parsed text's [start:old_end]
+        self.pending = None
+        self.diagnostics = []
+
+    # Positions
+    # ----------------------------------------------------------------
+
+    def line_start(self, line):
+        if line >= self.shift_from:
+            return self.lines[line] + self.shift
+        return self.lines[line]
+
+    def offset(self, position):
+        """
+        Returns the text offset of an LSP position, clamped to the text.
+        """
+
+        line = position['line']
+        if line >= len(self.lines):
+            return len(self.text)
+        start = self.line_start(line)
+        end = self.line_start(line + 1) - 1 if line + 1 < len(self.lines) else len(self.text)
+        character = position['character']
+        if self.encoding == 'utf-16' and not self.text[start:end].isascii():
+            # Code points outside the BMP are two UTF-16 code units
+            units = 0
+            for index, char in enumerate(self.text[start:end]):
+                if units >= character:
+                    character = index
+                    break
+                units += 2 if char > '\uffff' else 1
+            else:
+                character = end - start
+        return min(start + character, end)
+
+    def position(self, offset):
+        """
+        Returns the LSP position of a text offset.
+        """
+
+        line = bisect_right(LineStarts(self), offset) - 1
+        start = self.line_start(line)
+        character = offset - start
+        if self.encoding == 'utf-16' and not self.text[start:offset].isascii():
+            character += sum(char > '\uffff' for char in self.text[start:offset])
+        return {'line': line, 'character': character}
+
+    def range(self, start, end):
+        return {'start': self.position(start), 'end': self.position(end)}
+
+    # Changes
+    # ----------------------------------------------------------------
+
+    def change(self, changes, version=None):
+        """
+        Applies a list of LSP TextDocumentContentChangeEvents.
+        """
+
+        for change in changes:
+            if 'range' in change:
+                start = self.offset(change['range']['start'])
+                end = self.offset(change['range']['end'])
+                self.replace(start, end - start, change['text'])
+            else:
+                self.replace(0, len(self.text), change['text'])
+        self.version = version
+
+    def replace(self, offset, deleted, inserted):
+        """
+        Replaces `deleted` characters at offset with `inserted`.
+        """
+
+        end = offset + deleted
+        delta = len(inserted) - deleted
+
+        first = bisect_right(LineStarts(self), offset)
+        last = bisect_right(LineStarts(self), end)
+        lines, shift_from, shift = self.lines, min(self.shift_from, len(self.lines)), self.shift
+        added = array('i', line_starts(inserted, offset))
+
+        # Kept lines past the old shift point get their shift applied, the
+        # lines after the edit are stored without it as the new shift
+        # covers them all
+        split = min(shift_from, first)
+        head = lines[:split] + shifted(lines[split:first], shift)
+        split = max(shift_from, last)
+        tail = shifted(lines[last:split], -shift) + lines[split:]
+        self.lines = head + added + tail
+        self.shift_from = first + len(added)
+        self.shift = shift + delta
+        self.text = self.text[:offset] + inserted + self.text[end:]
+
+        if self.pending is None:
+            self.pending = (offset, end, end + delta)
+        else:
+            start, old_end, new_end = self.pending
+            if end > new_end:
+                # Text past the pending edit is unchanged since the parse
+                old_end += end - new_end
+                new_end = end
+            self.pending = (min(start, offset), old_end, new_end + delta)
+
+    # Analysis
+    # ----------------------------------------------------------------
+
+    def analyze(self):
+        """
+        Brings the parse up to date and returns the LSP diagnostics of the
+        current text.
+        """
+
+        try:
+            if self.parser is None:
+                lexer = Lexer(self.text)
+                parser = IncrementalParser(lexer.token_stream(), lexer.names)
+                diagnostics = parser.parse()
+                self.parser = parser
+            elif self.pending is not None:
+                start, old_end, new_end = self.pending
+                diagnostics = self.parser.edit(start, old_end - start, self.text[start:new_end])
+            else:
+                return self.diagnostics
+            self.pending = None
+            self.diagnostics = [self.diagnostic(diagnostic.position, self.token_end(diagnostic.position),
+                                                diagnostic.message) for diagnostic in diagnostics]
+
+        except (IllegalCharacterException, InvalidTokenException) as error:
+            position = error.position if error.position is not None else 0
+            self.diagnostics = [self.diagnostic(position, position + 1, f"Illegal character {error}"
+                                                if isinstance(error, IllegalCharacterException)
+                                                else f"Invalid token {error.token!r}")]
+
+        return self.diagnostics
+
+    def token_end(self, position):
+        """
+        Returns the end offset of the parsed token at position.
+        """
+
+        stream = self.parser.stream
+        index = min(bisect_right(TokenEnds(stream), position), len(stream) - 1)
+        return stream.end(index)
+
+    def diagnostic(self, start, end, message):
+        start = min(start, len(self.text))
+        end = min(max(end, start), len(self.text))
+        return {
+            'range': self.range(start, end),
+            'severity': error_severity,
+            'source': 'kale',
+            'message': message,
+        }
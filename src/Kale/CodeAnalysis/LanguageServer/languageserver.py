@@ -0,0 +1,207 @@
+import asyncio
+import json
+import sys
+
+from CodeAnalysis.LanguageServer.document import Document
+
+
+# LSP TextDocumentSyncKind.Incremental
+incremental_sync = 2
+
+# JSON-RPC MethodNotFound and InternalError
+method_not_found = -32601
+internal_error = -32603
+
+# LSP MessageType.Error
+error_message = 1
+
+
+class LanguageServer:
+    """
+    Language Server Protocol server publishing Kale diagnostics.
+
+    Messages are read from an asyncio StreamReader and written to a binary
+    file object, both JSON-RPC with Content-Length headers. Documents stay
+    in memory and are analyzed incrementally, `debounce` seconds after the
+    last change of a burst: each change cancels the analysis still waiting
+    for the previous one, so only the latest text is ever analyzed.
+
+    A handler failing doesn't stop the server: a request gets an error
+    response, a notification's error is logged to the client.
+    """
+
+    def __init__(self, reader, output, debounce=0.15):
+        self.reader = reader
+        self.output = output
+        self.debounce = debounce
+        self.documents = {}
+        self.analyses = {}
+        self.encoding = 'utf-16'
+        self.running = True
+        self.handlers = {
+            'initialize': self.initialize,
+            'initialized': self.ignore,
+            'shutdown': self.shutdown,
+            'exit': self.exit,
+            'textDocument/didOpen': self.did_open,
+            'textDocument/didChange': self.did_change,
+            'textDocument/didClose': self.did_close,
+        }
+
+    # Transport
+    # ----------------------------------------------------------------
+
+    async def read_message(self):
+        """
+        Reads one message, returns None at the end of the input.
+        """
+
+        length = None
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+
+        if length is None:
+            return None
+        return json.loads(await self.reader.readexactly(length))
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message).encode('utf-8')
+        self.output.write(b'Content-Length: %d\r\n\r\n' % len(body) + body)
+        self.output.flush()
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    async def serve(self):
+        """
+        Handles messages until `exit` or the end of the input.
+        """
+
+        while self.running:
+            try:
+                message = await self.read_message()
+            except asyncio.IncompleteReadError:
+                message = None
+            if message is None:
+                break
+            self.dispatch(message)
+
+        for analysis in self.analyses.values():
+            analysis.cancel()
+
+    def dispatch(self, message):
+        method = message.get('method')
+        handler = self.handlers.get(method)
+        if 'id' not in message:
+            if handler is not None:
+                try:
+                    handler(message.get('params'))
+                except Exception as error:
+                    self.notify('window/logMessage',
+                                {'type': error_message, 'message': f"{method} failed: {error!r}"})
+            return
+
+        if handler is None:
+            self.send({'id': message['id'],
+                       'error': {'code': method_not_found, 'message': f"Unknown method {method}"}})
+            return
+        try:
+            result = handler(message.get('params'))
+        except Exception as error:
+            self.send({'id': message['id'],
+                       'error': {'code': internal_error, 'message': f"{method} failed: {error!r}"}})
+        else:
+            self.send({'id': message['id'], 'result': result})
+
+    # Lifecycle
+    # ----------------------------------------------------------------
+
+    def initialize(self, params):
+        # Code points map to text offsets directly, UTF-16 code units are
+        # the default when the client doesn't offer them
+        general = (params or {}).get('capabilities', {}).get('general', {})
+        self.encoding = 'utf-32' if 'utf-32' in general.get('positionEncodings', ()) else 'utf-16'
+        return {
+            'capabilities': {
+                'positionEncoding': self.encoding,
+                'textDocumentSync': {'openClose': True, 'change': incremental_sync},
+            },
+            'serverInfo': {'name': 'kale'},
+        }
+
+    def ignore(self, params):
+        pass
+
+    def shutdown(self, params):
+        return None
+
+    def exit(self, params):
+        self.running = False
+
+    # Documents
+    # ----------------------------------------------------------------
+
+    def did_open(self, params):
+        item = params['textDocument']
+        self.documents[item['uri']] = Document(item['uri'], item['text'], item.get('version'),
+                                                  self.encoding)
+        self.schedule(item['uri'], 0)
+
+    def did_change(self, params):
+        uri = params['textDocument']['uri']
+        document = self.documents.get(uri)
+        if document is None:
+            return
+        document.change(params['contentChanges'], params['textDocument'].get('version'))
+        self.schedule(uri, self.debounce)
+
+    def did_close(self, params):
+        uri = params['textDocument']['uri']
+        analysis = self.analyses.pop(uri, None)
+        if analysis is not None:
+            analysis.cancel()
+        if self.documents.pop(uri, None) is not None:
+            self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+
+    # Analysis
+    # ----------------------------------------------------------------
+
+    def schedule(self, uri, delay):
+        """
+        (Re)starts the countdown to the analysis of a document.
+        """
+
+        analysis = self.analyses.get(uri)
+        if analysis is not None:
+            analysis.cancel()
+        self.analyses[uri] = asyncio.get_running_loop().create_task(self.analyze(uri, delay))
+
+    async def analyze(self, uri, delay):
+        await asyncio.sleep(delay)
+        # Nothing else runs until the diagnostics are sent, they can't be
+        # for an older text than the document's
+        del self.analyses[uri]
+        document = self.documents[uri]
+        diagnostics = document.analyze()
+        self.notify('textDocument/publishDiagnostics',
+                    {'uri': uri, 'version': document.version, 'diagnostics': diagnostics})
+
+
+async def serve_stdio(debounce=0.15):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await LanguageServer(reader, sys.stdout.buffer, debounce).serve()
+
+
+def main():
+    asyncio.run(serve_stdio())
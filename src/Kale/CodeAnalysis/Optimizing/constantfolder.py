@@ -0,0 +1,358 @@
+import math
+
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, GotoStatement, IfStatement,
+    InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement, UnaryExpression, WhileStatement,
+)
+
+
+int_min, int_max = -2 ** 31, 2 ** 31 - 1
+
+# Literal type a declaration's constant must have to be propagated, the
+# C conversions of the other keywords (char, float, bool) would be lost
+propagated_types = {
+    SyntaxKind.IntKeyword: 'int',
+    SyntaxKind.DoubleKeyword: 'double',
+    SyntaxKind.StringKeyword: 'string',
+    SyntaxKind.LetKeyword: None,
+    SyntaxKind.VarKeyword: None,
+}
+
+arithmetic = {
+    SyntaxKind.PlusToken: lambda left, right: left + right,
+    SyntaxKind.MinusToken: lambda left, right: left - right,
+    SyntaxKind.StartToken: lambda left, right: left * right,
+}
+
+comparisons = {
+    SyntaxKind.GreaterToken: lambda left, right: left > right,
+    SyntaxKind.GreaterOrEqualsToken: lambda left, right: left >= right,
+    SyntaxKind.LessToken: lambda left, right: left < right,
+    SyntaxKind.LessOrEqualsToken: lambda left, right: left <= right,
+    SyntaxKind.EqualsEqualsToken: lambda left, right: left == right,
+    SyntaxKind.BangEqualsToken: lambda left, right: left != right,
+}
+
+bitwise = {
+    SyntaxKind.AmpersandToken: lambda left, right: left & right,
+    SyntaxKind.PipeToken: lambda left, right: left | right,
+    SyntaxKind.HatToken: lambda left, right: left ^ right,
+    # The emitted C masks the count like the hardware does
+    SyntaxKind.LeftShiftToken: lambda left, right: left << (right & 31),
+    SyntaxKind.RightShiftToken: lambda left, right: left >> (right & 31),
+}
+
+modifying_operators = frozenset([SyntaxKind.PlusPlusToken, SyntaxKind.MinusMinusToken])
+
+
+def literal_type(node):
+    """
+    'int', 'double', 'string' or 'bool', the C type the literal gets.
+    """
+
+    if node.kind is SyntaxKind.NumberToken:
+        return 'double' if '.' in node.value else 'int'
+    if node.kind is SyntaxKind.StringToken:
+        return 'string'
+    return 'bool'
+
+
+def literal_value(node):
+    """
+    Python value of a number or bool literal, bools count as 0 and 1.
+    """
+
+    if node.kind is SyntaxKind.NumberToken:
+        return float(node.value) if '.' in node.value else int(node.value)
+    return int(bool(node.value))
+
+
+def number(value):
+    """
+    Literal for a folded value, or None if C would read it back as
+    another value or type.
+    """
+
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        # C reads -2147483648 as the negation of a long, and the minus of
+        # an enclosing negation it can't fold would then make `--`
+        if int_min < value <= int_max:
+            return LiteralExpression(SyntaxKind.NumberToken, str(value))
+        return None
+    text = repr(value)
+    if 'e' in text or 'n' in text:
+        # Exponents, inf and nan have no literal
+        return None
+    return LiteralExpression(SyntaxKind.NumberToken, text)
+
+
+class ConstantFolder:
+    """
+    Folds literal expressions and propagates constants, in place.
+
+    Arithmetic follows the C the CodeGenerator emits: ints truncate on
+    division and only fold inside int's range, mixed operands are
+    doubles, comparisons and `!` give int 0 or 1, `~` truncates doubles.
+    `%` takes the sign of the dividend, bitwise operators and shifts only
+    fold ints. Operations on strings are left alone.
+
+    A typed or let/var declaration of a literal is propagated into the
+    statements after it in its block when its name is never assigned nor
+    incremented. A label can be reached from anywhere, constants stop
+    being propagated past one that is the target of a goto.
+    """
+
+    def __init__(self):
+        self.folded = 0
+        self.propagated = 0
+        self.constants = {}
+        self.assigned = set()
+        self.targets = set()
+
+    def run(self, unit):
+        self.assigned = set()
+        self.targets = set()
+        for statement in unit.statements:
+            self.scan(statement)
+        self.block(unit.statements)
+        return unit
+
+    def counts(self):
+        return {'folded': self.folded, 'propagated': self.propagated}
+
+    # Statements
+    # ----------------------------------------------------------------
+
+    def scan(self, node):
+        """
+        Collects the names assigned or incremented and the goto targets.
+        """
+
+        if isinstance(node, AssignmentStatement):
+            self.assigned.add(node.name_id)
+            self.scan(node.expression)
+        elif isinstance(node, UnaryExpression):
+            if node.operator in modifying_operators and isinstance(node.operand, NameExpression):
+                self.assigned.add(node.operand.name_id)
+            self.scan(node.operand)
+        elif isinstance(node, BinaryExpression):
+            self.scan(node.left)
+            self.scan(node.right)
+        elif isinstance(node, PrintStatement):
+            self.scan(node.expression)
+        elif isinstance(node, DeclarationStatement):
+            if node.initializer is not None:
+                self.scan(node.initializer)
+        elif isinstance(node, InputExpression):
+            if node.prompt is not None:
+                self.scan(node.prompt)
+        elif isinstance(node, IfStatement):
+            self.scan(node.condition)
+            for statement in node.body + (node.else_body or []):
+                self.scan(statement)
+        elif isinstance(node, WhileStatement):
+            self.scan(node.condition)
+            for statement in node.body:
+                self.scan(statement)
+        elif isinstance(node, ForStatement):
+            self.scan(node.initializer)
+            self.scan(node.condition)
+            self.scan(node.increment)
+            for statement in node.body:
+                self.scan(statement)
+        elif isinstance(node, GotoStatement):
+            self.targets.add(node.name_id)
+
+    def block(self, statements):
+        """
+        Folds statements, constants they declare are forgotten after them.
+        """
+
+        declared = []
+        for statement in statements:
+            self.statement(statement, declared)
+        for name_id in declared:
+            self.constants.pop(name_id, None)
+
+    def statement(self, node, declared):
+        fold = self.expression
+
+        if isinstance(node, PrintStatement):
+            node.expression = fold(node.expression)
+
+        elif isinstance(node, DeclarationStatement):
+            if node.initializer is not None:
+                node.initializer = fold(node.initializer)
+                if isinstance(node.initializer, LiteralExpression) and node.name_id not in self.assigned \
+                        and node.keyword in propagated_types:
+                    wanted = propagated_types[node.keyword]
+                    if wanted is None or wanted == literal_type(node.initializer):
+                        self.constants[node.name_id] = node.initializer
+                        declared.append(node.name_id)
+
+        elif isinstance(node, AssignmentStatement):
+            node.expression = fold(node.expression)
+
+        elif isinstance(node, IfStatement):
+            node.condition = fold(node.condition)
+            self.block(node.body)
+            if node.else_body is not None:
+                self.block(node.else_body)
+
+        elif isinstance(node, WhileStatement):
+            self.enter_loop(node.body)
+            node.condition = fold(node.condition)
+            self.block(node.body)
+
+        elif isinstance(node, ForStatement):
+            self.statement(node.initializer, declared)
+            self.enter_loop(node.body)
+            node.condition = fold(node.condition)
+            node.increment = fold(node.increment)
+            self.block(node.body)
+
+        elif isinstance(node, LabelStatement):
+            if node.name_id in self.targets:
+                self.constants.clear()
+
+    def enter_loop(self, body):
+        """
+        A goto into a loop's body reaches its condition too, which then
+        can't use the constants either.
+        """
+
+        if self.targeted(body):
+            self.constants.clear()
+
+    def targeted(self, statements):
+        for node in statements:
+            if isinstance(node, LabelStatement):
+                if node.name_id in self.targets:
+                    return True
+            elif isinstance(node, IfStatement):
+                if self.targeted(node.body) or (node.else_body is not None and self.targeted(node.else_body)):
+                    return True
+            elif isinstance(node, (WhileStatement, ForStatement)):
+                if self.targeted(node.body):
+                    return True
+        return False
+
+    # Expressions
+    # ----------------------------------------------------------------
+
+    def expression(self, node):
+        """
+        Returns node folded, a LiteralExpression where it is constant.
+        """
+
+        if isinstance(node, NameExpression):
+            constant = self.constants.get(node.name_id)
+            if constant is None:
+                return node
+            self.propagated += 1
+            return LiteralExpression(constant.kind, constant.value)
+
+        if isinstance(node, BinaryExpression):
+            node.left = self.expression(node.left)
+            node.right = self.expression(node.right)
+            if isinstance(node.left, LiteralExpression) and isinstance(node.right, LiteralExpression):
+                return self.count(self.binary(node), node)
+            return node
+
+        if isinstance(node, UnaryExpression):
+            if node.operator in modifying_operators:
+                return node
+            node.operand = self.expression(node.operand)
+            if isinstance(node.operand, LiteralExpression):
+                return self.count(self.unary(node), node)
+            return node
+
+        if isinstance(node, InputExpression):
+            if node.prompt is not None:
+                node.prompt = self.expression(node.prompt)
+            return node
+
+        return node
+
+    def count(self, folded, node):
+        if folded is None:
+            return node
+        self.folded += 1
+        return folded
+
+    def binary(self, node):
+        left, operator, right = node.left, node.operator, node.right
+        left_type, right_type = literal_type(left), literal_type(right)
+
+        # C adds and compares string pointers, not their text
+        if left_type == 'string' or right_type == 'string':
+            return None
+
+        left_value, right_value = literal_value(left), literal_value(right)
+        if left_type == 'double' or right_type == 'double':
+            left_value, right_value = float(left_value), float(right_value)
+
+        if operator in comparisons:
+            return number(comparisons[operator](left_value, right_value))
+        if operator in arithmetic:
+            return number(arithmetic[operator](left_value, right_value))
+        if operator is SyntaxKind.SlashToken and right_value:
+            if isinstance(left_value, float):
+                return number(left_value / right_value)
+            quotient = abs(left_value) // abs(right_value)
+            return number(quotient if (left_value < 0) == (right_value < 0) else -quotient)
+        if operator is SyntaxKind.PercentToken and right_value:
+            if isinstance(left_value, float):
+                return number(math.fmod(left_value, right_value))
+            # INT_MIN % -1 traps in C
+            if left_value == int_min and right_value == -1:
+                return None
+            remainder = abs(left_value) % abs(right_value)
+            return number(-remainder if left_value < 0 else remainder)
+        if operator is SyntaxKind.DoubleStarToken:
+            return self.power(left_value, right_value)
+        if operator in bitwise and not isinstance(left_value, float):
+            return number(bitwise[operator](left_value, right_value))
+        return None
+
+    def power(self, base, exponent):
+        """
+        Folds `**` like kale_power() and pow(), leaving what would
+        overflow or has no literal to run time.
+        """
+
+        if isinstance(base, float):
+            try:
+                return number(math.pow(base, exponent))
+            except (OverflowError, ValueError):
+                return None
+        if exponent < 0:
+            if base == 1 or base == -1:
+                return number(base ** (exponent & 1))
+            return number(0)
+        # Beyond that only 0, 1 and -1 stay inside int
+        if exponent > 31 and abs(base) > 1:
+            return None
+        return number(base ** exponent)
+
+    def unary(self, node):
+        operand = node.operand
+        if literal_type(operand) == 'string':
+            return None
+
+        value = literal_value(operand)
+        if literal_type(operand) == 'double':
+            value = float(value)
+
+        if node.operator is SyntaxKind.MinusToken:
+            return number(-value)
+        if node.operator is SyntaxKind.PlusToken:
+            return number(value)
+        if node.operator is SyntaxKind.BangToken:
+            return number(not value)
+        if node.operator is SyntaxKind.TildeToken:
+            return number(~int(value))
+        return None
@@ -0,0 +1,290 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, DeclarationStatement, ForStatement, GotoStatement, IfStatement,
+    InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement, UnaryExpression,
+    WhileStatement,
+)
+from CodeAnalysis.Optimizing.constantfolder import literal_value, modifying_operators
+
+
+def truth(condition):
+    """
+    True or False for a literal condition, None if it isn't one.
+    """
+
+    if not isinstance(condition, LiteralExpression):
+        return None
+    if condition.kind is SyntaxKind.StringToken:
+        # A string is a non-null pointer in C
+        return True
+    return bool(literal_value(condition))
+
+
+def reads(node, names):
+    """
+    Adds the ids of the variables an expression reads to names.
+    """
+
+    if isinstance(node, NameExpression):
+        names.add(node.name_id)
+    elif isinstance(node, BinaryExpression):
+        reads(node.left, names)
+        reads(node.right, names)
+    elif isinstance(node, UnaryExpression):
+        reads(node.operand, names)
+    elif isinstance(node, InputExpression) and node.prompt is not None:
+        reads(node.prompt, names)
+    return names
+
+
+def pure(node):
+    """
+    Whether evaluating an expression has no effect besides its value.
+    """
+
+    if isinstance(node, InputExpression):
+        return False
+    if isinstance(node, BinaryExpression):
+        return pure(node.left) and pure(node.right)
+    if isinstance(node, UnaryExpression):
+        return node.operator not in modifying_operators and pure(node.operand)
+    return True
+
+
+class BasicBlock:
+    """
+    Straight-line run of the program.
+
+    `items` are what the block evaluates in order: simple statements
+    (print, declaration, assignment, label, goto) and the conditions and
+    for increments of compound statements, as their expressions.
+    """
+
+    __slots__ = ('index', 'items', 'successors', 'predecessors', 'label')
+
+    def __init__(self, index):
+        self.index = index
+        self.items = []
+        self.successors = []
+        self.predecessors = []
+        self.label = None
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, successors={[block.index for block in self.successors]})"
+
+
+class ControlFlowGraph:
+    """
+    Basic blocks of a CompilationUnit, with gotos resolved to the block
+    their label starts.
+
+    Every label starts a block and a goto ends one. Edges a literal
+    condition can't take are left out, so the code they lead to is
+    unreachable. `blocks[0]` is the entry and `exit` the block control
+    reaches at the end of the program. `owners` maps the id of every
+    statement evaluated in a block to the block, `initializers` holds the
+    ids of the for initializers.
+    """
+
+    def __init__(self, unit):
+        self.blocks = []
+        self.labels = {}
+        self.label_statements = {}
+        self.owners = {}
+        self.gotos = []
+        self.initializers = set()
+
+        self.current = self.block()
+        self.statements(unit.statements)
+        self.exit = self.block()
+        self.link(self.current, self.exit)
+
+        for block, goto in self.gotos:
+            target = self.labels.get(goto.name_id)
+            if target is not None:
+                self.link(block, target)
+
+    def block(self):
+        block = BasicBlock(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    @staticmethod
+    def link(source, target):
+        if target not in source.successors:
+            source.successors.append(target)
+            target.predecessors.append(source)
+
+    def add(self, item):
+        self.current.items.append(item)
+        self.owners[id(item)] = self.current
+
+    # Construction
+    # ----------------------------------------------------------------
+
+    def statements(self, statements):
+        for statement in statements:
+            self.statement(statement)
+
+    def statement(self, node):
+        if isinstance(node, LabelStatement):
+            block = self.block()
+            self.link(self.current, block)
+            block.label = node.name_id
+            self.labels[node.name_id] = block
+            self.label_statements[node.name_id] = node
+            self.current = block
+            self.add(node)
+
+        elif isinstance(node, GotoStatement):
+            self.add(node)
+            self.gotos.append((self.current, node))
+            # Whatever follows is only reachable through a label
+            self.current = self.block()
+
+        elif isinstance(node, IfStatement):
+            self.add(node.condition)
+            self.owners[id(node)] = self.current
+            taken = truth(node.condition)
+            condition = self.current
+
+            self.current = self.block()
+            if taken is not False:
+                self.link(condition, self.current)
+            self.statements(node.body)
+            body_end = self.current
+
+            self.current = self.block()
+            if taken is not True:
+                self.link(condition, self.current)
+            self.statements(node.else_body or [])
+            else_end = self.current
+
+            self.current = self.block()
+            self.link(body_end, self.current)
+            self.link(else_end, self.current)
+
+        elif isinstance(node, WhileStatement):
+            self.loop(node, node.condition, None)
+
+        elif isinstance(node, ForStatement):
+            self.statement(node.initializer)
+            self.initializers.add(id(node.initializer))
+            self.loop(node, node.condition, node.increment)
+
+        else:
+            self.add(node)
+
+    def loop(self, node, condition, increment):
+        header = self.block()
+        self.link(self.current, header)
+        self.current = header
+        self.add(condition)
+        self.owners[id(node)] = header
+        taken = truth(condition)
+
+        self.current = self.block()
+        if taken is not False:
+            self.link(header, self.current)
+        self.statements(node.body)
+        if increment is not None:
+            latch = self.block()
+            self.link(self.current, latch)
+            self.current = latch
+            self.add(increment)
+        self.link(self.current, header)
+
+        self.current = self.block()
+        if taken is not True:
+            self.link(header, self.current)
+
+    # Analyses
+    # ----------------------------------------------------------------
+
+    def reachable(self):
+        """
+        Returns the set of indices of the blocks reachable from the entry.
+        """
+
+        seen = {0}
+        stack = [self.blocks[0]]
+        while stack:
+            for successor in stack.pop().successors:
+                if successor.index not in seen:
+                    seen.add(successor.index)
+                    stack.append(successor)
+        return seen
+
+    def live_out(self):
+        """
+        Returns, per block index, the ids of the variables read later
+        before being written.
+        """
+
+        uses, defs = [], []
+        for block in self.blocks:
+            used, defined = set(), set()
+            for item in block.items:
+                for name in self.item_reads(item):
+                    if name not in defined:
+                        used.add(name)
+                written = self.item_writes(item)
+                if written is not None:
+                    defined.add(written)
+            uses.append(used)
+            defs.append(defined)
+
+        live_in = [set() for _ in self.blocks]
+        live_out = [set() for _ in self.blocks]
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(self.blocks):
+                out = set()
+                for successor in block.successors:
+                    out |= live_in[successor.index]
+                live = uses[block.index] | (out - defs[block.index])
+                if live != live_in[block.index] or out != live_out[block.index]:
+                    live_in[block.index] = live
+                    live_out[block.index] = out
+                    changed = True
+        return live_out
+
+    def referenced(self):
+        """
+        Returns the ids of the variables read, assigned or incremented
+        anywhere, reachable or not. Declarations don't count.
+        """
+
+        names = set()
+        for block in self.blocks:
+            for item in block.items:
+                names |= self.item_reads(item)
+                if isinstance(item, AssignmentStatement):
+                    names.add(item.name_id)
+        return names
+
+    @staticmethod
+    def item_reads(item):
+        if isinstance(item, PrintStatement):
+            return reads(item.expression, set())
+        if isinstance(item, AssignmentStatement):
+            return reads(item.expression, set())
+        if isinstance(item, DeclarationStatement):
+            return reads(item.initializer, set()) if item.initializer is not None else set()
+        if isinstance(item, (LabelStatement, GotoStatement)):
+            return set()
+        return reads(item, set())
+
+    @staticmethod
+    def item_writes(item):
+        """
+        The variable an item always overwrites, if any. An increment also
+        reads its variable, so it isn't counted as a write.
+        """
+
+        if isinstance(item, AssignmentStatement):
+            return item.name_id
+        if isinstance(item, DeclarationStatement) and item.initializer is not None:
+            return item.name_id
+        return None
@@ -0,0 +1,266 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, DeclarationStatement, ForStatement, GotoStatement, IfStatement, LabelStatement,
+    NameExpression, WhileStatement,
+)
+from CodeAnalysis.Optimizing.controlflow import ControlFlowGraph, pure, truth
+
+
+# Declarations whose C type comes from their initializer, which must stay
+inferred_keywords = frozenset([SyntaxKind.LetKeyword, SyntaxKind.VarKeyword])
+
+
+class StatementRewriter:
+    """
+    Base of the passes that drop or replace statements.
+
+    rewrite() visits bodies before the statement holding them, replace()
+    returns the statement to keep, a list to splice in its place or None
+    to drop it.
+    """
+
+    def rewrite(self, statements):
+        result = []
+        for node in statements:
+            if isinstance(node, IfStatement):
+                node.body = self.rewrite(node.body)
+                if node.else_body is not None:
+                    node.else_body = self.rewrite(node.else_body) or None
+            elif isinstance(node, (WhileStatement, ForStatement)):
+                node.body = self.rewrite(node.body)
+
+            replaced = self.replace(node)
+            if isinstance(replaced, list):
+                result.extend(replaced)
+            elif replaced is not None:
+                result.append(replaced)
+        return result
+
+    def replace(self, node):
+        return node
+
+
+class JumpThreader(StatementRewriter):
+    """
+    Retargets a goto to a label that only leads on to another label, by
+    a goto or by falling through, to the end of the chain. Drops gotos to
+    the label right after them.
+    """
+
+    def __init__(self):
+        self.threaded = 0
+        self.removed = 0
+
+    def counts(self):
+        return {'threaded': self.threaded, 'removed': self.removed}
+
+    def run(self, unit):
+        graph = ControlFlowGraph(unit)
+
+        for block, goto in graph.gotos:
+            target, seen = goto.name_id, {goto.name_id}
+            while True:
+                following = self.forward(graph.labels.get(target))
+                if following is None or following in seen or following not in graph.labels:
+                    break
+                seen.add(following)
+                target = following
+            if target != goto.name_id:
+                goto.name = graph.label_statements[target].name
+                goto.name_id = target
+                self.threaded += 1
+
+        unit.statements = self.rewrite(unit.statements)
+        return unit
+
+    @staticmethod
+    def forward(block):
+        """
+        The label a labelled block only passes control on to, or None.
+        """
+
+        if block is None:
+            return None
+        items = [item for item in block.items if not isinstance(item, LabelStatement)]
+        if len(items) == 1 and isinstance(items[0], GotoStatement):
+            return items[0].name_id
+        if not items and len(block.successors) == 1:
+            return block.successors[0].label
+        return None
+
+    def rewrite(self, statements):
+        statements = super().rewrite(statements)
+        result = []
+        for index, node in enumerate(statements):
+            if isinstance(node, GotoStatement):
+                following = index + 1
+                while following < len(statements) and isinstance(statements[following], LabelStatement):
+                    if statements[following].name_id == node.name_id:
+                        break
+                    following += 1
+                else:
+                    following = None
+                if following is not None:
+                    self.removed += 1
+                    continue
+            result.append(node)
+        return result
+
+
+class UnreachableCodeEliminator(StatementRewriter):
+    """
+    Drops what no path from the start of the program reaches, including
+    the branch a literal condition never takes, and ifs left empty.
+
+    A declaration whose name is used elsewhere keeps declaring it for the
+    CodeGenerator: it loses a typed initializer and is kept whole for
+    let and var, whose type is their initializer's.
+    """
+
+    def __init__(self):
+        self.removed = 0
+        self.graph = None
+        self.reachable = None
+        self.referenced = None
+
+    def counts(self):
+        return {'removed': self.removed}
+
+    def run(self, unit):
+        self.graph = ControlFlowGraph(unit)
+        self.reachable = self.graph.reachable()
+        self.referenced = self.graph.referenced()
+        unit.statements = self.rewrite(unit.statements)
+        return unit
+
+    def dead(self, node):
+        block = self.graph.owners.get(id(node))
+        return block is not None and block.index not in self.reachable
+
+    def replace(self, node):
+        if isinstance(node, IfStatement):
+            if self.dead(node):
+                if node.body or node.else_body:
+                    return node
+                self.removed += 1
+                return None
+            taken = truth(node.condition)
+            if not node.body and not node.else_body and pure(node.condition):
+                self.removed += 1
+                return None
+            if taken is True and not node.else_body:
+                self.removed += 1
+                return node.body
+            if taken is False and not node.body:
+                self.removed += 1
+                return node.else_body or []
+            return node
+
+        if isinstance(node, (WhileStatement, ForStatement)):
+            if node.body or not (self.dead(node) or truth(node.condition) is False):
+                return node
+            self.removed += 1
+            if isinstance(node, ForStatement) and not self.dead(node):
+                return node.initializer
+            return None
+
+        if not self.dead(node):
+            return node
+
+        if isinstance(node, DeclarationStatement) and node.name_id in self.referenced:
+            if node.initializer is None or node.keyword in inferred_keywords:
+                return node
+            node.initializer = None
+        self.removed += 1
+        return node if isinstance(node, DeclarationStatement) else None
+
+
+class DeadStoreEliminator(StatementRewriter):
+    """
+    Drops assignments and initializers whose value is never read, when
+    computing it has no effect, and assignments of a variable to itself,
+    until there are none left. Liveness runs
+    over the control flow graph, so it follows gotos.
+
+    Declarations are kept while their name is used, as for unreachable
+    ones. For initializers are never dropped, they make the C loop.
+    """
+
+    def __init__(self, rounds=10):
+        self.rounds = rounds
+        self.removed = 0
+        self.dead = set()
+        self.referenced = None
+
+    def counts(self):
+        return {'removed': self.removed}
+
+    def run(self, unit):
+        for _ in range(self.rounds):
+            removed = self.removed
+            graph = ControlFlowGraph(unit)
+            self.dead = self.dead_stores(graph)
+            self.referenced = graph.referenced()
+            unit.statements = self.rewrite(unit.statements)
+            if self.removed == removed:
+                break
+        return unit
+
+    @staticmethod
+    def dead_stores(graph):
+        dead = set()
+        live_out = graph.live_out()
+        for block in graph.blocks:
+            live = set(live_out[block.index])
+            for item in reversed(block.items):
+                written = graph.item_writes(item)
+                if written is not None and written not in live and id(item) not in graph.initializers:
+                    value = item.expression if isinstance(item, AssignmentStatement) else item.initializer
+                    if pure(value):
+                        dead.add(id(item))
+                        continue
+                if written is not None:
+                    live.discard(written)
+                live |= graph.item_reads(item)
+        return dead
+
+    def replace(self, node):
+        if isinstance(node, AssignmentStatement):
+            if id(node) in self.dead or (isinstance(node.expression, NameExpression)
+                                         and node.expression.name_id == node.name_id):
+                self.removed += 1
+                return None
+
+        if isinstance(node, DeclarationStatement):
+            if node.name_id not in self.referenced:
+                if node.initializer is None or pure(node.initializer):
+                    self.removed += 1
+                    return None
+            elif id(node) in self.dead and node.keyword not in inferred_keywords:
+                node.initializer = None
+                self.removed += 1
+        return node
+
+
+class LabelEliminator(StatementRewriter):
+    """
+    Drops the labels no goto targets.
+    """
+
+    def __init__(self):
+        self.removed = 0
+        self.targets = set()
+
+    def counts(self):
+        return {'removed': self.removed}
+
+    def run(self, unit):
+        self.targets = {goto.name_id for _, goto in ControlFlowGraph(unit).gotos}
+        unit.statements = self.rewrite(unit.statements)
+        return unit
+
+    def replace(self, node):
+        if isinstance(node, LabelStatement) and node.name_id not in self.targets:
+            self.removed += 1
+            return None
+        return node
@@ -0,0 +1,72 @@
+from CodeAnalysis.Optimizing.constantfolder import ConstantFolder
+from CodeAnalysis.Optimizing.deadcode import (
+    DeadStoreEliminator, JumpThreader, LabelEliminator, UnreachableCodeEliminator,
+)
+from CodeAnalysis.Optimizing.ssapasses import (
+    CommonSubexpressionEliminator, DeadValueEliminator, LoopInvariantCodeMover, StrengthReducer,
+)
+from CodeAnalysis.Intermediate.lowering import Lowering
+
+
+class Optimizer:
+    """
+    Runs the optimization passes of a level over a CompilationUnit.
+
+    Level 0 runs nothing, which lets the Parser stream statements straight
+    to the CodeGenerator. Level 1 folds constants, level 2 and up also
+    run the control flow graph passes, in an order where each one leaves
+    work for the next. Level 3 then lowers the program to SSA form, see
+    lower(), for the loop passes. Every pass has a counts() of what it changed,
+    recorded in stats.passes under the pass name when stats are given.
+    """
+
+    def __init__(self, level=1, stats=None):
+        self.level = level
+        self.stats = stats
+
+    def passes(self):
+        if self.level >= 1:
+            yield 'fold', ConstantFolder()
+        if self.level >= 2:
+            yield 'thread', JumpThreader()
+            yield 'stores', DeadStoreEliminator()
+            yield 'unreachable', UnreachableCodeEliminator()
+            # Dropped code can leave gotos to the next statement
+            yield 'thread', JumpThreader()
+            yield 'labels', LabelEliminator()
+
+    def function_passes(self):
+        if self.level >= 3:
+            yield 'cse', CommonSubexpressionEliminator()
+            yield 'licm', LoopInvariantCodeMover()
+            yield 'strength', StrengthReducer()
+            # Reduced products leave their factors and hoisting duplicates
+            yield 'cse', CommonSubexpressionEliminator()
+            yield 'values', DeadValueEliminator()
+
+    def run(self, unit):
+        return self.apply(self.passes(), unit)
+
+    def lower(self, unit):
+        """
+        Optimizes a CompilationUnit and returns it as an optimized SSA
+        Function.
+        """
+
+        unit = self.run(unit)
+        if self.stats is not None:
+            with self.stats.phase('optimize'):
+                function = Lowering().run(unit)
+        else:
+            function = Lowering().run(unit)
+        return self.apply(self.function_passes(), function)
+
+    def apply(self, passes, program):
+        for name, optimization in passes:
+            if self.stats is not None:
+                with self.stats.phase('optimize'):
+                    program = optimization.run(program)
+                self.stats.add_pass(name, optimization.counts())
+            else:
+                program = optimization.run(program)
+        return program
@@ -0,0 +1,286 @@
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Intermediate.dominance import DominatorTree
+from CodeAnalysis.Intermediate.ir import Jump, commutative_operators
+
+
+int_minimum, int_maximum = -2 ** 31, 2 ** 31 - 1
+
+
+def constant_int(value):
+    """
+    The value of an int const instruction, None for anything else.
+    """
+
+    if value.opcode != 'const' or value.type != 'int':
+        return None
+    try:
+        return int(value.attribute)
+    except ValueError:
+        return None
+
+
+def preheader(function, loop):
+    """
+    Returns the block control enters loop from, making one when the header
+    is entered from several blocks or one that also branches elsewhere.
+    Phis of the header merging several entering values get their merge in
+    the new block.
+    """
+
+    header = loop.header
+    outside = [index for index, predecessor in enumerate(header.predecessors) if predecessor not in loop]
+    if len(outside) == 1:
+        entering = header.predecessors[outside[0]]
+        if isinstance(entering.terminator, Jump):
+            return entering
+
+    block = function.block()
+    block.terminator = Jump(header)
+    for index in outside:
+        predecessor = header.predecessors[index]
+        predecessor.retarget(header, block)
+        block.predecessors.append(predecessor)
+
+    inside = [index for index in range(len(header.predecessors)) if index not in outside]
+    for phi in header.phis:
+        values = [phi.operands[index] for index in outside]
+        if len(values) == 1 or all(value is values[0] for value in values):
+            value = values[0]
+        else:
+            value = function.instruction('phi', phi.type, values, block=block)
+            block.phis.append(value)
+        phi.operands = [value] + [phi.operands[index] for index in inside]
+    header.predecessors = [block] + [header.predecessors[index] for index in inside]
+    return block
+
+
+class CommonSubexpressionEliminator:
+    """
+    Replaces a pure instruction by an identical one dominating it, by
+    value numbering scoped to the dominator tree. Operands of commutative
+    operators are numbered in either order.
+    """
+
+    def __init__(self):
+        self.removed = 0
+
+    def counts(self):
+        return {'removed': self.removed}
+
+    def run(self, function):
+        tree = DominatorTree(function)
+        replacements = {}
+        available = {}
+
+        def resolve(value):
+            while id(value) in replacements:
+                value = replacements[id(value)]
+            return value
+
+        # Walks the tree keeping the numbers of the dominating blocks only
+        stack = [(tree.order[0], False)]
+        scopes = []
+        while stack:
+            block, leaving = stack.pop()
+            if leaving:
+                for key in scopes.pop():
+                    del available[key]
+                continue
+
+            added = []
+            kept = []
+            for instruction in block.instructions:
+                instruction.operands = [resolve(operand) for operand in instruction.operands]
+                if not instruction.pure:
+                    kept.append(instruction)
+                    continue
+                operands = [id(operand) for operand in instruction.operands]
+                if instruction.opcode == 'binary' and instruction.attribute in commutative_operators:
+                    operands.sort()
+                key = (instruction.opcode, instruction.type, instruction.attribute, tuple(operands))
+                existing = available.get(key)
+                if existing is not None:
+                    replacements[id(instruction)] = existing
+                    self.removed += 1
+                    continue
+                available[key] = instruction
+                added.append(key)
+                kept.append(instruction)
+            block.instructions = kept
+
+            scopes.append(added)
+            stack.append((block, True))
+            stack.extend((child, False) for child in reversed(tree.children[id(block)]))
+
+        function.replace(replacements)
+        return function
+
+
+class LoopInvariantCodeMover:
+    """
+    Moves the pure instructions of a loop whose operands are all defined
+    outside it to its preheader, inner loops first so an invariant can
+    move out of several. Instructions that may trap stay, they could run
+    when the loop didn't run them.
+    """
+
+    def __init__(self):
+        self.hoisted = 0
+        self.preheaders = 0
+
+    def counts(self):
+        return {'hoisted': self.hoisted, 'preheaders': self.preheaders}
+
+    def run(self, function):
+        blocks = len(function.blocks)
+        for loop in DominatorTree(function).loops():
+            preheader(function, loop)
+        self.preheaders += len(function.blocks) - blocks
+
+        # Outer loops now hold the preheaders of the inner ones
+        tree = DominatorTree(function)
+        loops = tree.loops()
+        entries = [preheader(function, loop) for loop in loops]
+        order = tree.order
+
+        for loop, entry in zip(loops, entries):
+            for block in order:
+                if block not in loop:
+                    continue
+                kept = []
+                for instruction in block.instructions:
+                    if instruction.pure and not instruction.traps() \
+                            and all(operand.block not in loop for operand in instruction.operands):
+                        instruction.block = entry
+                        entry.instructions.append(instruction)
+                        self.hoisted += 1
+                    else:
+                        kept.append(instruction)
+                block.instructions = kept
+        return function
+
+
+class StrengthReducer:
+    """
+    Replaces the product of an int induction variable by a constant with
+    a variable of its own, stepped by an addition each iteration.
+
+    An induction variable is a header phi entered from a preheader and
+    updated by a single latch to itself plus or minus a constant: for
+    `i = phi(start, i + step)`, `i * k` becomes `j = phi(start * k, j +
+    step * k)`. Runs after the LoopInvariantCodeMover has made the
+    preheaders.
+    """
+
+    def __init__(self):
+        self.reduced = 0
+
+    def counts(self):
+        return {'reduced': self.reduced}
+
+    def run(self, function):
+        tree = DominatorTree(function)
+        for loop in tree.loops():
+            header = loop.header
+            if len(header.predecessors) != 2 or len(loop.latches) != 1:
+                continue
+            entry, latch = header.predecessors
+            if entry in loop or latch is not loop.latches[0] or not isinstance(entry.terminator, Jump):
+                continue
+
+            steps = {}
+            for phi in header.phis:
+                step = self.step(phi)
+                if step is not None:
+                    steps[id(phi)] = step
+
+            products = [instruction for block in tree.order if block in loop for instruction in block.instructions
+                        if instruction.opcode == 'binary' and instruction.attribute is SyntaxKind.StartToken
+                        and instruction.type == 'int']
+            for instruction in products:
+                left, right = instruction.operands
+                if id(left) not in steps:
+                    left, right = right, left
+                factor = constant_int(right)
+                if id(left) not in steps or factor is None:
+                    continue
+                if self.reduce(function, instruction, left, steps[id(left)], factor, entry, latch):
+                    self.reduced += 1
+        return function
+
+    @staticmethod
+    def step(phi):
+        """
+        The constant an int phi is stepped by at the latch, or None.
+        """
+
+        if phi.type != 'int':
+            return None
+        update = phi.operands[1]
+        if update.opcode != 'binary' or update.type != 'int' or phi not in update.operands:
+            return None
+        left, right = update.operands
+        if update.attribute is SyntaxKind.PlusToken:
+            step = constant_int(right) if left is phi else constant_int(left)
+        elif update.attribute is SyntaxKind.MinusToken and left is phi:
+            step = constant_int(right)
+            step = -step if step is not None else None
+        else:
+            return None
+        return step
+
+    @staticmethod
+    def reduce(function, product, variable, step, factor, entry, latch):
+        increment = step * factor
+        if not int_minimum <= increment <= int_maximum:
+            return False
+
+        initial = constant_int(variable.operands[0])
+        if initial is not None and int_minimum <= initial * factor <= int_maximum:
+            start = function.instruction('const', 'int', (), str(initial * factor), entry)
+            entry.instructions.append(start)
+        else:
+            multiplier = function.instruction('const', 'int', (), str(factor), entry)
+            start = function.instruction('binary', 'int', [variable.operands[0], multiplier],
+                                         SyntaxKind.StartToken, entry)
+            entry.instructions.extend((multiplier, start))
+
+        header = variable.block
+        reduced = function.instruction('phi', 'int', block=header)
+        header.phis.append(reduced)
+
+        constant = function.instruction('const', 'int', (), str(increment), latch)
+        stepped = function.instruction('binary', 'int', [reduced, constant], SyntaxKind.PlusToken, latch)
+        latch.instructions.extend((constant, stepped))
+        reduced.operands = [start, stepped]
+
+        function.replace({id(product): reduced})
+        product.block.instructions.remove(product)
+        return True
+
+
+class DeadValueEliminator:
+    """
+    Drops the pure instructions and phis nothing uses, until there are
+    none left.
+    """
+
+    def __init__(self):
+        self.removed = 0
+
+    def counts(self):
+        return {'removed': self.removed}
+
+    def run(self, function):
+        while True:
+            uses = function.uses()
+            removed = self.removed
+            for block in function.blocks:
+                phis = [phi for phi in block.phis if id(phi) in uses]
+                instructions = [instruction for instruction in block.instructions
+                                if not instruction.pure or id(instruction) in uses]
+                self.removed += len(block.phis) - len(phis) + len(block.instructions) - len(instructions)
+                block.phis = phis
+                block.instructions = instructions
+            if self.removed == removed:
+                return function
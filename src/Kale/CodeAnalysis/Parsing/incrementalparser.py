@@ -0,0 +1,456 @@
+from array import array
+from bisect import bisect_left, insort
+from heapq import heappop, heappush
+
+from CodeAnalysis.Diagnostics.diagnosticbag import Diagnostic, DiagnosticBag
+from CodeAnalysis.Exceptions.parseerror import ParseException
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Parsing.relexer import relex_range, shifted
+from CodeAnalysis.Syntax.nametable import NameTable
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtree import CompilationUnit
+
+
+# The parser's name sets a statement's checks look names up in, in the
+# order of StatementSummary.queries and .declared
+namespaces = ('symbols', 'strings', 'labels_declared')
+
+# Spacing of the order keys given to statements appended at the end, new
+# statements between two others take a fraction of the gap between them
+order_gap = 1 << 32
+order_fraction = 64
+
+
+class Declarations:
+    """
+    One namespace's declarations: the order keys of the statements
+    declaring each name, sorted, and the statements whose checks looked
+    each name up.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.dependents = {}
+
+    def declared_before(self, name, order):
+        orders = self.orders.get(name)
+        return bool(orders) and orders[0] < order
+
+    def register(self, summary, index):
+        for name in summary.declared[index]:
+            insort(self.orders.setdefault(name, []), summary.order)
+        for name in summary.queries[index]:
+            self.dependents.setdefault(name, set()).add(summary)
+
+    def unregister(self, summary, index):
+        for name in summary.declared[index]:
+            orders = self.orders[name]
+            del orders[bisect_left(orders, summary.order)]
+            if not orders:
+                del self.orders[name]
+        for name in summary.queries[index]:
+            dependents = self.dependents[name]
+            dependents.discard(summary)
+            if not dependents:
+                del self.dependents[name]
+
+
+class PrefixSet:
+    """
+    Set-like view of the names declared by the statements before `order`,
+    handed to the Parser in place of its own sets. Logs the answers it
+    gives about names the current statement didn't declare itself, those
+    are all the statement's checks depend on.
+    """
+
+    def __init__(self, declarations):
+        self.declarations = declarations
+        self.begin(0)
+
+    def begin(self, order):
+        self.order = order
+        self.queries = {}
+        self.added = []
+
+    def __contains__(self, item):
+        if item in self.added:
+            return True
+        found = self.declarations.declared_before(item, self.order)
+        self.queries.setdefault(item, found)
+        return found
+
+    def add(self, item):
+        if item not in self.added:
+            self.added.append(item)
+
+
+class StatementSummary:
+    """
+    A parsed top level statement: its node (None if it had a syntax error),
+    a fingerprint of its tokens, its order key, the lookups its checks
+    made and the names it declared per namespace, the labels it jumps to
+    and its diagnostics. Positions are offsets from the statement's start.
+    """
+
+    __slots__ = ('node', 'fingerprint', 'order', 'queries', 'declared', 'gotos', 'diagnostics')
+
+    def __init__(self, node, fingerprint, order, views, gotos, diagnostics):
+        self.node = node
+        self.fingerprint = fingerprint
+        self.order = order
+        self.queries = tuple(view.queries for view in views)
+        self.declared = tuple(view.added for view in views)
+        self.gotos = gotos
+        self.diagnostics = diagnostics
+
+    def holds(self, declarations):
+        """
+        Checks whether the statement's checks would answer the same against
+        the current declarations.
+        """
+
+        for namespace, queries in zip(declarations, self.queries):
+            for name, found in queries.items():
+                if namespace.declared_before(name, self.order) != found:
+                    return False
+        return True
+
+
+class Column:
+    """
+    Sequence view of one attribute of a list of objects, or of an array
+    with a lazy shift, for bisect.
+    """
+
+    def __init__(self, length, item):
+        self.length = length
+        self.item = item
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return self.item(index)
+
+
+def fingerprint(stream, start, stop):
+    """
+    Position independent hash of the tokens [start, stop) of stream.
+    """
+
+    return hash((stream.kinds[start:stop].tobytes(), stream.source[stream.start(start):stream.end(stop - 1)]))
+
+
+class IncrementalParser:
+    """
+    Parses a TokenStream statement by statement and keeps a summary of
+    each top level statement: its token range, a fingerprint of its
+    tokens, the name lookups its checks made, what it declared and its
+    diagnostics.
+
+    After an edit only the statements overlapping the relexed tokens are
+    parsed again. Declarations are indexed by name, with the statements
+    that looked each name up, so of the statements after the edit only
+    those that looked up a name whose declarations changed are rechecked.
+    The "already defined", undeclared name, string operand and goto target
+    checks stay those of a full parse, and errors are recovered from as
+    the batch compiler does.
+
+    Statements are ordered by integer keys with gaps between them, so a
+    statement can be inserted without renumbering the ones after it, and
+    their token ranges are stored as the TokenStream stores offsets: the
+    ones after the last edit without its shift.
+    """
+
+    def __init__(self, stream, names=None):
+        self.stream = stream
+        self.names = names if names is not None else NameTable()
+        self.reparsed = 0
+        self.reset()
+
+    def reset(self):
+        self.summaries = []
+        self.starts = array('i')
+        self.stops = array('i')
+        self.shift_from = 0
+        self.shift = 0
+        self.declarations = tuple(Declarations() for _ in namespaces)
+        # Label id: the summaries jumping to it, and the labels jumped to
+        # that no statement declares
+        self.gotos = {}
+        self.missing = set()
+        self.failing = set()
+
+    def parse(self):
+        """
+        Full parse of the stream, returns its diagnostics.
+        """
+
+        self.reset()
+        return self.update(self.stream, 0, len(self.stream), len(self.stream))
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Applies a source edit, see relexer.relex_range, and returns the
+        diagnostics of the new source.
+
+        Exceptions: Raises the Lexer's exceptions if the edited source has
+        a character it can't scan, the previous state is kept in that case.
+        """
+
+        stream, first, old_stop, new_stop = relex_range(self.stream, offset, deleted, inserted, self.names)
+        return self.update(stream, first, old_stop, new_stop)
+
+    def unit(self):
+        """
+        The CompilationUnit of the source, without the statements a syntax
+        error abandoned, as a full parse.
+        """
+
+        return CompilationUnit([summary.node for summary in self.summaries if summary.node is not None])
+
+    def diagnostics(self):
+        """
+        Returns the Diagnostics of the source, sorted by position.
+        """
+
+        diagnostics = []
+        for summary in sorted(self.failing, key=lambda summary: summary.order):
+            base = self.position(summary)
+            diagnostics += [Diagnostic(message, base + offset) for message, offset in summary.diagnostics]
+        for label in self.missing:
+            summary = min(self.gotos[label], key=lambda summary: summary.order)
+            offset = next(offset for name, offset in summary.gotos if name == label)
+            diagnostics.append(Diagnostic("Attempting to goto to undeclared label: " + self.names.name(label),
+                                          self.position(summary) + offset))
+        diagnostics.sort(key=lambda diagnostic: diagnostic.position)
+        return diagnostics
+
+    # Statement ranges
+    # ----------------------------------------------------------------
+
+    def start(self, index):
+        return self.starts[index] + (self.shift if index >= self.shift_from else 0)
+
+    def stop(self, index):
+        return self.stops[index] + (self.shift if index >= self.shift_from else 0)
+
+    def index(self, summary):
+        orders = Column(len(self.summaries), lambda index: self.summaries[index].order)
+        return bisect_left(orders, summary.order)
+
+    def position(self, summary):
+        return self.stream[self.start(self.index(summary))].position
+
+    # Parsing
+    # ----------------------------------------------------------------
+
+    def parser(self, stream, start):
+        parser = Parser(stream.tokens(start), names=self.names)
+        parser.start = start
+        parser.views = tuple(PrefixSet(declarations) for declarations in self.declarations)
+        parser.symbols, parser.strings, parser.labels_declared = parser.views
+        return parser
+
+    def statement(self, parser, stream, order):
+        """
+        Parses the statement at the parser's position, recovering from a
+        syntax error, and returns its summary and where it stops.
+        """
+
+        for view in parser.views:
+            view.begin(order)
+        parser.diagnostics = DiagnosticBag()
+        parser.goto_tokens = {}
+        start = parser.start + parser.position
+        begin = parser.position
+        try:
+            node = parser.statement()
+        except ParseException:
+            node = None
+            parser.synchronize(begin)
+        stop = parser.start + parser.position
+        self.reparsed += 1
+
+        base = stream[start].position
+        gotos = [(name, token.position - base) for name, token in parser.goto_tokens.items()]
+        diagnostics = [(diagnostic.message, diagnostic.position - base) for diagnostic in parser.diagnostics]
+        summary = StatementSummary(node, fingerprint(stream, start, stop), order, parser.views, gotos, diagnostics)
+        return summary, stop
+
+    def changes(self):
+        """
+        Sets of the names whose declarations changed per namespace, then
+        of the labels whose gotos changed.
+        """
+
+        return tuple(set() for _ in range(len(namespaces) + 1))
+
+    def register(self, summary, changed):
+        for index, declarations in enumerate(self.declarations):
+            declarations.register(summary, index)
+            changed[index].update(summary.declared[index])
+        for name, _ in summary.gotos:
+            self.gotos.setdefault(name, set()).add(summary)
+            changed[-1].add(name)
+        if summary.diagnostics:
+            self.failing.add(summary)
+
+    def unregister(self, summary, changed):
+        for index, declarations in enumerate(self.declarations):
+            declarations.unregister(summary, index)
+            changed[index].update(summary.declared[index])
+        for name, _ in summary.gotos:
+            summaries = self.gotos[name]
+            summaries.discard(summary)
+            if not summaries:
+                del self.gotos[name]
+            changed[-1].add(name)
+        self.failing.discard(summary)
+
+    def renumber(self, summaries):
+        """
+        Spreads the order keys of summaries out again once a gap is used up.
+        """
+
+        for declarations in self.declarations:
+            declarations.orders = {}
+        for order, summary in enumerate(summaries, 1):
+            summary.order = order * order_gap
+        for summary in summaries:
+            for index, declarations in enumerate(self.declarations):
+                for name in summary.declared[index]:
+                    declarations.orders.setdefault(name, []).append(summary.order)
+
+    def update(self, stream, first, old_stop, new_stop):
+        """
+        Reparses after tokens [first, old_stop) of the previous stream were
+        replaced by [first, new_stop) of `stream`, returns the diagnostics.
+        """
+
+        delta = new_stop - old_stop
+        summaries, count = self.summaries, len(self.summaries)
+        changed = self.changes()
+
+        # A statement's extent depends on the token after it, so only the
+        # statements ending before `first` are kept in place
+        keep = bisect_left(Column(count, self.stop), first)
+        # Statements starting after the edit are reused, shifted
+        reuse = bisect_left(Column(count, self.start), old_stop)
+        for summary in summaries[keep:reuse]:
+            self.unregister(summary, changed)
+
+        # Parse until a statement boundary lines up with a reused statement
+        position = self.stop(keep - 1) if keep else 0
+        parser = self.parser(stream, position)
+        added, added_starts, added_stops = [], array('i'), array('i')
+        passed, resumed = reuse, count
+        while not parser.check_token(SyntaxKind.EndOfFileToken):
+            # Reused statements starting before the position are reparsed
+            # over, from the first one after it on they still follow
+            k = bisect_left(Column(count, self.start), position - delta, passed)
+            for summary in summaries[passed:k]:
+                self.unregister(summary, changed)
+            passed = k
+            if (position >= new_stop and k < count and self.start(k) == position - delta and
+                    summaries[k].fingerprint == fingerprint(stream, position, self.stop(k) + delta)):
+                resumed = k
+                break
+
+            last = added[-1].order if added else summaries[keep - 1].order if keep else 0
+            if k < count:
+                step = (summaries[k].order - last) // order_fraction
+                if not step:
+                    self.renumber(summaries[:keep] + added + summaries[k:])
+                    last = added[-1].order if added else summaries[keep - 1].order if keep else 0
+                    step = (summaries[k].order - last) // order_fraction
+            else:
+                step = order_gap
+
+            summary, stop = self.statement(parser, stream, last + step)
+            self.register(summary, changed)
+            added.append(summary)
+            added_starts.append(position)
+            added_stops.append(stop)
+            position = stop
+
+        for summary in summaries[passed:resumed]:
+            self.unregister(summary, changed)
+        first_reused = summaries[resumed] if resumed < count else None
+        self.splice(keep, resumed, added, added_starts, added_stops, delta)
+        self.stream = stream
+
+        # Reused statements, rechecked only if a name they looked up changed
+        if first_reused is not None:
+            self.recheck(changed, first_reused.order)
+
+        for name in changed[2] | changed[-1]:
+            if name in self.gotos and name not in self.declarations[2].orders:
+                self.missing.add(name)
+            else:
+                self.missing.discard(name)
+
+        return self.diagnostics()
+
+    def splice(self, keep, resumed, added, added_starts, added_stops, delta):
+        """
+        Replaces the statements [keep, resumed) with the added ones, the
+        statements after them moving by delta tokens.
+        """
+
+        shift_from, shift = min(self.shift_from, len(self.summaries)), self.shift
+        columns = (self.starts, self.stops)
+
+        # Kept statements past the old shift point get their shift applied
+        split = min(shift_from, keep)
+        for column in columns:
+            column[split:keep] = shifted(column[split:keep], shift)
+
+        # Reused statements before the old shift point are stored without
+        # it, but the new shift covers the whole tail
+        split = max(shift_from, resumed)
+        for column in columns:
+            column[resumed:split] = shifted(column[resumed:split], -shift)
+
+        self.summaries[keep:resumed] = added
+        self.starts[keep:resumed] = added_starts
+        self.stops[keep:resumed] = added_stops
+        self.shift_from = keep + len(added)
+        self.shift = shift + delta
+
+    def recheck(self, changed, first_order):
+        """
+        Reparses the statements from first_order on whose lookups of the
+        changed names no longer hold, and the ones after them looking up
+        a name a reparse changed in turn.
+        """
+
+        pending, queued = [], set()
+
+        def watch(names, index, after):
+            dependents = self.declarations[index].dependents
+            for name in names:
+                for summary in dependents.get(name, ()):
+                    if summary.order >= after and summary not in queued:
+                        queued.add(summary)
+                        heappush(pending, (summary.order, id(summary), summary))
+
+        for index in range(len(namespaces)):
+            watch(changed[index], index, first_order)
+
+        while pending:
+            _, _, summary = heappop(pending)
+            if summary.holds(self.declarations):
+                continue
+            index = self.index(summary)
+            start = self.start(index)
+            recheck = self.changes()
+            self.unregister(summary, recheck)
+            new, _ = self.statement(self.parser(self.stream, start), self.stream, summary.order)
+            new.fingerprint = summary.fingerprint
+            self.register(new, recheck)
+            self.summaries[index] = new
+            for names, total in zip(recheck, changed):
+                total.update(names)
+            for index in range(len(namespaces)):
+                watch(recheck[index], index, summary.order + 1)
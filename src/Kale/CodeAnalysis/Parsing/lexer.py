@@ -1,16 +1,58 @@
-from loguru import logger
+import re
 
 from CodeAnalysis.Syntax.syntaxtoken import SyntaxToken
+from CodeAnalysis.Syntax.tokenstream import TokenStream
 from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import operator_map, punctuator_map
+from CodeAnalysis.Syntax.nametable import NameTable
 
 from CodeAnalysis.Exceptions.illegalcharacter import IllegalCharacterException
 from CodeAnalysis.Exceptions.invalidtoken import InvalidTokenException
 
 
+# Characters that may not appear inside a string literal
+illegal_string_chars = ('\r', '\n', '\t', '\\', '%')
+
+# Tokens the parser never sees
+trivia_kinds = frozenset([SyntaxKind.NewLineToken, SyntaxKind.WhiteSpaceToken, SyntaxKind.Comments])
+
+# Master pattern of the scanner, every alternative is a named group so the
+# matched group tells next_token which kind of token it is looking at.
+# Compiled on first use: the MappedLexer of the command line scans bytes
+# with its own pattern and only needs this one for non-ASCII text.
+token_pattern = None
+
+
+def scanner_pattern():
+    global token_pattern
+    if token_pattern is None:
+        token_pattern = re.compile('|'.join([
+            r'(?P<whitespace>[ \t\r]+)',
+            r'(?P<newline>\n)',
+            r'(?P<string>"[^"\0\r\n\t\\%]*|\'[^\'\0\r\n\t\\%]*)',
+            r'(?P<number>\d+(?:\.(?P<fraction>\d+))?)',
+            r'(?P<identifier>[^\W\d_][^\W_]*)',
+            r'(?P<comment>//[^\n\0]*)',
+            '(?P<operator>' + '|'.join(re.escape(op) for op in operator_map) + ')',
+            '(?P<punctuator>' + '|'.join(re.escape(p) for p in punctuator_map) + ')',
+            r'(?P<bad>.)',
+        ]), re.DOTALL)
+    return token_pattern
+
+
 class Lexer:
-    def __init__(self, text):
+    def __init__(self, text, names=None, trace=None, stats=None, diagnostics=None):
+        """
+        Errors are raised unless a DiagnosticBag is passed as
+        `diagnostics`, they are then reported to it and the offending
+        characters skipped.
+        """
         self.source = text
         self.position = 0
+        self.names = names if names is not None else NameTable()
+        self.trace = trace
+        self.stats = stats
+        self.diagnostics = diagnostics
 
     def cur_char(self):
         if self.position >= len(self.source):
@@ -25,255 +67,198 @@ class Lexer:
     def advance(self, offset=0):
         self.position += 1 + offset
 
-    def next_token(self):
-        white_space = [' ', '\t', '\r']
-        token = None
-
-        # Literals
-        # ----------------------------------------------------------------
-
-        if self.position >= len(self.source):
-            token = SyntaxToken(SyntaxKind.EndOfFileToken)
-
-        elif self.cur_char() in white_space:
-            start = self.position
-            while self.cur_char() in white_space:
-                self.advance()
-            length = self.position - start
-            text = self.source[start:length + start]
-            return SyntaxToken(SyntaxKind.WhiteSpaceToken, text)
-
-        elif self.cur_char() == '\n':
-            token = SyntaxToken(SyntaxKind.NewLineToken)
+    def error(self, error):
+        """
+        Raises a lexing error, or reports it if there is a DiagnosticBag.
+        """
+        if self.diagnostics is None:
+            raise error
+        if isinstance(error, IllegalCharacterException):
+            # Escaped, the character may be a newline or a tab
+            self.diagnostics.report(f"Illegal character {error.char.encode('unicode_escape').decode()}", error.position)
+        else:
+            self.diagnostics.report(f"Invalid token {error.token!r}", error.position)
 
-        elif self.cur_char() == '\"':
-            self.advance()
-            start_pos = self.position
-
-            while self.cur_char() not in ['\"', '\0']:
-                if self.cur_char() in ['\r', '\n', '\t', '\\', '%']:
-                    # logger.error(f'Illegal character {self.cur_char()}')
-                    # exit(1)
-                    raise IllegalCharacterException(f'at {self.cur_char()}')
-
-                self.advance()
-
-            token_text = self.source[start_pos: self.position]
-            token = SyntaxToken(SyntaxKind.StringToken, token_text)
-        
-        elif self.cur_char() == '\'':
-            self.advance()
-            start_pos = self.position
-
-            while self.cur_char() not in ['\'', '\0']:
-                if self.cur_char() in ['\r', '\n', '\t', '\\', '%']:
-                    # logger.error(f'Illegal character {self.cur_char()}')
-                    # exit(1)
-                    raise IllegalCharacterException(f'at {self.cur_char()}')
-
-                self.advance()
-
-            token_text = self.source[start_pos: self.position]
-            token = SyntaxToken(SyntaxKind.StringToken, token_text)
-
-        elif self.cur_char().isdigit():
-            start_pos = self.position
-            while self.peek().isdigit():
-                self.advance()
-            if self.peek() == '.':
-                self.advance()
-
-                if not self.peek().isdigit():
-                    # logger.error(f'Invalid number {self.source[start_pos: self.position + 1]}')
-                    # exit(0)
-                    raise IllegalCharacterException(f'at {self.cur_char()}')
-                
-                while self.peek().isdigit():
-                    self.advance()
-            token_text = self.source[start_pos: self.position + 1]
-            token = SyntaxToken(SyntaxKind.NumberToken, token_text)
-
-        elif self.cur_char().isalpha():
-            start_pos = self.position
-            while self.peek().isalnum():
-                self.advance()
-
-            token_text = self.source[start_pos: self.position + 1]
-            keyword = SyntaxToken().check_keyword(token_text)
+    def next_token(self):
+        """
+        Scans the token starting at the current position.
+
+        Dispatch is a single match of the master pattern, the matched group
+        selects how the token is built.
+        """
+        position = self.position
+        source = self.source
+
+        if position >= len(source):
+            self.position = position + 1
+            return SyntaxToken(SyntaxKind.EndOfFileToken)
+
+        match = scanner_pattern().match(source, position)
+        group = match.lastgroup
+        text = match.group()
+        end = match.end()
+
+        if group == 'identifier':
+            names = self.names
+            name_id = names.intern(text)
+            keyword = names.kinds[name_id]
             if keyword is None:
-                token = SyntaxToken(SyntaxKind.IdentifierToken, token_text)
+                token = SyntaxToken(SyntaxKind.IdentifierToken, names.names[name_id])
             # Keywords
             else:
                 token = SyntaxToken(keyword)
 
-        # Punctuators
-        # ----------------------------------------------------------------
-
-        elif self.cur_char() == '(':
-            token = SyntaxToken(SyntaxKind.OpenParenthesisToken)
-
-        elif self.cur_char() == ')':
-            token = SyntaxToken(SyntaxKind.CloseParenthesisToken)
+        elif group == 'whitespace':
+            # Whitespace runs do not consume the character that ends them
+            self.position = end
+            return SyntaxToken(SyntaxKind.WhiteSpaceToken, text)
 
-        elif self.cur_char() == '[':
-            token = SyntaxToken(SyntaxKind.OpenBracketsToken)
+        elif group == 'operator':
+            token = SyntaxToken(operator_map[text], text)
 
-        elif self.cur_char() == ']':
-            token = SyntaxToken(SyntaxKind.CloseBracketsToken)
+        elif group == 'punctuator':
+            token = SyntaxToken(punctuator_map[text])
 
-        elif self.cur_char() == '{':
-            token = SyntaxToken(SyntaxKind.OpenBraceToken)
+        elif group == 'newline':
+            token = SyntaxToken(SyntaxKind.NewLineToken)
 
-        elif self.cur_char() == '}':
-            token = SyntaxToken(SyntaxKind.CloseBraceToken)
+        elif group == 'number':
+            token = SyntaxToken(SyntaxKind.NumberToken, text)
+            if source[end:end + 1] == '.' and match.group('fraction') is None:
+                self.error(IllegalCharacterException('at .', end))
+                # Skip the stray '.'
+                end += 1
+
+        elif group == 'string':
+            token = SyntaxToken(SyntaxKind.StringToken, text[1:])
+            terminator = source[end:end + 1]
+            if terminator in illegal_string_chars:
+                # The string ends before the illegal character
+                self.error(IllegalCharacterException(f'at {terminator}', end))
+            else:
+                # Step over the closing quote
+                end += 1
 
-        elif self.cur_char() == ',':
-            token = SyntaxToken(SyntaxKind.CommaToken)
+        elif group == 'comment':
+            token = SyntaxToken(SyntaxKind.Comments, text)
+            # Step over the terminating newline
+            end += 1
 
-        elif self.cur_char() == ';':
-            token = SyntaxToken(SyntaxKind.SemicolonToken)
+        # illegal token
+        else:
+            token = SyntaxToken(SyntaxKind.BadToken, text)
 
-        # Operators
-        # ----------------------------------------------------------------
+        self.position = end
+        return token
 
-        elif self.cur_char() == ':':
-            token = SyntaxToken(SyntaxKind.ColonToken, self.cur_char())
+    def tokens(self):
+        """
+        Yields the significant tokens one at a time, ending with the
+        EndOfFileToken. Whitespace, newlines and comments are dropped.
 
-        elif self.cur_char() == '+':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.PlusEqualsToken, last_char + self.cur_char())
-            elif self.peek() == '+':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.PlusPlusToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.PlusToken, self.cur_char())
-
-        elif self.cur_char() == '-':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.MinusEqualsToken, last_char + self.cur_char())
-            elif self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.MinusMinusToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.MinusToken, self.cur_char())
-
-        elif self.cur_char() == '*':
-            if self.peek() == '*':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.DoubleStarToken, last_char + self.cur_char())
-            elif self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.StarEqualsToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.StartToken, self.cur_char())
-
-        elif self.cur_char() == '/':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.SlashEqualsToken, last_char + self.cur_char())
-            # comments
-            elif self.peek() == '/':
-                start = self.position
-                while self.cur_char() not in ['\n', '\0']:
-                    self.advance()
-                length = self.position - start
-                text = self.source[start:length + start]
-                token = SyntaxToken(SyntaxKind.Comments, text)
-            else:
-                token = SyntaxToken(SyntaxKind.SlashToken, self.cur_char())
-
-        elif self.cur_char() == '|':
-            token = SyntaxToken(SyntaxKind.PipeToken, self.cur_char())
-
-        elif self.cur_char() == '&':
-            token = SyntaxToken(SyntaxKind.AmpersandToken, self.cur_char())
-
-        elif self.cur_char() == '<':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.LessOrEqualsToken, last_char + self.cur_char())
-            elif self.peek() == '<':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.LeftShiftToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.LessToken, self.cur_char())
-
-        elif self.cur_char() == '>':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.GreaterOrEqualsToken, last_char + self.cur_char())
-            elif self.peek() == '>':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.RightShiftToken, last_char + self.cur_char())
+        Exceptions: Raises InvalidTokenException on the first bad token,
+        see __init__.
+        """
+        next_token = self.next_token
+        while True:
+            start = self.position
+            token = next_token()
+            kind = token.kind
+            if kind is SyntaxKind.EndOfFileToken:
+                token.position = start
+                yield token
+                return
+            if kind is SyntaxKind.BadToken:
+                self.error(InvalidTokenException(token.value, start))
+            elif kind not in trivia_kinds:
+                token.position = start
+                yield token
+
+    def spans(self):
+        """
+        Yields (kind, start, end) for the significant tokens, ending with
+        the EndOfFileToken, without building SyntaxToken objects. The
+        token's value, if it has one, is source[start:end], so a string's
+        span starts after its opening quote while its token's position,
+        as tokens() gives it, is the quote.
+
+        Exceptions: Same as tokens().
+        """
+        source = self.source
+        length = len(source)
+        match_at = scanner_pattern().match
+        names = self.names
+        position = self.position
+
+        while position < length:
+            match = match_at(source, position)
+            group = match.lastgroup
+            start, end = match.span()
+            position = end
+
+            if group == 'identifier':
+                kind = names.kinds[names.intern(match.group())] or SyntaxKind.IdentifierToken
+            elif group == 'whitespace' or group == 'newline':
+                continue
+            elif group == 'operator':
+                kind = operator_map[match.group()]
+            elif group == 'punctuator':
+                kind = punctuator_map[match.group()]
+            elif group == 'number':
+                if source[end:end + 1] == '.' and match.group('fraction') is None:
+                    self.error(IllegalCharacterException('at .', end))
+                    position += 1
+                kind = SyntaxKind.NumberToken
+            elif group == 'string':
+                terminator = source[end:end + 1]
+                if terminator in illegal_string_chars:
+                    self.error(IllegalCharacterException(f'at {terminator}', end))
+                else:
+                    position += 1
+                kind = SyntaxKind.StringToken
+                start += 1
+            elif group == 'comment':
+                position += 1
+                continue
             else:
-                token = SyntaxToken(SyntaxKind.GreaterToken, self.cur_char())
+                self.error(InvalidTokenException(match.group(), start))
+                continue
 
-        elif self.cur_char() == '=':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.EqualsEqualsToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.EqualsToken, self.cur_char())
+            yield kind, start, end
 
-        elif self.cur_char() == '.':
-            token = SyntaxToken(SyntaxKind.DotToken)
+        self.position = position + 1
+        yield SyntaxKind.EndOfFileToken, length, length
 
-        elif self.cur_char() == '%':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.PercentEqualsToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.PercentToken, self.cur_char())
+    def token_stream(self):
+        """
+        Lexes the whole source into a compact TokenStream.
+        """
 
-        elif self.cur_char() == '!':
-            if self.peek() == '=':
-                last_char = self.cur_char()
-                self.advance()
-                token = SyntaxToken(SyntaxKind.BangEqualsToken, last_char + self.cur_char())
-            else:
-                token = SyntaxToken(SyntaxKind.BangToken, self.cur_char())
+        if self.stats is not None:
+            with self.stats.phase('lex'):
+                stream = self.fill_stream()
+            self.stats.tokens += len(stream)
+            return stream
 
-        elif self.cur_char() == '~':
-            token = SyntaxToken(SyntaxKind.TildeToken, self.cur_char())
+        return self.fill_stream()
 
-        elif self.cur_char() == '^':
-            token = SyntaxToken(SyntaxKind.HatToken, self.cur_char())
+    def fill_stream(self):
+        stream = TokenStream(self.source)
+        append = stream.append
+        for kind, start, end in self.spans():
+            append(kind, start, end)
+        return stream
 
-        # illegal token
+    def lex(self):
+        if self.stats is not None:
+            with self.stats.phase('lex'):
+                token_list = list(self.tokens())
+            self.stats.tokens += len(token_list)
         else:
-            token = SyntaxToken(SyntaxKind.BadToken, self.cur_char())
-
-        self.advance()
-        return token
+            token_list = list(self.tokens())
 
-    def lex(self):
-        token_list = []
-        while True:
-            token = self.next_token()
-            if token.kind == SyntaxKind.EndOfFileToken:
-                token_list.append(token)
-                break
-            if token.kind == SyntaxKind.BadToken:
-                raise InvalidTokenException(token.value)
-            if token.kind not in [SyntaxKind.NewLineToken, SyntaxKind.WhiteSpaceToken, SyntaxKind.Comments]:
-                token_list.append(token)
-
-        for x in token_list:
-            print(x)
+        if self.trace is not None:
+            for x in token_list:
+                self.trace.token(x)
 
         return token_list
@@ -0,0 +1,221 @@
+import mmap
+import os
+import re
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Syntax.syntaxtoken import SyntaxToken
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import keyword_map, operator_map, punctuator_map
+
+from CodeAnalysis.Exceptions.illegalcharacter import IllegalCharacterException
+from CodeAnalysis.Exceptions.invalidtoken import InvalidTokenException
+
+
+keyword_bytes_map = {word.encode('ascii'): kind for word, kind in keyword_map.items()}
+operator_bytes_map = {op.encode('ascii'): (kind, op) for op, kind in operator_map.items()}
+punctuator_bytes_map = {p.encode('ascii'): kind for p, kind in punctuator_map.items()}
+
+# Byte values that may not appear inside a string literal
+illegal_string_bytes = frozenset(b'\r\n\t\\%')
+
+# Bytes version of the Lexer's master pattern. Identifiers are ASCII only,
+# a token touching a byte >= 0x80 is rescanned from its decoded word run.
+byte_token_pattern = re.compile(b'|'.join([
+    rb'(?P<whitespace>[ \t\r]+)',
+    rb'(?P<newline>\n)',
+    rb'(?P<string>"[^"\0\r\n\t\\%]*|\'[^\'\0\r\n\t\\%]*)',
+    rb'(?P<number>[0-9]+(?:\.(?P<fraction>[0-9]+))?)',
+    rb'(?P<identifier>[A-Za-z][A-Za-z0-9]*)',
+    rb'(?P<unicode>[\x80-\xff])',
+    rb'(?P<comment>//[^\n\0]*)',
+    b'(?P<operator>' + b'|'.join(re.escape(op) for op in operator_bytes_map) + b')',
+    b'(?P<punctuator>' + b'|'.join(re.escape(p) for p in punctuator_bytes_map) + b')',
+    rb'(?P<bad>.)',
+]), re.DOTALL)
+
+word_run_pattern = re.compile(rb'[A-Za-z0-9\x80-\xff]+')
+
+
+class MappedLexer(Lexer):
+    """
+    Lexer over a bytes-like UTF-8 source, typically a read-only mmap of the
+    source file, so no decoded copy of the file is ever held.
+
+    Only identifier, string and comment slices are decoded, and only when a
+    token for them is built. Positions are byte offsets,
+    DiagnosticBag.located turns them into character columns.
+    """
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Maps the file at path read-only and returns a lexer over it.
+        """
+
+        with open(path, 'rb') as source_file:
+            if os.fstat(source_file.fileno()).st_size == 0:
+                return cls(b'', **kwargs)
+            return cls(mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ), **kwargs)
+
+    def close(self):
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+
+    def next_token(self):
+        """
+        Scans the token starting at the current byte position.
+        """
+
+        if self.position >= len(self.source):
+            self.position += 1
+            return SyntaxToken(SyntaxKind.EndOfFileToken)
+
+        return self.build(byte_token_pattern.match(self.source, self.position))
+
+    def build(self, match):
+        """
+        Builds the token for a match of the byte pattern and moves past it.
+        """
+
+        source = self.source
+        group = match.lastgroup
+        end = match.end()
+
+        if group == 'identifier' and source[end:end + 1] < b'\x80':
+            text = match.group()
+            keyword = keyword_bytes_map.get(text)
+            if keyword is None:
+                names = self.names
+                token = SyntaxToken(SyntaxKind.IdentifierToken, names.names[names.intern(text.decode('ascii'))])
+            # Keywords
+            else:
+                token = SyntaxToken(keyword)
+
+        elif group == 'whitespace':
+            self.position = end
+            return SyntaxToken(SyntaxKind.WhiteSpaceToken, match.group().decode('ascii'))
+
+        elif group == 'operator':
+            kind, text = operator_bytes_map[match.group()]
+            token = SyntaxToken(kind, text)
+
+        elif group == 'punctuator':
+            token = SyntaxToken(punctuator_bytes_map[match.group()])
+
+        elif group == 'newline':
+            token = SyntaxToken(SyntaxKind.NewLineToken)
+
+        elif group == 'number':
+            token = SyntaxToken(SyntaxKind.NumberToken, match.group().decode('ascii'))
+            if source[end:end + 1] == b'.' and match.group('fraction') is None:
+                self.error(IllegalCharacterException('at .', end))
+                # Skip the stray '.'
+                end += 1
+
+        elif group == 'string':
+            token = SyntaxToken(SyntaxKind.StringToken, match.group()[1:].decode('utf-8'))
+            terminator = source[end:end + 1]
+            if terminator and terminator[0] in illegal_string_bytes:
+                # The string ends before the illegal character
+                self.error(IllegalCharacterException(f'at {terminator.decode("ascii")}', end))
+            else:
+                # Step over the closing quote
+                end += 1
+
+        elif group == 'comment':
+            token = SyntaxToken(SyntaxKind.Comments, match.group().decode('utf-8'))
+            # Step over the terminating newline
+            end += 1
+
+        elif group == 'unicode' or group == 'identifier':
+            # Slow path: let the str scanner decide where the token ends
+            start = match.start()
+            run = word_run_pattern.match(source, start).group().decode('utf-8')
+            lexer = Lexer(run)
+            token = lexer.next_token()
+            end = start + len(run[:lexer.position].encode('utf-8'))
+
+        # illegal token
+        else:
+            token = SyntaxToken(SyntaxKind.BadToken, match.group().decode('ascii'))
+
+        self.position = end
+        return token
+
+    def tokens(self):
+        """
+        Yields the significant tokens, skipping trivia without decoding it.
+        """
+
+        source = self.source
+        length = len(source)
+        match_at = byte_token_pattern.match
+        build = self.build
+        while True:
+            start = self.position
+            if start >= length:
+                self.position += 1
+                yield SyntaxToken(SyntaxKind.EndOfFileToken, position=start)
+                return
+
+            match = match_at(source, start)
+            group = match.lastgroup
+            if group == 'whitespace' or group == 'newline':
+                self.position = match.end()
+                continue
+            if group == 'comment':
+                self.position = match.end() + 1
+                continue
+
+            token = build(match)
+            if token.kind is SyntaxKind.BadToken:
+                self.error(InvalidTokenException(token.value, start))
+                continue
+            token.position = start
+            yield token
+
+    def spans(self):
+        """
+        Yields (kind, start, end) byte spans for the significant tokens.
+        """
+
+        source = self.source
+        length = len(source)
+        match_at = byte_token_pattern.match
+        position = self.position
+
+        while position < length:
+            match = match_at(source, position)
+            group = match.lastgroup
+            start, end = match.span()
+            position = end
+
+            if group == 'identifier' and source[end:end + 1] < b'\x80':
+                kind = keyword_bytes_map.get(match.group(), SyntaxKind.IdentifierToken)
+            elif group == 'whitespace' or group == 'newline':
+                continue
+            elif group == 'operator':
+                kind = operator_bytes_map[match.group()][0]
+            elif group == 'punctuator':
+                kind = punctuator_bytes_map[match.group()]
+            elif group == 'comment':
+                position += 1
+                continue
+            else:
+                # Numbers, strings and non-ASCII runs share build()'s checks
+                self.position = start
+                token = self.build(match)
+                kind = token.kind
+                position = self.position
+                if kind is SyntaxKind.BadToken:
+                    self.error(InvalidTokenException(token.value, start))
+                    continue
+                if kind is SyntaxKind.StringToken:
+                    start += 1
+                elif kind is not SyntaxKind.NumberToken:
+                    end = position
+
+            yield kind, start, end
+
+        self.position = position + 1
+        yield SyntaxKind.EndOfFileToken, length, length
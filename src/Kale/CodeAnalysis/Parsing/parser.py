@@ -1,24 +1,176 @@
-import sys
 from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import operator_map
+from CodeAnalysis.Parsing.tokenbuffer import TokenBuffer
+from CodeAnalysis.Parsing.parsetable import statement_rules
+from CodeAnalysis.Syntax.nametable import NameTable
+from CodeAnalysis.Tracing.tracesink import TextSink
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Exceptions.parseerror import ParseException
+from CodeAnalysis.Syntax.syntaxtree import (
+    AssignmentStatement, BinaryExpression, CompilationUnit, DeclarationStatement, ForStatement, GotoStatement,
+    IfStatement, InputExpression, LabelStatement, LiteralExpression, NameExpression, PrintStatement,
+    UnaryExpression, WhileStatement,
+)
+
+# Rules reported to an attached trace sink, expression() reports the
+# primaries and prefix operators it parses itself
+traced_rules = ('program', 'statement', 'expression')
+
+# Binding powers of the operators following an operand, (left, right) for
+# the infix ones and (left, None) for the postfix ones. An operator only
+# takes the operand before it if its left power is above the power the
+# operand is parsed at, the operand after it is parsed at its right
+# power. Left associative operators bind one tighter on their right, `**`
+# binds one looser so it is right associative. The levels are C's, with
+# `**` above the prefix operators as in Python.
+operator_powers = {
+    SyntaxKind.PipeToken:               (10, 11),
+    SyntaxKind.HatToken:                (20, 21),
+    SyntaxKind.AmpersandToken:          (30, 31),
+    SyntaxKind.EqualsEqualsToken:       (40, 41),
+    SyntaxKind.BangEqualsToken:         (40, 41),
+    SyntaxKind.LessToken:               (50, 51),
+    SyntaxKind.LessOrEqualsToken:       (50, 51),
+    SyntaxKind.GreaterToken:            (50, 51),
+    SyntaxKind.GreaterOrEqualsToken:    (50, 51),
+    SyntaxKind.LeftShiftToken:          (60, 61),
+    SyntaxKind.RightShiftToken:         (60, 61),
+    SyntaxKind.PlusToken:               (70, 71),
+    SyntaxKind.MinusToken:              (70, 71),
+    SyntaxKind.StartToken:              (80, 81),
+    SyntaxKind.SlashToken:              (80, 81),
+    SyntaxKind.PercentToken:            (80, 81),
+    SyntaxKind.DoubleStarToken:         (100, 99),
+    SyntaxKind.PlusPlusToken:           (110, None),
+    SyntaxKind.MinusMinusToken:         (110, None),
+}
+
+# Operand of the prefix operators, between `*` and `**`
+prefix_power = 90
+
+prefix_kinds = frozenset([
+    SyntaxKind.PlusToken, SyntaxKind.MinusToken, SyntaxKind.BangToken,
+    SyntaxKind.TildeToken, SyntaxKind.PlusPlusToken, SyntaxKind.MinusMinusToken,
+])
+
+# The operator each compound assignment applies
+compound_assignments = {
+    SyntaxKind.PlusEqualsToken:         SyntaxKind.PlusToken,
+    SyntaxKind.MinusEqualsToken:        SyntaxKind.MinusToken,
+    SyntaxKind.StarEqualsToken:         SyntaxKind.StartToken,
+    SyntaxKind.SlashEqualsToken:        SyntaxKind.SlashToken,
+    SyntaxKind.PercentEqualsToken:      SyntaxKind.PercentToken,
+    SyntaxKind.DoubleStarEqualsToken:   SyntaxKind.DoubleStarToken,
+    SyntaxKind.LeftShiftEqualsToken:    SyntaxKind.LeftShiftToken,
+    SyntaxKind.RightShiftEqualsToken:   SyntaxKind.RightShiftToken,
+    SyntaxKind.AmpersandEqualsToken:    SyntaxKind.AmpersandToken,
+    SyntaxKind.PipeEqualsToken:         SyntaxKind.PipeToken,
+    SyntaxKind.HatEqualsToken:          SyntaxKind.HatToken,
+}
+
+# Operators that compare their operands, the only ones taking strings
+comparison_kinds = frozenset([
+    SyntaxKind.GreaterToken, SyntaxKind.GreaterOrEqualsToken, SyntaxKind.LessToken,
+    SyntaxKind.LessOrEqualsToken, SyntaxKind.EqualsEqualsToken, SyntaxKind.BangEqualsToken,
+])
+
+operator_text = {kind: text for text, kind in operator_map.items()}
+
+# Declarations that infer their type and so need an initializer
+inferred_keywords = frozenset([SyntaxKind.LetKeyword, SyntaxKind.VarKeyword])
+
+bool_literals = {SyntaxKind.TrueKeyword: True, SyntaxKind.FalseKeyword: False}
+
+# Tokens panic mode recovery stops at: the first token of a statement
+# (other than an assignment's identifier), the end of a block or the file
+sync_kinds = frozenset(statement_rules).difference([SyntaxKind.IdentifierToken]).union([
+    SyntaxKind.CloseBraceToken, SyntaxKind.EndOfFileToken,
+])
 
-import colorama, termcolor
-colorama.init()
 
 class Parser:
-    def __init__(self, token_list, debug=False):
-        self.token_list = token_list
+    def __init__(self, token_list, debug=False, lookahead=4, names=None, trace=None, stats=None,
+                 diagnostics=None, recover=True, generator=None):
+        """
+        token_list can be a list of tokens or any iterable, such as
+        Lexer.tokens(). Tokens are pulled lazily through a ring buffer
+        that allows peeking up to `lookahead` tokens past the current one.
+
+        Symbols and labels are kept as ids of the `names` table, pass the
+        Lexer's table to share it. The symbols of string variables are in
+        `strings` as well, operators other than comparisons are reported on
+        strings since no backend has them.
+
+        Parse events go to the `trace` sink, debug=True attaches a TextSink.
+        Timings and the statement count go to `stats` if given.
+
+        Errors are reported to the `diagnostics` bag and parsing resumes at
+        the next statement. With recover=False the first error raises a
+        ParseException instead.
+
+        With a CodeGenerator as `generator` every top level statement is
+        handed to it as soon as it is parsed, and not kept in the returned
+        CompilationUnit. Generation stops at the first error.
+        """
+        self.tokens = TokenBuffer(token_list, lookahead)
         self.position = -1
         self.debug = debug
 
         # ----
+        self.names = names if names is not None else NameTable()
         self.symbols = set()
+        self.strings = set()
         self.labels_declared = set()
         self.labels_gotoed = set()
+        self.statement_count = 0
+        self.stats = stats
+        self.diagnostics = diagnostics if diagnostics is not None else DiagnosticBag()
+        self.recover = recover
+        self.goto_tokens = {}
+        self.generator = generator
 
         # ----
         self.cur_token = None
+        self.trace = None
         
         self.advance()
+
+        if trace is None and debug:
+            trace = TextSink()
+        if trace is not None:
+            self.attach(trace)
+
+    def attach(self, sink):
+        """
+        Routes rule and token events to sink.
+
+        The rules and advance() are wrapped on this instance only, so a
+        Parser without a sink runs the plain methods at no extra cost.
+        """
+        self.trace = sink
+
+        for rule in traced_rules:
+            setattr(self, rule, self.traced(rule, getattr(Parser, rule).__get__(self)))
+
+        advance = Parser.advance.__get__(self)
+
+        def traced_advance(offset=0):
+            for _ in range(1 + offset):
+                sink.consume(self.cur_token, self.position)
+                advance()
+
+        self.advance = traced_advance
+
+    def traced(self, rule, method):
+        sink = self.trace
+
+        def traced_rule(*args):
+            sink.enter(rule, self.cur_token, self.position)
+            node = method(*args)
+            sink.exit(rule, self.cur_token, self.position)
+            return node
+
+        return traced_rule
         
     def check_token(self, kind):
         """
@@ -27,12 +179,13 @@ class Parser:
 
         return kind == self.cur_token.kind
 
-    def peek(self, kind):
+    def peek(self, kind, k=1):
         """
-        Checks whether passed token kind matches the next token.
+        Checks whether passed token kind matches the k-th token after the
+        current one.
         """
 
-        return self.token_list[self.position + 1]
+        return kind == self.tokens.peek(k - 1).kind
 
     def match(self, kind):
         """
@@ -49,634 +202,545 @@ class Parser:
         """
         Sets the current token to the next token.
         """
+        for _ in range(offset):
+            self.tokens.advance()
         self.position += 1 + offset
-        if self.position < len(self.token_list):
-            self.cur_token = self.token_list[self.position]
+        self.cur_token = self.tokens.advance()
 
-    def is_comparison_operator(self):
+    def name_id(self):
         """
-        Checks whether the current token is a comparison operator.
+        Returns the interned id of the current token's value.
         """
 
-        return (
-                self.check_token(SyntaxKind.GreaterToken) or self.check_token(SyntaxKind.GreaterOrEqualsToken) or
-                self.check_token(SyntaxKind.LessToken) or self.check_token(SyntaxKind.LessOrEqualsToken) or
-                self.check_token(SyntaxKind.EqualsEqualsToken) or self.check_token(SyntaxKind.BangEqualsToken)
-        )
+        return self.names.intern(self.cur_token.value)
+
+    def report(self, message, token=None):
+        """
+        Reports an error at token, the current token by default, and
+        carries on.
+
+        Exceptions: Raises ParseException if recovery is off.
+        """
+        token = token if token is not None else self.cur_token
+        if not self.recover:
+            raise ParseException(message, token)
+        self.diagnostics.report(message, token.position)
 
     def abort(self, message):
         """
-        Aborts the program with the passed message.
+        Reports a syntax error and abandons the current statement.
+
+        Exceptions: Raises ParseException, caught by the enclosing
+        statement list which then synchronizes.
+        """
+        self.report(message)
+        raise ParseException(message, self.cur_token)
+
+    def synchronize(self, start):
         """
-        print(termcolor.colored(f"Error: {message}", "red"))
-        sys.exit()
+        Panic mode recovery: skips to the next token of sync_kinds.
+
+        At least one token is skipped if the failed statement started at
+        the current position, so every error moves the parser forward and
+        recovery can't loop.
+        """
+        if self.position == start and not self.check_token(SyntaxKind.EndOfFileToken):
+            self.advance()
+        while self.cur_token.kind not in sync_kinds:
+            self.advance()
 
     # Production rules.
     def program(self):
         """
         Program entry point
+
+        Returns the CompilationUnit of the program.
         """
-        if self.debug:
-            print("Program")
+        if self.stats is not None:
+            with self.stats.phase('parse'):
+                unit = self.compilation_unit()
+            self.stats.statements += self.statement_count
+            return unit
 
-        while not self.check_token(SyntaxKind.EndOfFileToken):
-            self.statement()
+        return self.compilation_unit()
+
+    def compilation_unit(self):
+        """
+        Statements up to the EndOfFileToken, then the goto target check.
+        """
+        generator = self.generator
+        statements = self.statement_list(SyntaxKind.EndOfFileToken, generator)
 
         for label in self.labels_gotoed:
             if label not in self.labels_declared:
-                self.abort("Attempting to goto to undeclared label: " + label)
+                self.report("Attempting to goto to undeclared label: " + self.names.name(label),
+                            self.goto_tokens.get(label))
+
+        if generator is not None and not len(self.diagnostics):
+            generator.end()
+
+        return CompilationUnit(statements)
+
+    def statement_list(self, end, generator=None):
+        """
+        Statements up to a token of kind `end`, the EndOfFileToken or a full
+        diagnostics bag. A statement with a syntax error is dropped and
+        parsing resumes after it.
+
+        Statements go to `generator` instead of the returned list if given.
+        """
+        statements = []
+        diagnostics = self.diagnostics
+        while not (self.check_token(end) or self.check_token(SyntaxKind.EndOfFileToken) or diagnostics.full):
+            start = self.position
+            try:
+                node = self.statement()
+                if generator is None:
+                    statements.append(node)
+                elif not len(diagnostics):
+                    generator.statement(node)
+            except ParseException:
+                if not self.recover:
+                    raise
+                self.synchronize(start)
+
+        return statements
+
+    def block(self):
+        """
+        Braced statement list.
+        """
+        self.match(SyntaxKind.OpenBraceToken)
+        body = self.statement_list(SyntaxKind.CloseBraceToken)
+        self.match(SyntaxKind.CloseBraceToken)
+
+        return body
 
     def statement(self):
         """
         Statements Parser
-        """
 
-        if self.check_token(SyntaxKind.PrintKeyword):
-            """
-            Print Statement
-            
-            Syntax: 
-                1.  print(StringKeyword)
-                2.  print(EXPRESSION)
-            """
-            if self.debug:
-                print("Print-Statement")
+        The current token selects the rule of the statement in
+        statement_rules, the table generated from grammar/grammar.txt,
+        and the method of that rule parses it.
 
-            self.advance()
+        Returns the syntax node of the parsed statement.
+        """
+        self.statement_count += 1
 
-            # Body
-            # ----
-            self.match(SyntaxKind.OpenParenthesisToken)
-            if self.check_token(SyntaxKind.StringToken):
-                self.advance()
-            else:
-                self.expression()
-            self.match(SyntaxKind.CloseParenthesisToken)
-        
-        elif self.check_token(SyntaxKind.IfKeyword):
-            """
-            If/If-else Statement
-            
-            Syntax: 
-                1.  if(EXPRESSION) 
-                    { 
-                        STATEMENTS 
-                    }
-                    
-                2.  if (COMPARISON) 
-                    {
-                        STATEMENTS
-                    } else {
-                        STATEMENTS        
-                    }
-                3.  if (COMPARISON)
-                    {
-                        STATEMENTS
-                    } else if (COMPARISON)
-                    {
-                        STATEMENTS
-                    } else {
-                        STATEMENTS
-                    }
-            """
-            if self.debug:
-                print("If-Statement")
+        method = statement_methods.get(self.cur_token.kind)
+        if method is None:
+            self.abort(f"Invalid statement at {self.cur_token.kind.name}"
+                       + (f" {self.cur_token.value}" if self.cur_token.value is not None else ""))
+        return method(self)
 
-            self.advance()
+    def print_statement(self):
+        """
+        Print Statement
 
-            # Comparison
-            # ----
-            self.match(SyntaxKind.OpenParenthesisToken)
-            self.comparison()
-            self.match(SyntaxKind.CloseParenthesisToken)
+        Syntax:
+            1.  print(EXPRESSION)
+        """
 
-            # Body
-            # ----
-            self.match(SyntaxKind.OpenBraceToken)
-            while not self.check_token(SyntaxKind.CloseBraceToken):
-                self.statement()
+        self.advance()
 
-            self.match(SyntaxKind.CloseBraceToken)
+        # Body
+        # ----
+        self.match(SyntaxKind.OpenParenthesisToken)
+        expression = self.expression()
+        self.match(SyntaxKind.CloseParenthesisToken)
 
-            # Extensions
-            # ----
-            while self.check_token(SyntaxKind.ElseKeyword):
-                self.advance()
+        return PrintStatement(expression)
 
-                if self.check_token(SyntaxKind.IfKeyword):
-                    if self.debug:
-                        print("Else-If-Statement")
-                    
-                    self.advance()
-
-                    # Comparison
-                    # ----
-                    self.match(SyntaxKind.OpenParenthesisToken)
-                    self.comparison()
-                    self.match(SyntaxKind.CloseParenthesisToken)
-                    
-                    # Body
-                    # ----
-                    self.match(SyntaxKind.OpenBraceToken)
-                    while not self.check_token(SyntaxKind.CloseBraceToken):
-                        self.statement()
-
-                    self.match(SyntaxKind.CloseBraceToken)
-
-                elif self.check_token(SyntaxKind.OpenBraceToken):
-                    if self.debug:
-                        print("Else-Statement")
-                    
-                    self.advance()
-                    
-                    # Body
-                    # ----
-                    while not self.check_token(SyntaxKind.CloseBraceToken):
-                        self.statement()
-
-                    self.match(SyntaxKind.CloseBraceToken)
-                    
-                    break
+    def if_statement(self):
+        """
+        If/If-else Statement
 
-        elif self.check_token(SyntaxKind.WhileKeyword):
-            """
-            While Statement
-
-            Syntax:
-                1.  while(EXPRESSION)
-                    {
-                        STATEMENTS
-                    }
-            """
-            if self.debug:
-                print("While-Statement")
-            
-            self.advance()
+        Syntax:
+            1.  if(EXPRESSION)
+                {
+                    STATEMENTS
+                }
+
+            2.  if (EXPRESSION)
+                {
+                    STATEMENTS
+                } else {
+                    STATEMENTS
+                }
+            3.  if (EXPRESSION)
+                {
+                    STATEMENTS
+                } else if (EXPRESSION)
+                {
+                    STATEMENTS
+                } else {
+                    STATEMENTS
+                }
+        """
 
-            # Comparison
-            # ----
-            self.match(SyntaxKind.OpenParenthesisToken)
-            self.comparison()
-            self.match(SyntaxKind.CloseParenthesisToken)
+        self.advance()
 
-            # Body
-            # ----
-            self.match(SyntaxKind.OpenBraceToken)
-            while not self.check_token(SyntaxKind.CloseBraceToken):
-                self.statement()
-            
-            self.match(SyntaxKind.CloseBraceToken)
-        
-        elif self.check_token(SyntaxKind.ForKeyword):
-            """
-            For Statement
-
-            Syntax:
-                1.  for(INITIALIZATION; CONDITION; INCREMENT)
-                    {
-                        STATEMENTS
-                    }
-            """
-            if self.debug:
-                print("For-Statement")
-            
-            self.advance()
+        # Comparison
+        # ----
+        self.match(SyntaxKind.OpenParenthesisToken)
+        condition = self.expression()
+        self.match(SyntaxKind.CloseParenthesisToken)
 
-            # Initialization, Condition, Increment
-            # ----
-            self.match(SyntaxKind.OpenParenthesisToken)
-            self.statement()
-            self.match(SyntaxKind.SemiToken)
-            self.comparison()
-            self.match(SyntaxKind.SemiToken)
-            self.expression()
-            self.match(SyntaxKind.CloseParenthesisToken)
-
-            # Body
-            # ----
-            self.match(SyntaxKind.OpenBraceToken)
-            while not self.check_token(SyntaxKind.CloseBraceToken):
-                self.statement()
-            
-            self.match(SyntaxKind.CloseBraceToken)
-
-        elif self.check_token(SyntaxKind.LabelKeyword):
-            """
-            Label Statement
-
-            Syntax:
-                1.  label IDENTIFIER:
-            """
-            if self.debug:
-                print("Label-Statement")
+        # Body
+        # ----
+        body = self.block()
 
+        branches = [(condition, body)]
+        else_body = None
+
+        # Extensions
+        # ----
+        while self.check_token(SyntaxKind.ElseKeyword):
             self.advance()
 
-            # ----
-            if self.cur_token.value in self.labels_declared:
-                self.abort(f"Label already exists: {self.cur_token.value}")
-            self.labels_declared.add(self.cur_token.value)
+            if self.check_token(SyntaxKind.IfKeyword):
 
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-            self.match(SyntaxKind.ColonToken)
-
-        elif self.check_token(SyntaxKind.GotoKeyword):
-            """
-            Goto Statement
-
-            Syntax:
-                1.  goto IDENTIFIER
-            """
-            if self.debug:
-                print("Goto-Statement")
-    
-            self.advance()
-            
-            # ----
-            self.labels_gotoed.add(self.cur_token.value)
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-        
-        elif self.check_token(SyntaxKind.IntKeyword):
-            """
-            Integer Declaration
-
-            Syntax:
-                1.  int IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Int-Declaration")
-            
-            self.advance()
+                self.advance()
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                self.expression()
-
-        elif self.check_token(SyntaxKind.CharKeyword):
-            """
-            Char Declaration
-
-            Syntax:
-                1.  char IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Char-Declaration")
-            
-            self.advance()
+                # Comparison
+                # ----
+                self.match(SyntaxKind.OpenParenthesisToken)
+                condition = self.expression()
+                self.match(SyntaxKind.CloseParenthesisToken)
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                self.expression()
-
-        elif self.check_token(SyntaxKind.FloatKeyword):
-            """
-            Float Declaration
-
-            Syntax:
-                1.  float IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Float-Declaration")
-            
-            self.advance()
+                # Body
+                # ----
+                body = self.block()
+                branches.append((condition, body))
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
             else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
 
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                self.expression()
-        
-        elif self.check_token(SyntaxKind.StringKeyword):
-            """
-            String Declaration
-
-            Syntax:
-                1.  string IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("String-Declaration")
-            
-            self.advance()
+                # Body
+                # ----
+                else_body = self.block()
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
+                break
 
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                self.expression()
-        
-        
-        elif self.check_token(SyntaxKind.BoolKeyword):
-            """
-            Boolean Declaration
-
-            Syntax:
-                1.  bool IDENTIFIER = true
-                2.  bool IDENTIFIER = false
-                3.  bool IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Bool-Declaration")
-            
-            self.advance()
+        # Else-ifs nest as the else body of the previous branch
+        for condition, body in reversed(branches):
+            node = IfStatement(condition, body, else_body)
+            else_body = [node]
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                if self.check_token(SyntaxKind.TrueKeyword):
-                    self.match(SyntaxKind.TrueKeyword)
-                elif self.check_token(SyntaxKind.FalseKeyword):
-                    self.match(SyntaxKind.FalseKeyword)
-                else:
-                    self.expression()
-
-        elif self.check_token(SyntaxKind.DoubleKeyword):
-            """
-            Double Declaration
-
-            Syntax:
-                1.  double IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Double-Declaration")
-            
-            self.advance()
+        return node
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-
-            # Optional
-            if self.check_token(SyntaxKind.EqualsToken):
-                self.match(SyntaxKind.EqualsToken)
-                self.expression()            
-
-        elif self.check_token(SyntaxKind.LetKeyword):
-            """
-            Let Statement
-
-            Syntax:
-                1.  let IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Let-Statement")
-            
-            self.advance()
+    def while_statement(self):
+        """
+        While Statement
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
-            else:
-                self.abort(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
+        Syntax:
+            1.  while(EXPRESSION)
+                {
+                    STATEMENTS
+                }
+        """
 
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-            self.match(SyntaxKind.EqualsToken)
-            self.expression()
-        
-        elif self.check_token(SyntaxKind.VarKeyword):
-            """
-            Variable Declaration
-
-            Syntax:
-                1.  var IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Var-Statement")
-            
-            self.advance()
+        self.advance()
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.symbols.add(self.cur_token.value)
+        # Comparison
+        # ----
+        self.match(SyntaxKind.OpenParenthesisToken)
+        condition = self.expression()
+        self.match(SyntaxKind.CloseParenthesisToken)
 
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-            self.match(SyntaxKind.EqualsToken)
-            self.expression()
-
-        # elif self.check_token(SyntaxKind.InputKeyword):
-        #     """
-        #     Input Statement
-
-        #     Syntax:
-        #         1.  input(IDENTIFIER)
-        #     """
-        #     if self.debug:
-        #         print("Input-Statement")
-            
-        #     self.advance()
-
-        #     # Body
-        #     # ----
-        #     self.match(SyntaxKind.OpenParenthesisToken)
-
-        #     if self.cur_token.value not in self.symbols:
-        #         self.symbols.add(self.cur_token.value)
-            
-        #     self.match(SyntaxKind.IdentifierToken)
-        #     self.match(SyntaxKind.CloseParenthesisToken)
-
-        elif self.check_token(SyntaxKind.IdentifierToken):
-            """
-            Assignment Statement
-
-            Syntax:
-                1.  IDENTIFIER = EXPRESSION
-            """
-            if self.debug:
-                print("Assignment-Statement")
+        # Body
+        # ----
+        body = self.block()
 
-            # ----
-            if self.cur_token.value not in self.symbols:
-                self.abort(f"The name '{self.cur_token.value}' does not exist in the current convalue")
-            
-            # Body
-            # ----
-            self.match(SyntaxKind.IdentifierToken)
-            self.match(SyntaxKind.EqualsToken)
-            self.expression()
-            
-        else:
-            self.abort(f"Invalid statement at {self.cur_token.kind.name} {self.cur_token.value if self.cur_token.value is not None else ''}")
+        return WhileStatement(condition, body)
 
-    def comparison(self):
+    def for_statement(self):
         """
-        Comparison
-        
+        For Statement
+
         Syntax:
-            1.  EXPRESSION
-            2.  EXPRESSION COMPARISON EXPRESSION
-            3.  EXPRESSION COMPARISON EXPRESSION...
+            1.  for(INITIALIZATION; CONDITION; INCREMENT)
+                {
+                    STATEMENTS
+                }
         """
-        if self.debug:
-            print("Comparison")
-        
-        self.expression()
-        
-        if self.is_comparison_operator():
-            self.advance()
-            self.expression()
 
-        while self.is_comparison_operator():
-            self.advance()
-            self.expression()
+        self.advance()
 
-    def expression(self):
+        # Initialization, Condition, Increment
+        # ----
+        self.match(SyntaxKind.OpenParenthesisToken)
+        initializer = self.statement()
+        self.match(SyntaxKind.SemicolonToken)
+        condition = self.expression()
+        self.match(SyntaxKind.SemicolonToken)
+        increment = self.expression()
+        self.match(SyntaxKind.CloseParenthesisToken)
+
+        # Body
+        # ----
+        body = self.block()
+
+        return ForStatement(initializer, condition, increment, body)
+
+    def label_statement(self):
         """
-        Expression
+        Label Statement
 
         Syntax:
-            1.  TERM
-            2.  TERM + TERM
-            3.  TERM - TERM
+            1.  label IDENTIFIER:
         """
-        print("Expression")
-        self.term()
-        while self.check_token(SyntaxKind.PlusToken) or self.check_token(SyntaxKind.MinusToken):
-            self.advance()
-            self.term()
 
-    def term(self):
+        self.advance()
+
+        # ----
+        name = self.name_id()
+        if name in self.labels_declared:
+            self.report(f"Label already exists: {self.cur_token.value}")
+        self.labels_declared.add(name)
+        node = LabelStatement(self.cur_token.value, name)
+
+        # Body
+        # ----
+        self.match(SyntaxKind.IdentifierToken)
+        self.match(SyntaxKind.ColonToken)
+
+        return node
+
+    def goto_statement(self):
         """
-        Term
+        Goto Statement
 
         Syntax:
-            1.  FACTOR
-            2.  FACTOR * FACTOR
-            3.  FACTOR / FACTOR
+            1.  goto IDENTIFIER
         """
-        if self.debug:
-            print("Term")
-        
-        self.unary()
 
-        while self.check_token(SyntaxKind.StartToken) or self.check_token(SyntaxKind.SlashToken):
-            self.advance()
-            self.unary()
+        self.advance()
+
+        # ----
+        token = self.cur_token
+        name = self.name_id()
+
+        # Body
+        # ----
+        self.match(SyntaxKind.IdentifierToken)
+        self.labels_gotoed.add(name)
+        self.goto_tokens.setdefault(name, token)
+
+        return GotoStatement(token.value, name)
 
-    def unary(self):
+    def declaration(self):
         """
-        Unary
+        Declaration
 
         Syntax:
-            1.  PlusToken FACTOR
-            2.  MinusToken FACTOR
-            3.  NOT FACTOR
-            4.  TildeToken FACTOR
-            5.  PlusPlusToken FACTOR
-            6.  MinusMinusToken FACTOR
-            7.  FACTOR
-        """
-        # Prefix
-        if (self.check_token(SyntaxKind.PlusToken) or self.check_token(SyntaxKind.MinusToken) or
-            self.check_token(SyntaxKind.BangToken) or self.check_token(SyntaxKind.TildeToken) or
-            self.check_token(SyntaxKind.PlusPlusToken) or self.check_token(SyntaxKind.MinusMinusToken)):
-            print(f"Unary ({self.cur_token.value})")
+            1.  TYPE IDENTIFIER
+            2.  TYPE IDENTIFIER = EXPRESSION
+            3.  bool IDENTIFIER = true
+            4.  bool IDENTIFIER = false
+            5.  let IDENTIFIER = EXPRESSION
+            6.  var IDENTIFIER = EXPRESSION
+
+        TYPE is int, char, float, string, double or bool. A var may
+        redeclare a name, the other declarations may not.
+        """
+
+        keyword = self.cur_token.kind
+        self.advance()
+
+        # ----
+        name = self.name_id()
+        declared = name not in self.symbols
+        if declared:
+            self.symbols.add(name)
+            if keyword is SyntaxKind.StringKeyword:
+                self.strings.add(name)
+        elif keyword is not SyntaxKind.VarKeyword:
+            self.report(f"A local variable named '{self.cur_token.value}' is already defined in this scope")
+        node = DeclarationStatement(keyword, self.cur_token.value, name)
+
+        # Body
+        # ----
+        self.match(SyntaxKind.IdentifierToken)
+
+        # Optional, but for let and var
+        if keyword in inferred_keywords:
+            self.match(SyntaxKind.EqualsToken)
+        elif self.check_token(SyntaxKind.EqualsToken):
             self.advance()
-        
-        self.primary()
-        
-        # Postfix
-        if (self.check_token(SyntaxKind.PlusPlusToken) or self.check_token(SyntaxKind.MinusMinusToken)):
-            print(f"Unary ({self.cur_token.value})")
+        else:
+            return node
+
+        if keyword is SyntaxKind.BoolKeyword and self.cur_token.kind in bool_literals:
+            node.initializer = LiteralExpression(self.cur_token.kind, bool_literals[self.cur_token.kind])
             self.advance()
+        else:
+            node.initializer = self.expression()
+            # let and var variables take their first initializer's type
+            if declared and keyword in inferred_keywords and self.is_string(node.initializer):
+                self.strings.add(name)
 
-    def primary(self):
+        return node
+
+    def assignment(self):
         """
-        Primary
+        Assignment Statement
 
         Syntax:
-            1.  NUMBER
-            2.  StringKeyword
-            3.  IDENTIFIER
-            4.  (EXPRESSION)
+            1.  IDENTIFIER = EXPRESSION
+            2.  IDENTIFIER OPERATOR= EXPRESSION
         """
-        if self.check_token(SyntaxKind.NumberToken) or self.check_token(SyntaxKind.StringToken):
-            print(f"Primary ({self.cur_token.value})")
-            self.advance()
-        
-        elif self.check_token(SyntaxKind.IdentifierToken):
-            if self.cur_token.value not in self.symbols:
-                self.abort(f"Referencing variable before assignment: {self.cur_token.value}")
-            
-            print(f"Primary ({self.cur_token.value})")
-            self.advance()
-        
-        elif self.check_token(SyntaxKind.OpenParenthesisToken):
-            print("Primary (")
-            self.advance()
-            self.expression()
-            self.match(SyntaxKind.CloseParenthesisToken)
-            print(")")
-        elif self.check_token(SyntaxKind.InputKeyword):
-            print("Input")
-            self.advance()
-            self.match(SyntaxKind.OpenParenthesisToken)
-            if not self.check_token(SyntaxKind.CloseParenthesisToken):
-                self.expression()
-            self.match(SyntaxKind.CloseParenthesisToken)
-        else:
-            self.abort(f"Unexpected token {self.cur_token.kind} {f'at {self.cur_token.value}' if self.cur_token.value is not None else ''}")
+
+        # ----
+        name = self.name_id()
+        if name not in self.symbols:
+            self.report(f"The name '{self.cur_token.value}' does not exist in the current convalue")
+        value = self.cur_token.value
+
+        # Body
+        # ----
+        self.match(SyntaxKind.IdentifierToken)
+        operator = compound_assignments.get(self.cur_token.kind)
+        if operator is None:
+            self.match(SyntaxKind.EqualsToken)
+            return AssignmentStatement(value, name, self.expression())
+
+        # x op= e is x = x op (e)
+        operator_token = self.cur_token
+        self.advance()
+        expression = BinaryExpression(NameExpression(value, name), operator, self.expression())
+        self.check_operands(expression, operator_token)
+        return AssignmentStatement(value, name, expression)
+
+    def is_string(self, node):
+        """
+        Whether an expression is a string, only literals and variables
+        can be since operators never give one.
+        """
+        if isinstance(node, LiteralExpression):
+            return node.kind is SyntaxKind.StringToken
+        return isinstance(node, NameExpression) and node.name_id in self.strings
+
+    def check_operands(self, node, token):
+        """
+        Reports the operator at token of a binary or unary expression if it
+        can't take the operands' types.
+        """
+        if isinstance(node, UnaryExpression):
+            if node.operator is not SyntaxKind.BangToken and self.is_string(node.operand):
+                self.report(f"Operator '{operator_text[node.operator]}' can't be applied to a string", token)
+        elif node.operator in comparison_kinds:
+            if self.is_string(node.left) != self.is_string(node.right):
+                self.report("A string can only be compared with another string", token)
+        elif self.is_string(node.left) or self.is_string(node.right):
+            self.report(f"Operator '{operator_text[node.operator]}' can't be applied to a string", token)
+
+    def expression(self):
+        """
+        Expression
+
+        Syntax:
+            1.  PRIMARY
+            2.  PREFIX EXPRESSION
+            3.  EXPRESSION POSTFIX
+            4.  EXPRESSION OPERATOR EXPRESSION
+
+        PRIMARY is a number, a string, an identifier, (EXPRESSION) or
+        input() with an optional prompt EXPRESSION.
+
+        Precedence climbing on operator_powers: the token after an operand
+        is looked up once and either extends the operand or ends it.
+        Operators waiting for their right operand and open parentheses are
+        kept on a stack of (power, kind, left, token) frames instead of
+        Python's, so nesting is only bounded by memory.
+        """
+        trace = self.trace
+        advance = self.advance
+        symbols = self.symbols
+        identifier, number, string = SyntaxKind.IdentifierToken, SyntaxKind.NumberToken, SyntaxKind.StringToken
+        open_parenthesis, close_parenthesis = SyntaxKind.OpenParenthesisToken, SyntaxKind.CloseParenthesisToken
+        frames = []
+        power = 0
+
+        while True:
+            # Operand
+            # ----
+            token = self.cur_token
+            kind = token.kind
+            if kind in prefix_kinds:
+                if trace is not None:
+                    trace.enter('unary', token, self.position)
+                advance()
+                frames.append((power, kind, None, token))
+                power = prefix_power
+                continue
+
+            if trace is not None:
+                trace.enter('primary', token, self.position)
+            if kind is identifier:
+                value = token.value
+                name = self.names.intern(value)
+                if name not in symbols:
+                    self.report(f"Referencing variable before assignment: {value}")
+                node = NameExpression(value, name)
+                advance()
+            elif kind is number or kind is string:
+                node = LiteralExpression(kind, token.value)
+                advance()
+            elif kind is open_parenthesis:
+                advance()
+                frames.append((power, kind, None, token))
+                power = 0
+                continue
+            elif kind is SyntaxKind.InputKeyword:
+                advance()
+                self.match(open_parenthesis)
+                if not self.check_token(close_parenthesis):
+                    frames.append((power, kind, None, token))
+                    power = 0
+                    continue
+                advance()
+                node = InputExpression()
+            else:
+                self.abort(f"Unexpected token {kind.name}" + (f" at {token.value}" if token.value is not None else ""))
+            if trace is not None:
+                trace.exit('primary', self.cur_token, self.position)
+
+            # Operators
+            # ----
+            while True:
+                token = self.cur_token
+                kind = token.kind
+                powers = operator_powers.get(kind)
+                if powers is not None and powers[0] > power:
+                    advance()
+                    if powers[1] is None:
+                        node = UnaryExpression(kind, node, postfix=True)
+                        self.check_operands(node, token)
+                        continue
+                    frames.append((power, kind, node, token))
+                    power = powers[1]
+                    break
+
+                # Nothing binds tighter, the innermost frame is complete
+                if not frames:
+                    return node
+                power, kind, left, token = frames.pop()
+                if left is not None:
+                    node = BinaryExpression(left, kind, node)
+                    self.check_operands(node, token)
+                elif kind in prefix_kinds:
+                    node = UnaryExpression(kind, node)
+                    self.check_operands(node, token)
+                    if trace is not None:
+                        trace.exit('unary', self.cur_token, self.position)
+                else:
+                    self.match(close_parenthesis)
+                    if kind is not open_parenthesis:
+                        node = InputExpression(node)
+                    if trace is not None:
+                        trace.exit('primary', self.cur_token, self.position)
+
+
+# The method of each statement rule by the token kinds starting it
+statement_methods = {kind: getattr(Parser, rule) for kind, rule in statement_rules.items()}
@@ -0,0 +1,22 @@
+# Generated from grammar/grammar.txt by CodeAnalysis/Parsing/tablegenerator.py,
+# regenerate it rather than editing it.
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+
+# The alternative of `statement` each token kind starts
+statement_rules = {
+    SyntaxKind.PrintKeyword: 'print_statement',
+    SyntaxKind.IfKeyword: 'if_statement',
+    SyntaxKind.WhileKeyword: 'while_statement',
+    SyntaxKind.ForKeyword: 'for_statement',
+    SyntaxKind.LabelKeyword: 'label_statement',
+    SyntaxKind.GotoKeyword: 'goto_statement',
+    SyntaxKind.LetKeyword: 'declaration',
+    SyntaxKind.VarKeyword: 'declaration',
+    SyntaxKind.BoolKeyword: 'declaration',
+    SyntaxKind.CharKeyword: 'declaration',
+    SyntaxKind.DoubleKeyword: 'declaration',
+    SyntaxKind.FloatKeyword: 'declaration',
+    SyntaxKind.IntKeyword: 'declaration',
+    SyntaxKind.StringKeyword: 'declaration',
+    SyntaxKind.IdentifierToken: 'assignment',
+}
@@ -0,0 +1,144 @@
+from array import array
+from bisect import bisect_right
+
+from CodeAnalysis.Parsing.lexer import Lexer
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.tokenstream import TokenStream
+
+
+# Scanning a token looks at most two characters past its end (the '.' and
+# first fraction digit after a number), tokens ending further than that
+# before an edit can't change.
+lookahead = 2
+
+string_id = SyntaxKind.StringToken.value
+
+
+class TokenEnds:
+    """
+    Sequence view of a stream's true end offsets, for bisect.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def __len__(self):
+        return len(self.stream)
+
+    def __getitem__(self, index):
+        return self.stream.end(index)
+
+
+def token_start(stream, index):
+    """
+    Returns where the scan of the token at index started, string values
+    start after their opening quote.
+    """
+
+    start = stream.start(index)
+    return start - 1 if stream.kinds[index] == string_id else start
+
+
+def resume_position(stream, index):
+    """
+    Returns where the lexer continued after the token at index.
+    """
+
+    end = stream.end(index)
+    return end + 1 if stream.kinds[index] == string_id else end
+
+
+def shifted(column, shift):
+    return array('i', map(shift.__add__, column)) if shift else column
+
+
+def relex_range(stream, offset, deleted, inserted, names=None):
+    """
+    Applies an edit to the source of a str TokenStream and relexes only
+    the tokens it can affect.
+
+    The edit replaces `deleted` characters at `offset` with `inserted`.
+    Scanning restarts after the last token that ended safely before the
+    edit and stops as soon as a new token starts where an old token did,
+    past the edit; the old tokens from there on are reused and moved by
+    the stream's lazy shift, so only the offsets between this edit and
+    the previous one are rewritten. The old stream's arrays are spliced
+    in place and taken over by the new stream, the old stream can't be
+    used afterwards.
+
+    Returns (new_stream, first, old_stop, new_stop): tokens [first,
+    old_stop) of the old stream were replaced by [first, new_stop) of the
+    new one.
+
+    Exceptions: Same as a full Lexer.token_stream() of the new source.
+    """
+
+    old_source = stream.source
+    source = old_source[:offset] + inserted + old_source[offset + deleted:]
+    delta = len(inserted) - deleted
+    edit_end = offset + len(inserted)
+
+    # Tokens kept as they are
+    first = bisect_right(TokenEnds(stream), offset - lookahead)
+    # The EndOfFileToken always rescans
+    first = min(first, len(stream) - 1)
+
+    lexer = Lexer(source, names)
+    lexer.position = resume_position(stream, first - 1) if first else 0
+
+    kinds = array('i')
+    starts = array('i')
+    ends = array('i')
+
+    old_stop = first
+    old_count = len(stream)
+    for kind, start, end in lexer.spans():
+        scan_start = start - 1 if kind is SyntaxKind.StringToken else start
+
+        if scan_start >= edit_end:
+            # Resynchronized once a token starts where an old one did
+            old_start = scan_start - delta
+            while old_stop < old_count and token_start(stream, old_stop) < old_start:
+                old_stop += 1
+            if old_stop < old_count and token_start(stream, old_stop) == old_start:
+                break
+
+        kinds.append(kind.value)
+        starts.append(start)
+        ends.append(end)
+    else:
+        old_stop = old_count
+
+    new_stop = first + len(kinds)
+    shift_from, shift = min(stream.shift_from, old_count), stream.shift
+    columns = (stream.starts, stream.ends)
+
+    # Kept tokens past the old shift point get their shift applied
+    split = min(shift_from, first)
+    for column in columns:
+        column[split:first] = shifted(column[split:first], shift)
+
+    # Reused tokens before the old shift point are stored without it, but
+    # the new shift covers the whole tail
+    split = max(shift_from, old_stop)
+    for column in columns:
+        column[old_stop:split] = shifted(column[old_stop:split], -shift)
+
+    stream.kinds[first:old_stop] = kinds
+    stream.starts[first:old_stop] = starts
+    stream.ends[first:old_stop] = ends
+
+    new_stream = TokenStream(source)
+    new_stream.kinds, new_stream.starts, new_stream.ends = stream.kinds, stream.starts, stream.ends
+    new_stream.shift_from = new_stop
+    new_stream.shift = shift + delta
+
+    return new_stream, first, old_stop, new_stop
+
+
+def relex(stream, offset, deleted, inserted, names=None):
+    """
+    Returns the TokenStream of the edited source, see relex_range.
+    """
+
+    return relex_range(stream, offset, deleted, inserted, names)[0]
@@ -0,0 +1,310 @@
+"""
+LL(1) table generator for grammar/grammar.txt.
+
+Computes the FIRST and FOLLOW sets of the grammar, reports the tokens
+that would start two alternatives of a rule, and writes the rule of
+`statement` each token kind starts to parsetable.py, the table
+Parser.statement dispatches on. Run from src/Kale after editing the
+grammar:
+
+    python -m CodeAnalysis.Parsing.tablegenerator [--check]
+"""
+import argparse
+import os
+import re
+import sys
+
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxmap import keyword_map, operator_map, punctuator_map
+from CodeAnalysis.Exceptions.grammarerror import GrammarException
+
+parsing_root = os.path.dirname(os.path.abspath(__file__))
+grammar_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(parsing_root)))),
+                            'grammar', 'grammar.txt')
+table_path = os.path.join(parsing_root, 'parsetable.py')
+
+# The token classes a grammar names, the other terminals are quoted
+token_classes = {
+    'IDENTIFIER': SyntaxKind.IdentifierToken,
+    'NUMBER': SyntaxKind.NumberToken,
+    'STRING': SyntaxKind.StringToken,
+    'EOF': SyntaxKind.EndOfFileToken,
+}
+
+# A quoted terminal, a name, or the separators
+symbol_pattern = re.compile(r"'[^'\s]+'|\w+|[|:]|\S")
+
+# Rules whose table is written out, each alternative of one is a single
+# rule the Parser has a method of
+dispatched_rules = ('statement',)
+
+
+def terminal_kind(symbol, line=None):
+    """
+    The SyntaxKind a quoted terminal or a token class stands for.
+    """
+
+    if symbol.startswith("'"):
+        text = symbol[1:-1]
+        kind = keyword_map.get(text) or punctuator_map.get(text) or operator_map.get(text)
+        if kind is None:
+            raise GrammarException(f"No token is spelled {symbol}", line)
+        return kind
+    if symbol not in token_classes:
+        raise GrammarException(f"Unknown token class {symbol}", line)
+    return token_classes[symbol]
+
+
+def spelled(symbols):
+    return " ".join(symbol if isinstance(symbol, str) else symbol.name for symbol in symbols) or "EMPTY"
+
+
+class Grammar:
+    """
+    A context free grammar over SyntaxKinds. `rules` maps each rule name
+    to its alternatives, tuples of rule names and SyntaxKinds, () for the
+    empty one. The first rule is the start rule.
+
+    FIRST sets hold None when the rule derives the empty string.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.start = next(iter(rules))
+        for name, alternatives in rules.items():
+            for alternative in alternatives:
+                for symbol in alternative:
+                    if isinstance(symbol, str) and symbol not in rules:
+                        raise GrammarException(f"Rule {name} uses undefined rule {symbol}")
+        self.first = self.first_sets()
+        self.follow = self.follow_sets()
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Reads the `name : alternative | alternative` rules of text, see
+        grammar/grammar.txt for the notation.
+        """
+
+        rules = {}
+        name = None
+        for number, line in enumerate(text.splitlines(), 1):
+            symbols = symbol_pattern.findall(line.split('#', 1)[0])
+            if not symbols:
+                continue
+            if symbols[0] == '|':
+                if name is None:
+                    raise GrammarException("Alternative outside of a rule", number)
+                symbols = symbols[1:]
+            else:
+                name = symbols[0]
+                if len(symbols) < 2 or symbols[1] != ':' or not name.islower():
+                    raise GrammarException("Expected a rule, `name : alternatives`", number)
+                if name in rules:
+                    raise GrammarException(f"Rule {name} is defined twice", number)
+                rules[name] = []
+                symbols = symbols[2:]
+
+            alternative = []
+            for symbol in symbols + ['|']:
+                if symbol != '|':
+                    alternative.append(symbol)
+                    continue
+                if not alternative:
+                    raise GrammarException(f"Empty alternative of {name}, write EMPTY", number)
+                rules[name].append(cls.alternative(alternative, number))
+                alternative = []
+
+        if not rules:
+            raise GrammarException("The grammar has no rules")
+        return cls(rules)
+
+    @classmethod
+    def from_file(cls, path=grammar_path):
+        with open(path) as file:
+            return cls.parse(file.read())
+
+    @staticmethod
+    def alternative(symbols, line):
+        if symbols == ['EMPTY']:
+            return ()
+        if 'EMPTY' in symbols:
+            raise GrammarException("EMPTY must be an alternative of its own", line)
+        alternative = []
+        for symbol in symbols:
+            if symbol.startswith("'") or symbol.isupper():
+                alternative.append(terminal_kind(symbol, line))
+            elif symbol.isidentifier() and symbol.islower():
+                alternative.append(symbol)
+            else:
+                raise GrammarException(f"Unexpected {symbol}", line)
+        return tuple(alternative)
+
+    # Sets
+    # ----------------------------------------------------------------
+
+    def first_of(self, symbols):
+        """
+        FIRST of a sequence of symbols, with None if all of them can be
+        empty.
+        """
+
+        first = set()
+        for symbol in symbols:
+            if not isinstance(symbol, str):
+                first.add(symbol)
+                return first
+            first |= self.first[symbol]
+            if None not in self.first[symbol]:
+                first.discard(None)
+                return first
+        first.add(None)
+        return first
+
+    def first_sets(self):
+        self.first = {name: set() for name in self.rules}
+        changed = True
+        while changed:
+            changed = False
+            for name, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    first = self.first_of(alternative)
+                    if not first <= self.first[name]:
+                        self.first[name] |= first
+                        changed = True
+        return self.first
+
+    def follow_sets(self):
+        follow = {name: set() for name in self.rules}
+        follow[self.start].add(SyntaxKind.EndOfFileToken)
+        changed = True
+        while changed:
+            changed = False
+            for name, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    for index, symbol in enumerate(alternative):
+                        if not isinstance(symbol, str):
+                            continue
+                        rest = self.first_of(alternative[index + 1:])
+                        following = rest - {None}
+                        if None in rest:
+                            following |= follow[name]
+                        if not following <= follow[symbol]:
+                            follow[symbol] |= following
+                            changed = True
+        return follow
+
+    # Table
+    # ----------------------------------------------------------------
+
+    def predicted(self, name, alternative):
+        """
+        The token kinds that select an alternative of rule name.
+        """
+
+        first = self.first_of(alternative)
+        if None in first:
+            return (first - {None}) | self.follow[name]
+        return first
+
+    def table(self):
+        """
+        Returns ({rule: {kind: alternative index}}, conflicts), conflicts
+        being the (rule, kind, alternative indexes) of the kinds starting
+        more than one alternative.
+        """
+
+        table = {}
+        conflicts = []
+        for name, alternatives in self.rules.items():
+            row = table[name] = {}
+            clashes = {}
+            for index, alternative in enumerate(alternatives):
+                for kind in self.predicted(name, alternative):
+                    if kind in row:
+                        clashes.setdefault(kind, [row[kind]]).append(index)
+                    else:
+                        row[kind] = index
+            conflicts += [(name, kind, tuple(indexes))
+                          for kind, indexes in sorted(clashes.items(), key=lambda item: item[0].value)]
+        return table, conflicts
+
+    def conflict_messages(self, conflicts):
+        return [f"{name}: {kind.name} starts both "
+                + " and ".join(f"`{spelled(self.rules[name][index])}`" for index in indexes)
+                for name, kind, indexes in conflicts]
+
+    def dispatch(self, name):
+        """
+        The rule of each alternative of rule name by the token kinds that
+        select it, in the order of the alternatives.
+
+        Exceptions: Raises GrammarException if the grammar isn't LL(1)
+        or an alternative isn't a single rule.
+        """
+
+        table, conflicts = self.table()
+        if conflicts:
+            raise GrammarException("The grammar isn't LL(1):\n" + "\n".join(self.conflict_messages(conflicts)))
+        alternatives = self.rules[name]
+        for alternative in alternatives:
+            if len(alternative) != 1 or not isinstance(alternative[0], str):
+                raise GrammarException(f"Alternative `{spelled(alternative)}` of {name} isn't a single rule")
+        return {kind: alternatives[index][0]
+                for kind, index in sorted(table[name].items(), key=lambda item: (item[1], item[0].value))}
+
+
+def table_source(grammar):
+    """
+    The text of parsetable.py for grammar.
+    """
+
+    lines = [
+        "# Generated from grammar/grammar.txt by CodeAnalysis/Parsing/tablegenerator.py,",
+        "# regenerate it rather than editing it.",
+        "from CodeAnalysis.Syntax.syntaxkind import SyntaxKind",
+    ]
+    for name in dispatched_rules:
+        lines += ["", f"# The alternative of `{name}` each token kind starts", f"{name}_rules = {{"]
+        lines += [f"    SyntaxKind.{kind.name}: '{rule}'," for kind, rule in grammar.dispatch(name).items()]
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description="Kale LL(1) table generator")
+    arguments.add_argument('--grammar', default=grammar_path, help="grammar file (default: grammar/grammar.txt)")
+    arguments.add_argument('--output', default=table_path, help="table module to write (default: parsetable.py)")
+    arguments.add_argument('--check', action='store_true', help="only check the table is up to date")
+    options = arguments.parse_args(argv)
+
+    try:
+        grammar = Grammar.from_file(options.grammar)
+        table, conflicts = grammar.table()
+        if conflicts:
+            for message in grammar.conflict_messages(conflicts):
+                print(message, file=sys.stderr)
+            return 1
+        source = table_source(grammar)
+    except (GrammarException, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if options.check:
+        try:
+            with open(options.output) as file:
+                current = file.read()
+        except OSError:
+            current = None
+        if current != source:
+            print(f"{options.output} is out of date with {options.grammar}", file=sys.stderr)
+            return 1
+        return 0
+
+    with open(options.output, 'w') as file:
+        file.write(source)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
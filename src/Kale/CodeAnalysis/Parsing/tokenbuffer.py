@@ -0,0 +1,61 @@
+class TokenBuffer:
+    """
+    Fixed size ring buffer over a token iterator.
+
+    Tokens are pulled from the iterator only when they are looked at, so a
+    Parser reading through it never holds more than `size` tokens. Once the
+    iterator runs dry the last token (the EndOfFileToken) is repeated.
+    """
+
+    def __init__(self, tokens, size=4):
+        self.tokens = iter(tokens)
+        self.size = size
+        self.ring = [None] * size
+        self.start = 0
+        self.count = 0
+        self.last = None
+
+    def fill(self, k):
+        """
+        Pulls tokens until the k-th token ahead is buffered.
+        """
+
+        while self.count <= k:
+            token = next(self.tokens, None)
+            if token is None:
+                token = self.last
+            else:
+                self.last = token
+            self.ring[(self.start + self.count) % self.size] = token
+            self.count += 1
+
+    def peek(self, k=0):
+        """
+        Returns the k-th token ahead without consuming it.
+
+        Exceptions: Raises an IndexError if k doesn't fit in the buffer.
+        """
+
+        if not 0 <= k < self.size:
+            raise IndexError(f"Lookahead of {k} exceeds the token buffer size of {self.size}")
+        if self.count <= k:
+            self.fill(k)
+        return self.ring[(self.start + k) % self.size]
+
+    def advance(self):
+        """
+        Consumes and returns the next token.
+        """
+
+        if not self.count:
+            # Nothing was peeked at, the token needn't go through the ring
+            token = next(self.tokens, None)
+            if token is None:
+                return self.last
+            self.last = token
+            return token
+        token = self.ring[self.start]
+        self.ring[self.start] = None
+        self.start = (self.start + 1) % self.size
+        self.count -= 1
+        return token
@@ -0,0 +1,375 @@
+from array import array
+
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Intermediate.coalescing import coalesce
+from CodeAnalysis.Intermediate.ir import Branch, Jump
+from CodeAnalysis.Exceptions.unsupported import UnsupportedException
+
+
+# Opcodes, each followed by its operands in the instruction stream. d is
+# the register written, a and b the registers read, t and f jump targets.
+# Constants live in the first registers, loaded from the constant pool.
+RETURN = 0
+MOVE = 1              # d a
+JUMP = 2              # t
+BRANCH = 3            # a t f
+ADD_I = 4             # d a b, and so on for the binary operators
+SUB_I = 5
+MUL_I = 6
+DIV_I = 7
+ADD_D = 8
+SUB_D = 9
+MUL_D = 10
+DIV_D = 11
+ADD_F = 12
+SUB_F = 13
+MUL_F = 14
+DIV_F = 15
+LESS = 16
+LESS_EQUAL = 17
+GREATER = 18
+GREATER_EQUAL = 19
+EQUAL = 20
+NOT_EQUAL = 21
+NEGATE_I = 22         # d a, and so on for the unary operators
+NEGATE_D = 23
+NOT = 24
+INVERT = 25
+TO_INT = 26
+TO_CHAR = 27
+TO_BOOL = 28
+TO_FLOAT = 29
+TO_DOUBLE = 30
+IS_NULL = 31
+PRINT = 32            # a format, the format is a constant register
+INPUT = 33            # d prompt format, -1 for no prompt or a string one
+# Superinstructions, the common pairs of a loop as one dispatch
+BRANCH_LESS = 34      # a b t f, a comparison only its branch reads
+BRANCH_LESS_EQUAL = 35
+BRANCH_GREATER = 36
+BRANCH_GREATER_EQUAL = 37
+BRANCH_EQUAL = 38
+BRANCH_NOT_EQUAL = 39
+ADD_I_JUMP = 40       # d a b t, an int increment ending a block
+MOD_I = 41            # d a b, the operators loops rarely run
+MOD_D = 42
+POW_I = 43
+POW_D = 44
+AND = 45
+OR = 46
+XOR = 47
+SHIFT_LEFT = 48
+SHIFT_RIGHT = 49
+
+opcode_names = {value: name for name, value in globals().items() if name.isupper() and isinstance(value, int)}
+
+# Operand count of each opcode
+operand_counts = {RETURN: 0, MOVE: 2, JUMP: 1, BRANCH: 3, PRINT: 2, INPUT: 3, ADD_I_JUMP: 4}
+operand_counts.update({opcode: 3 for opcode in range(ADD_I, NOT_EQUAL + 1)})
+operand_counts.update({opcode: 2 for opcode in range(NEGATE_I, IS_NULL + 1)})
+operand_counts.update({opcode: 4 for opcode in range(BRANCH_LESS, BRANCH_NOT_EQUAL + 1)})
+operand_counts.update({opcode: 3 for opcode in range(MOD_I, SHIFT_RIGHT + 1)})
+
+arithmetic_opcodes = {
+    'int': {SyntaxKind.PlusToken: ADD_I, SyntaxKind.MinusToken: SUB_I, SyntaxKind.StartToken: MUL_I,
+            SyntaxKind.SlashToken: DIV_I, SyntaxKind.PercentToken: MOD_I, SyntaxKind.DoubleStarToken: POW_I,
+            SyntaxKind.AmpersandToken: AND, SyntaxKind.PipeToken: OR, SyntaxKind.HatToken: XOR,
+            SyntaxKind.LeftShiftToken: SHIFT_LEFT, SyntaxKind.RightShiftToken: SHIFT_RIGHT},
+    'double': {SyntaxKind.PlusToken: ADD_D, SyntaxKind.MinusToken: SUB_D, SyntaxKind.StartToken: MUL_D,
+               SyntaxKind.SlashToken: DIV_D, SyntaxKind.PercentToken: MOD_D, SyntaxKind.DoubleStarToken: POW_D},
+    'float': {SyntaxKind.PlusToken: ADD_F, SyntaxKind.MinusToken: SUB_F, SyntaxKind.StartToken: MUL_F,
+              SyntaxKind.SlashToken: DIV_F},
+}
+
+comparison_opcodes = {
+    SyntaxKind.LessToken: (LESS, BRANCH_LESS),
+    SyntaxKind.LessOrEqualsToken: (LESS_EQUAL, BRANCH_LESS_EQUAL),
+    SyntaxKind.GreaterToken: (GREATER, BRANCH_GREATER),
+    SyntaxKind.GreaterOrEqualsToken: (GREATER_EQUAL, BRANCH_GREATER_EQUAL),
+    SyntaxKind.EqualsEqualsToken: (EQUAL, BRANCH_EQUAL),
+    SyntaxKind.BangEqualsToken: (NOT_EQUAL, BRANCH_NOT_EQUAL),
+}
+
+conversion_opcodes = {'int': TO_INT, 'char': TO_CHAR, 'bool': TO_BOOL, 'float': TO_FLOAT, 'double': TO_DOUBLE}
+
+
+def constant_value(type, text):
+    """
+    The value a VM register holds for a C literal of a C type.
+    """
+
+    if type == 'const char *':
+        if not text.startswith('"'):
+            return None
+        return text[1:-1].replace('\\?', '?').replace('\\"', '"').replace('\\\\', '\\')
+    if text.startswith("'"):
+        character = text[1:-1]
+        return {"\\0": 0, "\\'": 39, "\\\\": 92}.get(character) if character.startswith('\\') else ord(character)
+    if type in ('double', 'float'):
+        return float(text.rstrip('f'))
+    if len(text) > 1 and text.startswith('0') and text.isdigit():
+        return int(text, 8)
+    return int(text)
+
+
+class Program:
+    """
+    Bytecode of a Kale program: the instruction stream, the constant pool
+    loaded into registers 0 to len(constants) - 1 and the total number of
+    registers.
+    """
+
+    __slots__ = ('code', 'constants', 'registers')
+
+    def __init__(self, code, constants, registers):
+        self.code = code
+        self.constants = constants
+        self.registers = registers
+
+    def disassemble(self):
+        lines = []
+        pc = 0
+        code = self.code
+        while pc < len(code):
+            opcode = code[pc]
+            count = operand_counts[opcode]
+            operands = " ".join(str(operand) for operand in code[pc + 1:pc + 1 + count])
+            lines.append(f"{pc:>5} {opcode_names[opcode]} {operands}".rstrip())
+            pc += 1 + count
+        return "\n".join(lines)
+
+
+class BytecodeCompiler:
+    """
+    Compiles an optimized Function to a Program.
+
+    Every value gets a register, shared by a phi and the operands it can
+    be coalesced with as in the IRCodeGenerator, and the remaining phi
+    copies become moves on the edges, in stubs after the block for
+    branches. Blocks are laid out in reverse postorder so most jumps fall
+    through, and jump targets are resolved to instruction offsets once
+    every block is placed.
+    """
+
+    def __init__(self):
+        self.code = []
+        self.constants = []
+        self.constant_registers = {}
+        self.registers = {}
+        self.owners = {}
+        self.labels = {}
+        self.fixups = []
+        self.uses = {}
+        self.count = 0
+
+    def compile(self, function):
+        order = function.reverse_postorder()
+        self.owners = coalesce(order)
+        self.uses = function.uses()
+
+        # Constants first, so the pool is the start of the registers
+        values = []
+        for block in order:
+            for value in block.phis + block.instructions:
+                if value.opcode == 'const':
+                    self.constant(value)
+                elif value.opcode == 'print':
+                    self.pool(value.attribute + "\n")
+                elif value.opcode == 'input' and value.attribute is not None:
+                    self.pool(value.attribute)
+                if value.type is not None and value.opcode != 'const' and self.owner(value) is value:
+                    values.append(value)
+        self.count = len(self.constants)
+        for value in values:
+            self.registers[id(value)] = self.allocate()
+
+        for index, block in enumerate(order):
+            self.labels[id(block)] = len(self.code)
+            stubs = self.block(block, order[index + 1] if index + 1 < len(order) else None)
+            for stub, target in stubs:
+                self.labels[id(stub)] = len(self.code)
+                self.copies(block, target)
+                self.jump(target)
+
+        for position, target in self.fixups:
+            self.code[position] = self.labels[id(target)]
+        return Program(array('i', self.code), self.constants, self.count)
+
+    # Registers
+    # ----------------------------------------------------------------
+
+    def owner(self, value):
+        return self.owners.get(id(value), value)
+
+    def allocate(self):
+        self.count += 1
+        return self.count - 1
+
+    def register(self, value):
+        if value.opcode == 'const':
+            return self.constant(value)
+        return self.registers[id(self.owner(value))]
+
+    def constant(self, value):
+        return self.pool(constant_value(value.type, value.attribute))
+
+    def pool(self, value):
+        # 1 and 1.0 or 0.0 and -0.0 are equal keys, but not the same C value
+        key = (value.__class__, repr(value))
+        register = self.constant_registers.get(key)
+        if register is None:
+            register = self.constant_registers[key] = len(self.constants)
+            self.constants.append(value)
+        return register
+
+    # Blocks
+    # ----------------------------------------------------------------
+
+    def emit(self, *words):
+        self.code.extend(words)
+
+    def target(self, block):
+        self.fixups.append((len(self.code), block))
+        self.code.append(-1)
+
+    def jump(self, block):
+        self.emit(JUMP)
+        self.target(block)
+
+    def block(self, block, following):
+        """
+        Emits a block, returns the (stub, target) edges of its branch that
+        need copies.
+        """
+
+        terminator = block.terminator
+        instructions = [instruction for instruction in block.instructions if instruction.opcode != 'const']
+        fused = None
+        if instructions and self.uses.get(id(instructions[-1])) == 1:
+            last = instructions[-1]
+            if isinstance(terminator, Branch) and terminator.condition is last and last.opcode == 'binary' \
+                    and last.attribute in comparison_opcodes:
+                fused = instructions.pop()
+            elif isinstance(terminator, Jump) and terminator.target is not following \
+                    and last.opcode == 'binary' and last.type == 'int' and last.attribute is SyntaxKind.PlusToken \
+                    and not self.pending_copies(block, terminator.target):
+                fused = instructions.pop()
+
+        for instruction in instructions:
+            self.instruction(instruction)
+
+        if isinstance(terminator, Jump):
+            if fused is not None:
+                self.emit(ADD_I_JUMP, self.register(fused), *map(self.register, fused.operands))
+                self.target(terminator.target)
+                return []
+            self.copies(block, terminator.target)
+            if terminator.target is not following:
+                self.jump(terminator.target)
+            return []
+
+        if isinstance(terminator, Branch):
+            stubs = []
+            targets = []
+            for target in (terminator.true_target, terminator.false_target):
+                if self.pending_copies(block, target):
+                    stub = object()
+                    stubs.append((stub, target))
+                    targets.append(stub)
+                else:
+                    targets.append(target)
+
+            if fused is not None:
+                self.emit(comparison_opcodes[fused.attribute][1], *map(self.register, fused.operands))
+            elif terminator.condition.type == 'const char *':
+                # Pointers are true unless null, even for ""
+                condition = self.allocate()
+                self.emit(IS_NULL, condition, self.register(terminator.condition))
+                self.emit(BRANCH, condition)
+                targets.reverse()
+            else:
+                self.emit(BRANCH, self.register(terminator.condition))
+            for target in targets:
+                self.target(target)
+            return stubs
+
+        self.emit(RETURN)
+        return []
+
+    def pending_copies(self, source, target):
+        """
+        The (phi, value) copies the edge from source to target needs.
+        """
+
+        if not target.phis:
+            return []
+        index = target.predecessors.index(source)
+        return [(phi, phi.operands[index]) for phi in target.phis
+                if phi.operands[index].opcode == 'const' or self.owner(phi.operands[index]) is not self.owner(phi)]
+
+    def copies(self, source, target):
+        """
+        Emits the moves of the phis of target on the edge from source,
+        each one before the moves still reading the register it writes,
+        through temporaries for the moves left reading each other.
+        """
+
+        pending = self.pending_copies(source, target)
+        while pending:
+            for pair in pending:
+                destination = self.register(pair[0])
+                if not any(self.register(value) == destination for phi, value in pending if phi is not pair[0]):
+                    self.emit(MOVE, destination, self.register(pair[1]))
+                    pending.remove(pair)
+                    break
+            else:
+                break
+
+        temporaries = []
+        for phi, value in pending:
+            temporaries.append(self.allocate())
+            self.emit(MOVE, temporaries[-1], self.register(value))
+        for (phi, _), temporary in zip(pending, temporaries):
+            self.emit(MOVE, self.register(phi), temporary)
+
+    # Instructions
+    # ----------------------------------------------------------------
+
+    def instruction(self, instruction):
+        opcode = instruction.opcode
+        operands = [self.register(operand) for operand in instruction.operands]
+
+        if opcode == 'print':
+            self.emit(PRINT, operands[0], self.pool(instruction.attribute + "\n"))
+            return
+        destination = self.register(instruction)
+
+        if opcode == 'binary':
+            if instruction.attribute in comparison_opcodes:
+                self.emit(comparison_opcodes[instruction.attribute][0], destination, *operands)
+            elif instruction.type in arithmetic_opcodes:
+                self.emit(arithmetic_opcodes[instruction.type][instruction.attribute], destination, *operands)
+            else:
+                raise UnsupportedException("Arithmetic on strings can't run on the VM")
+
+        elif opcode == 'unary':
+            operator = instruction.attribute
+            if operator is SyntaxKind.BangToken:
+                self.emit(IS_NULL if instruction.operands[0].type == 'const char *' else NOT, destination, *operands)
+            elif operator is SyntaxKind.TildeToken:
+                self.emit(INVERT, destination, *operands)
+            elif operator is SyntaxKind.MinusToken:
+                self.emit(NEGATE_I if instruction.type == 'int' else NEGATE_D, destination, *operands)
+            else:
+                self.emit(MOVE, destination, *operands)
+
+        elif opcode == 'convert':
+            if instruction.type not in conversion_opcodes or instruction.operands[0].type == 'const char *':
+                raise UnsupportedException(f"Converting {instruction.operands[0].type} to {instruction.type} "
+                                           f"can't run on the VM")
+            self.emit(conversion_opcodes[instruction.type], destination, *operands)
+
+        elif opcode == 'input':
+            prompt = operands[0] if operands else -1
+            prompt_format = self.pool(instruction.attribute) if instruction.attribute is not None else -1
+            self.emit(INPUT, destination, prompt, prompt_format)
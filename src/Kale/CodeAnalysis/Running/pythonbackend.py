@@ -0,0 +1,98 @@
+import importlib.util
+import marshal
+import sys
+
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Emitting.pythonemitter import PythonEmitter
+from CodeAnalysis.Emitting.pythongenerator import PythonGenerator
+from CodeAnalysis.Exceptions.runtimeerror import RuntimeException
+from CodeAnalysis.Exceptions.unsupported import UnsupportedException
+from CodeAnalysis.Optimizing.optimizer import Optimizer
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Running.virtualmachine import (
+    NumberReader, c_format, divide, fmod, int_power, power, remainder, single, to_int,
+)
+
+
+def translate(unit, path, stats=None):
+    """
+    Emits the Python source of a CompilationUnit, returns its emitter.
+    """
+
+    emitter = PythonEmitter(path, stats)
+    PythonGenerator(emitter).generate(unit)
+    return emitter
+
+
+def load_code(path, optimization=2, cache=None, stats=None):
+    """
+    Compiles the file at path to a Python code object, returns it with the
+    located diagnostics of the file, the code being None if there are any.
+    A construct with no Python translation is reported at the start of the
+    file.
+
+    The SSA passes of level 3 work on the IR, which the Python backend
+    doesn't go through, so levels above 2 fold like level 2. With a cache
+    the code object is stored marshalled, keyed by the interpreter's
+    bytecode version as well since marshal data doesn't carry over.
+    """
+
+    diagnostics = DiagnosticBag()
+    lexer = MappedLexer.from_file(path, stats=stats, diagnostics=diagnostics)
+    try:
+        key = None
+        if cache is not None:
+            key = cache.key(lexer.source, ('python', optimization, importlib.util.MAGIC_NUMBER))
+            data = cache.load(key, 'python')
+            if data is not None:
+                return marshal.loads(data), []
+
+        unit = Parser(lexer.tokens(), names=lexer.names, stats=stats, diagnostics=diagnostics).program()
+        located = diagnostics.located(lexer.source)
+        if located:
+            return None, located
+    finally:
+        lexer.close()
+
+    try:
+        code = translate(Optimizer(min(optimization, 2), stats).run(unit), path, stats).compile()
+    except UnsupportedException as error:
+        return None, [(1, 1, error.message)]
+    if key is not None:
+        cache.store(key, 'python', marshal.dumps(code))
+    return code, []
+
+
+def execute(code, stdin=None, stdout=None):
+    """
+    Runs a code object load_code returned.
+    """
+
+    stdin = stdin if stdin is not None else sys.stdin
+    stdout = stdout if stdout is not None else sys.stdout
+    reader = NumberReader(stdin)
+
+    def kale_input(prompt):
+        if prompt is not None:
+            stdout.write(prompt)
+        stdout.flush()
+        return reader.read()
+
+    namespace = {
+        '__name__': '__kale__',
+        'kale_write': stdout.write,
+        'kale_input': kale_input,
+        'kale_format': c_format,
+        'divide': divide,
+        'remainder': remainder,
+        'fmod': fmod,
+        'power': power,
+        'int_power': int_power,
+        'single': single,
+        'to_int': to_int,
+    }
+    try:
+        exec(code, namespace)
+    except ZeroDivisionError:
+        raise RuntimeException("Division by zero") from None
@@ -0,0 +1,115 @@
+import argparse
+import sys
+import time
+from array import array
+
+from CodeAnalysis.Caching.compilationcache import CompilationCache, default_directory
+from CodeAnalysis.Diagnostics.diagnosticbag import DiagnosticBag
+from CodeAnalysis.Diagnostics.diagnosticrenderer import report_errors
+from CodeAnalysis.Exceptions.runtimeerror import RuntimeException
+from CodeAnalysis.Exceptions.unsupported import UnsupportedException
+from CodeAnalysis.Optimizing.optimizer import Optimizer
+from CodeAnalysis.Parsing.mappedlexer import MappedLexer
+from CodeAnalysis.Parsing.parser import Parser
+from CodeAnalysis.Running.bytecode import BytecodeCompiler, Program
+from CodeAnalysis.Running.pythonbackend import execute, load_code
+from CodeAnalysis.Running.virtualmachine import VirtualMachine
+
+
+def load_program(path, optimization=3, cache=None, stats=None):
+    """
+    Compiles the file at path to a Program, returns it with the located
+    diagnostics of the file, the Program being None if there are any. A
+    construct the VM has no instructions for is reported at the start of
+    the file.
+
+    With a cache, the bytecode of a source compiled before at the same
+    level is loaded without lexing or parsing it again.
+    """
+
+    diagnostics = DiagnosticBag()
+    lexer = MappedLexer.from_file(path, stats=stats, diagnostics=diagnostics)
+    try:
+        key = cache.key(lexer.source, ('bytecode', optimization)) if cache is not None else None
+        if key is not None:
+            cached = cache.load_object(key, 'bytecode')
+            if cached is not None:
+                code, constants, registers = cached
+                instructions = array('i')
+                instructions.frombytes(code)
+                return Program(instructions, constants, registers), []
+
+        unit = Parser(lexer.tokens(), names=lexer.names, stats=stats, diagnostics=diagnostics).program()
+        located = diagnostics.located(lexer.source)
+        if located:
+            return None, located
+    finally:
+        lexer.close()
+
+    try:
+        program = BytecodeCompiler().compile(Optimizer(optimization, stats).lower(unit))
+    except UnsupportedException as error:
+        return None, [(1, 1, error.message)]
+    if key is not None:
+        cache.store_object(key, 'bytecode', (program.code.tobytes(), program.constants, program.registers))
+    return program, []
+
+
+def main(argv=None):
+    """
+    `kale run`: compiles a file to bytecode, or to Python with --backend
+    python, and runs it in process, no C compiler needed. Returns the exit
+    status.
+    """
+
+    arg_parser = argparse.ArgumentParser(prog="kale run", description="Run a Kale program on the bytecode VM")
+    arg_parser.add_argument("file", help="Kale source file")
+    arg_parser.add_argument("-O", dest="optimization", type=int, choices=range(4), default=3, metavar="LEVEL",
+                            help="optimization level, 0 to 3 (default: %(default)s)")
+    arg_parser.add_argument("--backend", choices=("vm", "python"), default="vm",
+                            help="run on the bytecode VM or as compiled Python (default: %(default)s)")
+    arg_parser.add_argument("--disassemble", action="store_true", help="print the bytecode instead of running it")
+    arg_parser.add_argument("--timings", action="store_true", help="report compile and run time on stderr")
+    arg_parser.add_argument("--cache-dir", metavar="PATH", default=default_directory(),
+                            help="compilation cache directory (default: %(default)s)")
+    arg_parser.add_argument("--no-cache", action="store_true", help="don't read or write the compilation cache")
+    args = arg_parser.parse_args(argv)
+
+    cache = None if args.no_cache else CompilationCache(args.cache_dir)
+    start = time.perf_counter()
+    try:
+        if args.backend == "python":
+            program, diagnostics = load_code(args.file, args.optimization, cache)
+        else:
+            program, diagnostics = load_program(args.file, args.optimization, cache)
+    except OSError as error:
+        diagnostics = [(1, 1, error.strerror or str(error))]
+
+    if diagnostics:
+        report_errors(args.file, diagnostics, file=sys.stderr)
+        return 1
+
+    if args.disassemble:
+        if args.backend == "python":
+            import dis
+            dis.dis(program)
+        else:
+            print(program.disassemble())
+        return 0
+
+    compiled = time.perf_counter()
+    try:
+        if args.backend == "python":
+            execute(program)
+        else:
+            VirtualMachine(program).run()
+    except RuntimeException as error:
+        sys.stdout.flush()
+        print(f"{args.file}: Runtime error: {error.message}", file=sys.stderr)
+        return 1
+    finally:
+        sys.stdout.flush()
+        if args.timings:
+            print(f"compile {(compiled - start) * 1000:.1f} ms, run {(time.perf_counter() - compiled) * 1000:.1f} ms",
+                  file=sys.stderr)
+    return 0
@@ -0,0 +1,363 @@
+import math
+import re
+import struct
+import sys
+
+from CodeAnalysis.Exceptions.runtimeerror import RuntimeException
+from CodeAnalysis.Running.bytecode import (
+    ADD_D, ADD_F, ADD_I, ADD_I_JUMP, BRANCH, BRANCH_EQUAL, BRANCH_GREATER, BRANCH_GREATER_EQUAL, BRANCH_LESS,
+    BRANCH_LESS_EQUAL, BRANCH_NOT_EQUAL, DIV_D, DIV_F, DIV_I, EQUAL, GREATER, GREATER_EQUAL, INPUT, INVERT, IS_NULL,
+    JUMP, LESS, LESS_EQUAL, MOVE, MUL_D, MUL_F, MUL_I, NEGATE_D, NEGATE_I, NOT, NOT_EQUAL, PRINT, RETURN, SUB_D,
+    SUB_F, SUB_I, TO_BOOL, TO_CHAR, TO_DOUBLE, TO_FLOAT, TO_INT, MOD_I, MOD_D, POW_I, POW_D, AND, OR, XOR,
+    SHIFT_LEFT, SHIFT_RIGHT,
+)
+
+
+int_minimum, int_maximum = -2 ** 31, 2 ** 31 - 1
+
+single_format = struct.Struct('f')
+
+# What scanf("%lf") takes from the start of a word
+number_pattern = re.compile(r'[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf(?:inity)?|nan)', re.IGNORECASE)
+
+
+def wrap(value):
+    """
+    An int result as a 32 bit two's complement int.
+    """
+
+    return ((value + 2 ** 31) & 0xFFFFFFFF) - 2 ** 31
+
+
+def single(value):
+    """
+    A double rounded to the nearest float.
+    """
+
+    try:
+        return single_format.unpack(single_format.pack(value))[0]
+    except OverflowError:
+        return math.copysign(math.inf, value)
+
+
+def to_int(value):
+    """
+    C conversion to int, out of range doubles give INT_MIN as on x86.
+    """
+
+    if isinstance(value, float):
+        if value != value or not -2147483649.0 < value < 2147483648.0:
+            return int_minimum
+        return int(value)
+    return int(value)
+
+
+def divide(left, right):
+    """
+    IEEE division, which gives infinities and NaN instead of raising.
+    """
+
+    try:
+        return left / right
+    except ZeroDivisionError:
+        if left != left or left == 0:
+            return math.nan
+        return math.copysign(math.inf, left) * math.copysign(1.0, right)
+
+
+def remainder(left, right):
+    """
+    C's int remainder, which takes the sign of the dividend.
+    """
+
+    value = abs(left) % abs(right)
+    return -value if left < 0 else value
+
+
+def fmod(left, right):
+    """
+    C's fmod(), whose domain errors give NaN instead of raising.
+    """
+
+    try:
+        return math.fmod(left, right)
+    except ValueError:
+        return -math.nan
+
+
+def int_power(base, exponent):
+    """
+    kale_power() of the emitted C: wrapping, negative exponents truncate
+    like int division.
+    """
+
+    if exponent < 0:
+        if base == 1 or base == -1:
+            return base ** (exponent & 1)
+        return 0
+    return wrap(pow(base, exponent, 4294967296))
+
+
+def power(left, right):
+    """
+    C's pow(), overflows give infinities and domain errors NaN instead of
+    raising.
+    """
+
+    right = float(right)
+    try:
+        return math.pow(left, right)
+    except OverflowError:
+        odd = right.is_integer() and right % 2 == 1
+        return -math.inf if left < 0 and odd else math.inf
+    except ValueError:
+        # A zero base to a negative power, or a negative one to a fraction
+        if left == 0:
+            odd = right.is_integer() and right % 2 == 1
+            return math.copysign(math.inf, left) if odd else math.inf
+        return -math.nan
+
+
+def c_format(text_format, value):
+    """
+    What printf prints for a value with a single %d, %c, %g or %s: the
+    sign of a NaN, the low byte of a char and (null) for a null string.
+    """
+
+    if value is None:
+        return text_format % "(null)"
+    if value != value and math.copysign(1.0, value) < 0:
+        return text_format.replace('%g', '-nan')
+    if '%c' in text_format:
+        return text_format % (value & 255)
+    return text_format % value
+
+
+class NumberReader:
+    """
+    Reads doubles from a text stream like scanf("%lf") does.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.words = []
+
+    def read(self):
+        """
+        The number starting the next word, or 0 without consuming anything
+        when there isn't one.
+        """
+
+        while not self.words:
+            line = self.stream.readline()
+            if not line:
+                return 0.0
+            self.words = line.split()[::-1]
+        word = self.words[-1]
+        match = number_pattern.match(word)
+        if match is None:
+            return 0.0
+        rest = word[match.end():]
+        if rest:
+            self.words[-1] = rest
+        else:
+            self.words.pop()
+        return float(match.group())
+
+
+class VirtualMachine:
+    """
+    Runs a Program, with the semantics of the C the other backends emit:
+    ints wrap at 32 bits, int division truncates, floats round to single
+    precision and conversions follow C's.
+
+    Registers are a list, the constant pool copied to its start. The
+    dispatch loop tests the opcodes the loops of a program run most
+    first: the fused compares and branches, moves and int arithmetic.
+    """
+
+    def __init__(self, program, stdin=None, stdout=None):
+        self.program = program
+        self.stdin = stdin if stdin is not None else sys.stdin
+        self.stdout = stdout if stdout is not None else sys.stdout
+        self.reader = NumberReader(self.stdin)
+
+    def run(self):
+        program = self.program
+        # The array is the compact form of the code, a list is faster to
+        # index since it doesn't box every word it returns
+        code = program.code.tolist()
+        r = list(program.constants) + [0] * (program.registers - len(program.constants))
+        write = self.stdout.write
+        pc = 0
+
+        while True:
+            op = code[pc]
+            if op == MOVE:
+                r[code[pc + 1]] = r[code[pc + 2]]
+                pc += 3
+            elif op == ADD_I_JUMP:
+                value = r[code[pc + 2]] + r[code[pc + 3]]
+                r[code[pc + 1]] = value if -2147483648 <= value <= 2147483647 else wrap(value)
+                pc = code[pc + 4]
+            elif op == BRANCH_LESS:
+                pc = code[pc + 3] if r[code[pc + 1]] < r[code[pc + 2]] else code[pc + 4]
+            elif op == ADD_I:
+                value = r[code[pc + 2]] + r[code[pc + 3]]
+                r[code[pc + 1]] = value if -2147483648 <= value <= 2147483647 else wrap(value)
+                pc += 4
+            elif op == JUMP:
+                pc = code[pc + 1]
+            elif op == ADD_D:
+                r[code[pc + 1]] = r[code[pc + 2]] + r[code[pc + 3]]
+                pc += 4
+            elif op == SUB_I:
+                value = r[code[pc + 2]] - r[code[pc + 3]]
+                r[code[pc + 1]] = value if -2147483648 <= value <= 2147483647 else wrap(value)
+                pc += 4
+            elif op == MUL_I:
+                value = r[code[pc + 2]] * r[code[pc + 3]]
+                r[code[pc + 1]] = value if -2147483648 <= value <= 2147483647 else wrap(value)
+                pc += 4
+            elif op == BRANCH_GREATER:
+                pc = code[pc + 3] if r[code[pc + 1]] > r[code[pc + 2]] else code[pc + 4]
+            elif op == BRANCH_LESS_EQUAL:
+                pc = code[pc + 3] if r[code[pc + 1]] <= r[code[pc + 2]] else code[pc + 4]
+            elif op == BRANCH_GREATER_EQUAL:
+                pc = code[pc + 3] if r[code[pc + 1]] >= r[code[pc + 2]] else code[pc + 4]
+            elif op == BRANCH_EQUAL:
+                pc = code[pc + 3] if r[code[pc + 1]] == r[code[pc + 2]] else code[pc + 4]
+            elif op == BRANCH_NOT_EQUAL:
+                pc = code[pc + 3] if r[code[pc + 1]] != r[code[pc + 2]] else code[pc + 4]
+            elif op == BRANCH:
+                pc = code[pc + 2] if r[code[pc + 1]] else code[pc + 3]
+            elif op == SUB_D:
+                r[code[pc + 1]] = r[code[pc + 2]] - r[code[pc + 3]]
+                pc += 4
+            elif op == MUL_D:
+                r[code[pc + 1]] = r[code[pc + 2]] * r[code[pc + 3]]
+                pc += 4
+            elif op == DIV_I:
+                right = r[code[pc + 3]]
+                if not right:
+                    raise RuntimeException("Division by zero")
+                value = int(r[code[pc + 2]] / right)
+                r[code[pc + 1]] = value if -2147483648 <= value <= 2147483647 else wrap(value)
+                pc += 4
+            elif op == DIV_D:
+                r[code[pc + 1]] = divide(r[code[pc + 2]], r[code[pc + 3]])
+                pc += 4
+            elif op == PRINT:
+                value = r[code[pc + 1]]
+                text = r[code[pc + 2]]
+                if value == value:
+                    try:
+                        write(text % value)
+                    except (OverflowError, TypeError):
+                        # %c of a negative char, %s of a null string
+                        write(c_format(text, value))
+                else:
+                    write(c_format(text, value))
+                pc += 3
+            elif op == LESS:
+                r[code[pc + 1]] = r[code[pc + 2]] < r[code[pc + 3]]
+                pc += 4
+            elif op == LESS_EQUAL:
+                r[code[pc + 1]] = r[code[pc + 2]] <= r[code[pc + 3]]
+                pc += 4
+            elif op == GREATER:
+                r[code[pc + 1]] = r[code[pc + 2]] > r[code[pc + 3]]
+                pc += 4
+            elif op == GREATER_EQUAL:
+                r[code[pc + 1]] = r[code[pc + 2]] >= r[code[pc + 3]]
+                pc += 4
+            elif op == EQUAL:
+                r[code[pc + 1]] = r[code[pc + 2]] == r[code[pc + 3]]
+                pc += 4
+            elif op == NOT_EQUAL:
+                r[code[pc + 1]] = r[code[pc + 2]] != r[code[pc + 3]]
+                pc += 4
+            elif op == TO_INT:
+                r[code[pc + 1]] = to_int(r[code[pc + 2]])
+                pc += 3
+            elif op == TO_DOUBLE:
+                r[code[pc + 1]] = float(r[code[pc + 2]])
+                pc += 3
+            elif op == ADD_F:
+                r[code[pc + 1]] = single(r[code[pc + 2]] + r[code[pc + 3]])
+                pc += 4
+            elif op == SUB_F:
+                r[code[pc + 1]] = single(r[code[pc + 2]] - r[code[pc + 3]])
+                pc += 4
+            elif op == MUL_F:
+                r[code[pc + 1]] = single(r[code[pc + 2]] * r[code[pc + 3]])
+                pc += 4
+            elif op == DIV_F:
+                r[code[pc + 1]] = single(divide(r[code[pc + 2]], r[code[pc + 3]]))
+                pc += 4
+            elif op == NEGATE_I:
+                value = -r[code[pc + 2]]
+                r[code[pc + 1]] = value if value <= 2147483647 else wrap(value)
+                pc += 3
+            elif op == NEGATE_D:
+                r[code[pc + 1]] = -r[code[pc + 2]]
+                pc += 3
+            elif op == NOT:
+                r[code[pc + 1]] = not r[code[pc + 2]]
+                pc += 3
+            elif op == INVERT:
+                r[code[pc + 1]] = ~r[code[pc + 2]]
+                pc += 3
+            elif op == TO_CHAR:
+                r[code[pc + 1]] = ((to_int(r[code[pc + 2]]) + 128) & 0xFF) - 128
+                pc += 3
+            elif op == TO_BOOL:
+                r[code[pc + 1]] = bool(r[code[pc + 2]])
+                pc += 3
+            elif op == TO_FLOAT:
+                r[code[pc + 1]] = single(float(r[code[pc + 2]]))
+                pc += 3
+            elif op == IS_NULL:
+                r[code[pc + 1]] = r[code[pc + 2]] is None
+                pc += 3
+            elif op == MOD_I:
+                right = r[code[pc + 3]]
+                if not right:
+                    raise RuntimeException("Division by zero")
+                r[code[pc + 1]] = remainder(r[code[pc + 2]], right)
+                pc += 4
+            elif op == MOD_D:
+                r[code[pc + 1]] = fmod(r[code[pc + 2]], r[code[pc + 3]])
+                pc += 4
+            elif op == POW_I:
+                r[code[pc + 1]] = int_power(r[code[pc + 2]], r[code[pc + 3]])
+                pc += 4
+            elif op == POW_D:
+                r[code[pc + 1]] = power(r[code[pc + 2]], r[code[pc + 3]])
+                pc += 4
+            elif op == AND:
+                r[code[pc + 1]] = r[code[pc + 2]] & r[code[pc + 3]]
+                pc += 4
+            elif op == OR:
+                r[code[pc + 1]] = r[code[pc + 2]] | r[code[pc + 3]]
+                pc += 4
+            elif op == XOR:
+                r[code[pc + 1]] = r[code[pc + 2]] ^ r[code[pc + 3]]
+                pc += 4
+            elif op == SHIFT_LEFT:
+                r[code[pc + 1]] = wrap(r[code[pc + 2]] << (r[code[pc + 3]] & 31))
+                pc += 4
+            elif op == SHIFT_RIGHT:
+                r[code[pc + 1]] = r[code[pc + 2]] >> (r[code[pc + 3]] & 31)
+                pc += 4
+            elif op == INPUT:
+                prompt, prompt_format = code[pc + 2], code[pc + 3]
+                if prompt >= 0:
+                    write(r[prompt] if prompt_format < 0 else c_format(r[prompt_format], r[prompt]))
+                self.stdout.flush()
+                r[code[pc + 1]] = self.reader.read()
+                pc += 4
+            elif op == RETURN:
+                return
+            else:
+                raise RuntimeException(f"Invalid opcode {op} at {pc}")
@@ -0,0 +1,135 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PhaseStats:
+    __slots__ = ('name', 'wall', 'cpu', 'peak_memory')
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_memory = None
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CompilationStats:
+    """
+    Per-phase measurements of one compilation.
+
+    The Lexer, Parser, Optimizer and Emitter record into it when one is
+    passed to them, `passes` holds what each optimization pass changed.
+    Peak memory is only traced (with tracemalloc) when memory=True,
+    tracing slows compilation down several times.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = {}
+        self.tokens = 0
+        self.statements = 0
+        self.c_bytes = 0
+        self.passes = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Measures the wrapped block as phase `name`, adding to earlier runs.
+        """
+
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(name)
+
+        started_tracing = False
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall += time.perf_counter() - wall
+            stats.cpu += time.process_time() - cpu
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                stats.peak_memory = max(stats.peak_memory or 0, peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def add_pass(self, name, counts):
+        """
+        Adds the counts of an optimization pass run.
+        """
+
+        totals = self.passes.setdefault(name, {})
+        for key, count in counts.items():
+            totals[key] = totals.get(key, 0) + count
+
+    def add(self, other):
+        """
+        Adds the measurements of another compilation, peaks are maxed.
+        """
+
+        for name, phase in other.phases.items():
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = PhaseStats(name)
+            stats.wall += phase.wall
+            stats.cpu += phase.cpu
+            if phase.peak_memory is not None:
+                stats.peak_memory = max(stats.peak_memory or 0, phase.peak_memory)
+        self.tokens += other.tokens
+        self.statements += other.statements
+        self.c_bytes += other.c_bytes
+        for name, counts in other.passes.items():
+            self.add_pass(name, counts)
+
+    @property
+    def tokens_per_second(self):
+        lex = self.phases.get('lex')
+        if lex is None or not lex.wall:
+            return None
+        return self.tokens / lex.wall
+
+    def as_dict(self):
+        return {
+            'phases': [phase.as_dict() for phase in self.phases.values()],
+            'tokens': self.tokens,
+            'statements': self.statements,
+            'tokens_per_second': self.tokens_per_second,
+            'c_bytes': self.c_bytes,
+            'passes': self.passes,
+        }
+
+    def to_json(self, **kwargs):
+        import json
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self, timings=True, memory=False):
+        """
+        Returns a printable table of the recorded phases.
+        """
+
+        lines = []
+        for phase in self.phases.values():
+            line = f"{phase.name:<8}"
+            if timings:
+                line += f"{phase.wall * 1000:>10.2f} ms wall{phase.cpu * 1000:>10.2f} ms cpu"
+            if memory and phase.peak_memory is not None:
+                line += f"{phase.peak_memory / 1024:>12.1f} KiB peak"
+            lines.append(line)
+
+        for name, counts in self.passes.items():
+            lines.append(f"{name:<12}" + ", ".join(f"{count} {key}" for key, count in counts.items()))
+        lines.append(f"tokens: {self.tokens}  statements: {self.statements}  C bytes: {self.c_bytes}")
+        if self.tokens_per_second is not None:
+            lines.append(f"{self.tokens_per_second:,.0f} tokens/s")
+        return "\n".join(lines)
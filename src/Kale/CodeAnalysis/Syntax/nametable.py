@@ -0,0 +1,51 @@
+from CodeAnalysis.Syntax.syntaxmap import keyword_map
+
+
+class NameTable:
+    """
+    Interns names to small integer ids.
+
+    Keywords are interned first, so a single probe of the table both
+    interns an identifier and tells whether it is a keyword.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.kinds = []
+
+        for word, kind in keyword_map.items():
+            self.add(word, kind)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, kind=None):
+        name_id = len(self.names)
+        self.ids[name] = name_id
+        self.names.append(name)
+        self.kinds.append(kind)
+        return name_id
+
+    def intern(self, name):
+        """
+        Returns the id of name, adding it to the table if it is new.
+        """
+
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.add(name)
+        return name_id
+
+    def keyword(self, name):
+        """
+        Returns the keyword kind of name, or None if it isn't a keyword.
+        """
+
+        name_id = self.ids.get(name)
+        if name_id is None:
+            return None
+        return self.kinds[name_id]
+
+    def name(self, name_id):
+        return self.names[name_id]
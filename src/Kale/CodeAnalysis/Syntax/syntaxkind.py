@@ -2,6 +2,10 @@ import enum
 
 
 class SyntaxKind(enum.Enum):
+    # Kinds are singletons, hashing them by identity makes a table keyed by
+    # kind a plain dict lookup rather than a call to Enum.__hash__
+    __hash__ = object.__hash__
+
     # Meta kinds
     # ----
     Comments                = -3
@@ -61,7 +65,7 @@ class SyntaxKind(enum.Enum):
     PlusToken               = 351
     MinusToken              = 352
     StartToken              = 353
-    SlashToken              = 353
+    SlashToken              = 354
     PipeToken               = 355
     AmpersandToken          = 356
     BangToken               = 357
@@ -22,3 +22,55 @@ keyword_map = {
     'var'       : SyntaxKind.VarKeyword,
     'while'     : SyntaxKind.WhileKeyword,
 }
+
+# Punctuators carry no value, operators carry their source text.
+# Multi-character entries must come before their prefixes so the
+# scanner's alternation always picks the longest match.
+punctuator_map = {
+    '('         : SyntaxKind.OpenParenthesisToken,
+    ')'         : SyntaxKind.CloseParenthesisToken,
+    '['         : SyntaxKind.OpenBracketsToken,
+    ']'         : SyntaxKind.CloseBracketsToken,
+    '{'         : SyntaxKind.OpenBraceToken,
+    '}'         : SyntaxKind.CloseBraceToken,
+    ','         : SyntaxKind.CommaToken,
+    ';'         : SyntaxKind.SemicolonToken,
+    '.'         : SyntaxKind.DotToken,
+}
+
+operator_map = {
+    '<<='       : SyntaxKind.LeftShiftEqualsToken,
+    '>>='       : SyntaxKind.RightShiftEqualsToken,
+    '**='       : SyntaxKind.DoubleStarEqualsToken,
+    '+='        : SyntaxKind.PlusEqualsToken,
+    '++'        : SyntaxKind.PlusPlusToken,
+    '-='        : SyntaxKind.MinusEqualsToken,
+    '--'        : SyntaxKind.MinusMinusToken,
+    '**'        : SyntaxKind.DoubleStarToken,
+    '*='        : SyntaxKind.StarEqualsToken,
+    '/='        : SyntaxKind.SlashEqualsToken,
+    '<='        : SyntaxKind.LessOrEqualsToken,
+    '<<'        : SyntaxKind.LeftShiftToken,
+    '>='        : SyntaxKind.GreaterOrEqualsToken,
+    '>>'        : SyntaxKind.RightShiftToken,
+    '=='        : SyntaxKind.EqualsEqualsToken,
+    '%='        : SyntaxKind.PercentEqualsToken,
+    '&='        : SyntaxKind.AmpersandEqualsToken,
+    '|='        : SyntaxKind.PipeEqualsToken,
+    '^='        : SyntaxKind.HatEqualsToken,
+    '!='        : SyntaxKind.BangEqualsToken,
+    ':'         : SyntaxKind.ColonToken,
+    '+'         : SyntaxKind.PlusToken,
+    '-'         : SyntaxKind.MinusToken,
+    '*'         : SyntaxKind.StartToken,
+    '/'         : SyntaxKind.SlashToken,
+    '|'         : SyntaxKind.PipeToken,
+    '&'         : SyntaxKind.AmpersandToken,
+    '<'         : SyntaxKind.LessToken,
+    '>'         : SyntaxKind.GreaterToken,
+    '='         : SyntaxKind.EqualsToken,
+    '%'         : SyntaxKind.PercentToken,
+    '!'         : SyntaxKind.BangToken,
+    '~'         : SyntaxKind.TildeToken,
+    '^'         : SyntaxKind.HatToken,
+}
@@ -1,23 +1,39 @@
-from dataclasses import dataclass
-from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
 from CodeAnalysis.Syntax.syntaxmap import keyword_map
 
 
-@dataclass
 class SyntaxToken:
-    kind: SyntaxKind = None
-    value: any = None
-    
+    """
+    A token and its value. Tokens compare by kind and value, the position
+    doesn't take part.
+
+    A plain class with __slots__ rather than a dataclass: importing
+    dataclasses pulls in inspect, which cost more than the rest of the
+    parser's imports together.
+    """
+
+    __slots__ = ('kind', 'value', 'position')
+
+    def __init__(self, kind=None, value=None, position=None):
+        self.kind = kind
+        self.value = value
+        # Source offset, set by Lexer.tokens()
+        self.position = position
+
+    def __eq__(self, other):
+        if type(other) is not SyntaxToken:
+            return NotImplemented
+        return self.kind is other.kind and self.value == other.value
+
+    __hash__ = None
+
     def __repr__(self):
         return self.kind.name + (f":{self.value}" if self.value is not None else "")
 
     def check_keyword(self, word):
-        for kind in SyntaxKind:
-            if self.is_a_keyword(word) and 100 <= kind.value < 300:
-                return self.get_keyword(word)
-    
+        return keyword_map.get(word)
+
     def is_a_keyword(self, word):
         return word in keyword_map
 
     def get_keyword(self, word):
-        return keyword_map[word]
\ No newline at end of file
+        return keyword_map[word]
@@ -0,0 +1,162 @@
+class SyntaxNode:
+    """
+    Base class of the syntax tree nodes built by the Parser.
+
+    Nodes only use __slots__ so a tree costs a few dozen bytes per node.
+    Subclasses take their slots, in order, as constructor arguments.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        # Every node's constructor takes its slots in order, much cheaper
+        # to pickle than the generic slots state
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+# Expressions
+# ----------------------------------------------------------------
+
+class LiteralExpression(SyntaxNode):
+    """
+    NumberToken, StringToken, TrueKeyword or FalseKeyword literal.
+    """
+
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind, value):
+        self.kind = kind
+        self.value = value
+
+
+class NameExpression(SyntaxNode):
+    __slots__ = ('name', 'name_id')
+
+    def __init__(self, name, name_id):
+        self.name = name
+        self.name_id = name_id
+
+
+class UnaryExpression(SyntaxNode):
+    """
+    Prefix or postfix operator applied to an operand.
+    """
+
+    __slots__ = ('operator', 'operand', 'postfix')
+
+    def __init__(self, operator, operand, postfix=False):
+        self.operator = operator
+        self.operand = operand
+        self.postfix = postfix
+
+
+class BinaryExpression(SyntaxNode):
+    __slots__ = ('left', 'operator', 'right')
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+
+class InputExpression(SyntaxNode):
+    """
+    input() with an optional prompt expression.
+    """
+
+    __slots__ = ('prompt',)
+
+    def __init__(self, prompt=None):
+        self.prompt = prompt
+
+
+# Statements
+# ----------------------------------------------------------------
+
+class PrintStatement(SyntaxNode):
+    __slots__ = ('expression',)
+
+    def __init__(self, expression):
+        self.expression = expression
+
+
+class IfStatement(SyntaxNode):
+    """
+    An else-if chain is an IfStatement as the only statement of else_body.
+    """
+
+    __slots__ = ('condition', 'body', 'else_body')
+
+    def __init__(self, condition, body, else_body=None):
+        self.condition = condition
+        self.body = body
+        self.else_body = else_body
+
+
+class WhileStatement(SyntaxNode):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body):
+        self.condition = condition
+        self.body = body
+
+
+class ForStatement(SyntaxNode):
+    __slots__ = ('initializer', 'condition', 'increment', 'body')
+
+    def __init__(self, initializer, condition, increment, body):
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+
+
+class LabelStatement(SyntaxNode):
+    __slots__ = ('name', 'name_id')
+
+    def __init__(self, name, name_id):
+        self.name = name
+        self.name_id = name_id
+
+
+class GotoStatement(SyntaxNode):
+    __slots__ = ('name', 'name_id')
+
+    def __init__(self, name, name_id):
+        self.name = name
+        self.name_id = name_id
+
+
+class DeclarationStatement(SyntaxNode):
+    """
+    Typed, let or var declaration. `keyword` is the SyntaxKind of the
+    declaring keyword, `initializer` is None when there is none.
+    """
+
+    __slots__ = ('keyword', 'name', 'name_id', 'initializer')
+
+    def __init__(self, keyword, name, name_id, initializer=None):
+        self.keyword = keyword
+        self.name = name
+        self.name_id = name_id
+        self.initializer = initializer
+
+
+class AssignmentStatement(SyntaxNode):
+    __slots__ = ('name', 'name_id', 'expression')
+
+    def __init__(self, name, name_id, expression):
+        self.name = name
+        self.name_id = name_id
+        self.expression = expression
+
+
+class CompilationUnit(SyntaxNode):
+    __slots__ = ('statements',)
+
+    def __init__(self, statements):
+        self.statements = statements
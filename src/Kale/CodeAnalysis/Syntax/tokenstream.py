@@ -0,0 +1,159 @@
+from array import array
+
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+from CodeAnalysis.Syntax.syntaxtoken import SyntaxToken
+from CodeAnalysis.Syntax.syntaxmap import keyword_map, punctuator_map
+
+
+kind_by_id = {kind.value: kind for kind in SyntaxKind}
+
+# Kinds whose token value is None
+valueless_ids = frozenset(
+    [kind.value for kind in keyword_map.values()] +
+    [kind.value for kind in punctuator_map.values()] +
+    [SyntaxKind.EndOfFileToken.value, SyntaxKind.NewLineToken.value]
+)
+
+
+class StreamToken:
+    """
+    Lightweight view of one token of a TokenStream.
+
+    Exposes the same kind/value interface as SyntaxToken. The value is only
+    sliced out of the source when it is read.
+    """
+
+    __slots__ = ('kind', 'stream', 'index')
+
+    def __init__(self, stream, index):
+        self.kind = kind_by_id[stream.kinds[index]]
+        self.stream = stream
+        self.index = index
+
+    @property
+    def value(self):
+        return self.stream.value(self.index)
+
+    @property
+    def position(self):
+        # Where the token starts, as SyntaxToken.position: a string's
+        # value starts after its opening quote
+        start = self.stream.start(self.index)
+        return start - 1 if self.kind is SyntaxKind.StringToken else start
+
+    def __eq__(self, other):
+        if not isinstance(other, (StreamToken, SyntaxToken)):
+            return NotImplemented
+        return self.kind is other.kind and self.value == other.value
+
+    __hash__ = None
+
+    def __repr__(self):
+        value = self.value
+        return self.kind.name + (f":{value}" if value is not None else "")
+
+
+class TokenStream:
+    """
+    Struct-of-arrays token store.
+
+    Each token is three 32 bit ints in parallel arrays (kind id, start and
+    end offset of its value in the source, so one past the opening quote
+    of a string), 12 bytes per token, against
+    about 110 bytes per token for a list of SyntaxToken objects (measured
+    with tracemalloc on generated declarations and prints).
+    StreamToken views are made on demand when indexing or iterating.
+
+    Offsets of tokens from `shift_from` on are stored `shift` too low, so
+    an edit can move the tail of the stream without rewriting it. Read
+    offsets through start() and end(), or normalize() first.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.shift_from = 0
+        self.shift = 0
+
+    def append(self, kind, start, end):
+        self.kinds.append(kind.value)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        if not 0 <= index < len(self.kinds):
+            raise IndexError("token index out of range")
+        return StreamToken(self, index)
+
+    def __iter__(self):
+        return self.tokens()
+
+    def tokens(self, start=0):
+        """
+        Yields token views from index start to the end of the stream.
+        """
+
+        for index in range(start, len(self.kinds)):
+            yield StreamToken(self, index)
+
+    def kind(self, index):
+        return kind_by_id[self.kinds[index]]
+
+    def start(self, index):
+        if index >= self.shift_from:
+            return self.starts[index] + self.shift
+        return self.starts[index]
+
+    def end(self, index):
+        if index >= self.shift_from:
+            return self.ends[index] + self.shift
+        return self.ends[index]
+
+    def normalize(self):
+        """
+        Applies the pending shift to the stored offsets.
+        """
+
+        if self.shift:
+            shift_from, add = self.shift_from, self.shift.__add__
+            self.starts[shift_from:] = array('i', map(add, self.starts[shift_from:]))
+            self.ends[shift_from:] = array('i', map(add, self.ends[shift_from:]))
+        self.shift_from = 0
+        self.shift = 0
+
+    def raw(self, index):
+        """
+        Returns the source slice of the token's value. For bytes sources
+        this is a memoryview, so no copy is made.
+        """
+
+        source = self.source
+        if not isinstance(source, str):
+            source = memoryview(source)
+        return source[self.start(index):self.end(index)]
+
+    def value(self, index):
+        """
+        Returns the token's value as SyntaxToken would hold it.
+        """
+
+        if self.kinds[index] in valueless_ids:
+            return None
+        text = self.source[self.start(index):self.end(index)]
+        if isinstance(text, str):
+            return text
+        return text.decode('utf-8')
+
+    def nbytes(self):
+        """
+        Returns the memory used by the token columns.
+        """
+
+        return sum(len(column) * column.itemsize for column in (self.kinds, self.starts, self.ends))
@@ -0,0 +1,202 @@
+import sys
+from collections import Counter
+
+from CodeAnalysis.Syntax.syntaxkind import SyntaxKind
+
+
+class TraceSink:
+    """
+    Receives structured events from the Lexer and Parser.
+
+    Positions are token indices for parser events. Every method is a no-op
+    here, sinks override the events they care about.
+    """
+
+    def token(self, token):
+        """
+        A token produced by Lexer.lex().
+        """
+
+    def enter(self, rule, token, position):
+        """
+        A production rule is entered with `token` as the current token.
+        """
+
+    def exit(self, rule, token, position):
+        """
+        A production rule returned, `token` is the token following it.
+        """
+
+    def consume(self, token, position):
+        """
+        The parser moved past `token`.
+        """
+
+
+statement_labels = {
+    SyntaxKind.PrintKeyword     : "Print-Statement",
+    SyntaxKind.IfKeyword        : "If-Statement",
+    SyntaxKind.WhileKeyword     : "While-Statement",
+    SyntaxKind.ForKeyword       : "For-Statement",
+    SyntaxKind.LabelKeyword     : "Label-Statement",
+    SyntaxKind.GotoKeyword      : "Goto-Statement",
+    SyntaxKind.IntKeyword       : "Int-Declaration",
+    SyntaxKind.CharKeyword      : "Char-Declaration",
+    SyntaxKind.FloatKeyword     : "Float-Declaration",
+    SyntaxKind.StringKeyword    : "String-Declaration",
+    SyntaxKind.BoolKeyword      : "Bool-Declaration",
+    SyntaxKind.DoubleKeyword    : "Double-Declaration",
+    SyntaxKind.LetKeyword       : "Let-Statement",
+    SyntaxKind.VarKeyword       : "Var-Statement",
+    SyntaxKind.IdentifierToken  : "Assignment-Statement",
+}
+
+prefix_operators = frozenset([
+    SyntaxKind.PlusToken, SyntaxKind.MinusToken, SyntaxKind.BangToken,
+    SyntaxKind.TildeToken, SyntaxKind.PlusPlusToken, SyntaxKind.MinusMinusToken,
+])
+
+postfix_operators = frozenset([SyntaxKind.PlusPlusToken, SyntaxKind.MinusMinusToken])
+
+# Operators that started another term or expression of the old grammar
+term_operators = frozenset([SyntaxKind.PlusToken, SyntaxKind.MinusToken])
+comparison_operators = frozenset([
+    SyntaxKind.EqualsEqualsToken, SyntaxKind.BangEqualsToken, SyntaxKind.LessToken,
+    SyntaxKind.LessOrEqualsToken, SyntaxKind.GreaterToken, SyntaxKind.GreaterOrEqualsToken,
+])
+
+
+class TextSink(TraceSink):
+    """
+    Prints the classic debug output of the compiler: every lexed token and
+    one line per rule, statement and operand.
+
+    The Comparison, Expression and Term lines of the old recursive descent
+    rules are derived from the operators consumed, so the output stays the
+    same for the programs that grammar accepted.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+        self.parentheses = []
+        self.after_else = False
+        self.after_prefix = False
+        self.condition = False
+        self.semicolons = 0
+        self.in_print = False
+        self.quiet_primary = False
+        self.input_prompt = False
+
+    def write(self, text):
+        print(text, file=self.file if self.file is not None else sys.stdout)
+
+    def token(self, token):
+        self.write(token)
+
+    def expression(self):
+        self.write("Expression")
+        self.write("Term")
+
+    def enter(self, rule, token, position):
+        kind = token.kind
+        if rule == 'statement':
+            label = statement_labels.get(kind)
+            if label is not None:
+                self.write(label)
+            self.in_print = kind is SyntaxKind.PrintKeyword
+        elif rule == 'expression':
+            if self.in_print and kind is SyntaxKind.StringToken:
+                # print("text") didn't go through the expression rules
+                self.quiet_primary = True
+            else:
+                if self.condition:
+                    self.write("Comparison")
+                self.expression()
+            self.in_print = self.condition = False
+        elif rule == 'primary':
+            self.parentheses.append(kind is SyntaxKind.OpenParenthesisToken)
+            if self.input_prompt:
+                self.input_prompt = False
+                self.expression()
+            if self.quiet_primary:
+                self.quiet_primary = False
+            elif kind is SyntaxKind.OpenParenthesisToken:
+                self.write("Primary (")
+                self.expression()
+            elif kind is SyntaxKind.InputKeyword:
+                self.write("Input")
+            elif kind in (SyntaxKind.NumberToken, SyntaxKind.StringToken, SyntaxKind.IdentifierToken):
+                self.write(f"Primary ({token.value})")
+        elif rule == 'unary':
+            if self.input_prompt:
+                self.input_prompt = False
+                self.expression()
+            self.after_prefix = True
+            self.write(f"Unary ({token.value})")
+        else:
+            self.write(rule.capitalize())
+
+    def exit(self, rule, token, position):
+        if rule == 'primary':
+            if self.parentheses.pop():
+                self.write(")")
+
+    def consume(self, token, position):
+        kind = token.kind
+        if self.after_prefix:
+            # The prefix operator itself
+            self.after_prefix = False
+        elif kind in postfix_operators:
+            self.write(f"Unary ({token.value})")
+        elif kind in term_operators:
+            self.write("Term")
+        elif kind in comparison_operators:
+            self.expression()
+        elif kind is SyntaxKind.OpenParenthesisToken and self.input_prompt is None:
+            # input( is followed by a prompt expression or )
+            self.input_prompt = True
+        elif kind is SyntaxKind.CloseParenthesisToken:
+            self.input_prompt = False
+
+        if kind is SyntaxKind.InputKeyword:
+            self.input_prompt = None
+        elif kind is SyntaxKind.WhileKeyword:
+            self.condition = True
+        elif kind is SyntaxKind.SemicolonToken:
+            # The condition follows the first semicolon of a for
+            self.semicolons += 1
+            self.condition = self.semicolons % 2 == 1
+
+        if self.after_else:
+            self.after_else = False
+            if kind is SyntaxKind.IfKeyword:
+                self.write("Else-If-Statement")
+            elif kind is SyntaxKind.OpenBraceToken:
+                self.write("Else-Statement")
+        elif kind is SyntaxKind.ElseKeyword:
+            self.after_else = True
+        if kind is SyntaxKind.IfKeyword:
+            self.condition = True
+
+
+class CountingSink(TraceSink):
+    """
+    Counts rule entries and consumed tokens by kind, for finding hot rules.
+    """
+
+    def __init__(self):
+        self.rules = Counter()
+        self.tokens = Counter()
+
+    def enter(self, rule, token, position):
+        self.rules[rule] += 1
+
+    def consume(self, token, position):
+        self.tokens[token.kind] += 1
+
+    def report(self, limit=10):
+        lines = ["Rules:"]
+        lines += [f"  {rule:<16}{count}" for rule, count in self.rules.most_common(limit)]
+        lines += ["Tokens:"]
+        lines += [f"  {kind.name:<24}{count}" for kind, count in self.tokens.most_common(limit)]
+        return "\n".join(lines)
@@ -1,50 +1,125 @@
 import sys
+
+# The subcommands are dispatched before anything else is imported, none
+# of them needs the compiler's modules loaded here
+
+# `kale lsp` serves diagnostics over stdio, nothing else may be printed
+if sys.argv[1:2] == ["lsp"]:
+    from CodeAnalysis.LanguageServer.languageserver import main
+    main()
+    sys.exit(0)
+
+# `kale run` runs a program without a C compiler, on the bytecode VM or with `--backend python` as Python
+if sys.argv[1:2] == ["run"]:
+    from CodeAnalysis.Running.runner import main
+    sys.exit(main(sys.argv[2:]))
+
+import argparse
 import time
 
-from CodeAnalysis.Parsing.lexer import Lexer
-from CodeAnalysis.Parsing.parser import Parser
-# from CodeAnalysis.Emitting.emitter import Emitter
+from CodeAnalysis.Compilation.compilation import CompilationOptions, compile_files, expand
+from CodeAnalysis.Diagnostics.diagnosticrenderer import error, report_errors
 
+arg_parser = argparse.ArgumentParser(prog="kale", description="Kale compiler")
+arg_parser.add_argument("files", nargs="+", metavar="file", help="Kale source files or glob patterns")
+arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+arg_parser.add_argument("-q", "--quiet", action="store_true", help="don't print the parse trace")
+arg_parser.add_argument("--check", action="store_true", help="only report errors, don't write C")
+arg_parser.add_argument("-b", "--build", action="store_true", help="compile the C to executables")
+arg_parser.add_argument("-O", dest="optimization", type=int, choices=range(4), default=0, metavar="LEVEL",
+                        help="optimization level of the C, 0 to 3, above 0 each file is held whole in memory "
+                             "(default: %(default)s)")
+arg_parser.add_argument("--cc-O", dest="c_optimization", type=int, choices=range(4), default=2, metavar="LEVEL",
+                        help="optimization level of the C compiler, 0 to 3 (default: %(default)s)")
+arg_parser.add_argument("--march-native", action="store_true", help="optimize the executables for this CPU")
+arg_parser.add_argument("--timings", action="store_true", help="report wall and cpu time per phase")
+arg_parser.add_argument("--memory", action="store_true", help="report peak memory per phase (slow)")
+arg_parser.add_argument("--stats-json", metavar="PATH", help="write compilation statistics as JSON to PATH")
+arg_parser.add_argument("--cache-dir", metavar="PATH",
+                        help="compilation cache directory (default: $KALE_CACHE_DIR or ~/.cache/kale)")
+arg_parser.add_argument("--cache-size", type=int, default=512, metavar="MB", help="compilation cache size cap")
+arg_parser.add_argument("--no-cache", action="store_true", help="don't read or write the compilation cache")
+args = arg_parser.parse_args()
+paths = expand(args.files)
+if not paths:
+    arg_parser.error("no input files")
 
 print("Kale")
-text = None
 
-if len(sys.argv) != 2:
-    sys.exit("Error: compiler needs input files")
-with open(sys.argv[1], 'r') as source_file:
-    source = source_file.read()
+# The cache and statistics modules are only imported when used, a clean
+# --no-cache compile doesn't pay for them
+cache = None
+if not args.no_cache:
+    from CodeAnalysis.Caching.compilationcache import CompilationCache
+    cache = CompilationCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+options = CompilationOptions(
+    trace=not args.quiet,
+    stats=bool(args.timings or args.memory or args.stats_json),
+    memory=args.memory,
+    cache_dir=cache.directory if cache is not None else None,
+    emit=not args.check,
+    optimization=args.optimization,
+)
+
+stats = None
+if options.stats:
+    from CodeAnalysis.Statistics.compilationstats import CompilationStats
+    stats = CompilationStats(memory=args.memory)
+failed = 0
+c_paths = []
+start = time.perf_counter()
 
-filename = sys.argv[1].split(".")[0]
+# Results come back in argument order whatever the worker count
+for result in compile_files(paths, options, args.jobs):
+    sys.stdout.write(result.output)
 
-lexer   = Lexer(source)
-token_list = lexer.lex()
-# emitter = Emitter(filename)
-parser  = Parser(token_list, debug=True)
+    # Every error of the run is reported, no C is written for a file with one
+    if result.failed:
+        failed += 1
+        print()
+        report_errors(result.path, result.diagnostics, result.dropped)
 
+    if result.c_path is not None:
+        c_paths.append(result.c_path)
+    if stats is not None and result.stats is not None:
+        stats.add(result.stats)
+    if cache is not None and result.hits is not None:
+        cache.hits.update(result.hits)
+        cache.misses.update(result.misses)
 
-# ------------
-bar_width = 20
-sys.stdout.write("□□" * bar_width)
-sys.stdout.flush()
-sys.stdout.write("\b" * 2 * (bar_width+1))
+elapsed = time.perf_counter() - start
 
-for i in range(bar_width):
-    time.sleep(0.000000001)
-    sys.stdout.write("■■")
-    sys.stdout.flush()
+if len(paths) == 1:
+    if not failed:
+        print("\nCompilation complete.")
+else:
+    rate = f" ({len(paths) / elapsed:,.1f} files/s)" if elapsed > 0 else ""
+    print(f"\nCompiled {len(paths) - failed} of {len(paths)} files in {elapsed:.2f} s{rate}")
 
-sys.stdout.write(" 100%\n")
-# ------------
+if args.build and c_paths:
+    from CodeAnalysis.Building.nativebuilder import BuildOptions, NativeBuilder, report
 
+    builder = NativeBuilder(BuildOptions(optimization=args.c_optimization, native=args.march_native), cache,
+                            args.jobs)
+    start = time.perf_counter()
+    results = []
+    for result in builder.build_all(c_paths):
+        results.append(result)
+        if result.failed:
+            failed += 1
+            error(f"{result.path}: Build failed: {result.error}")
+    print(report(results, time.perf_counter() - start))
 
-parser.program()
-# emitter.output()
+if cache is not None:
+    print(cache.report())
+    cache.trim()
 
-print("\nCompilation complete.")
+if stats is not None:
+    if args.timings or args.memory:
+        print(stats.report(timings=args.timings, memory=args.memory))
+    if args.stats_json:
+        with open(args.stats_json, 'w') as stats_file:
+            stats_file.write(stats.to_json(indent=4))
 
-exit(0)
-try:
-    # emitter.build(filename)
-    print("build complete.")
-except:
-    print("Compiling to executable failed. \nCouldn't find a C compiler. GCC/MSVC should be installed")
+exit(1 if failed else 0)